@@ -0,0 +1 @@
+"""Offline benchmarks for AI Release Guardian."""
@@ -0,0 +1,116 @@
+"""Benchmark matching acceptance criteria to large collected test suites.
+
+Generates pytest-style test ids and Jira-style acceptance criteria over a
+shared vocabulary, then times TestValidationAgent.validate_tests followed
+by check_coverage_gaps (one test-name index, reused by the second call)
+against the pairwise scan they replace: _matches_ac for every (AC, test)
+pair, run once per call. Above --naive-max tests the pairwise time is
+extrapolated from the first --naive-max tests. The bm25 columns time
+validate_tests in the BM25 similarity mode (index build and scoring) and
+count the criteria it covers. The marked column times validate_tests on
+the same suite with an ac marker on every test, which skips name matching.
+
+Usage:
+    python -m benchmarks.bench_ac_matcher [--tests 1000 10000 100000] [--criteria 300] [--naive-max 10000]
+        [--threshold 0.5]
+"""
+
+import argparse
+import random
+import time
+from typing import List
+
+from src.agents.test_validator import TestValidationAgent
+from src.utils.ac_matcher import mask_indices
+
+FEATURES = ["login", "logout", "password", "reset", "invoice", "export", "report", "dashboard", "invite",
+            "session", "token", "refund", "payment", "cart", "checkout", "search", "filter", "upload",
+            "profile", "avatar", "notification", "webhook", "audit", "billing", "subscription", "coupon"]
+ACTORS = ["user", "admin", "guest", "viewer", "owner", "customer"]
+VERBS = ["can", "cannot", "sees", "receives", "downloads", "creates", "deletes", "updates"]
+OUTCOMES = ["within two seconds", "after confirming", "with an error message", "in the audit trail",
+            "for expired accounts", "when offline", "on the next page", "as a CSV file"]
+
+
+def fake_tests(count: int, rng: random.Random) -> List[dict]:
+    """Test results for `count` pytest-style test ids."""
+    tests = []
+    for index in range(count):
+        feature, other = rng.sample(FEATURES, 2)
+        name = (f"tests/{feature}/test_{other}.py::Test{feature.title()}::"
+                f"test_{rng.choice(ACTORS)}_{rng.choice(VERBS)}_{feature}_{other}_{index}")
+        tests.append({"name": name, "status": "failed" if rng.random() < 0.02 else "passed"})
+    return tests
+
+
+def fake_criteria(count: int, rng: random.Random) -> List[str]:
+    """Acceptance criteria sentences."""
+    return [
+        f"{rng.choice(ACTORS).title()} {rng.choice(VERBS)} {rng.choice(FEATURES)} "
+        f"{rng.choice(FEATURES)} {rng.choice(OUTCOMES)}."
+        for _ in range(count)
+    ]
+
+
+def marked(tests: List[dict], criteria: List[str], rng: random.Random) -> List[dict]:
+    """Copies of the tests, each with an ac marker naming a random criterion by number."""
+    return [dict(test, ac=[{"issue": "BENCH-1", "criterion": f"AC-{rng.randint(1, len(criteria))}"}])
+            for test in tests]
+
+
+def pairwise(agent: TestValidationAgent, tests: List[dict], criteria: List[str]) -> List[List[int]]:
+    """Matches from _matches_ac on every (AC, test) pair."""
+    return [[i for i, test in enumerate(tests) if agent._matches_ac(test["name"], ac)] for ac in criteria]
+
+
+def timed_run(fn, *args) -> tuple:
+    """Return (seconds, result) of one call."""
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tests", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--criteria", type=int, default=300)
+    parser.add_argument("--naive-max", type=int, default=10000, help="largest suite to scan pairwise")
+    parser.add_argument("--threshold", type=float, default=0.5, help="bm25 similarity threshold")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    criteria = fake_criteria(args.criteria, rng)
+    print(f"{args.criteria} acceptance criteria")
+    print(f"{'tests':>8} {'pairwise s':>11} {'validate s':>11} {'gaps s':>7} {'covered':>8} {'agree':>6} "
+          f"{'bm25 s':>7} {'bm25 covered':>13} {'marked s':>9}")
+    for count in args.tests:
+        tests = fake_tests(count, rng)
+        results = {"tests": tests, "summary": {"total": count, "passed": count}}
+        agent = TestValidationAgent()
+
+        validate_s, validation = timed_run(agent.validate_tests, results, criteria)
+        gaps_s, _ = timed_run(agent.check_coverage_gaps, results, criteria)
+
+        sample = tests[:args.naive_max]
+        # validate_tests and check_coverage_gaps each ran the pairwise scan
+        naive_s, expected = timed_run(pairwise, agent, sample, criteria)
+        naive_s *= 2 * count / len(sample)
+        agree = expected == list(map(mask_indices, TestValidationAgent().match_criteria(sample, criteria)))
+        naive = f"{naive_s:>11.2f}" if len(sample) == count else f"{naive_s:>8.0f} ~ "
+        covered = sum(1 for ac in validation["ac_coverage"] if ac["tested"])
+
+        bm25_agent = TestValidationAgent(match_mode="bm25", similarity_threshold=args.threshold)
+        bm25_s, scored = timed_run(bm25_agent.validate_tests, results, criteria)
+        bm25_covered = sum(1 for ac in scored["ac_coverage"] if ac["tested"])
+        
+        annotated = dict(results, tests=marked(tests, criteria, rng))
+        marked_s, _ = timed_run(TestValidationAgent().validate_tests, annotated, criteria, 80.0, None,
+                                {"BENCH-1": criteria})
+        print(f"{count:>8} {naive} {validate_s:>11.3f} {gaps_s:>7.3f} {covered:>8} {str(agree):>6} "
+              f"{bm25_s:>7.3f} {bm25_covered:>13} {marked_s:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
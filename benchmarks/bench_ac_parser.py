@@ -0,0 +1,103 @@
+"""Benchmark acceptance-criteria extraction on adversarial descriptions.
+
+Builds descriptions shaped to stress a regex extractor (words containing
+"ac", criteria titles followed by long runs of "*" and "-", one huge
+line, thousands of nested bullets, long Given/When/Then scenarios and a
+deeply nested ADF document) at doubling sizes, and times the two regexes
+JiraClient used before against the line parser. A linear extractor's time
+doubles with the size; the ratio columns show the growth per doubling.
+The last columns count the criteria each extractor returns.
+
+Usage:
+    python -m benchmarks.bench_ac_parser [--sizes-kb 64 128 256 512 1024] [--repeat 3]
+"""
+
+import argparse
+import re
+import time
+from typing import Callable, Dict, List
+
+from src.utils.ac_parser import adf_to_text, parse_acceptance_criteria
+
+LEGACY_PATTERNS = [
+    r'(?:Acceptance Criteria|AC)[\s\n:]*([^*-]*(?:[*-][^\n]*)*)',
+    r'(?:Given|When|Then)([^\n]*)',
+]
+
+
+def legacy_extract(description: str) -> List[str]:
+    """The regex extraction JiraClient._extract_ac_from_description used to run."""
+    matches = []
+    for pattern in LEGACY_PATTERNS:
+        matches.extend(re.findall(pattern, description, re.IGNORECASE | re.MULTILINE))
+    cleaned = [m.strip().strip('*').strip('-').strip() for m in matches]
+    return list(set(m for m in cleaned if len(m) > 10))
+
+
+def repeat_to(unit: str, size: int) -> str:
+    """`unit` repeated to `size` characters."""
+    return (unit * (size // len(unit) + 1))[:size]
+
+
+def adversarial_inputs(size: int) -> Dict[str, Callable[[], object]]:
+    """Builders of descriptions of about `size` characters, by name."""
+    def nested_adf():
+        # Lists nested inside list items, each item holding a short paragraph
+        depth = max(1, size // 60)
+        node = {"type": "paragraph", "content": [{"type": "text", "text": "Innermost criterion holds"}]}
+        for level in range(depth):
+            node = {"type": "bulletList", "content": [{"type": "listItem", "content": [
+                {"type": "paragraph", "content": [{"type": "text", "text": f"Criterion at depth {level}"}]}, node,
+            ]}]}
+        return {"type": "doc", "content": [
+            {"type": "heading", "attrs": {"level": 2}, "content": [{"type": "text", "text": "Acceptance Criteria"}]},
+            node,
+        ]}
+
+    return {
+        "ac-words": lambda: repeat_to("account react practice facade backtrack ", size),
+        "title+dashes": lambda: "Acceptance Criteria:\n" + repeat_to("*-*- ", size),
+        "ac-runs": lambda: repeat_to("AC AC: * - ac * -\n", size),
+        "one-line": lambda: "h2. Acceptance Criteria\n* " + repeat_to("user sees the report ", size),
+        "bullets": lambda: "h2. Acceptance Criteria\n" + repeat_to("** nested criterion number ten\n", size),
+        "gherkin": lambda: repeat_to("Given a user\nWhen they act thenceforth\nThen the given result\n", size),
+        "adf-nested": nested_adf,
+    }
+
+
+def measure(fn: Callable, value, repeat: int) -> float:
+    """Best of `repeat` timings of fn(value), in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(value)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes-kb", type=int, nargs="+", default=[64, 128, 256, 512, 1024])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'input':>13} {'KB':>6} {'legacy ms':>10} {'ratio':>6} {'parser ms':>10} {'ratio':>6} {'legacy ac':>10} {'parser ac':>10}")
+    for name in adversarial_inputs(1):
+        previous = None
+        for size_kb in args.sizes_kb:
+            description = adversarial_inputs(size_kb * 1024)[name]()
+            # The legacy regexes only read text, so they get the flattened ADF document
+            text = description if isinstance(description, str) else adf_to_text(description)
+            legacy_s = measure(legacy_extract, text, args.repeat)
+            parser_s = measure(parse_acceptance_criteria, description, args.repeat)
+            legacy_count, parser_count = len(legacy_extract(text)), len(parse_acceptance_criteria(description))
+            legacy_ratio = f"{legacy_s / previous[0]:.2f}" if previous else "-"
+            parser_ratio = f"{parser_s / previous[1]:.2f}" if previous else "-"
+            print(f"{name:>13} {size_kb:>6} {legacy_s * 1000:>10.1f} {legacy_ratio:>6} "
+                  f"{parser_s * 1000:>10.1f} {parser_ratio:>6} {legacy_count:>10} {parser_count:>10}")
+            previous = (legacy_s, parser_s)
+
+
+if __name__ == "__main__":
+    main()
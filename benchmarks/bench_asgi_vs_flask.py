@@ -0,0 +1,118 @@
+"""Benchmark the Flask MCP server against its ASGI variant under concurrent load.
+
+Each server runs for real on localhost in its own process (Flask on
+werkzeug with a bounded worker-thread pool, like a gthread deployment; the
+ASGI app on uvicorn) and is driven by the same asyncio load generator. The
+planner and pipeline are replaced by stand-ins with fixed PR-fetch and
+Claude latencies, so the numbers show how each server copes with requests
+that mostly wait on upstream I/O.
+
+Usage:
+    python -m benchmarks.bench_asgi_vs_flask [--requests 400] [--concurrency 100] [--flask-threads 32]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+import httpx
+import uvicorn
+
+from benchmarks.fakes import FakeAnalysisAgents
+from benchmarks.servers import ServerProcess, ThreadPoolWSGIServer
+from src.integrations.pool import ClientPool
+from src.mcp.asgi import AsyncReleaseGuardianServer
+from src.mcp.server import ReleasGuardianMCPServer
+
+
+def serve_flask(port: int, threads: int, fetch_seconds: float, llm_seconds: float):
+    """Serve the Flask app until the process is terminated."""
+    agents = FakeAnalysisAgents(fetch_seconds, llm_seconds)
+    server = ReleasGuardianMCPServer()
+    server.clients = ClientPool()
+    server.clients.get("agent:planner", lambda: agents)
+    server.clients.get("agent:analysis_pipeline", lambda: agents)
+
+    ThreadPoolWSGIServer("127.0.0.1", port, server.app, threads).serve_forever()
+
+
+def serve_asgi(port: int, fetch_seconds: float, llm_seconds: float):
+    """Serve the ASGI app with uvicorn until the process is terminated."""
+    agents = FakeAnalysisAgents(fetch_seconds, llm_seconds)
+    app = AsyncReleaseGuardianServer()
+    app.clients.get("agent:planner", lambda: agents)
+    app.clients.get("agent:analysis_pipeline", lambda: agents)
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+async def drive(url: str, requests: int, concurrency: int) -> dict:
+    """POST `requests` distinct analyze-release requests, `concurrency` at a time."""
+    latencies = []
+    errors = 0
+    slots = asyncio.Semaphore(concurrency)
+    # A fresh connection per request: the werkzeug server closes connections
+    # anyway, and httpx's keep-alive pool slows down badly with many idle
+    # connections, which would be measured as server latency.
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=0)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=120.0) as client:
+        async def one(pr_number: int):
+            nonlocal errors
+            async with slots:
+                start = time.perf_counter()
+                response = await client.post("/analyze-release", json={
+                    "repo_owner": "org", "repo_name": "repo", "pr_number": pr_number,
+                })
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(pr_number) for pr_number in range(1, requests + 1)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50": statistics.median(latencies),
+        "p99": latencies[int(0.99 * (len(latencies) - 1))],
+        "errors": errors,
+    }
+
+
+def main():
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=100, help="in-flight requests")
+    parser.add_argument("--flask-threads", type=int, default=32, help="Flask worker threads")
+    parser.add_argument("--fetch-ms", type=float, default=50.0)
+    parser.add_argument("--llm-ms", type=float, default=300.0)
+    args = parser.parse_args()
+
+    os.environ["MCP_COALESCE_ENABLED"] = "false"
+    fetch_seconds, llm_seconds = args.fetch_ms / 1000, args.llm_ms / 1000
+
+    print(
+        f"{args.requests} analyze-release requests, {args.concurrency} in flight "
+        f"(fetch {args.fetch_ms:.0f} ms, Claude {args.llm_ms:.0f} ms)"
+    )
+    print(f"{'server':>22} {'req/s':>8} {'p50 s':>7} {'p99 s':>7} {'errors':>7}")
+    servers = [
+        (f"flask ({args.flask_threads} threads)", serve_flask, (args.flask_threads, fetch_seconds, llm_seconds)),
+        ("asgi (uvicorn)", serve_asgi, (fetch_seconds, llm_seconds)),
+    ]
+    for name, target, target_args in servers:
+        server = ServerProcess(target, *target_args)
+        try:
+            result = asyncio.run(drive(server.url, args.requests, args.concurrency))
+        finally:
+            server.stop()
+        print(f"{name:>22} {result['rps']:>8.1f} {result['p50']:>7.3f} {result['p99']:>7.3f} {result['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Benchmark the rule-table file classifier on monorepo-scale PRs.
+
+Generates PRs of synthetic monorepo paths (services, web apps, infra,
+migrations, tests, docs) and classifies them three ways: the substring
+chain PlannerAgent used before, a freshly compiled FileClassifier (cold
+memo) and the same classifier on a second PR sharing most paths with the
+first (warm memo, as for later pushes of a PR or PRs in the same repo).
+Also counts paths the two approaches put in different categories.
+
+Usage:
+    python -m benchmarks.bench_file_classifier [--paths 10000 100000] [--overlap 0.9] [--seed 1]
+"""
+
+import argparse
+import random
+import time
+from typing import List
+
+from src.utils.file_classifier import FileClassifier
+
+SERVICES = ["billing", "orders", "auth", "search", "inventory", "notifications", "payments", "contest"]
+LAYOUTS = [
+    "services/{svc}/src/{pkg}/{name}.py",
+    "services/{svc}/src/{pkg}/{name}.go",
+    "services/{svc}/src/main/java/com/acme/{pkg}/{Name}Service.java",
+    "services/{svc}/src/test/java/com/acme/{pkg}/{Name}ServiceTest.java",
+    "services/{svc}/tests/test_{name}.py",
+    "services/{svc}/migrations/{num:04d}_{name}.py",
+    "services/{svc}/db/migrate/{num}_{name}.rb",
+    "services/{svc}/config/{name}.yaml",
+    "services/{svc}/{name}.json",
+    "web/{svc}/src/components/{Name}.tsx",
+    "web/{svc}/src/components/{Name}.test.tsx",
+    "web/{svc}/src/styles/{name}.scss",
+    "web/{svc}/types/{name}.d.ts",
+    "web/{svc}/{name}.config.js",
+    "infra/terraform/{svc}/{name}.tf",
+    "deploy/k8s/{svc}/{name}.yml",
+    "services/{svc}/Dockerfile",
+    "docs/{svc}/{name}.md",
+    "sql/{svc}/{name}.sql",
+    "tools/{pkg}/{name}.sh",
+]
+WORDS = ["latest", "attest", "respect", "specific", "manifest", "router", "handler", "schema", "api", "user",
+         "invoice", "ledger", "cart", "session", "token", "report", "export", "import", "cache", "queue"]
+
+
+def legacy_classify(files: List[dict]) -> dict:
+    """The substring chain PlannerAgent._classify_files used to run."""
+    classification = {
+        "backend": [], "frontend": [], "database": [], "infrastructure": [], "config": [], "tests": [], "other": [],
+    }
+    for file_info in files:
+        filename = file_info["filename"].lower()
+        if "test" in filename or "spec" in filename:
+            classification["tests"].append(filename)
+        elif any(ext in filename for ext in [".sql", ".migration", ".ddl"]):
+            classification["database"].append(filename)
+        elif any(ext in filename for ext in [".tf", ".yaml", ".yml", "docker", "k8s"]):
+            classification["infrastructure"].append(filename)
+        elif any(ext in filename for ext in [".json", ".toml", ".env", "config"]):
+            classification["config"].append(filename)
+        elif any(ext in filename for ext in [".js", ".jsx", ".tsx", ".ts", ".vue", ".css"]):
+            classification["frontend"].append(filename)
+        elif any(ext in filename for ext in [".py", ".go", ".java", ".rs", ".cpp", ".c"]):
+            classification["backend"].append(filename)
+        else:
+            classification["other"].append(filename)
+    return {k: v for k, v in classification.items() if v}
+
+
+def fake_paths(count: int, rng: random.Random) -> List[str]:
+    """Distinct synthetic monorepo paths."""
+    paths = set()
+    while len(paths) < count:
+        name = "_".join(rng.sample(WORDS, 2)) + str(rng.randrange(1000))
+        paths.add(rng.choice(LAYOUTS).format(
+            svc=rng.choice(SERVICES), pkg=rng.choice(WORDS), name=name,
+            Name=name.title().replace("_", ""), num=rng.randrange(10000),
+        ))
+    return sorted(paths)
+
+
+def timed_run(fn, *args) -> tuple:
+    """Return (seconds, result) of one call."""
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paths", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--overlap", type=float, default=0.9, help="share of the second PR's paths seen before")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'paths':>8} {'legacy s':>9} {'cold s':>7} {'warm s':>7} {'compile ms':>11} {'disagree':>9}")
+    for count in args.paths:
+        first = fake_paths(count, rng)
+        fresh = fake_paths(count - int(count * args.overlap), rng)
+        second = rng.sample(first, int(count * args.overlap)) + fresh
+        first_files = [{"filename": path} for path in first]
+        second_files = [{"filename": path} for path in second]
+
+        legacy_s, legacy = timed_run(legacy_classify, first_files)
+        compile_s, classifier = timed_run(FileClassifier)
+        cold_s, result = timed_run(classifier.classify_files, first_files)
+        warm_s, _ = timed_run(classifier.classify_files, second_files)
+
+        legacy_category = {path: category for category, paths in legacy.items() for path in paths}
+        disagree = sum(1 for path in first if legacy_category[path.lower()] != classifier.classify(path))
+        print(f"{count:>8} {legacy_s:>9.3f} {cold_s:>7.3f} {warm_s:>7.3f} {compile_s * 1000:>11.2f} {disagree:>9}")
+
+    print("\nSample disagreements (path: legacy -> rule table):")
+    shown = 0
+    for path in first:
+        if legacy_category[path.lower()] != classifier.classify(path) and shown < 8:
+            print(f"  {path}: {legacy_category[path.lower()]} -> {classifier.classify(path)}")
+            shown += 1
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Benchmark serial vs bulk Jira ticket fetching against a local stand-in.
+
+Usage:
+    python -m benchmarks.bench_jira_bulk [--latency-ms 50] [--counts 1 5 20 50 120]
+"""
+
+import argparse
+import time
+from unittest.mock import patch
+
+from benchmarks.fakes import FakeJIRA
+from src.integrations.jira import JiraClient
+
+
+def run(ticket_count: int, latency_seconds: float, bulk: bool) -> dict:
+    """Fetch `ticket_count` tickets and report round trips and wall time."""
+    fake = FakeJIRA(latency_seconds=latency_seconds)
+    with patch("src.integrations.jira.JIRA", return_value=fake):
+        client = JiraClient(url="http://jira.local", user="bench", token="bench")
+    
+    ticket_ids = [f"PROJ-{i}" for i in range(1, ticket_count + 1)]
+    start = time.perf_counter()
+    tickets = client.get_multiple_tickets(ticket_ids, bulk=bulk)
+    elapsed = time.perf_counter() - start
+    
+    assert len(tickets) == ticket_count
+    return {"round_trips": fake.round_trips, "seconds": elapsed}
+
+
+def main():
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--counts", type=int, nargs="+", default=[1, 5, 20, 50, 120])
+    args = parser.parse_args()
+    
+    latency = args.latency_ms / 1000
+    print(f"Simulated Jira latency: {args.latency_ms:.0f} ms per request")
+    print(f"{'tickets':>8} {'serial trips':>13} {'serial s':>9} {'bulk trips':>11} {'bulk s':>7} {'speedup':>8}")
+    for count in args.counts:
+        serial = run(count, latency, bulk=False)
+        bulk = run(count, latency, bulk=True)
+        speedup = serial["seconds"] / bulk["seconds"] if bulk["seconds"] else float("inf")
+        print(
+            f"{count:>8} {serial['round_trips']:>13} {serial['seconds']:>9.3f} "
+            f"{bulk['round_trips']:>11} {bulk['seconds']:>7.3f} {speedup:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Benchmark Lambda handler import time and first/warm request latency.
+
+Each mode runs in a fresh interpreter so module caches start cold:
+
+    eager   - every export of src.agents and src.integrations is imported up
+              front and clients are rebuilt on every invocation (the old
+              handler behavior)
+    lazy    - exports load on first access and clients come from the
+              process-wide ClientPool
+
+GitHub, Claude and the analysis itself are replaced with canned results, so
+the numbers cover imports and client construction, not network time. Real
+deployments additionally save the TLS handshake and the Jira server-info
+request that pooled clients avoid repeating.
+
+Usage:
+    python -m benchmarks.bench_lambda_startup [--invocations 5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SDK_MODULES = ["anthropic", "github", "jira", "pydantic", "flask"]
+
+
+def _event(head_sha: str) -> dict:
+    body = {
+        "action": "synchronize",
+        "pull_request": {"number": 7, "head": {"sha": head_sha}, "updated_at": head_sha},
+        "repository": {"name": "repo", "owner": {"login": "org"}},
+    }
+    return {"headers": {"X-GitHub-Delivery": head_sha}, "body": json.dumps(body)}
+
+
+def child(mode: str, invocations: int) -> dict:
+    """Measure one mode inside a fresh interpreter."""
+    from unittest.mock import patch
+
+    start = time.perf_counter()
+    sys.path.insert(0, str(ROOT / "lambda"))
+    if mode == "eager":
+        import src.agents
+        import src.integrations
+        for package in (src.agents, src.integrations):
+            for name in package.__all__:
+                getattr(package, name)
+    import handler
+    import_seconds = time.perf_counter() - start
+    loaded_at_import = [m for m in SDK_MODULES if m in sys.modules]
+
+    from src.integrations import get_client_pool
+    from src.models.schemas import RiskAssessment
+
+    context = {"pr_info": {"files": [], "head_sha": None}, "jira_tickets": [], "acceptance_criteria": []}
+    analysis = {
+        "test_result": {"integration_tests": [], "automation_tests": [], "e2e_flows": [], "total_tests": 0},
+        "risk": RiskAssessment(risk_score=10, confidence_percentage=90, risk_flags=[],
+                               suggestions=[], requires_manual_review=False),
+        "fast_path": None,
+        "incremental": {},
+    }
+
+    latencies = []
+    with patch("src.agents.planner.PlannerAgent.analyze_pr_context", return_value=context), \
+            patch("src.agents.incremental.IncrementalAnalyzer.analyze", return_value=analysis), \
+            patch("src.integrations.github.GitHubClient.post_pr_comment", return_value=True):
+        for i in range(invocations):
+            if mode == "eager":
+                get_client_pool().reset()
+            start = time.perf_counter()
+            response = handler.lambda_handler(_event(f"{mode}-{i:04d}"), None)
+            latencies.append(time.perf_counter() - start)
+            assert response["statusCode"] == 200, response
+
+    return {
+        "import_seconds": import_seconds,
+        "loaded_at_import": loaded_at_import,
+        "first_request_seconds": latencies[0],
+        "warm_request_seconds": statistics.median(latencies[1:]) if len(latencies) > 1 else None,
+    }
+
+
+def run(mode: str, invocations: int) -> dict:
+    """Run one mode in a subprocess and return its measurements."""
+    with tempfile.TemporaryDirectory() as state_dir:
+        env = {
+            **os.environ,
+            "GITHUB_TOKEN": "bench",
+            "CLAUDE_API_KEY": "bench",
+            "JIRA_API_TOKEN": "",
+            "STATE_TABLE_NAME": "",
+            "STATE_DIR": state_dir,
+            "WEBHOOK_DEBOUNCE_SECONDS": "0",
+            "CLAUDE_CACHE_ENABLED": "false",
+            "PYTHONPATH": str(ROOT),
+        }
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_lambda_startup", "--child", mode,
+             "--invocations", str(invocations)],
+            cwd=ROOT, env=env, capture_output=True, text=True, check=True
+        ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--invocations", type=int, default=5)
+    parser.add_argument("--child", choices=["eager", "lazy"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(child(args.child, max(args.invocations, 1))))
+        return
+
+    print(f"{'mode':>6} {'import ms':>10} {'first req ms':>13} {'cold total ms':>14} {'warm req ms':>12}  SDKs loaded at import")
+    for mode in ("eager", "lazy"):
+        result = run(mode, args.invocations)
+        warm = result["warm_request_seconds"]
+        print(
+            f"{mode:>6} {result['import_seconds'] * 1000:>10.1f} "
+            f"{result['first_request_seconds'] * 1000:>13.1f} "
+            f"{(result['import_seconds'] + result['first_request_seconds']) * 1000:>14.1f} "
+            f"{warm * 1000 if warm is not None else float('nan'):>12.1f}  "
+            f"{', '.join(result['loaded_at_import']) or '-'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
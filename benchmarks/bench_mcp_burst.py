@@ -0,0 +1,146 @@
+"""Benchmark MCP server analyze-release under bursty, duplicated load.
+
+Fires bursts of concurrent requests where several callers (e.g. CI and a
+human) ask for the same repo/PR/head SHA at once, and compares:
+
+    baseline  - clients and agents built per request, no coalescing
+    pooled    - shared client pool plus single-flight request coalescing
+
+GitHub/Jira/Claude are replaced by stand-ins with fixed latencies for
+connection setup, the PR fetch and the LLM analysis. The LLM stand-in
+serves a limited number of concurrent requests, like a rate-limited API
+key, so duplicate work shows up as queueing in the tail.
+
+Usage:
+    python -m benchmarks.bench_mcp_burst [--prs 4] [--duplicates 5] [--bursts 3]
+"""
+
+import argparse
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from src.integrations.pool import ClientPool
+from src.mcp.server import ReleasGuardianMCPServer
+from src.models.schemas import RiskAssessment
+
+
+class _PerRequestPool(ClientPool):
+    """Pool whose clients live for a single request (the old behavior)."""
+
+    def __init__(self):
+        super().__init__()
+        self._local = threading.local()
+
+    def begin_request(self):
+        self._local.clients = {}
+
+    def get(self, name, factory):
+        if name not in self._local.clients:
+            self._local.clients[name] = factory()
+        return self._local.clients[name]
+
+
+class Upstream:
+    """Stand-in for GitHub, Jira and Claude that counts calls."""
+
+    def __init__(self, connect_seconds: float, fetch_seconds: float, llm_seconds: float, llm_concurrency: int):
+        self.connect_seconds = connect_seconds
+        self.fetch_seconds = fetch_seconds
+        self.llm_seconds = llm_seconds
+        self.counts = {"connections": 0, "pr_fetches": 0, "llm_analyses": 0}
+        self._lock = threading.Lock()
+        self._llm_slots = threading.Semaphore(llm_concurrency)
+
+    def _count(self, name: str, seconds: float):
+        with self._lock:
+            self.counts[name] += 1
+        time.sleep(seconds)
+
+    def connect(self):
+        self._count("connections", self.connect_seconds)
+        return SimpleNamespace()
+
+    def analyze_pr_context(self, repo_owner, repo_name, pr_number):
+        self._count("pr_fetches", self.fetch_seconds)
+        return {"pr_info": {"files": []}, "jira_tickets": [], "acceptance_criteria": []}
+
+    def analyze(self, context, test_files=None):
+        with self._llm_slots:
+            self._count("llm_analyses", self.llm_seconds)
+        risk = RiskAssessment(risk_score=30, confidence_percentage=70, risk_flags=[],
+                              suggestions=[], requires_manual_review=False)
+        return {"test_result": {"total_tests": 3}, "risk": risk}
+
+
+def run(mode: str, prs: int, duplicates: int, bursts: int, upstream: Upstream) -> dict:
+    """Send `bursts` bursts of prs x duplicates concurrent requests."""
+    with patch.dict("os.environ", {"MCP_COALESCE_ENABLED": "true" if mode == "pooled" else "false"}):
+        server = ReleasGuardianMCPServer()
+    server.clients = ClientPool() if mode == "pooled" else _PerRequestPool()
+    server.app.config["TESTING"] = True
+
+    latencies = []
+
+    def request(pr_number: int):
+        start = time.perf_counter()
+        if mode == "baseline":
+            server.clients.begin_request()
+        with server.app.test_client() as client:
+            response = client.post("/analyze-release", json={
+                "repo_owner": "org", "repo_name": "repo", "pr_number": pr_number, "head_sha": f"sha-{pr_number}",
+            })
+        assert response.status_code == 200, response.data
+        latencies.append(time.perf_counter() - start)
+
+    with patch("src.integrations.github.create_github_client", side_effect=lambda: upstream.connect()), \
+            patch("src.integrations.claude.create_claude_analyzer", side_effect=lambda: upstream.connect()), \
+            patch("src.agents.planner.PlannerAgent.analyze_pr_context", side_effect=upstream.analyze_pr_context), \
+            patch("src.agents.analysis_pipeline.ReleaseAnalysisPipeline.analyze", side_effect=upstream.analyze), \
+            patch.dict("os.environ", {"JIRA_API_TOKEN": ""}):
+        with ThreadPoolExecutor(max_workers=prs * duplicates) as executor:
+            for burst in range(bursts):
+                pr_numbers = [burst * prs + pr + 1 for pr in range(prs) for _ in range(duplicates)]
+                list(executor.map(request, pr_numbers))
+
+    latencies.sort()
+    return {
+        **upstream.counts,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(0.95 * (len(latencies) - 1))],
+        "max": latencies[-1],
+    }
+
+
+def main():
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--prs", type=int, default=4, help="distinct PRs per burst")
+    parser.add_argument("--duplicates", type=int, default=5, help="identical requests per PR")
+    parser.add_argument("--bursts", type=int, default=3)
+    parser.add_argument("--connect-ms", type=float, default=40.0)
+    parser.add_argument("--fetch-ms", type=float, default=150.0)
+    parser.add_argument("--llm-ms", type=float, default=600.0)
+    parser.add_argument("--llm-concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    print(
+        f"{args.bursts} bursts x {args.prs} PRs x {args.duplicates} identical requests "
+        f"(connect {args.connect_ms:.0f} ms, fetch {args.fetch_ms:.0f} ms, "
+        f"LLM {args.llm_ms:.0f} ms x {args.llm_concurrency} concurrent)"
+    )
+    print(f"{'mode':>9} {'connections':>12} {'PR fetches':>11} {'LLM runs':>9} {'p50 s':>7} {'p95 s':>7} {'max s':>7}")
+    for mode in ("baseline", "pooled"):
+        upstream = Upstream(args.connect_ms / 1000, args.fetch_ms / 1000, args.llm_ms / 1000, args.llm_concurrency)
+        result = run(mode, args.prs, args.duplicates, args.bursts, upstream)
+        print(
+            f"{mode:>9} {result['connections']:>12} {result['pr_fetches']:>11} {result['llm_analyses']:>9} "
+            f"{result['p50']:>7.3f} {result['p95']:>7.3f} {result['max']:>7.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
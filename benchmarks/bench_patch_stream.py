@@ -0,0 +1,110 @@
+"""Benchmark peak memory of joined-diff scanning vs spooled single-pass scanning.
+
+The joined variant is what the pipeline used to do before building the
+prompt: keep every patch in memory, join them for the risky-keyword scan
+(and lowercase the result), then join them again for the prompt. The
+spooled variant collects the patches through a PatchSpool as GitHub pages
+them in, makes one pass that parses them and feeds the incremental-analysis
+hashes, then scans the added lines one file at a time. Both build the (unreduced) prompt diff last,
+since that string is what Claude is sent.
+
+Usage:
+    python -m benchmarks.bench_patch_stream [--sizes-mb 16 64 256] [--files 2000] [--spool-mb 64]
+"""
+
+import argparse
+import hashlib
+import time
+import tracemalloc
+from typing import Iterator
+
+from src.utils.diff_model import ParsedDiff
+from src.utils.patch_stream import PatchSpool, consume_patches, file_patch
+
+LINE = "+    result = compute_release_risk(pull_request, acceptance_criteria, options)\n"
+
+
+def fake_files(total_mb: int, files: int) -> Iterator[dict]:
+    """Yield PR file dictionaries as a paged GitHub listing would."""
+    lines_per_file = max(1, total_mb * 1024 * 1024 // files // len(LINE))
+    for i in range(files):
+        yield {
+            "filename": f"src/module_{i}.py",
+            "status": "modified",
+            "additions": lines_per_file,
+            "deletions": 0,
+            "changes": lines_per_file,
+            "patch": f"@@ -1,0 +1,{lines_per_file} @@\n" + LINE * lines_per_file,
+        }
+
+
+def joined(total_mb: int, files: int, build_prompt: bool) -> dict:
+    """Materialise the file list and join the diff for each consumer."""
+    file_list = list(fake_files(total_mb, files))
+    code_diff = "\n".join([f["patch"] for f in file_list])
+    breaking = "breaking" in code_diff.lower() or "deprecated" in code_diff.lower()
+    hashes = {f["filename"]: hashlib.sha256(f["patch"].encode()).hexdigest() for f in file_list}
+    prompt = "\n".join([f["patch"] for f in file_list]) if build_prompt else ""
+    return {"breaking": breaking, "hashes": len(hashes), "prompt_bytes": len(prompt)}
+
+
+def spooled(total_mb: int, files: int, build_prompt: bool, spool_mb: float) -> dict:
+    """Spool the patches and read each one once for every consumer."""
+    spool = PatchSpool(max_memory_bytes=int(spool_mb * 1024 * 1024))
+    file_list = spool.collect(fake_files(total_mb, files))
+    diff = ParsedDiff()
+    hashes = {}
+    consume_patches(
+        file_list,
+        diff,
+        lambda file_info, patch: hashes.__setitem__(file_info["filename"], hashlib.sha256(patch.encode()).hexdigest()),
+    )
+    breaking = any("breaking" in text or "deprecated" in text
+                   for text in (parsed.added_text().text.lower() for parsed in diff.files))
+    prompt = "\n".join(file_patch(f) for f in file_list) if build_prompt else ""
+    spool.close()
+    return {"breaking": breaking, "hashes": len(hashes), "prompt_bytes": len(prompt), "spilled": spool.spilled}
+
+
+def measure(fn, *args) -> tuple:
+    """Run `fn` untraced for its time, then under tracemalloc for its peak.
+
+    Returns (peak traced MB, seconds, result).
+    """
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024 / 1024, elapsed, result
+
+
+def main():
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes-mb", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--spool-mb", type=float, default=64)
+    args = parser.parse_args()
+
+    print(f"{args.files} files per PR, spool limit {args.spool_mb:g} MB; peak = traced Python allocations")
+    print(f"{'diff MB':>8} {'joined scan MB':>15} {'spooled scan MB':>16} {'joined+prompt MB':>17} "
+          f"{'spooled+prompt MB':>18} {'joined s':>9} {'spooled s':>10}")
+    for size in args.sizes_mb:
+        joined_peak, joined_s, joined_result = measure(joined, size, args.files, False)
+        spooled_peak, spooled_s, spooled_result = measure(spooled, size, args.files, False, args.spool_mb)
+        joined_prompt_peak, _, _ = measure(joined, size, args.files, True)
+        spooled_prompt_peak, _, _ = measure(spooled, size, args.files, True, args.spool_mb)
+        assert joined_result["hashes"] == spooled_result["hashes"]
+        assert joined_result["breaking"] == spooled_result["breaking"]
+        print(
+            f"{size:>8} {joined_peak:>15.1f} {spooled_peak:>16.1f} {joined_prompt_peak:>17.1f} "
+            f"{spooled_prompt_peak:>18.1f} {joined_s:>9.2f} {spooled_s:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""In-process stand-ins for external services used by the benchmarks."""
+
+import asyncio
+import json
+import math
+import random
+import re
+import time
+from types import SimpleNamespace
+from typing import Iterable, List, Optional
+
+
+class FakeJIRA:
+    """Local Jira stand-in with a fixed per-request latency.
+    
+    Implements the subset of the `jira.JIRA` API used by `JiraClient` and
+    counts every round trip.
+    """
+    
+    def __init__(self, known_keys: Optional[Iterable[str]] = None, latency_seconds: float = 0.05, **kwargs):
+        """Initialize the stand-in."""
+        self.known_keys = set(known_keys) if known_keys is not None else None
+        self.latency_seconds = latency_seconds
+        self.round_trips = 0
+    
+    def issue(self, key: str, fields: Optional[str] = None):
+        """Fetch a single issue."""
+        self._round_trip()
+        if not self._exists(key):
+            raise LookupError(f"Issue does not exist: {key}")
+        return make_fake_issue(key)
+    
+    def search_issues(self, jql_str: str, startAt: int = 0, maxResults: int = 50,
+                      validate_query: bool = True, fields=None, **kwargs) -> List[SimpleNamespace]:
+        """Run a `key in (...)` search."""
+        self._round_trip()
+        keys = re.findall(r'[A-Z][A-Z0-9]*-\d+', jql_str)
+        unknown = [key for key in keys if not self._exists(key)]
+        if unknown and validate_query:
+            raise LookupError(f"Issues do not exist: {', '.join(unknown)}")
+        found = [make_fake_issue(key) for key in keys if self._exists(key)]
+        return found[startAt:startAt + maxResults]
+    
+    def _exists(self, key: str) -> bool:
+        return self.known_keys is None or key in self.known_keys
+    
+    def _round_trip(self):
+        self.round_trips += 1
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+
+
+def make_fake_issue(key: str) -> SimpleNamespace:
+    """Build an object shaped like a `jira.Issue`."""
+    description = (
+        "Acceptance Criteria:\n"
+        f"* User can open the {key} settings page\n"
+        f"* Changes to {key} settings are persisted\n"
+    )
+    return SimpleNamespace(
+        key=key,
+        fields=SimpleNamespace(
+            summary=f"Summary for {key}",
+            description=description,
+            status=SimpleNamespace(name="In Progress"),
+            issuetype=SimpleNamespace(name="Story"),
+            assignee=SimpleNamespace(displayName="Dev User"),
+            labels=["backend"],
+            priority=SimpleNamespace(name="High"),
+        ),
+    )
+
+
+class FakeAnalysisAgents:
+    """Planner and pipeline stand-in for benchmarking the MCP servers.
+    
+    Waits a fixed time for the PR fetch and for the Claude analysis, with
+    blocking sleeps for the Flask server and asyncio sleeps for the ASGI
+    server, so both servers see the same upstream latency.
+    """
+    
+    def __init__(self, fetch_seconds: float = 0.05, llm_seconds: float = 0.3):
+        """Initialize the stand-in."""
+        self.fetch_seconds = fetch_seconds
+        self.llm_seconds = llm_seconds
+    
+    def analyze_pr_context(self, repo_owner: str, repo_name: str, pr_number: int) -> dict:
+        """Blocking PR fetch."""
+        time.sleep(self.fetch_seconds)
+        return make_fake_context(pr_number)
+    
+    async def analyze_pr_context_async(self, repo_owner: str, repo_name: str, pr_number: int) -> dict:
+        """Non-blocking PR fetch."""
+        await asyncio.sleep(self.fetch_seconds)
+        return make_fake_context(pr_number)
+    
+    def analyze(self, context: dict, test_files: Optional[List[str]] = None) -> dict:
+        """Blocking Claude analysis."""
+        time.sleep(self.llm_seconds)
+        return make_fake_analysis()
+    
+    async def analyze_async(self, context: dict, test_files: Optional[List[str]] = None) -> dict:
+        """Non-blocking Claude analysis."""
+        await asyncio.sleep(self.llm_seconds)
+        return make_fake_analysis()
+
+
+def make_fake_context(pr_number: int) -> dict:
+    """Build a PlannerAgent.analyze_pr_context result."""
+    return {
+        "pr_info": {
+            "pr_number": pr_number,
+            "title": f"PROJ-{pr_number} Update handler",
+            "files": [{"filename": "app/handler.py", "status": "modified", "additions": 3,
+                       "deletions": 1, "changes": 4, "patch": "+x"}],
+        },
+        "jira_tickets": [f"PROJ-{pr_number}"],
+        "acceptance_criteria": ["Handler returns 200"],
+    }
+
+
+def make_fake_analysis() -> dict:
+    """Build a ReleaseAnalysisPipeline.analyze result."""
+    from src.models.schemas import RiskAssessment
+    
+    return {
+        "test_result": {"total_tests": 3},
+        "risk": RiskAssessment(risk_score=30, confidence_percentage=70, risk_flags=[],
+                               suggestions=[], requires_manual_review=False),
+    }
+
+
+class Latency:
+    """Latency distribution parsed from a spec string.
+    
+    Specs (milliseconds): "120" or "fixed:120", "uniform:50:200",
+    "lognormal:300:0.5" (median, sigma) and "exp:100" (mean).
+    """
+    
+    def __init__(self, spec: str, seed: Optional[int] = None):
+        """Parse the spec."""
+        self.spec = spec
+        kind, _, params = spec.partition(":") if ":" in spec else ("fixed", "", spec)
+        values = [float(value) for value in params.split(":")] if params else []
+        samplers = {
+            "fixed": (1, lambda ms: ms),
+            "uniform": (2, lambda low, high: self._random.uniform(low, high)),
+            "lognormal": (2, lambda median, sigma: self._random.lognormvariate(math.log(median), sigma)),
+            "exp": (1, lambda mean: self._random.expovariate(1 / mean)),
+        }
+        if kind not in samplers or len(values) != samplers[kind][0]:
+            raise ValueError(f"Invalid latency spec: {spec!r}")
+        self._sampler = samplers[kind][1]
+        self._values = values
+        self._random = random.Random(seed)
+    
+    def sample(self) -> float:
+        """Draw a latency in seconds."""
+        return max(0.0, self._sampler(*self._values)) / 1000
+    
+    def sleep(self):
+        """Block for a sampled latency."""
+        seconds = self.sample()
+        if seconds:
+            time.sleep(seconds)
+
+
+def make_fake_patch(lines: int, seed: int = 0) -> str:
+    """Build a unified-diff hunk of roughly `lines` changed lines."""
+    body = []
+    for i in range(lines):
+        sign = "+" if (i + seed) % 3 else "-"
+        body.append(f"{sign}    value_{seed}_{i} = compute(item_{i}, retries={i % 5})")
+    return f"@@ -1,{lines} +1,{lines} @@\n" + "\n".join(body) + "\n"
+
+
+class FakeGitHubClient:
+    """Offline GitHubClient with a latency model and synthetic PR sizes.
+    
+    Each PR links one Jira ticket (PROJ-<pr_number>) and changes
+    `files_per_pr` backend files of `patch_lines` lines each.
+    """
+    
+    def __init__(self, latency: Latency, files_per_pr: int = 10, patch_lines: int = 30):
+        """Initialize the stand-in."""
+        self.latency = latency
+        self.files_per_pr = files_per_pr
+        self.patch_lines = patch_lines
+    
+    def get_pr_diff(self, repo_owner: str, repo_name: str, pr_number: int) -> dict:
+        """Return a synthetic PR."""
+        self.latency.sleep()
+        files = [
+            {
+                "filename": f"src/service/module_{i}.py",
+                "status": "modified",
+                "additions": self.patch_lines * 2 // 3,
+                "deletions": self.patch_lines // 3,
+                "patch": make_fake_patch(self.patch_lines, seed=pr_number + i),
+                "changes": self.patch_lines,
+            }
+            for i in range(self.files_per_pr)
+        ]
+        return {
+            "pr_number": pr_number,
+            "title": f"PROJ-{pr_number} Update service modules",
+            "body": f"Implements PROJ-{pr_number}.",
+            "author": "dev",
+            "base_branch": "main",
+            "head_branch": f"feature/{pr_number}",
+            "head_sha": f"{pr_number:040x}",
+            "files": files,
+            "total_files": len(files),
+            "total_additions": sum(f["additions"] for f in files),
+            "total_deletions": sum(f["deletions"] for f in files),
+        }
+    
+    def get_pr_stats(self, repo_owner: str, repo_name: str, pr_number: int) -> dict:
+        """Return synthetic PR size counters."""
+        self.latency.sleep()
+        return {
+            "changed_files": self.files_per_pr,
+            "additions": self.files_per_pr * self.patch_lines * 2 // 3,
+            "deletions": self.files_per_pr * self.patch_lines // 3,
+        }
+    
+    def extract_jira_tickets_from_pr(self, pr_title: str, pr_body: str) -> List[str]:
+        """Extract Jira ticket IDs from PR title and body."""
+        from src.integrations.github import extract_jira_tickets
+        
+        return extract_jira_tickets(pr_title, pr_body)
+
+
+class FakeJiraClient:
+    """Offline JiraClient whose bulk search takes one sampled round trip."""
+    
+    def __init__(self, latency: Latency):
+        """Initialize the stand-in."""
+        self.latency = latency
+    
+    def get_tickets_bulk(self, ticket_ids: List[str]) -> dict:
+        """Return every requested ticket."""
+        from src.integrations.jira import issue_to_dict
+        
+        self.latency.sleep()
+        requested = list(dict.fromkeys(ticket_ids))
+        return {
+            "tickets": [issue_to_dict(make_fake_issue(key), key) for key in requested],
+            "missing": [],
+        }
+
+
+class FakeAnthropic:
+    """Offline stand-in for `anthropic.Anthropic` answering the analyzer's prompts."""
+    
+    def __init__(self, latency: Latency, tests_per_response: int = 6):
+        """Initialize the stand-in."""
+        self.latency = latency
+        self.tests_per_response = tests_per_response
+        self.messages = self
+    
+    def create(self, model: str, max_tokens: int, messages: list, **kwargs) -> SimpleNamespace:
+        """Answer a prompt after a sampled latency."""
+        self.latency.sleep()
+        prompt = messages[0]["content"]
+        if '"risk_score"' in prompt:
+            payload = {
+                "risk_score": 35,
+                "confidence_percentage": 75,
+                "risk_factors": ["Touches shared service modules"],
+                "recommendations": ["Run the service integration suite"],
+                "requires_manual_review": False,
+            }
+        elif '"integration_tests"' in prompt:
+            tests = [
+                {
+                    "name": f"test_scenario_{i}",
+                    "description": f"Scenario {i} covering the changed service path",
+                    "steps": ["Arrange fixtures", "Call the service", "Check the response"],
+                    "expected_outcomes": ["Response matches the acceptance criteria"],
+                    "priority": "high" if i % 2 else "medium",
+                }
+                for i in range(self.tests_per_response)
+            ]
+            third = max(1, len(tests) // 3)
+            payload = {
+                "integration_tests": tests[:third],
+                "automation_tests": tests[third:2 * third],
+                "e2e_flows": tests[2 * third:],
+            }
+        else:
+            payload = {"key_changes": [], "integration_points": [], "risks": [], "files_modified": []}
+        return SimpleNamespace(content=[SimpleNamespace(text=json.dumps(payload))])
+
+
+def make_fake_claude_analyzer(latency: Latency, tests_per_response: int = 6):
+    """Build a real ClaudeAnalyzer (prompts, chunking, parsing) on top of FakeAnthropic, without a cache."""
+    from src.integrations.claude import ClaudeAnalyzer
+    
+    analyzer = ClaudeAnalyzer(api_key="offline", cache=None)
+    analyzer.client = FakeAnthropic(latency, tests_per_response)
+    return analyzer
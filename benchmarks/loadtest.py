@@ -0,0 +1,229 @@
+"""Offline load test for the MCP server.
+
+Starts `ReleasGuardianMCPServer` in a child process with its GitHub, Jira
+and Claude clients replaced by in-process fakes (benchmarks/fakes.py) that
+have configurable latency distributions and payload sizes. The real agents,
+pipeline, prompts and response parsing still run. Each route is then
+driven at a fixed request rate (open loop: requests are sent on schedule
+whether or not earlier ones have finished, and latency is measured from
+the scheduled send time) and the run reports throughput, latency
+percentiles, error rates and the server's peak RSS.
+
+Latency specs are in milliseconds: "120", "uniform:50:200",
+"lognormal:300:0.5" (median, sigma) or "exp:100" (mean).
+
+Usage:
+    python -m benchmarks.loadtest [--rate 5] [--duration 10] [--routes analyze-release generate-tests]
+        [--claude-latency lognormal:400:0.5] [--files 10] [--patch-lines 30]
+        [--max-p99-ms 5000] [--max-error-rate 0.01] [--json results.json]
+
+Exits with status 1 when a --max-* threshold is exceeded, so it can gate a
+deploy.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.fakes import (
+    FakeGitHubClient,
+    FakeJiraClient,
+    Latency,
+    make_fake_claude_analyzer,
+    make_fake_patch,
+)
+from benchmarks.servers import ServerProcess, ThreadPoolWSGIServer
+
+
+def _analyze_release(i: int, config: dict) -> dict:
+    return {"repo_owner": "org", "repo_name": "repo", "pr_number": i, "head_sha": f"{i:040x}"}
+
+
+def _generate_tests(i: int, config: dict) -> dict:
+    return {
+        "code_diff": make_fake_patch(config["files"] * config["patch_lines"], seed=i),
+        "acceptance_criteria": [f"Request {i} is handled"],
+        "file_types": {"backend": [f"src/service/module_{i}.py"]},
+        "pr_title": f"PROJ-{i} Update service",
+    }
+
+
+def _release_risk_score(i: int, config: dict) -> dict:
+    return {
+        "changes_summary": f"PROJ-{i} Update service modules",
+        "file_types": {"backend": [f"src/service/module_{n}.py" for n in range(config["files"])]},
+        "total_changes": config["files"] * config["patch_lines"],
+    }
+
+
+def _rollback_plan(i: int, config: dict) -> dict:
+    return {
+        "release_id": f"release-{i}",
+        "changed_files": [f"src/service/module_{n}.py" for n in range(config["files"])],
+        "file_types": {"backend": [f"src/service/module_{n}.py" for n in range(config["files"])]},
+    }
+
+
+# Route name -> (method, request body builder)
+ROUTES: Dict[str, tuple] = {
+    "health": ("GET", None),
+    "analyze-release": ("POST", _analyze_release),
+    "generate-tests": ("POST", _generate_tests),
+    "release-risk-score": ("POST", _release_risk_score),
+    "rollback-plan": ("POST", _rollback_plan),
+}
+
+
+def serve(port: int, config: dict):
+    """Serve the Flask app on fake integrations until the process is terminated."""
+    from src.integrations.pool import ClientPool
+    from src.mcp.server import ReleasGuardianMCPServer
+
+    server = ReleasGuardianMCPServer()
+    server.clients = ClientPool()
+    server.clients.get("github", lambda: FakeGitHubClient(
+        Latency(config["github_latency"]), config["files"], config["patch_lines"]
+    ))
+    server.clients.get("jira", lambda: FakeJiraClient(Latency(config["jira_latency"])))
+    server.clients.get("claude", lambda: make_fake_claude_analyzer(
+        Latency(config["claude_latency"]), config["tests_per_response"]
+    ))
+
+    ThreadPoolWSGIServer("127.0.0.1", port, server.app, config["threads"]).serve_forever()
+
+
+async def drive(url: str, routes: List[str], rate: float, duration: float, timeout: float, config: dict) -> dict:
+    """Send requests to each route at `rate` per second for `duration` seconds."""
+    samples: Dict[str, List[tuple]] = {route: [] for route in routes}
+    # A fresh connection per request; httpx's keep-alive pool slows down
+    # badly with many idle connections, which would be measured as server
+    # latency.
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=0)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=timeout) as client:
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+
+        async def one(route: str, i: int, scheduled: float):
+            method, build = ROUTES[route]
+            await asyncio.sleep(max(0.0, scheduled - loop.time()))
+            try:
+                if build is None:
+                    response = await client.request(method, f"/{route}")
+                else:
+                    response = await client.request(method, f"/{route}", json=build(i, config))
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            samples[route].append((loop.time() - scheduled, ok))
+
+        count = max(1, int(rate * duration))
+        tasks = [
+            one(route, i + 1, start + i / rate)
+            for route in routes
+            for i in range(count)
+        ]
+        await asyncio.gather(*tasks)
+        elapsed = loop.time() - start
+
+    return {route: summarize(route_samples, elapsed) for route, route_samples in samples.items()}
+
+
+def summarize(samples: List[tuple], elapsed: float) -> dict:
+    """Throughput, error rate and latency percentiles for one route."""
+    latencies = sorted(latency for latency, _ in samples)
+    errors = sum(1 for _, ok in samples if not ok)
+
+    def percentile(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "error_rate": errors / len(samples),
+        "throughput": (len(samples) - errors) / elapsed,
+        "p50_ms": percentile(0.50) * 1000,
+        "p90_ms": percentile(0.90) * 1000,
+        "p99_ms": percentile(0.99) * 1000,
+        "max_ms": latencies[-1] * 1000,
+    }
+
+
+def check_thresholds(results: dict, max_p99_ms: Optional[float], max_error_rate: Optional[float]) -> List[str]:
+    """Describe every route that breaches a threshold."""
+    failures = []
+    for route, result in results.items():
+        if max_p99_ms is not None and result["p99_ms"] > max_p99_ms:
+            failures.append(f"{route}: p99 {result['p99_ms']:.0f} ms > {max_p99_ms:.0f} ms")
+        if max_error_rate is not None and result["error_rate"] > max_error_rate:
+            failures.append(f"{route}: error rate {result['error_rate']:.2%} > {max_error_rate:.2%}")
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--routes", nargs="+", choices=list(ROUTES), default=list(ROUTES))
+    parser.add_argument("--rate", type=float, default=5.0, help="requests per second per route")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load per route")
+    parser.add_argument("--threads", type=int, default=32, help="server worker threads")
+    parser.add_argument("--timeout", type=float, default=60.0, help="client timeout in seconds")
+    parser.add_argument("--github-latency", default="lognormal:120:0.4")
+    parser.add_argument("--jira-latency", default="lognormal:80:0.3")
+    parser.add_argument("--claude-latency", default="lognormal:400:0.5")
+    parser.add_argument("--files", type=int, default=10, help="files per PR")
+    parser.add_argument("--patch-lines", type=int, default=30, help="changed lines per file")
+    parser.add_argument("--tests-per-response", type=int, default=6, help="scenarios per Claude answer")
+    parser.add_argument("--max-p99-ms", type=float)
+    parser.add_argument("--max-error-rate", type=float)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    config = {
+        "threads": args.threads,
+        "github_latency": args.github_latency,
+        "jira_latency": args.jira_latency,
+        "claude_latency": args.claude_latency,
+        "files": args.files,
+        "patch_lines": args.patch_lines,
+        "tests_per_response": args.tests_per_response,
+    }
+    for spec in (args.github_latency, args.jira_latency, args.claude_latency):
+        Latency(spec)
+
+    server = ServerProcess(serve, config)
+    try:
+        results = asyncio.run(drive(server.url, args.routes, args.rate, args.duration, args.timeout, config))
+        peak_rss_mb = server.peak_rss_mb()
+    finally:
+        server.stop()
+
+    print(
+        f"{args.rate:g} req/s per route for {args.duration:g} s, {args.threads} server threads "
+        f"(GitHub {args.github_latency}, Jira {args.jira_latency}, Claude {args.claude_latency} ms; "
+        f"{args.files} files x {args.patch_lines} lines)"
+    )
+    print(f"{'route':>19} {'sent':>6} {'errors':>7} {'ok req/s':>9} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for route, result in results.items():
+        print(
+            f"{route:>19} {result['requests']:>6} {result['error_rate']:>7.1%} {result['throughput']:>9.1f} "
+            f"{result['p50_ms']:>8.0f} {result['p90_ms']:>8.0f} {result['p99_ms']:>8.0f} {result['max_ms']:>8.0f}"
+        )
+    print(f"server peak RSS: {f'{peak_rss_mb:.1f} MB' if peak_rss_mb is not None else 'n/a'}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"config": config, "routes": results, "peak_rss_mb": peak_rss_mb}, f, indent=2)
+
+    failures = check_thresholds(results, args.max_p99_ms, args.max_error_rate)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""Helpers for running the MCP servers in a separate process during benchmarks.
+
+Servers run in their own process so they do not share a GIL with the load
+generator, which would otherwise be measured as server latency.
+"""
+
+import multiprocessing
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from socketserver import ThreadingMixIn
+from typing import Callable, Optional
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+class ThreadPoolWSGIServer(ThreadingMixIn, BaseWSGIServer):
+    """werkzeug server that handles requests on a fixed number of threads, like a gthread deployment."""
+
+    daemon_threads = True
+
+    def __init__(self, host: str, port: int, app, threads: int):
+        super().__init__(host, port, app, handler=_QuietHandler)
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="flask-worker")
+
+    def process_request(self, request, client_address):
+        self._pool.submit(self.process_request_thread, request, client_address)
+
+
+class ServerProcess:
+    """A server running in a child process on a free localhost port."""
+
+    def __init__(self, target: Callable, *args, startup_timeout: float = 30.0):
+        """Start `target(port, *args)` in a child process and wait until it accepts connections."""
+        self.port = free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.process = multiprocessing.get_context("spawn").Process(
+            target=target, args=(self.port, *args), daemon=True
+        )
+        self.process.start()
+
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", self.port), timeout=1).close()
+                return
+            except OSError:
+                if time.monotonic() > deadline or not self.process.is_alive():
+                    self.stop()
+                    raise RuntimeError(f"{target.__name__} did not start")
+                time.sleep(0.05)
+
+    def peak_rss_mb(self) -> Optional[float]:
+        """Peak resident set size of the server process, where /proc is available."""
+        try:
+            with open(f"/proc/{self.process.pid}/status") as status:
+                for line in status:
+                    if line.startswith("VmHWM:"):
+                        return int(line.split()[1]) / 1024
+        except OSError:
+            pass
+        return None
+
+    def stop(self):
+        """Terminate the server process."""
+        self.process.terminate()
+        self.process.join()
+
+
+def free_port() -> int:
+    """Return a currently unused localhost port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
@@ -1,29 +1,64 @@
 """AWS Lambda handler for GitHub webhooks."""
 
 import json
-import os
 import logging
-from src.integrations import (
-    create_github_client,
-    create_jira_client,
-    create_claude_analyzer
-)
+import time
+import structlog
+from src.integrations import get_client_pool, create_webhook_guard
 from src.agents import (
     create_planner_agent,
     create_test_generator_agent,
     create_risk_scorer_agent,
+    create_release_analysis_pipeline,
+    create_incremental_analyzer,
+    fast_path_stats,
 )
+from src.utils.metrics import log_metrics, observe_stage
+from src.utils.memory import track_memory
+from src.utils.profiler import profiled
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
+metrics_logger = structlog.get_logger("release_guardian.metrics")
 
 
 def lambda_handler(event, context):
     """
     AWS Lambda handler for GitHub PR webhooks.
     
-    Triggered by GitHub webhook on PR opened/synchronize events.
+    Logs the invocation's metrics (stage latencies, Claude tokens, cache
+    lookups) as one structured line per series before returning. The
+    invocation is the root span of its trace, and is profiled when
+    PROFILE_DIR is set. MEMORY_PROFILE=true logs per-stage peak RSS and the
+    top allocation sites.
     """
+    start = time.perf_counter()
+    response = None
+    try:
+        with profiled("lambda.handler", request_id=getattr(context, "aws_request_id", None)) as current, \
+                track_memory("lambda.handler"):
+            response = _handle_webhook(event, context)
+            current.set_attribute("status", response["statusCode"])
+        return response
+    finally:
+        observe_stage(
+            "lambda.handler",
+            time.perf_counter() - start,
+            error=response is None or response["statusCode"] >= 500
+        )
+        log_metrics(metrics_logger)
+
+
+def _handle_webhook(event, context):
+    """
+    Process a GitHub PR webhook.
+    
+    Triggered by GitHub webhook on PR opened/synchronize events. Redelivered
+    webhooks and pushes superseded by a newer push to the same PR are
+    acknowledged without running the analysis.
+    """
+    guard = None
+    pr_key = head_sha = delivery_id = None
     try:
         # Parse webhook payload
         body = json.loads(event.get("body", "{}"))
@@ -43,52 +78,62 @@ def lambda_handler(event, context):
         if not all([pr_number, repo_owner, repo_name]):
             return {"statusCode": 400, "body": "Invalid webhook payload"}
         
-        # Initialize clients
-        github_client = create_github_client()
-        jira_client = create_jira_client() if os.getenv("JIRA_API_TOKEN") else None
-        claude_analyzer = create_claude_analyzer()
+        # Drop duplicate deliveries and wait briefly for newer pushes
+        pool = get_client_pool()
+        store = pool.state_store()
+        pr_key = f"{repo_owner}/{repo_name}#{pr_number}"
+        head_sha = pr.get("head", {}).get("sha")
+        if head_sha:
+            guard = create_webhook_guard(store)
+            delivery_id = _header(event, "X-GitHub-Delivery")
+            if not guard.claim(pr_key, head_sha, delivery_id):
+                guard = None
+                return {"statusCode": 200, "body": "Duplicate delivery ignored"}
+            
+            guard.mark_latest(pr_key, head_sha, pr.get("updated_at"))
+            if not guard.wait_for_quiet(pr_key, head_sha):
+                return {"statusCode": 200, "body": "Superseded by a newer push"}
+        
+        # Reuse clients from previous invocations in this container
+        github_client = pool.github()
+        jira_client = pool.jira()
+        claude_analyzer = pool.claude()
         
         # Create agents
         planner = create_planner_agent(github_client, jira_client)
         test_gen = create_test_generator_agent(claude_analyzer)
         risk_scorer = create_risk_scorer_agent(claude_analyzer)
+        pipeline = create_release_analysis_pipeline(planner, test_gen, risk_scorer)
+        incremental = create_incremental_analyzer(github_client, pipeline, store)
         
         # Analyze PR
-        context = planner.analyze_pr_context(repo_owner, repo_name, pr_number)
-        pr_info = context["pr_info"]
+        with track_memory("lambda.analyze_pr_context"):
+            context = planner.analyze_pr_context(repo_owner, repo_name, pr_number)
+        if guard and guard.is_superseded(pr_key, head_sha):
+            return {"statusCode": 200, "body": "Superseded by a newer push"}
         
-        # Generate tests
-        test_result = test_gen.generate_tests(
-            "\n".join([f["patch"] for f in pr_info["files"]]),
-            context["acceptance_criteria"],
-            context["file_types"],
-            pr_info["title"]
-        )
-        
-        # Score risk
-        risky_patterns = planner.extract_risky_patterns(
-            "\n".join([f["patch"] for f in pr_info["files"]]),
-            context["file_types"]
-        )
-        
-        risk = risk_scorer.score_release(
-            pr_info["title"],
-            context["file_types"],
-            context["total_changes"],
-            risky_patterns
-        )
+        # Generate tests and score risk concurrently, reusing per-file
+        # results from the last analyzed push where possible
+        with track_memory("lambda.analysis"):
+            analysis = incremental.analyze(repo_owner, repo_name, pr_number, context)
+        test_result = analysis["test_result"]
+        risk = analysis["risk"]
         
         # Generate PR comment
         comment_body = _generate_pr_comment(
             test_result,
             risk,
-            context
+            context,
+            analysis.get("risk_findings", [])
         )
         
-        # Post comment to GitHub
+        # Post comment to GitHub unless a newer push arrived meanwhile
+        if guard and guard.is_superseded(pr_key, head_sha):
+            return {"statusCode": 200, "body": "Superseded by a newer push"}
+        
         github_client.post_pr_comment(repo_owner, repo_name, pr_number, comment_body)
         
-        logger.info(f"Successfully processed PR #{pr_number}")
+        logger.info(f"Successfully processed PR #{pr_number} (fast path stats: {fast_path_stats()})")
         
         return {
             "statusCode": 200,
@@ -97,18 +142,35 @@ def lambda_handler(event, context):
                 "pr_number": pr_number,
                 "tests_generated": test_result["total_tests"],
                 "risk_score": risk.risk_score,
+                "fast_path": analysis["fast_path"],
+                "incremental": analysis["incremental"],
             })
         }
     
     except Exception as e:
         logger.error(f"Error processing webhook: {str(e)}")
+        if guard:
+            # Let GitHub's redelivery retry this push
+            try:
+                guard.release(pr_key, head_sha, delivery_id)
+            except Exception as release_error:
+                logger.error(f"Error releasing webhook claim: {str(release_error)}")
         return {
             "statusCode": 500,
             "body": json.dumps({"error": str(e)})
         }
 
 
-def _generate_pr_comment(test_result: dict, risk, context: dict) -> str:
+def _header(event: dict, name: str):
+    """Get a request header regardless of case."""
+    headers = event.get("headers") or {}
+    for key, value in headers.items():
+        if key.lower() == name.lower():
+            return value
+    return None
+
+
+def _generate_pr_comment(test_result: dict, risk, context: dict, findings: list = None) -> str:
     """Generate a GitHub PR comment with analysis results."""
     
     # Risk level badge
@@ -136,11 +198,17 @@ def _generate_pr_comment(test_result: dict, risk, context: dict) -> str:
 **Risk Score:** {risk.risk_score}/100 ({risk_level})
 **Deployment Confidence:** {risk.confidence_percentage}%
 **Manual Review Required:** {'Yes ⚠️' if risk.requires_manual_review else 'No ✓'}
+**Assessed By:** {'Heuristic fast path (no LLM)' if risk.assessment_source == 'heuristic' else 'Claude'}
 
 #### Risk Flags:
 {chr(10).join(f'- ⚠️ {flag}' for flag in risk.risk_flags[:5])}
 """
     
+    if findings:
+        risk_summary += "\n#### Flagged Lines:\n"
+        for finding in findings[:10]:  # Show top 10
+            risk_summary += f"- `{finding['filename']}:{finding['line']}` - {finding['message']}\n"
+    
     # Jira context
     jira_summary = ""
     if context['jira_tickets']:
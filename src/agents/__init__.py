@@ -1,29 +1,52 @@
-"""Agent modules."""
+"""Agent modules.
 
-from .planner import PlannerAgent, create_planner_agent
-from .test_generator import TestGeneratorAgent, create_test_generator_agent
-from .risk_scorer import RiskScorerAgent, create_risk_scorer_agent
-from .rollback import RollbackPlannerAgent, create_rollback_planner_agent
-from .test_executor import TestExecutionAgent, create_test_executor_agent
-from .test_validator import TestValidationAgent, create_test_validator_agent
-from .deployment_decider import DeploymentDecisionAgent, create_deployment_decision_agent
-from .phase2_orchestrator import Phase2Orchestrator, create_phase2_orchestrator
+Exports are imported on first access, so a code path only loads the agents
+(and the SDKs behind them) it actually uses.
+"""
 
-__all__ = [
-    "PlannerAgent",
-    "TestGeneratorAgent",
-    "RiskScorerAgent",
-    "RollbackPlannerAgent",
-    "TestExecutionAgent",
-    "TestValidationAgent",
-    "DeploymentDecisionAgent",
-    "Phase2Orchestrator",
-    "create_planner_agent",
-    "create_test_generator_agent",
-    "create_risk_scorer_agent",
-    "create_rollback_planner_agent",
-    "create_test_executor_agent",
-    "create_test_validator_agent",
-    "create_deployment_decision_agent",
-    "create_phase2_orchestrator",
-]
+from typing import TYPE_CHECKING
+
+from src.utils.lazy import lazy_exports
+
+_EXPORTS = {
+    "PlannerAgent": ".planner",
+    "TestGeneratorAgent": ".test_generator",
+    "RiskScorerAgent": ".risk_scorer",
+    "RollbackPlannerAgent": ".rollback",
+    "TestExecutionAgent": ".test_executor",
+    "TestValidationAgent": ".test_validator",
+    "DeploymentDecisionAgent": ".deployment_decider",
+    "HeuristicPreScorer": ".fast_path",
+    "ReleaseAnalysisPipeline": ".analysis_pipeline",
+    "IncrementalAnalyzer": ".incremental",
+    "Phase2Orchestrator": ".phase2_orchestrator",
+    "create_planner_agent": ".planner",
+    "create_test_generator_agent": ".test_generator",
+    "create_risk_scorer_agent": ".risk_scorer",
+    "create_rollback_planner_agent": ".rollback",
+    "create_test_executor_agent": ".test_executor",
+    "create_test_validator_agent": ".test_validator",
+    "create_deployment_decision_agent": ".deployment_decider",
+    "create_heuristic_pre_scorer": ".fast_path",
+    "create_release_analysis_pipeline": ".analysis_pipeline",
+    "create_incremental_analyzer": ".incremental",
+    "fast_path_stats": ".fast_path",
+    "create_phase2_orchestrator": ".phase2_orchestrator",
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .planner import PlannerAgent, create_planner_agent
+    from .test_generator import TestGeneratorAgent, create_test_generator_agent
+    from .risk_scorer import RiskScorerAgent, create_risk_scorer_agent
+    from .rollback import RollbackPlannerAgent, create_rollback_planner_agent
+    from .test_executor import TestExecutionAgent, create_test_executor_agent
+    from .test_validator import TestValidationAgent, create_test_validator_agent
+    from .deployment_decider import DeploymentDecisionAgent, create_deployment_decision_agent
+    from .fast_path import HeuristicPreScorer, create_heuristic_pre_scorer, fast_path_stats
+    from .analysis_pipeline import ReleaseAnalysisPipeline, create_release_analysis_pipeline
+    from .incremental import IncrementalAnalyzer, create_incremental_analyzer
+    from .phase2_orchestrator import Phase2Orchestrator, create_phase2_orchestrator
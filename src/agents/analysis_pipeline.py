@@ -0,0 +1,323 @@
+"""Release Analysis Pipeline - Runs the independent PR analysis steps concurrently."""
+
+import asyncio
+import os
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import List, Optional
+
+from src.agents.planner import PlannerAgent
+from src.agents.test_generator import TestGeneratorAgent
+from src.agents.risk_scorer import RiskScorerAgent
+from src.agents.fast_path import HeuristicPreScorer, create_heuristic_pre_scorer
+from src.models.schemas import RiskAssessment
+from src.utils import logger
+from src.utils.metrics import timed
+from src.utils.tracing import with_current_context
+from src.utils.diff_model import ParsedDiff
+from src.utils.diff_reducer import DiffReducer, PromptDiffBuilder, create_diff_reducer
+from src.utils.patch_stream import consume_patches
+
+
+DEFAULT_TIMEOUT_SECONDS = 120.0
+
+
+class ReleaseAnalysisPipeline:
+    """Fans out test generation, risky-pattern extraction and risk scoring.
+
+    The two Claude calls run on separate worker threads, so the latency of an
+    analysis is that of the slowest call rather than the sum of them. Steps
+    that miss the deadline are cancelled if they have not started and
+    replaced by the same conservative defaults the agents use on errors.
+    Calls already in flight cannot be interrupted; they finish in the
+    background and their results are discarded.
+
+    Only the prompt sent to Claude uses the reduced diff; risky-pattern
+    extraction and risk scoring use the PR's parsed diff, which covers every
+    file. Patches are read one at a time, and may be spooled to disk for
+    large PRs, so the full diff is never joined into one string.
+
+    PRs that match a safe shape of the heuristic pre-scorer skip the fan-out
+    entirely.
+    """
+
+    def __init__(self,
+                 planner: PlannerAgent,
+                 test_generator: TestGeneratorAgent,
+                 risk_scorer: RiskScorerAgent,
+                 timeout_seconds: Optional[float] = None,
+                 diff_reducer: Optional[DiffReducer] = None,
+                 pre_scorer: Optional[HeuristicPreScorer] = None):
+        """Initialize release analysis pipeline."""
+        self.planner = planner
+        self.test_generator = test_generator
+        self.risk_scorer = risk_scorer
+        self.timeout_seconds = timeout_seconds or float(
+            os.getenv("ANALYSIS_TIMEOUT_SECONDS", DEFAULT_TIMEOUT_SECONDS)
+        )
+        self.diff_reducer = diff_reducer
+        self.pre_scorer = pre_scorer
+        self._logger = logger
+
+    @timed("pipeline.analyze")
+    def analyze(self, context: dict, test_files: Optional[List[str]] = None) -> dict:
+        """
+        Generate tests and score risk for an analyzed PR context.
+
+        Args:
+            context: Output of PlannerAgent.analyze_pr_context
+            test_files: Limit test generation to these files; an empty list
+                skips test generation. Risk is always scored on the whole PR.
+
+        Returns:
+            Dictionary with test_result, risky_patterns, the rule findings
+            behind them (risk_findings), risk, the diff reduction report,
+            the names of any steps that timed out and the fast-path shape if
+            the PR was answered heuristically
+        """
+        if self.pre_scorer is not None:
+            heuristic = self.pre_scorer.evaluate(context)
+            if heuristic is not None:
+                return heuristic
+
+        pr_info = context["pr_info"]
+        diff, prompt = self._scan_files(context, test_files)
+        prompt_diff, reduction = prompt.diff(), prompt.report()
+
+        executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="release-analysis")
+        try:
+            patterns_future = executor.submit(
+                with_current_context(self._extract_risks),
+                diff,
+                context["file_types"]
+            )
+            if prompt.files:
+                tests_future = executor.submit(
+                    with_current_context(self.test_generator.generate_tests),
+                    prompt_diff,
+                    context["acceptance_criteria"],
+                    context["file_types"],
+                    pr_info["title"]
+                )
+            else:
+                tests_future = Future()
+                tests_future.set_result(self._default_test_result(None))
+            risk_future = executor.submit(with_current_context(self._score_risk), context, diff, patterns_future)
+
+            futures = {
+                "risky_patterns": patterns_future,
+                "test_generation": tests_future,
+                "risk_scoring": risk_future,
+            }
+            _, not_done = wait(futures.values(), timeout=self.timeout_seconds)
+
+            timed_out = []
+            for name, future in futures.items():
+                if future in not_done:
+                    future.cancel()
+                    timed_out.append(name)
+
+            if timed_out:
+                self._logger.warning(
+                    "Analysis steps timed out",
+                    steps=timed_out,
+                    timeout_seconds=self.timeout_seconds
+                )
+
+            risky_patterns, risk_findings = self._result_or_default(patterns_future, ([], []))
+            return {
+                "test_result": self._result_or_default(
+                    tests_future, self._default_test_result("Test generation timed out")
+                ),
+                "risky_patterns": risky_patterns,
+                "risk_findings": risk_findings,
+                "risk": self._result_or_default(risk_future, self._default_risk()),
+                "diff_reduction": reduction,
+                "timed_out": timed_out,
+                "fast_path": None,
+            }
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @timed("pipeline.analyze")
+    async def analyze_async(self, context: dict, test_files: Optional[List[str]] = None) -> dict:
+        """
+        Async variant of analyze for agents built on the async clients.
+
+        Test generation and risk scoring run as tasks on the event loop, so
+        their Claude calls overlap without worker threads. Unlike threads,
+        tasks still running at the deadline are cancelled.
+
+        Args:
+            context: Output of PlannerAgent.analyze_pr_context_async
+            test_files: Limit test generation to these files; an empty list
+                skips test generation
+
+        Returns:
+            The same dictionary as analyze
+        """
+        if self.pre_scorer is not None:
+            heuristic = self.pre_scorer.evaluate(context)
+            if heuristic is not None:
+                return heuristic
+
+        pr_info = context["pr_info"]
+        diff, prompt = self._scan_files(context, test_files)
+        prompt_diff, reduction = prompt.diff(), prompt.report()
+
+        # The pattern scan is local and cheap; run it inline
+        try:
+            risky_patterns, risk_findings = self._extract_risks(diff, context["file_types"])
+        except Exception as e:
+            self._logger.warning("Risky pattern extraction failed", error=str(e))
+            risky_patterns, risk_findings = [], []
+
+        tasks = {
+            "risk_scoring": asyncio.ensure_future(self.risk_scorer.score_release_async(
+                pr_info["title"],
+                context["file_types"],
+                context["total_changes"],
+                risky_patterns,
+                diff
+            )),
+        }
+        if prompt.files:
+            tasks["test_generation"] = asyncio.ensure_future(self.test_generator.generate_tests_async(
+                prompt_diff,
+                context["acceptance_criteria"],
+                context["file_types"],
+                pr_info["title"]
+            ))
+
+        _, pending = await asyncio.wait(tasks.values(), timeout=self.timeout_seconds)
+
+        timed_out = []
+        for name, task in tasks.items():
+            if task in pending:
+                task.cancel()
+                timed_out.append(name)
+
+        if timed_out:
+            self._logger.warning(
+                "Analysis steps timed out",
+                steps=timed_out,
+                timeout_seconds=self.timeout_seconds
+            )
+
+        if "test_generation" in tasks:
+            test_result = self._result_or_default(
+                tasks["test_generation"], self._default_test_result("Test generation timed out")
+            )
+        else:
+            test_result = self._default_test_result(None)
+
+        return {
+            "test_result": test_result,
+            "risky_patterns": risky_patterns,
+            "risk_findings": risk_findings,
+            "risk": self._result_or_default(tasks["risk_scoring"], self._default_risk()),
+            "diff_reduction": reduction,
+            "timed_out": timed_out,
+            "fast_path": None,
+        }
+
+    def generate_tests_for_files(self, context: dict, filenames: List[str]) -> dict:
+        """Generate tests from the diff of a subset of the PR's files."""
+        prompt = PromptDiffBuilder(self.diff_reducer, filenames)
+        consume_patches(context["pr_info"]["files"], prompt)
+        if not prompt.files:
+            return self._default_test_result(None)
+
+        return self.test_generator.generate_tests(
+            prompt.diff(),
+            context["acceptance_criteria"],
+            context["file_types"],
+            context["pr_info"]["title"]
+        )
+
+    def _scan_files(self, context: dict, test_files: Optional[List[str]]) -> tuple:
+        """Build the prompt diff, parsing the PR in the same pass if the planner has not.
+
+        Returns:
+            Tuple of (ParsedDiff of every file, PromptDiffBuilder over the
+            files selected for test generation)
+        """
+        prompt = PromptDiffBuilder(self.diff_reducer, test_files)
+        diff = context.get("diff")
+        if diff is None:
+            diff = context["diff"] = ParsedDiff()
+            consume_patches(context["pr_info"]["files"], diff, prompt)
+        else:
+            consume_patches(context["pr_info"]["files"], prompt)
+        return diff, prompt
+
+    def _extract_risks(self, diff: ParsedDiff, file_types: dict) -> tuple:
+        """Scan the diff against the risk rules.
+
+        Returns:
+            Tuple of (risky pattern messages, rule findings)
+        """
+        findings = self.planner.find_risky_changes(diff)
+        return self.planner.extract_risky_patterns(diff, file_types, findings), findings
+
+    def _score_risk(self, context: dict, diff: ParsedDiff, patterns_future: Future) -> RiskAssessment:
+        """Score risk once the (cheap, local) pattern scan has finished."""
+        try:
+            risky_patterns, _ = patterns_future.result(timeout=self.timeout_seconds)
+        except Exception as e:
+            self._logger.warning("Risky pattern extraction failed", error=str(e))
+            risky_patterns = []
+
+        return self.risk_scorer.score_release(
+            context["pr_info"]["title"],
+            context["file_types"],
+            context["total_changes"],
+            risky_patterns,
+            diff
+        )
+
+    def _result_or_default(self, future, default):
+        """Return a finished future's (or task's) result, or the default."""
+        if not future.done() or future.cancelled():
+            return default
+        try:
+            return future.result()
+        except Exception as e:
+            self._logger.error("Analysis step failed", error=str(e))
+            return default
+
+    def _default_test_result(self, error: Optional[str]) -> dict:
+        """Empty test result used when generation is skipped or does not finish."""
+        result = {
+            "integration_tests": [],
+            "automation_tests": [],
+            "e2e_flows": [],
+            "total_tests": 0,
+        }
+        if error:
+            result["error"] = error
+        return result
+
+    def _default_risk(self) -> RiskAssessment:
+        """High-risk default used when scoring does not finish."""
+        return RiskAssessment(
+            risk_score=75,
+            confidence_percentage=25,
+            risk_flags=["Analysis timed out - manual review required"],
+            suggestions=["Please review PR manually"],
+            requires_manual_review=True
+        )
+
+
+def create_release_analysis_pipeline(planner: PlannerAgent,
+                                     test_generator: TestGeneratorAgent,
+                                     risk_scorer: RiskScorerAgent,
+                                     timeout_seconds: Optional[float] = None) -> ReleaseAnalysisPipeline:
+    """Factory function to create release analysis pipeline."""
+    return ReleaseAnalysisPipeline(
+        planner,
+        test_generator,
+        risk_scorer,
+        timeout_seconds,
+        diff_reducer=create_diff_reducer(),
+        pre_scorer=create_heuristic_pre_scorer(planner)
+    )
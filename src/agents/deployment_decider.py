@@ -2,6 +2,7 @@
 
 from typing import Dict, List, Optional
 from src.utils import logger
+from src.utils.metrics import timed
 
 
 class DeploymentDecisionAgent:
@@ -11,6 +12,7 @@ class DeploymentDecisionAgent:
         """Initialize deployment decision agent."""
         self._logger = logger
     
+    @timed("deployment_decider.make_decision")
     def make_decision(self,
                      test_results: Dict,
                      validation_report: Dict,
@@ -0,0 +1,217 @@
+"""Incremental Analyzer - Re-analyzes only files changed since the last analyzed push."""
+
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+
+from src.agents.analysis_pipeline import ReleaseAnalysisPipeline
+from src.integrations.state_store import StateStore
+from src.models.schemas import TestScenario
+from src.utils import logger
+from src.utils.metrics import timed
+from src.utils.patch_stream import iter_file_patches
+from src.utils.tracing import with_current_context
+
+if TYPE_CHECKING:
+    from src.integrations.github import GitHubClient
+
+
+TEST_CATEGORIES = {
+    "integration_tests": "integration_test",
+    "automation_tests": "automation_test",
+    "e2e_flows": "e2e_test",
+}
+
+
+def _patch_hash(patch: str) -> str:
+    return hashlib.sha256((patch or "").encode("utf-8")).hexdigest()
+
+
+class IncrementalAnalyzer:
+    """Reuses per-file test results across pushes to the same PR.
+
+    Generated tests are stored in groups: the files (with a hash of each
+    file's patch) whose diff was sent to Claude, and the tests Claude
+    produced for it. On a new push, the compare API gives the files changed
+    since the last analyzed head SHA. Groups that contain none of them are
+    reused as-is. Tests are regenerated for the changed files, and
+    separately for the untouched files of invalidated groups, so that files
+    edited push after push end up in small groups of their own. Risk is
+    always scored on the whole PR.
+    """
+
+    def __init__(self, github_client: "GitHubClient", pipeline: ReleaseAnalysisPipeline, store: StateStore):
+        """Initialize incremental analyzer."""
+        self.github = github_client
+        self.pipeline = pipeline
+        self.store = store
+        self._logger = logger
+
+    @timed("incremental.analyze")
+    def analyze(self, repo_owner: str, repo_name: str, pr_number: int, context: dict) -> dict:
+        """
+        Analyze a PR, reusing results from the previous analysis where possible.
+
+        Args:
+            repo_owner: Repository owner
+            repo_name: Repository name
+            pr_number: PR number
+            context: Output of PlannerAgent.analyze_pr_context
+
+        Returns:
+            ReleaseAnalysisPipeline.analyze result with merged tests and an
+            `incremental` summary
+        """
+        pr_info = context["pr_info"]
+        head_sha = pr_info.get("head_sha")
+        key = f"analysis:{repo_owner}/{repo_name}#{pr_number}"
+        current = {f["filename"]: _patch_hash(patch) for f, patch in iter_file_patches(pr_info["files"])}
+
+        state = self._load(key) if head_sha else None
+        if state is None:
+            analysis = self.pipeline.analyze(context)
+            reusable, changed, orphaned = [], set(current), set()
+            orphan_tests = None
+        else:
+            reusable, changed, orphaned = self._plan(repo_owner, repo_name, state, head_sha, current)
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="incremental")
+            try:
+                orphan_future = executor.submit(
+                    with_current_context(self.pipeline.generate_tests_for_files), context, sorted(orphaned)
+                ) if orphaned else None
+                analysis = self.pipeline.analyze(context, test_files=sorted(changed))
+                orphan_tests = self._orphan_result(orphan_future)
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        summary = {
+            "previous_head_sha": state["head_sha"] if state else None,
+            "reanalyzed_files": sorted(changed | orphaned),
+            "reused_files": sum(len(group["files"]) for group in reusable),
+        }
+
+        if analysis.get("fast_path"):
+            self._save(key, head_sha, [])
+            analysis["incremental"] = summary
+            return analysis
+
+        test_generation_ok = "test_generation" not in analysis["timed_out"]
+        groups = list(reusable)
+        for files, tests in ((changed, analysis["test_result"]), (orphaned, orphan_tests)):
+            if files and tests is not None and test_generation_ok and "error" not in tests:
+                groups.append(self._group(files, current, tests))
+
+        if state is not None:
+            analysis["test_result"] = self._merge_groups(groups, analysis["test_result"], orphan_tests)
+
+        self._save(key, head_sha, groups)
+
+        self._logger.info(
+            "Incremental analysis complete",
+            pr_number=pr_number,
+            reanalyzed=len(summary["reanalyzed_files"]),
+            reused=summary["reused_files"]
+        )
+
+        analysis["incremental"] = summary
+        return analysis
+
+    def _plan(self, repo_owner: str, repo_name: str, state: dict, head_sha: str,
+              current: Dict[str, str]) -> Tuple[List[dict], Set[str], Set[str]]:
+        """
+        Split the stored groups against the current PR.
+
+        Returns:
+            Tuple of (reusable groups, changed files, untouched files of
+            invalidated groups)
+        """
+        changed_since: Set[str] = set()
+        if state["head_sha"] != head_sha:
+            try:
+                changed_since = set(self.github.get_changed_files_between(
+                    repo_owner, repo_name, state["head_sha"], head_sha
+                ))
+            except Exception as e:
+                self._logger.warning("Compare failed, re-analyzing all files", error=str(e))
+                return [], set(current), set()
+
+        # A patch hash mismatch also catches base-branch merges that the
+        # compare between head SHAs does not attribute to this PR.
+        stored: Dict[str, str] = {}
+        for group in state.get("groups", []):
+            stored.update(group["files"])
+        changed = {
+            filename for filename, digest in current.items()
+            if filename in changed_since or stored.get(filename) != digest
+        }
+
+        reusable = []
+        orphaned: Set[str] = set()
+        for group in state.get("groups", []):
+            if any(f in changed or f not in current for f in group["files"]):
+                orphaned.update(f for f in group["files"] if f in current and f not in changed)
+            else:
+                reusable.append(group)
+
+        return reusable, changed, orphaned
+
+    def _orphan_result(self, future) -> Optional[dict]:
+        """Wait for test generation of orphaned files within the pipeline deadline."""
+        if future is None:
+            return None
+        try:
+            return future.result(timeout=self.pipeline.timeout_seconds)
+        except Exception as e:
+            self._logger.warning("Test generation for unchanged files did not finish", error=str(e))
+            return None
+
+    def _group(self, files: Set[str], current: Dict[str, str], tests: dict) -> dict:
+        """Build a stored group from a set of files and the tests generated for them."""
+        return {
+            "files": {filename: current[filename] for filename in sorted(files)},
+            "tests": {
+                category: [t.model_dump() for t in tests.get(category, [])]
+                for category in TEST_CATEGORIES
+            },
+        }
+
+    def _merge_groups(self, groups: List[dict], *fresh_results: Optional[dict]) -> dict:
+        """Combine the tests of all groups into a single test result."""
+        merged = {}
+        for category, test_type in TEST_CATEGORIES.items():
+            scenarios = []
+            for group in groups:
+                for test in group["tests"].get(category, []):
+                    scenarios.append(TestScenario(**{
+                        **test,
+                        "test_id": f"{test_type}_{len(scenarios) + 1}",
+                    }))
+            merged[category] = scenarios
+
+        merged["total_tests"] = sum(len(merged[category]) for category in TEST_CATEGORIES)
+        errors = [result["error"] for result in fresh_results if result and result.get("error")]
+        if errors:
+            merged["error"] = "; ".join(errors)
+        return merged
+
+    def _load(self, key: str) -> Optional[dict]:
+        try:
+            return self.store.get(key)
+        except Exception as e:
+            self._logger.warning("Could not load analysis state", error=str(e), key=key)
+            return None
+
+    def _save(self, key: str, head_sha: Optional[str], groups: List[dict]):
+        if not head_sha:
+            return
+        try:
+            self.store.put(key, {"head_sha": head_sha, "groups": groups})
+        except Exception as e:
+            self._logger.warning("Could not save analysis state", error=str(e), key=key)
+
+
+def create_incremental_analyzer(github_client: "GitHubClient",
+                                pipeline: ReleaseAnalysisPipeline,
+                                store: StateStore) -> IncrementalAnalyzer:
+    """Factory function to create incremental analyzer."""
+    return IncrementalAnalyzer(github_client, pipeline, store)
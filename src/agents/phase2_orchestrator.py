@@ -11,8 +11,12 @@ from src.agents.risk_scorer import create_risk_scorer_agent
 from src.agents.test_executor import create_test_executor_agent
 from src.agents.test_validator import create_test_validator_agent
 from src.agents.deployment_decider import create_deployment_decision_agent
+from src.agents.analysis_pipeline import create_release_analysis_pipeline
 from src.integrations import create_github_client, create_jira_client, create_claude_analyzer
 from src.utils import logger
+from src.utils.memory import track_memory
+from src.utils.profiler import profiled
+from src.utils.tracing import set_attributes, traced
 
 
 class Phase2Orchestrator:
@@ -30,9 +34,11 @@ class Phase2Orchestrator:
         self.test_executor = create_test_executor_agent()
         self.test_validator = create_test_validator_agent()
         self.deployment_decider = create_deployment_decision_agent()
+        self.analysis = create_release_analysis_pipeline(self.planner, self.test_gen, self.risk_scorer)
         
         self._logger = logger
     
+    @traced("orchestrator.generate_tests")
     def generate_tests(self, repo_owner: str, repo_name: str, pr_number: int, 
                       output_file: str = "tests_generated.json") -> dict:
         """
@@ -43,54 +49,45 @@ class Phase2Orchestrator:
         """
         self._logger.info("Phase 1: Generating tests", pr_number=pr_number)
         
-        # Analyze PR
-        context = self.planner.analyze_pr_context(repo_owner, repo_name, pr_number)
-        pr_info = context["pr_info"]
-        
-        # Generate tests
-        tests = self.test_gen.generate_tests(
-            "\n".join([f["patch"] for f in pr_info["files"]]),
-            context["acceptance_criteria"],
-            context["file_types"],
-            pr_info["title"]
-        )
-        
-        # Score risk
-        risky_patterns = self.planner.extract_risky_patterns(
-            "\n".join([f["patch"] for f in pr_info["files"]]),
-            context["file_types"]
-        )
-        
-        risk = self.risk_scorer.score_release(
-            pr_info["title"],
-            context["file_types"],
-            context["total_changes"],
-            risky_patterns
-        )
+        with track_memory("orchestrator.generate_tests") as memory:
+            # Analyze PR
+            context = self.planner.analyze_pr_context(repo_owner, repo_name, pr_number)
+            pr_info = context["pr_info"]
+            
+            # Generate tests and score risk concurrently
+            analysis = self.analysis.analyze(context)
+            tests = analysis["test_result"]
+            risk = analysis["risk"]
+            
+            # Aggregate results
+            output = {
+                "pr_number": pr_number,
+                "pr_title": pr_info["title"],
+                "tests": {
+                    "integration": [t.dict() for t in tests["integration_tests"]],
+                    "automation": [t.dict() for t in tests["automation_tests"]],
+                    "e2e": [t.dict() for t in tests["e2e_flows"]],
+                    "total": tests["total_tests"]
+                },
+                "risk_assessment": {
+                    "risk_score": risk.risk_score,
+                    "confidence_percentage": risk.confidence_percentage,
+                    "risk_flags": risk.risk_flags,
+                    "suggestions": risk.suggestions,
+                    "requires_manual_review": risk.requires_manual_review,
+                    "assessment_source": risk.assessment_source,
+                    "findings": analysis.get("risk_findings", [])
+                },
+                "jira_context": {
+                    "tickets": context["jira_tickets"],
+                    "acceptance_criteria": context["acceptance_criteria"]
+                },
+                "file_types": context["file_types"],
+                "diff_reduction": _reduction_summary(analysis["diff_reduction"])
+            }
         
-        # Aggregate results
-        output = {
-            "pr_number": pr_number,
-            "pr_title": pr_info["title"],
-            "tests": {
-                "integration": [t.dict() for t in tests["integration_tests"]],
-                "automation": [t.dict() for t in tests["automation_tests"]],
-                "e2e": [t.dict() for t in tests["e2e_flows"]],
-                "total": tests["total_tests"]
-            },
-            "risk_assessment": {
-                "risk_score": risk.risk_score,
-                "confidence_percentage": risk.confidence_percentage,
-                "risk_flags": risk.risk_flags,
-                "suggestions": risk.suggestions,
-                "requires_manual_review": risk.requires_manual_review
-            },
-            "jira_context": {
-                "tickets": context["jira_tickets"],
-                "acceptance_criteria": context["acceptance_criteria"]
-            },
-            "file_types": context["file_types"]
-        }
+        if memory:
+            output["memory"] = memory
         
         # Save output
         with open(output_file, 'w') as f:
@@ -99,6 +96,7 @@ class Phase2Orchestrator:
         self._logger.info("Tests generated and saved", file=output_file, total=tests["total_tests"])
         return output
     
+    @traced("orchestrator.execute_tests")
     def execute_tests(self, repo_path: str, output_file: str = "tests_executed.json") -> dict:
         """
         Phase 2: Execute generated tests.
@@ -108,8 +106,12 @@ class Phase2Orchestrator:
         """
         self._logger.info("Phase 2: Executing tests", repo_path=repo_path)
         
-        # Run tests
-        results = self.test_executor.execute_tests(repo_path)
+        with track_memory("orchestrator.execute_tests") as memory:
+            # Run tests
+            results = self.test_executor.execute_tests(repo_path)
+        
+        if memory:
+            results["memory"] = memory
         
         # Save output
         with open(output_file, 'w') as f:
@@ -118,30 +120,52 @@ class Phase2Orchestrator:
         self._logger.info("Tests executed and saved", file=output_file, passed=results["summary"]["passed"])
         return results
     
+    @traced("orchestrator.validate_tests")
     def validate_tests(self, test_results_file: str, repo_owner: str, 
                       repo_name: str, pr_number: int,
-                      output_file: str = "tests_validated.json") -> dict:
+                      output_file: str = "tests_validated.json",
+                      test_defs_file: Optional[str] = None) -> dict:
         """
         Phase 2: Validate tests against AC.
         
+        Args:
+            test_defs_file: Phase 1 output; its scenarios describe the tests
+                implementing them when AC_MATCH_MODE=bm25
+        
         Returns:
             Validation report
         """
         self._logger.info("Phase 2: Validating tests")
         
-        # Load test results
-        with open(test_results_file) as f:
-            test_results = json.load(f)
-        
-        # Get PR context for AC
-        context = self.planner.analyze_pr_context(repo_owner, repo_name, pr_number)
+        with track_memory("orchestrator.validate_tests") as memory:
+            # Load test results
+            with open(test_results_file) as f:
+                test_results = json.load(f)
+            
+            scenarios = None
+            if test_defs_file:
+                with open(test_defs_file) as f:
+                    generated = json.load(f)["tests"]
+                scenarios = generated["integration"] + generated["automation"] + generated["e2e"]
+            
+            # Get PR context for AC
+            context = self.planner.analyze_pr_context(repo_owner, repo_name, pr_number)
+            
+            # Validate; ac markers refer to each ticket's AC in ticket order
+            issue_criteria = {
+                ticket_id: ticket.get("acceptance_criteria", [])
+                for ticket_id, ticket in context["jira_details"].items()
+            }
+            validation = self.test_validator.validate_tests(
+                test_results,
+                context["acceptance_criteria"],
+                coverage_requirement=80,
+                scenarios=scenarios,
+                issue_criteria=issue_criteria
+            )
         
-        # Validate
-        validation = self.test_validator.validate_tests(
-            test_results,
-            context["acceptance_criteria"],
-            coverage_requirement=80
-        )
+        if memory:
+            validation["memory"] = memory
         
         # Save output
         with open(output_file, 'w') as f:
@@ -150,6 +174,7 @@ class Phase2Orchestrator:
         self._logger.info("Tests validated and saved", file=output_file, status=validation["status"])
         return validation
     
+    @traced("orchestrator.make_decision")
     def make_decision(self, test_defs_file: str, test_results_file: str, 
                      validation_report_file: str, 
                      output_file: str = "deployment_decision.json") -> dict:
@@ -161,20 +186,24 @@ class Phase2Orchestrator:
         """
         self._logger.info("Phase 2: Making deployment decision")
         
-        # Load all reports
-        with open(test_defs_file) as f:
-            test_defs = json.load(f)
-        with open(test_results_file) as f:
-            test_results = json.load(f)
-        with open(validation_report_file) as f:
-            validation = json.load(f)
-        
-        # Make decision
-        decision = self.deployment_decider.make_decision(
-            test_results,
-            validation,
-            test_defs["risk_assessment"]
-        )
+        with track_memory("orchestrator.make_decision") as memory:
+            # Load all reports
+            with open(test_defs_file) as f:
+                test_defs = json.load(f)
+            with open(test_results_file) as f:
+                test_results = json.load(f)
+            with open(validation_report_file) as f:
+                validation = json.load(f)
+            
+            # Make decision
+            decision = self.deployment_decider.make_decision(
+                test_results,
+                validation,
+                test_defs["risk_assessment"]
+            )
+        
+        if memory:
+            decision["memory"] = memory
         
         # Save output
         with open(output_file, 'w') as f:
@@ -183,6 +212,7 @@ class Phase2Orchestrator:
         self._logger.info("Decision made and saved", file=output_file, status=decision["status"])
         return decision
     
+    @traced("orchestrator.end_to_end")
     def end_to_end(self, repo_owner: str, repo_name: str, pr_number: int, 
                    repo_path: str, output_dir: str = ".") -> dict:
         """
@@ -191,6 +221,7 @@ class Phase2Orchestrator:
         Returns:
             Final decision and all intermediate results
         """
+        set_attributes(pr_number=pr_number, repo=f"{repo_owner}/{repo_name}")
         self._logger.info("Running end-to-end Phase 1 + Phase 2 pipeline", pr_number=pr_number)
         
         # Phase 1: Generate tests
@@ -209,7 +240,8 @@ class Phase2Orchestrator:
         validation = self.validate_tests(
             f"{output_dir}/phase2_tests_executed.json",
             repo_owner, repo_name, pr_number,
-            f"{output_dir}/phase2_tests_validated.json"
+            f"{output_dir}/phase2_tests_validated.json",
+            test_defs_file=f"{output_dir}/phase1_tests_generated.json"
         )
         
         # Phase 2: Make decision
@@ -237,6 +269,14 @@ class Phase2Orchestrator:
             }
         }
         
+        memory = [r["memory"] for r in (test_defs, test_results, validation, decision) if "memory" in r]
+        if memory:
+            pipeline_result["memory"] = {
+                "peak_rss_mb": max(report["peak_rss_mb"] for report in memory),
+                "stages": memory,
+            }
+        
+        set_attributes(decision=decision["status"])
         self._logger.info(
             "End-to-end pipeline complete",
             decision_status=decision["status"],
@@ -246,6 +286,17 @@ class Phase2Orchestrator:
         return pipeline_result
 
 
+def _reduction_summary(report: Optional[dict]) -> Optional[dict]:
+    """Totals and non-trivial per-file entries of a diff reduction report."""
+    if report is None:
+        return None
+    return {
+        "bytes_saved": report["bytes_saved"],
+        "tokens_saved": report["tokens_saved"],
+        "files": [f for f in report["files"] if f["bytes_saved"] > 0],
+    }
+
+
 def create_phase2_orchestrator() -> Phase2Orchestrator:
     """Factory function to create Phase 2 orchestrator."""
     return Phase2Orchestrator()
@@ -258,35 +309,41 @@ def main():
     parser = argparse.ArgumentParser(description="AI Release Guardian Phase 2 Orchestrator")
     subparsers = parser.add_subparsers(dest='command', help='Command to run')
     
+    # Options shared by every command
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--profile', action='store_true',
+                        help='Write per-stage sampling profiles (collapsed stacks) next to the output files')
+    
     # Generate tests command
-    gen = subparsers.add_parser('generate-tests', help='Phase 1: Generate tests')
+    gen = subparsers.add_parser('generate-tests', help='Phase 1: Generate tests', parents=[common])
     gen.add_argument('--repo-owner', required=True)
     gen.add_argument('--repo-name', required=True)
     gen.add_argument('--pr-number', type=int, required=True)
     gen.add_argument('--output', default='phase1_tests_generated.json')
     
     # Execute tests command
-    exe = subparsers.add_parser('execute-tests', help='Phase 2: Execute tests')
+    exe = subparsers.add_parser('execute-tests', help='Phase 2: Execute tests', parents=[common])
     exe.add_argument('--repo-path', required=True)
     exe.add_argument('--output', default='phase2_tests_executed.json')
     
     # Validate tests command
-    val = subparsers.add_parser('validate-tests', help='Phase 2: Validate tests')
+    val = subparsers.add_parser('validate-tests', help='Phase 2: Validate tests', parents=[common])
     val.add_argument('--test-results', required=True)
     val.add_argument('--repo-owner', required=True)
     val.add_argument('--repo-name', required=True)
     val.add_argument('--pr-number', type=int, required=True)
     val.add_argument('--output', default='phase2_tests_validated.json')
+    val.add_argument('--test-defs', help='Phase 1 output with generated scenarios (used by AC_MATCH_MODE=bm25)')
     
     # Make decision command
-    dec = subparsers.add_parser('make-decision', help='Phase 2: Make deployment decision')
+    dec = subparsers.add_parser('make-decision', help='Phase 2: Make deployment decision', parents=[common])
     dec.add_argument('--test-defs', required=True)
     dec.add_argument('--test-results', required=True)
     dec.add_argument('--validation', required=True)
     dec.add_argument('--output', default='phase2_deployment_decision.json')
     
     # End-to-end command
-    e2e = subparsers.add_parser('end-to-end', help='Run complete Phase 1 + Phase 2')
+    e2e = subparsers.add_parser('end-to-end', help='Run complete Phase 1 + Phase 2', parents=[common])
     e2e.add_argument('--repo-owner', required=True)
     e2e.add_argument('--repo-name', required=True)
     e2e.add_argument('--pr-number', type=int, required=True)
@@ -301,39 +358,14 @@ def main():
     
     orchestrator = create_phase2_orchestrator()
     
+    # Profiles go next to the command's JSON output
+    profile_dir = None
+    if args.profile:
+        profile_dir = args.output_dir if args.command == 'end-to-end' else str(Path(args.output).parent)
+    
     try:
-        if args.command == 'generate-tests':
-            result = orchestrator.generate_tests(
-                args.repo_owner, args.repo_name, args.pr_number, args.output
-            )
-            print(f"✓ Tests generated: {result['tests']['total']}")
-        
-        elif args.command == 'execute-tests':
-            result = orchestrator.execute_tests(args.repo_path, args.output)
-            print(f"✓ Tests executed: {result['summary']['passed']}/{result['summary']['total']} passed")
-        
-        elif args.command == 'validate-tests':
-            result = orchestrator.validate_tests(
-                args.test_results, args.repo_owner, args.repo_name, 
-                args.pr_number, args.output
-            )
-            print(f"✓ Tests validated: {result['coverage_percentage']}% AC coverage")
-        
-        elif args.command == 'make-decision':
-            result = orchestrator.make_decision(
-                args.test_defs, args.test_results, args.validation, args.output
-            )
-            print(f"✓ Decision made: {result['status']}")
-        
-        elif args.command == 'end-to-end':
-            result = orchestrator.end_to_end(
-                args.repo_owner, args.repo_name, args.pr_number, 
-                args.repo_path, args.output_dir
-            )
-            print(f"✓ Pipeline complete: {result['phase2_deployment_decision']}")
-            print(f"  Tests: {result['phase2_tests_passed']}/{result['phase2_tests_executed']} passed")
-            print(f"  AC Coverage: {result['phase2_ac_coverage']}%")
-            print(f"  Confidence: {result['phase2_confidence']}%")
+        with profiled(f"cli.{args.command}", directory=profile_dir, prefix="profile"):
+            _run_command(orchestrator, args)
     
     except Exception as e:
         logger.error("Error in Phase 2 orchestrator", error=str(e))
@@ -341,5 +373,41 @@ def main():
         sys.exit(1)
 
 
+def _run_command(orchestrator: Phase2Orchestrator, args) -> None:
+    """Run one CLI command and print its summary."""
+    if args.command == 'generate-tests':
+        result = orchestrator.generate_tests(
+            args.repo_owner, args.repo_name, args.pr_number, args.output
+        )
+        print(f"✓ Tests generated: {result['tests']['total']}")
+    
+    elif args.command == 'execute-tests':
+        result = orchestrator.execute_tests(args.repo_path, args.output)
+        print(f"✓ Tests executed: {result['summary']['passed']}/{result['summary']['total']} passed")
+    
+    elif args.command == 'validate-tests':
+        result = orchestrator.validate_tests(
+            args.test_results, args.repo_owner, args.repo_name, 
+            args.pr_number, args.output, test_defs_file=args.test_defs
+        )
+        print(f"✓ Tests validated: {result['coverage_percentage']}% AC coverage")
+    
+    elif args.command == 'make-decision':
+        result = orchestrator.make_decision(
+            args.test_defs, args.test_results, args.validation, args.output
+        )
+        print(f"✓ Decision made: {result['status']}")
+    
+    elif args.command == 'end-to-end':
+        result = orchestrator.end_to_end(
+            args.repo_owner, args.repo_name, args.pr_number, 
+            args.repo_path, args.output_dir
+        )
+        print(f"✓ Pipeline complete: {result['phase2_deployment_decision']}")
+        print(f"  Tests: {result['phase2_tests_passed']}/{result['phase2_tests_executed']} passed")
+        print(f"  AC Coverage: {result['phase2_ac_coverage']}%")
+        print(f"  Confidence: {result['phase2_confidence']}%")
+
+
 if __name__ == '__main__':
     main()
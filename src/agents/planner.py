@@ -1,19 +1,49 @@
 """Planner Agent - Analyzes PRs and Jira context."""
 
-from typing import Optional, List
-from src.integrations import GitHubClient, JiraClient
+from typing import TYPE_CHECKING, Optional, List, Union
 from src.utils import logger
+from src.utils.diff_model import ParsedDiff, parse_diff
+from src.utils.file_classifier import FileClassifier, get_file_classifier
+from src.utils.metrics import timed
+from src.utils.risk_scanner import RiskScanner, get_risk_scanner
+
+if TYPE_CHECKING:
+    from src.integrations.github import GitHubClient
+    from src.integrations.jira import JiraClient
+
+
+def context_diff(context: dict) -> ParsedDiff:
+    """Parsed diff of an analyzed PR, parsing its files if the context has none yet."""
+    diff = context.get("diff")
+    if diff is None:
+        diff = context["diff"] = ParsedDiff.from_files(context["pr_info"]["files"])
+    return diff
 
 
 class PlannerAgent:
     """Orchestrates PR and Jira analysis to create execution plan."""
     
-    def __init__(self, github_client: GitHubClient, jira_client: Optional[JiraClient] = None):
-        """Initialize planner agent."""
+    def __init__(self,
+                 github_client: "GitHubClient",
+                 jira_client: Optional["JiraClient"] = None,
+                 risk_scanner: Optional[RiskScanner] = None,
+                 file_classifier: Optional[FileClassifier] = None):
+        """Initialize planner agent.
+        
+        Args:
+            github_client: GitHub client
+            jira_client: Jira client, if Jira tickets should be fetched
+            risk_scanner: Defaults to the shared scanner of the default rules
+            file_classifier: Classifier for every repository; by default each
+                repository gets the shared classifier of its own rules
+        """
         self.github = github_client
         self.jira = jira_client
+        self.risk_scanner = risk_scanner or get_risk_scanner()
+        self.file_classifier = file_classifier
         self._logger = logger
     
+    @timed("planner.analyze_pr_context")
     def analyze_pr_context(self, 
                           repo_owner: str, 
                           repo_name: str, 
@@ -25,73 +55,125 @@ class PlannerAgent:
             self._logger.info("PR info retrieved", pr_number=pr_number)
             
             # Extract Jira tickets
-            jira_tickets = self.github.extract_jira_tickets_from_pr(
-                pr_info["title"],
-                pr_info["body"]
-            )
-            self._logger.info("Jira tickets extracted", tickets=jira_tickets)
+            jira_tickets = self._extract_jira_tickets(pr_info)
             
             # Get Jira AC if available
-            acceptance_criteria = []
-            jira_details = {}
-            
+            bulk_result = None
             if self.jira and jira_tickets:
-                jira_details_list = self.jira.get_multiple_tickets(jira_tickets)
-                jira_details = {ticket["ticket_id"]: ticket for ticket in jira_details_list}
-                
-                # Aggregate AC from all tickets
-                for ticket_info in jira_details_list:
-                    acceptance_criteria.extend(ticket_info.get("acceptance_criteria", []))
+                bulk_result = self.jira.get_tickets_bulk(jira_tickets)
+            
+            return self._build_context(pr_info, jira_tickets, bulk_result, f"{repo_owner}/{repo_name}")
+        except Exception as e:
+            self._logger.error("Error in PR context analysis", error=str(e), pr_number=pr_number)
+            raise
+    
+    @timed("planner.analyze_pr_context")
+    async def analyze_pr_context_async(self,
+                                       repo_owner: str,
+                                       repo_name: str,
+                                       pr_number: int) -> dict:
+        """Analyze PR and gather all context with async GitHub and Jira clients."""
+        try:
+            pr_info = await self.github.get_pr_diff(repo_owner, repo_name, pr_number)
+            self._logger.info("PR info retrieved", pr_number=pr_number)
+            
+            jira_tickets = self._extract_jira_tickets(pr_info)
             
-            # Classify files by type
-            file_types = self._classify_files(pr_info["files"])
+            bulk_result = None
+            if self.jira and jira_tickets:
+                bulk_result = await self.jira.get_tickets_bulk(jira_tickets)
             
-            return {
-                "pr_info": pr_info,
-                "jira_tickets": jira_tickets,
-                "jira_details": jira_details,
-                "acceptance_criteria": list(set(acceptance_criteria)),  # Unique AC
-                "file_types": file_types,
-                "total_changes": pr_info["total_additions"] + pr_info["total_deletions"],
-            }
+            return self._build_context(pr_info, jira_tickets, bulk_result, f"{repo_owner}/{repo_name}")
         except Exception as e:
             self._logger.error("Error in PR context analysis", error=str(e), pr_number=pr_number)
             raise
     
-    def _classify_files(self, files: List[dict]) -> dict:
-        """Classify modified files by type."""
-        classification = {
-            "backend": [],
-            "frontend": [],
-            "database": [],
-            "infrastructure": [],
-            "config": [],
-            "tests": [],
-            "other": [],
-        }
+    def _extract_jira_tickets(self, pr_info: dict) -> List[str]:
+        """Extract linked Jira tickets from the PR title and body."""
+        jira_tickets = self.github.extract_jira_tickets_from_pr(
+            pr_info["title"],
+            pr_info["body"]
+        )
+        self._logger.info("Jira tickets extracted", tickets=jira_tickets)
+        return jira_tickets
+    
+    def _build_context(self,
+                       pr_info: dict,
+                       jira_tickets: List[str],
+                       bulk_result: Optional[dict],
+                       repo: Optional[str] = None) -> dict:
+        """Assemble the PR context from the PR and its Jira tickets."""
+        acceptance_criteria = []
+        jira_details = {}
+        missing_tickets = []
         
-        for file_info in files:
-            filename = file_info["filename"].lower()
+        if bulk_result is not None:
+            jira_details_list = bulk_result["tickets"]
+            missing_tickets = bulk_result["missing"]
+            jira_details = {ticket["ticket_id"]: ticket for ticket in jira_details_list}
+            
+            if missing_tickets:
+                # Tickets whose search failed are missing too; the analysis goes on without their AC
+                self._logger.warning("Linked Jira tickets not found", missing=missing_tickets,
+                                     failed=bulk_result.get("failed", []))
             
-            if "test" in filename or "spec" in filename:
-                classification["tests"].append(filename)
-            elif any(ext in filename for ext in [".sql", ".migration", ".ddl"]):
-                classification["database"].append(filename)
-            elif any(ext in filename for ext in [".tf", ".yaml", ".yml", "docker", "k8s"]):
-                classification["infrastructure"].append(filename)
-            elif any(ext in filename for ext in [".json", ".toml", ".env", "config"]):
-                classification["config"].append(filename)
-            elif any(ext in filename for ext in [".js", ".jsx", ".tsx", ".ts", ".vue", ".css"]):
-                classification["frontend"].append(filename)
-            elif any(ext in filename for ext in [".py", ".go", ".java", ".rs", ".cpp", ".c"]):
-                classification["backend"].append(filename)
-            else:
-                classification["other"].append(filename)
+            # Aggregate AC from all tickets
+            for ticket_info in jira_details_list:
+                acceptance_criteria.extend(ticket_info.get("acceptance_criteria", []))
         
-        return {k: v for k, v in classification.items() if v}  # Only return non-empty categories
+        # Classify files by type
+        file_types = self._classify_files(pr_info["files"], repo)
+        
+        return {
+            "pr_info": pr_info,
+            "diff": ParsedDiff.from_files(pr_info["files"]),
+            "jira_tickets": jira_tickets,
+            "jira_details": jira_details,
+            "missing_jira_tickets": missing_tickets,
+            "acceptance_criteria": list(dict.fromkeys(acceptance_criteria)),  # Unique AC, in ticket order
+            "file_types": file_types,
+            "total_changes": pr_info["total_additions"] + pr_info["total_deletions"],
+        }
     
-    def extract_risky_patterns(self, pr_diff: str, file_types: dict) -> List[str]:
-        """Identify risky change patterns."""
+    @timed("planner.classify_files")
+    def _classify_files(self, files: List[dict], repo: Optional[str] = None) -> dict:
+        """Classify modified files by type.
+        
+        Args:
+            files: File dictionaries of the PR
+            repo: "owner/name", to pick up the repository's category rules
+        
+        Returns:
+            Dictionary of category -> filenames, non-empty categories only
+        """
+        classifier = self.file_classifier or get_file_classifier(repo)
+        return classifier.classify_files(files)
+    
+    @timed("planner.find_risky_changes")
+    def find_risky_changes(self, pr_diff: Union[str, ParsedDiff]) -> List[dict]:
+        """Scan the changed lines of a diff against the risk rule table.
+        
+        Args:
+            pr_diff: The parsed diff, or unified diff text to parse
+        
+        Returns:
+            RiskScanner finding dictionaries with file, line and rule
+        """
+        diff = pr_diff if isinstance(pr_diff, ParsedDiff) else parse_diff(pr_diff)
+        return self.risk_scanner.scan(diff)
+    
+    @timed("planner.extract_risky_patterns")
+    def extract_risky_patterns(self,
+                               pr_diff: Union[str, ParsedDiff],
+                               file_types: dict,
+                               findings: Optional[List[dict]] = None) -> List[str]:
+        """Identify risky change patterns.
+        
+        Args:
+            pr_diff: The parsed diff, or unified diff text to parse
+            file_types: Output of _classify_files
+            findings: Output of find_risky_changes, if already scanned
+        """
         risks = []
         
         # Check for database changes
@@ -110,14 +192,15 @@ class PlannerAgent:
         if file_types.get("infrastructure"):
             risks.append("Infrastructure changes - requires DevOps review")
         
-        # Check diff for breaking changes
-        if "breaking" in pr_diff.lower() or "deprecated" in pr_diff.lower():
-            risks.append("Breaking changes in code - versioning strategy check needed")
+        # Check changed lines against the rule table
+        if findings is None:
+            findings = self.find_risky_changes(pr_diff)
+        risks.extend(message for message in self.risk_scanner.summarize(findings) if message not in risks)
         
         return risks
 
 
-def create_planner_agent(github_client: GitHubClient, 
-                        jira_client: Optional[JiraClient] = None) -> PlannerAgent:
+def create_planner_agent(github_client: "GitHubClient", 
+                        jira_client: Optional["JiraClient"] = None) -> PlannerAgent:
     """Factory function to create planner agent."""
     return PlannerAgent(github_client, jira_client)
@@ -1,64 +1,123 @@
 """Risk Scorer Agent - Assesses release risk and confidence."""
 
-from typing import Dict, List
-from src.integrations import ClaudeAnalyzer
+from typing import TYPE_CHECKING, Dict, List, Optional
 from src.models.schemas import RiskAssessment
 from src.utils import logger
+from src.utils.diff_model import ParsedDiff
+from src.utils.metrics import timed
+
+if TYPE_CHECKING:
+    from src.integrations.claude import ClaudeAnalyzer
+
+
+# Files described to Claude when a parsed diff is given, most changed first.
+MAX_SUMMARY_FILES = 20
+
+# Hunk sections (enclosing functions or classes) listed per file.
+MAX_SUMMARY_SECTIONS = 5
 
 
 class RiskScorerAgent:
     """Scores release risk and identifies mitigation steps."""
     
-    def __init__(self, claude_analyzer: ClaudeAnalyzer):
+    def __init__(self, claude_analyzer: "ClaudeAnalyzer"):
         """Initialize risk scorer agent."""
         self.claude = claude_analyzer
         self._logger = logger
     
+    @timed("risk_scorer.score_release")
     def score_release(self,
                      changes_summary: str,
                      file_types: Dict[str, List[str]],
                      total_changes: int,
-                     risky_patterns: List[str]) -> RiskAssessment:
-        """Score the risk of a release."""
+                     risky_patterns: List[str],
+                     diff: Optional[ParsedDiff] = None) -> RiskAssessment:
+        """Score the risk of a release.
+        
+        With a parsed diff, the changed files and the functions their hunks
+        touch are added to the summary sent to Claude.
+        """
         try:
             # Get Claude's assessment
             assessment = self.claude.score_release_risk(
-                changes_summary,
+                self._describe_changes(changes_summary, diff),
                 list(file_types.keys()),
                 total_changes
             )
-            
-            # Add detected patterns
-            risk_factors = assessment.get("risk_factors", [])
-            risk_factors.extend(risky_patterns)
-            
-            # Create RiskAssessment object
-            risk_assessment = RiskAssessment(
-                risk_score=assessment.get("risk_score", 50),
-                confidence_percentage=assessment.get("confidence_percentage", 50),
-                risk_flags=risk_factors,
-                suggestions=assessment.get("recommendations", []),
-                requires_manual_review=assessment.get("requires_manual_review", False)
-            )
-            
-            self._logger.info(
-                "Release risk scored",
-                risk_score=risk_assessment.risk_score,
-                confidence=risk_assessment.confidence_percentage,
-                requires_review=risk_assessment.requires_manual_review
-            )
-            
-            return risk_assessment
+            return self._build_assessment(assessment, risky_patterns)
         except Exception as e:
-            self._logger.error("Error scoring release risk", error=str(e))
-            # Return high-risk default on error
-            return RiskAssessment(
-                risk_score=75,
-                confidence_percentage=25,
-                risk_flags=["Analysis failed - manual review required"],
-                suggestions=["Please review PR manually"],
-                requires_manual_review=True
+            return self._failed_assessment(e)
+    
+    @timed("risk_scorer.score_release")
+    async def score_release_async(self,
+                                  changes_summary: str,
+                                  file_types: Dict[str, List[str]],
+                                  total_changes: int,
+                                  risky_patterns: List[str],
+                                  diff: Optional[ParsedDiff] = None) -> RiskAssessment:
+        """Score the risk of a release with an AsyncClaudeAnalyzer."""
+        try:
+            assessment = await self.claude.score_release_risk(
+                self._describe_changes(changes_summary, diff),
+                list(file_types.keys()),
+                total_changes
             )
+            return self._build_assessment(assessment, risky_patterns)
+        except Exception as e:
+            return self._failed_assessment(e)
+    
+    def _describe_changes(self, changes_summary: str, diff: Optional[ParsedDiff]) -> str:
+        """Append per-file line counts and changed sections to the summary."""
+        if diff is None or not diff.files:
+            return changes_summary
+        
+        files = sorted(diff.files, key=lambda f: f.added_count + f.removed_count, reverse=True)
+        lines = []
+        for parsed in files[:MAX_SUMMARY_FILES]:
+            sections = list(dict.fromkeys(h.section for h in parsed.hunks if h.section))
+            line = f"- {parsed.filename}: +{parsed.added_count}/-{parsed.removed_count} in {len(parsed.hunks)} hunks"
+            if sections:
+                line += f" ({', '.join(sections[:MAX_SUMMARY_SECTIONS])})"
+            lines.append(line)
+        if len(files) > MAX_SUMMARY_FILES:
+            lines.append(f"- ... and {len(files) - MAX_SUMMARY_FILES} more files")
+        
+        return changes_summary + "\n\nChanged files:\n" + "\n".join(lines)
+    
+    def _build_assessment(self, assessment: dict, risky_patterns: List[str]) -> RiskAssessment:
+        """Combine Claude's assessment with the locally detected patterns."""
+        # Add detected patterns
+        risk_factors = assessment.get("risk_factors", [])
+        risk_factors.extend(risky_patterns)
+        
+        # Create RiskAssessment object
+        risk_assessment = RiskAssessment(
+            risk_score=assessment.get("risk_score", 50),
+            confidence_percentage=assessment.get("confidence_percentage", 50),
+            risk_flags=risk_factors,
+            suggestions=assessment.get("recommendations", []),
+            requires_manual_review=assessment.get("requires_manual_review", False)
+        )
+        
+        self._logger.info(
+            "Release risk scored",
+            risk_score=risk_assessment.risk_score,
+            confidence=risk_assessment.confidence_percentage,
+            requires_review=risk_assessment.requires_manual_review
+        )
+        
+        return risk_assessment
+    
+    def _failed_assessment(self, error: Exception) -> RiskAssessment:
+        """High-risk default returned when scoring fails."""
+        self._logger.error("Error scoring release risk", error=str(error))
+        return RiskAssessment(
+            risk_score=75,
+            confidence_percentage=25,
+            risk_flags=["Analysis failed - manual review required"],
+            suggestions=["Please review PR manually"],
+            requires_manual_review=True
+        )
     
     def calculate_confidence_percentage(self, risk_score: float) -> float:
         """Calculate confidence percentage from risk score."""
@@ -134,6 +193,6 @@ class RiskScorerAgent:
         return steps
 
 
-def create_risk_scorer_agent(claude_analyzer: ClaudeAnalyzer) -> RiskScorerAgent:
+def create_risk_scorer_agent(claude_analyzer: "ClaudeAnalyzer") -> RiskScorerAgent:
     """Factory function to create risk scorer agent."""
     return RiskScorerAgent(claude_analyzer)
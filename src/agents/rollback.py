@@ -1,8 +1,9 @@
 """Rollback Planner Agent - Creates rollback procedures."""
 
-from typing import List, Dict
+from typing import List, Dict, Optional
 from src.models.schemas import RollbackPlan
 from src.utils import logger
+from src.utils.diff_model import ParsedDiff
 
 
 class RollbackPlannerAgent:
@@ -16,8 +17,13 @@ class RollbackPlannerAgent:
                               release_id: str,
                               changed_files: List[str],
                               file_types: Dict[str, List[str]],
-                              risk_flags: List[str]) -> RollbackPlan:
-        """Generate a rollback procedure."""
+                              risk_flags: List[str],
+                              diff: Optional[ParsedDiff] = None) -> RollbackPlan:
+        """Generate a rollback procedure.
+        
+        With a parsed diff, new migration files get their own down-migration
+        steps and the size of the change to revert is stated.
+        """
         try:
             steps = []
             critical_alerts = []
@@ -28,6 +34,13 @@ class RollbackPlannerAgent:
                 data_backup_required = True
                 steps.append("✅ Backup most recent from pre-deployment state")
                 steps.append("Revert database schema to previous version")
+                if diff is not None:
+                    database_files = {f.lower() for f in file_types["database"]}
+                    steps.extend(
+                        f"Run the down migration of {parsed.filename}"
+                        for parsed in diff.files
+                        if parsed.status == "added" and parsed.filename.lower() in database_files
+                    )
                 steps.append("Run post-rollback data validation")
                 critical_alerts.append("Database integrity check required")
             
@@ -64,6 +77,12 @@ class RollbackPlannerAgent:
                     "Monitor error rates and user reports"
                 ]
             
+            if diff is not None and diff.files:
+                steps.append(
+                    f"Confirm the revert covers {diff.hunk_count} hunks in {len(diff.files)} files "
+                    f"(+{diff.added_count}/-{diff.removed_count} lines)"
+                )
+            
             # Add monitoring and validation
             steps.append("Monitor application metrics for 30 minutes")
             steps.append("Verify all integration tests passing")
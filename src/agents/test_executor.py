@@ -1,10 +1,19 @@
 """Test Executor Agent - Runs generated tests and captures results."""
 
+import os
 import subprocess
 import json
 from typing import Optional, List, Dict
 from pathlib import Path
 from src.utils import logger
+from src.utils.metrics import timed
+from src.utils.tracing import set_attributes
+
+# The ac marker plugin, and where it writes the markers of the collected tests
+AC_MARKERS_PLUGIN = "release_guardian_ac"
+AC_MARKERS_FILE = "/tmp/ac_markers.json"
+# Directory holding only the plugin module, put on the tested repository's path
+PLUGIN_DIR = str(Path(__file__).resolve().parents[1] / "pytest_plugins")
 
 
 class TestExecutionAgent:
@@ -14,6 +23,7 @@ class TestExecutionAgent:
         """Initialize test executor agent."""
         self._logger = logger
     
+    @timed("test_executor.execute_tests")
     def execute_tests(self, repo_path: str, test_pattern: str = "tests/") -> dict:
         """
         Execute tests using pytest and capture results.
@@ -52,13 +62,17 @@ class TestExecutionAgent:
                 "--tb=short",
                 "--json-report",
                 "--json-report-file=/tmp/test_report.json",
-                "--junit-xml=/tmp/junit.xml"
+                "--junit-xml=/tmp/junit.xml",
+                "-p", AC_MARKERS_PLUGIN,
+                f"--ac-markers-file={AC_MARKERS_FILE}"
             ]
+            Path(AC_MARKERS_FILE).unlink(missing_ok=True)
             
             result = subprocess.run(
                 cmd,
                 capture_output=True,
                 text=True,
+                env=self._plugin_env(),
                 timeout=300  # 5 minute timeout
             )
             
@@ -70,11 +84,18 @@ class TestExecutionAgent:
             except FileNotFoundError:
                 # Fallback: parse stdout if JSON report not available
                 results = self._parse_pytest_output(result.stdout, results)
+            results = self._attach_ac_markers(results)
             
             # Check if any tests failed
             if results["summary"]["failed"] > 0 or results["summary"]["errors"] > 0:
                 results["status"] = "FAILED"
             
+            set_attributes(
+                total=results["summary"]["total"],
+                passed=results["summary"]["passed"],
+                failed=results["summary"]["failed"],
+                status=results["status"],
+            )
             self._logger.info(
                 "Tests executed",
                 total=results["summary"]["total"],
@@ -120,6 +141,34 @@ class TestExecutionAgent:
         
         return results
     
+    def _plugin_env(self) -> dict:
+        """Environment for pytest with the ac marker plugin importable.
+        
+        Only the plugin's own directory is added to PYTHONPATH, so the tested
+        repository's modules (a `src` package in particular) are not
+        shadowed by this project's.
+        """
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [PLUGIN_DIR, env.get("PYTHONPATH")]))
+        return env
+    
+    def _attach_ac_markers(self, results: dict, markers_file: str = AC_MARKERS_FILE) -> dict:
+        """Add the ac markers written by the plugin to the marked tests as an "ac" list."""
+        try:
+            with open(markers_file) as f:
+                markers = json.load(f)
+        except FileNotFoundError:
+            return results
+        
+        marked = 0
+        for test in results["tests"]:
+            found = markers.get(test["name"])
+            if found:
+                test["ac"] = found
+                marked += 1
+        self._logger.info("AC markers collected", marked_tests=marked)
+        return results
+    
     def _parse_pytest_output(self, stdout: str, results: dict) -> dict:
         """Fallback: parse pytest stdout."""
         lines = stdout.split('\n')
@@ -1,19 +1,23 @@
 """Test Generator Agent - Creates integration and automation tests."""
 
-from typing import List, Optional
-from src.integrations import ClaudeAnalyzer
+from typing import TYPE_CHECKING, List, Optional
 from src.models.schemas import TestScenario
 from src.utils import logger
+from src.utils.metrics import timed
+
+if TYPE_CHECKING:
+    from src.integrations.claude import ClaudeAnalyzer
 
 
 class TestGeneratorAgent:
     """Generates integration and automation test scenarios."""
     
-    def __init__(self, claude_analyzer: ClaudeAnalyzer):
+    def __init__(self, claude_analyzer: "ClaudeAnalyzer"):
         """Initialize test generator agent."""
         self.claude = claude_analyzer
         self._logger = logger
     
+    @timed("test_generator.generate_tests")
     def generate_tests(self,
                       code_diff: str,
                       acceptance_criteria: List[str],
@@ -27,49 +31,73 @@ class TestGeneratorAgent:
                 acceptance_criteria,
                 list(file_types.keys())
             )
-            
-            # Convert to TestScenario objects
-            integration_tests = self._convert_to_test_scenarios(
-                test_suggestions.get("integration_tests", []),
-                test_type="integration_test"
-            )
-            
-            automation_tests = self._convert_to_test_scenarios(
-                test_suggestions.get("automation_tests", []),
-                test_type="automation_test"
-            )
-            
-            e2e_flows = self._convert_to_test_scenarios(
-                test_suggestions.get("e2e_flows", []),
-                test_type="e2e_test"
-            )
-            
-            all_tests = integration_tests + automation_tests + e2e_flows
-            
-            self._logger.info(
-                "Tests generated",
-                integration_count=len(integration_tests),
-                automation_count=len(automation_tests),
-                e2e_count=len(e2e_flows),
-                total=len(all_tests)
+            return self._build_test_result(test_suggestions)
+        except Exception as e:
+            return self._failed_test_result(e)
+    
+    @timed("test_generator.generate_tests")
+    async def generate_tests_async(self,
+                                   code_diff: str,
+                                   acceptance_criteria: List[str],
+                                   file_types: dict,
+                                   pr_title: str) -> dict:
+        """Generate integration and automation tests with an AsyncClaudeAnalyzer."""
+        try:
+            test_suggestions = await self.claude.generate_test_scenarios(
+                code_diff,
+                acceptance_criteria,
+                list(file_types.keys())
             )
-            
-            return {
-                "integration_tests": integration_tests,
-                "automation_tests": automation_tests,
-                "e2e_flows": e2e_flows,
-                "total_tests": len(all_tests),
-                "raw_suggestions": test_suggestions
-            }
+            return self._build_test_result(test_suggestions)
         except Exception as e:
-            self._logger.error("Error generating tests", error=str(e))
-            return {
-                "integration_tests": [],
-                "automation_tests": [],
-                "e2e_flows": [],
-                "total_tests": 0,
-                "error": str(e)
-            }
+            return self._failed_test_result(e)
+    
+    def _build_test_result(self, test_suggestions: dict) -> dict:
+        """Convert Claude's suggestions into the test result dictionary."""
+        # Convert to TestScenario objects
+        integration_tests = self._convert_to_test_scenarios(
+            test_suggestions.get("integration_tests", []),
+            test_type="integration_test"
+        )
+        
+        automation_tests = self._convert_to_test_scenarios(
+            test_suggestions.get("automation_tests", []),
+            test_type="automation_test"
+        )
+        
+        e2e_flows = self._convert_to_test_scenarios(
+            test_suggestions.get("e2e_flows", []),
+            test_type="e2e_test"
+        )
+        
+        all_tests = integration_tests + automation_tests + e2e_flows
+        
+        self._logger.info(
+            "Tests generated",
+            integration_count=len(integration_tests),
+            automation_count=len(automation_tests),
+            e2e_count=len(e2e_flows),
+            total=len(all_tests)
+        )
+        
+        return {
+            "integration_tests": integration_tests,
+            "automation_tests": automation_tests,
+            "e2e_flows": e2e_flows,
+            "total_tests": len(all_tests),
+            "raw_suggestions": test_suggestions
+        }
+    
+    def _failed_test_result(self, error: Exception) -> dict:
+        """Empty test result returned when generation fails."""
+        self._logger.error("Error generating tests", error=str(error))
+        return {
+            "integration_tests": [],
+            "automation_tests": [],
+            "e2e_flows": [],
+            "total_tests": 0,
+            "error": str(error)
+        }
     
     def _convert_to_test_scenarios(self, 
                                    tests: List[dict],
@@ -201,6 +229,6 @@ def test_{scenario.test_id}():
         return code
 
 
-def create_test_generator_agent(claude_analyzer: ClaudeAnalyzer) -> TestGeneratorAgent:
+def create_test_generator_agent(claude_analyzer: "ClaudeAnalyzer") -> TestGeneratorAgent:
     """Factory function to create test generator agent."""
     return TestGeneratorAgent(claude_analyzer)
@@ -1,27 +1,61 @@
 """Test Validator Agent - Validates test results against acceptance criteria."""
 
-from typing import List, Dict, Optional
+import os
+from typing import List, Dict, Optional, Tuple
 from src.utils import logger
+from src.utils.ac_markers import MarkerCoverage, trace_markers
+from src.utils.ac_matcher import ACMatcher, mask_indices, to_mask
+from src.utils.ac_similarity import DEFAULT_SIMILARITY_THRESHOLD, BM25Index, describe_tests
+from src.utils.metrics import timed
+
+# "words": AC words in test names; "bm25": similarity to test names, docstrings and scenarios
+MATCH_MODES = ("words", "bm25")
 
 
 class TestValidationAgent:
     """Validates test results against acceptance criteria and coverage requirements."""
     
-    def __init__(self):
-        """Initialize test validator agent."""
+    def __init__(self, match_mode: Optional[str] = None, similarity_threshold: Optional[float] = None):
+        """
+        Initialize test validator agent.
+        
+        Args:
+            match_mode: "words" or "bm25" (needs NumPy); defaults to AC_MATCH_MODE or "words"
+            similarity_threshold: Lowest bm25 score (0 to 1) covering an AC;
+                defaults to AC_SIMILARITY_THRESHOLD
+        """
         self._logger = logger
+        self.match_mode = (match_mode or os.getenv("AC_MATCH_MODE", "words")).lower()
+        if self.match_mode not in MATCH_MODES:
+            raise ValueError(f"Unknown AC match mode: {self.match_mode}")
+        self.similarity_threshold = similarity_threshold if similarity_threshold is not None else float(
+            os.getenv("AC_SIMILARITY_THRESHOLD", DEFAULT_SIMILARITY_THRESHOLD)
+        )
+        # (test names, matcher) and (test documents, BM25 index, scores) of the last test results seen
+        self._matcher: Optional[tuple] = None
+        self._bm25: Optional[tuple] = None
     
+    @timed("test_validator.validate_tests")
     def validate_tests(self, 
                       test_results: dict, 
                       acceptance_criteria: List[str],
-                      coverage_requirement: float = 80.0) -> dict:
+                      coverage_requirement: float = 80.0,
+                      scenarios: Optional[List] = None,
+                      issue_criteria: Optional[Dict[str, List[str]]] = None) -> dict:
         """
         Validate tests against AC and coverage requirements.
         
+        Tests with ac markers cover exactly the AC they name; the others are
+        matched in the configured mode.
+        
         Args:
             test_results: Test execution results
             acceptance_criteria: List of AC from Jira
             coverage_requirement: Minimum coverage % required
+            scenarios: Generated TestScenario objects or dictionaries whose
+                descriptions the bm25 mode adds to the tests implementing them
+            issue_criteria: Each Jira issue's AC in ticket order, which the
+                markers' issue keys and criterion numbers refer to
         
         Returns:
             Validation report
@@ -29,6 +63,7 @@ class TestValidationAgent:
         validation = {
             "timestamp": str(__import__('datetime').datetime.now()),
             "ac_coverage": [],
+            "match_mode": self.match_mode,
             "coverage_percentage": 0,
             "gaps": [],
             "status": "PASS",
@@ -37,34 +72,29 @@ class TestValidationAgent:
         }
         
         try:
-            # Extract test names
-            test_names = [t["name"].lower() for t in test_results.get("tests", [])]
+            tests = test_results.get("tests", [])
+            matches, similarities, traced = self._coverage(tests, acceptance_criteria, scenarios, issue_criteria)
+            passed_mask = to_mask((i for i, t in enumerate(tests) if t["status"] == "passed"), len(tests))
             
             # Check each AC is tested
-            for idx, ac in enumerate(acceptance_criteria):
-                ac_lower = ac.lower()
-                
-                # Look for matching test
-                matching_tests = [t for t in test_results["tests"] 
-                                 if self._matches_ac(t["name"], ac)]
-                
-                if matching_tests:
+            for ac, matching in zip(acceptance_criteria, matches):
+                if matching:
                     # Check if tests passed
-                    passed_tests = [t for t in matching_tests if t["status"] == "passed"]
+                    passed_count = (matching & passed_mask).bit_count()
                     
-                    if passed_tests:
+                    if passed_count:
                         validation["ac_coverage"].append({
                             "ac": ac,
                             "tested": True,
                             "passed": True,
-                            "test_count": len(passed_tests)
+                            "test_count": passed_count
                         })
                     else:
                         validation["ac_coverage"].append({
                             "ac": ac,
                             "tested": True,
                             "passed": False,
-                            "test_count": len(matching_tests)
+                            "test_count": matching.bit_count()
                         })
                         validation["gaps"].append(f"Tests exist for AC but failed: {ac}")
                         validation["status"] = "FAIL"
@@ -78,6 +108,16 @@ class TestValidationAgent:
                     validation["gaps"].append(f"No test found for AC: {ac}")
                     validation["warnings"].append(f"Missing coverage for: {ac}")
             
+            if similarities is not None:
+                for coverage, similarity in zip(validation["ac_coverage"], similarities):
+                    coverage["similarity"] = similarity
+            
+            if len(traced.unmarked) < len(tests):
+                for coverage, marked in zip(validation["ac_coverage"], traced.masks):
+                    coverage["marked_tests"] = marked.bit_count()
+            for marker in traced.unknown:
+                validation["warnings"].append(f"Test marked with unknown AC: {marker}")
+            
             # Calculate coverage
             tested_count = len([ac for ac in validation["ac_coverage"] if ac["tested"]])
             total_count = len(acceptance_criteria)
@@ -125,8 +165,89 @@ class TestValidationAgent:
         
         return validation
     
+    @timed("test_validator.match_criteria")
+    def match_criteria(self, tests: List[dict], acceptance_criteria: List[str]) -> List[int]:
+        """
+        Match each AC against the tests, as `_matches_ac` would for every pair.
+        
+        The test names are indexed once and the index is kept for the next
+        call with the same tests, so check_coverage_gaps after validate_tests
+        reuses both the index and the per-AC matches.
+        
+        Args:
+            tests: Test result dictionaries with a "name"
+            acceptance_criteria: List of AC from Jira
+        
+        Returns:
+            Bitmask of the tests matching each AC (bit i for tests[i]);
+            ac_matcher.mask_indices lists them
+        """
+        names = tuple(t["name"] for t in tests)
+        cached = self._matcher
+        if cached is None or cached[0] != names:
+            cached = self._matcher = (names, ACMatcher(names))
+        return cached[1].match_all(acceptance_criteria)
+    
+    @timed("test_validator.score_criteria")
+    def score_criteria(self,
+                       tests: List[dict],
+                       acceptance_criteria: List[str],
+                       scenarios: Optional[List] = None) -> List[Tuple[int, float]]:
+        """
+        Score each AC against every test with BM25 (the "bm25" match mode).
+        
+        The index over the test documents is kept for the next call with the
+        same tests and scenarios, as are the scores for the same AC.
+        
+        Args:
+            tests: Test result dictionaries with a "name"
+            acceptance_criteria: List of AC from Jira
+            scenarios: Generated scenarios to add to the tests implementing them
+        
+        Returns:
+            (bitmask of the tests scoring at least the threshold, best score) per AC
+        """
+        documents = tuple(describe_tests(tests, scenarios))
+        cached = self._bm25
+        if cached is None or cached[0] != documents:
+            cached = self._bm25 = (documents, BM25Index(documents), {})
+        key = (tuple(acceptance_criteria), self.similarity_threshold)
+        if key not in cached[2]:
+            cached[2][key] = cached[1].match(acceptance_criteria, self.similarity_threshold)
+        return cached[2][key]
+    
+    def _coverage(self,
+                  tests: List[dict],
+                  acceptance_criteria: List[str],
+                  scenarios: Optional[List] = None,
+                  issue_criteria: Optional[Dict[str, List[str]]] = None
+                  ) -> Tuple[List[int], Optional[List[float]], MarkerCoverage]:
+        """
+        Bitmask of the tests covering each AC, bm25 scores if any, and the marker join.
+        
+        Marked tests cover the AC their markers name; the unmarked ones are
+        matched in the configured mode and their matches shifted back to
+        positions in `tests`.
+        """
+        traced = trace_markers(tests, acceptance_criteria, issue_criteria)
+        unmarked = traced.unmarked
+        if not unmarked:
+            similarities = [0.0] * len(acceptance_criteria) if self.match_mode == "bm25" else None
+            return traced.masks, similarities, traced
+        
+        subset = tests if len(unmarked) == len(tests) else [tests[i] for i in unmarked]
+        similarities = None
+        if self.match_mode == "bm25":
+            scored = self.score_criteria(subset, acceptance_criteria, scenarios)
+            matches, similarities = [mask for mask, _ in scored], [score for _, score in scored]
+        else:
+            matches = self.match_criteria(subset, acceptance_criteria)
+        if subset is not tests:
+            matches = [to_mask((unmarked[i] for i in mask_indices(mask)), len(tests)) for mask in matches]
+        return [marked | matched for marked, matched in zip(traced.masks, matches)], similarities, traced
+    
     def _matches_ac(self, test_name: str, ac: str) -> bool:
-        """Check if test name matches AC description."""
+        """Check if test name matches AC description (the rule match_criteria applies to every pair)."""
         test_lower = test_name.lower()
         ac_lower = ac.lower()
         
@@ -159,17 +280,14 @@ class TestValidationAgent:
         
         return validation
     
-    def check_coverage_gaps(self, test_results: dict, acceptance_criteria: List[str]) -> List[str]:
+    def check_coverage_gaps(self,
+                            test_results: dict,
+                            acceptance_criteria: List[str],
+                            scenarios: Optional[List] = None,
+                            issue_criteria: Optional[Dict[str, List[str]]] = None) -> List[str]:
         """Identify gaps in test coverage."""
-        gaps = []
-        
-        test_names = [t["name"].lower() for t in test_results.get("tests", [])]
-        
-        for ac in acceptance_criteria:
-            if not any(self._matches_ac(t, ac) for t in test_names):
-                gaps.append(f"No test coverage for: {ac}")
-        
-        return gaps
+        matches, _, _ = self._coverage(test_results.get("tests", []), acceptance_criteria, scenarios, issue_criteria)
+        return [f"No test coverage for: {ac}" for ac, matching in zip(acceptance_criteria, matches) if not matching]
 
 
 def create_test_validator_agent() -> TestValidationAgent:
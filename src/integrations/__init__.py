@@ -1,14 +1,44 @@
-"""Integration modules."""
-
-from .github import GitHubClient, create_github_client
-from .jira import JiraClient, create_jira_client
-from .claude import ClaudeAnalyzer, create_claude_analyzer
-
-__all__ = [
-    "GitHubClient",
-    "JiraClient",
-    "ClaudeAnalyzer",
-    "create_github_client",
-    "create_jira_client",
-    "create_claude_analyzer",
-]
+"""Integration modules.
+
+Exports are imported on first access, so e.g. the Jira SDK is only loaded
+when a Jira client is actually used.
+"""
+
+from typing import TYPE_CHECKING
+
+from src.utils.lazy import lazy_exports
+
+_EXPORTS = {
+    "GitHubClient": ".github",
+    "JiraClient": ".jira",
+    "ClaudeAnalyzer": ".claude",
+    "AsyncGitHubClient": ".github",
+    "AsyncJiraClient": ".jira",
+    "AsyncClaudeAnalyzer": ".claude",
+    "StateStore": ".state_store",
+    "MemoryStateStore": ".state_store",
+    "LocalStateStore": ".state_store",
+    "WebhookGuard": ".webhook_guard",
+    "ClientPool": ".pool",
+    "create_github_client": ".github",
+    "create_jira_client": ".jira",
+    "create_claude_analyzer": ".claude",
+    "create_async_github_client": ".github",
+    "create_async_jira_client": ".jira",
+    "create_async_claude_analyzer": ".claude",
+    "create_state_store": ".state_store",
+    "create_webhook_guard": ".webhook_guard",
+    "get_client_pool": ".pool",
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .github import GitHubClient, AsyncGitHubClient, create_github_client, create_async_github_client
+    from .jira import JiraClient, AsyncJiraClient, create_jira_client, create_async_jira_client
+    from .claude import ClaudeAnalyzer, AsyncClaudeAnalyzer, create_claude_analyzer, create_async_claude_analyzer
+    from .state_store import StateStore, MemoryStateStore, LocalStateStore, create_state_store
+    from .webhook_guard import WebhookGuard, create_webhook_guard
+    from .pool import ClientPool, get_client_pool
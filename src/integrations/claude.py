@@ -1,26 +1,140 @@
 """Claude AI integration for intelligent analysis."""
 
+import asyncio
+import copy
+import json
 import os
-from typing import Optional
+import re
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, List, NamedTuple, Optional
 import anthropic
 from src.utils import logger
+from src.utils.cache import ResponseCache, get_shared_response_cache, make_cache_key
+from src.utils.diff_chunker import estimate_tokens, split_diff
+from src.utils.metrics import observe_stage, record_cache_lookup, record_claude_usage
+from src.utils.tracing import set_attributes, span, with_current_context
 
 
-class ClaudeAnalyzer:
-    """Claude AI wrapper for PR and code analysis."""
+# Bump the version of a prompt whenever its template changes so cached
+# responses for the old template are no longer used.
+PROMPT_VERSIONS = {
+    "analyze_pr_diff": "1",
+    "generate_test_scenarios": "1",
+    "score_release_risk": "1",
+}
+
+# Diffs above this many estimated tokens are analyzed in chunks.
+DEFAULT_CHUNK_TOKEN_BUDGET = 60000
+
+# Concurrent Claude calls when analyzing chunks.
+DEFAULT_CHUNK_WORKERS = 4
+
+
+class _PromptRequest(NamedTuple):
+    """A prompt ready to send, with its cache key and fallback result."""
+    name: str
+    cache_key: str
+    prompt: str
+    max_tokens: int
+    default: dict
+    error_message: str
+
+
+class _ClaudeBase(ABC):
+    """Prompts, caching and chunk merging shared by the sync and async analyzers."""
     
-    def __init__(self, api_key: Optional[str] = None, model: str = "claude-3-5-sonnet-20241022"):
+    def __init__(self,
+                 api_key: Optional[str] = None,
+                 model: str = "claude-3-5-sonnet-20241022",
+                 cache: Optional[ResponseCache] = None,
+                 chunk_token_budget: Optional[int] = None,
+                 chunk_workers: Optional[int] = None):
         """Initialize Claude client."""
         self.api_key = api_key or os.getenv("CLAUDE_API_KEY")
         if not self.api_key:
             raise ValueError("CLAUDE_API_KEY not set in environment")
         
         self.model = model
-        self.client = anthropic.Anthropic(api_key=self.api_key)
+        self.client = self._create_client()
+        self.cache = cache
+        self.chunk_token_budget = chunk_token_budget or int(
+            os.getenv("CLAUDE_CHUNK_TOKEN_BUDGET", DEFAULT_CHUNK_TOKEN_BUDGET)
+        )
+        self.chunk_workers = chunk_workers or int(os.getenv("CLAUDE_CHUNK_WORKERS", DEFAULT_CHUNK_WORKERS))
         self._logger = logger
     
-    def analyze_pr_diff(self, diff: str, pr_title: str, acceptance_criteria: list) -> dict:
-        """Analyze PR diff and generate insights."""
+    @abstractmethod
+    def _create_client(self):
+        """Create the Anthropic SDK client."""
+    
+    def _cache_key(self, prompt_name: str, **inputs) -> str:
+        """Build the content-addressed cache key for a prompt."""
+        return make_cache_key(
+            model=self.model,
+            prompt=prompt_name,
+            prompt_version=PROMPT_VERSIONS[prompt_name],
+            **inputs
+        )
+    
+    def _cache_get(self, request: _PromptRequest) -> Optional[dict]:
+        """Look up a cached response, counting the hit or miss."""
+        if self.cache is None:
+            return None
+        cached = self.cache.get(request.cache_key)
+        record_cache_lookup(request.name, cached is not None)
+        set_attributes(cached=cached is not None)
+        return cached
+    
+    def _cache_set(self, key: str, result: dict):
+        """Store a successful response."""
+        if self.cache is not None:
+            self.cache.set(key, result)
+    
+    def _split_chunks(self, diff: str) -> List[str]:
+        """Split a diff into token-budgeted chunks."""
+        chunks = split_diff(diff, self.chunk_token_budget)
+        self._logger.info(
+            "Analyzing diff in chunks",
+            chunks=len(chunks),
+            estimated_tokens=estimate_tokens(diff),
+            workers=self.chunk_workers
+        )
+        return chunks
+    
+    def _needs_chunking(self, diff: str) -> bool:
+        """Check whether a diff exceeds the per-call token budget."""
+        return estimate_tokens(diff) > self.chunk_token_budget
+    
+    def _messages_args(self, request: _PromptRequest) -> dict:
+        """Arguments for `messages.create`."""
+        return {
+            "model": self.model,
+            "max_tokens": request.max_tokens,
+            "messages": [
+                {"role": "user", "content": request.prompt}
+            ],
+        }
+    
+    def _parse_response(self, request: _PromptRequest, response) -> dict:
+        """Decode Claude's JSON answer and cache it."""
+        usage = getattr(response, "usage", None)
+        record_claude_usage(request.name, usage)
+        if usage is not None:
+            set_attributes(input_tokens=usage.input_tokens, output_tokens=usage.output_tokens)
+        result = json.loads(response.content[0].text)
+        self._cache_set(request.cache_key, result)
+        return result
+    
+    def _failed(self, request: _PromptRequest, error: Exception) -> dict:
+        """Log a failed request and return a fresh copy of its fallback result."""
+        self._logger.error(request.error_message, error=str(error))
+        set_attributes(error=str(error))
+        return copy.deepcopy(request.default)
+    
+    def _analyze_pr_diff_request(self, diff: str, pr_title: str, acceptance_criteria: list) -> _PromptRequest:
+        """Build the PR analysis prompt."""
         prompt = f"""You are an expert QA engineer analyzing a GitHub PR.
 
 PR Title: {pr_title}
@@ -45,33 +159,30 @@ Respond in JSON format:
   "files_modified": ["file1", "file2"]
 }}
 """
-        
-        try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=2000,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
-            
-            import json
-            result = json.loads(response.content[0].text)
-            return result
-        except Exception as e:
-            self._logger.error("Error analyzing PR diff", error=str(e))
-            return {
+        return _PromptRequest(
+            name="analyze_pr_diff",
+            cache_key=self._cache_key(
+                "analyze_pr_diff",
+                diff=diff,
+                pr_title=pr_title,
+                acceptance_criteria=acceptance_criteria
+            ),
+            prompt=prompt,
+            max_tokens=2000,
+            default={
                 "key_changes": [],
                 "integration_points": [],
                 "risks": [],
                 "files_modified": []
-            }
+            },
+            error_message="Error analyzing PR diff"
+        )
     
-    def generate_test_scenarios(self, 
-                               code_diff: str, 
-                               acceptance_criteria: list,
-                               file_types: list) -> dict:
-        """Generate integration and automation test scenarios."""
+    def _test_scenarios_request(self,
+                                code_diff: str,
+                                acceptance_criteria: list,
+                                file_types: list) -> _PromptRequest:
+        """Build the test scenario generation prompt."""
         prompt = f"""You are an expert test automation engineer.
 
 Acceptance Criteria:
@@ -115,32 +226,29 @@ Respond with a JSON object:
 }}
 
 Focus on practical, executable tests that cover the acceptance criteria."""
-        
-        try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=4000,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
-            
-            import json
-            result = json.loads(response.content[0].text)
-            return result
-        except Exception as e:
-            self._logger.error("Error generating test scenarios", error=str(e))
-            return {
+        return _PromptRequest(
+            name="generate_test_scenarios",
+            cache_key=self._cache_key(
+                "generate_test_scenarios",
+                diff=code_diff,
+                acceptance_criteria=acceptance_criteria,
+                file_types=file_types
+            ),
+            prompt=prompt,
+            max_tokens=4000,
+            default={
                 "integration_tests": [],
                 "automation_tests": [],
                 "e2e_flows": []
-            }
+            },
+            error_message="Error generating test scenarios"
+        )
     
-    def score_release_risk(self, 
-                          changes_summary: str,
-                          file_types: list,
-                          change_magnitude: int) -> dict:
-        """Score the risk of a release."""
+    def _release_risk_request(self,
+                              changes_summary: str,
+                              file_types: list,
+                              change_magnitude: int) -> _PromptRequest:
+        """Build the release risk prompt."""
         prompt = f"""You are an expert release manager assessing deployment risk.
 
 Changes Summary: {changes_summary}
@@ -169,31 +277,249 @@ Respond with JSON:
 
 Risk Score: 0-20=low, 21-50=medium, 51-75=high, 76-100=critical
 Confidence: likelihood that this deployment will succeed"""
-        
-        try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=1500,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
-            
-            import json
-            result = json.loads(response.content[0].text)
-            return result
-        except Exception as e:
-            self._logger.error("Error scoring release risk", error=str(e))
-            return {
+        return _PromptRequest(
+            name="score_release_risk",
+            cache_key=self._cache_key(
+                "score_release_risk",
+                changes_summary=changes_summary,
+                file_types=file_types,
+                change_magnitude=change_magnitude
+            ),
+            prompt=prompt,
+            max_tokens=1500,
+            default={
                 "risk_score": 50,
                 "confidence_percentage": 50,
                 "risk_factors": ["analysis_error"],
                 "recommendations": ["manual_review_required"],
                 "requires_manual_review": True,
                 "deployment_gates": []
-            }
+            },
+            error_message="Error scoring release risk"
+        )
+
+
+class ClaudeAnalyzer(_ClaudeBase):
+    """Claude AI wrapper for PR and code analysis."""
+    
+    def _create_client(self):
+        """Create the Anthropic SDK client."""
+        return anthropic.Anthropic(api_key=self.api_key)
+    
+    def _complete(self, request: _PromptRequest) -> dict:
+        """Send a prompt, serving it from the cache when possible."""
+        with span(f"claude.{request.name}", prompt_bytes=len(request.prompt)):
+            cached = self._cache_get(request)
+            if cached is not None:
+                return cached
+            
+            start = time.perf_counter()
+            try:
+                response = self.client.messages.create(**self._messages_args(request))
+            except Exception as e:
+                observe_stage(f"claude.{request.name}", time.perf_counter() - start, error=True)
+                return self._failed(request, e)
+            observe_stage(f"claude.{request.name}", time.perf_counter() - start)
+            
+            try:
+                return self._parse_response(request, response)
+            except Exception as e:
+                return self._failed(request, e)
+    
+    def _map_chunks(self, diff: str, analyze_chunk: Callable[[str], dict]) -> List[dict]:
+        """Analyze each token-budgeted chunk of a diff on a bounded worker pool."""
+        chunks = self._split_chunks(diff)
+        with ThreadPoolExecutor(max_workers=self.chunk_workers, thread_name_prefix="claude-chunk") as executor:
+            futures = [executor.submit(with_current_context(analyze_chunk), chunk) for chunk in chunks]
+            return [future.result() for future in futures]
+    
+    def analyze_pr_diff(self, diff: str, pr_title: str, acceptance_criteria: list) -> dict:
+        """Analyze PR diff and generate insights.
+        
+        Diffs larger than the chunk token budget are analyzed chunk by chunk
+        and the findings merged.
+        """
+        if not self._needs_chunking(diff):
+            return self._analyze_pr_diff_single(diff, pr_title, acceptance_criteria)
+        
+        results = self._map_chunks(
+            diff,
+            lambda chunk: self._analyze_pr_diff_single(chunk, pr_title, acceptance_criteria)
+        )
+        return _merge_pr_analyses(results)
+    
+    def _analyze_pr_diff_single(self, diff: str, pr_title: str, acceptance_criteria: list) -> dict:
+        """Analyze a diff that fits in a single request."""
+        return self._complete(self._analyze_pr_diff_request(diff, pr_title, acceptance_criteria))
+    
+    def generate_test_scenarios(self, 
+                               code_diff: str, 
+                               acceptance_criteria: list,
+                               file_types: list) -> dict:
+        """Generate integration and automation test scenarios.
+        
+        Diffs larger than the chunk token budget are analyzed chunk by chunk;
+        scenarios are then merged and de-duplicated by name.
+        """
+        if not self._needs_chunking(code_diff):
+            return self._generate_test_scenarios_single(code_diff, acceptance_criteria, file_types)
+        
+        results = self._map_chunks(
+            code_diff,
+            lambda chunk: self._generate_test_scenarios_single(chunk, acceptance_criteria, file_types)
+        )
+        return _merge_test_results(results)
+    
+    def _generate_test_scenarios_single(self,
+                                        code_diff: str,
+                                        acceptance_criteria: list,
+                                        file_types: list) -> dict:
+        """Generate test scenarios for a diff that fits in a single request."""
+        return self._complete(self._test_scenarios_request(code_diff, acceptance_criteria, file_types))
+    
+    def score_release_risk(self, 
+                          changes_summary: str,
+                          file_types: list,
+                          change_magnitude: int) -> dict:
+        """Score the risk of a release."""
+        return self._complete(self._release_risk_request(changes_summary, file_types, change_magnitude))
+
+
+class AsyncClaudeAnalyzer(_ClaudeBase):
+    """asyncio variant of ClaudeAnalyzer for the ASGI server.
+    
+    Same prompts, cache and fallbacks; chunks of an oversized diff are sent
+    concurrently, at most `chunk_workers` at a time.
+    """
+    
+    def _create_client(self):
+        """Create the Anthropic SDK client."""
+        return anthropic.AsyncAnthropic(api_key=self.api_key)
+    
+    async def _complete(self, request: _PromptRequest) -> dict:
+        """Send a prompt, serving it from the cache when possible."""
+        with span(f"claude.{request.name}", prompt_bytes=len(request.prompt)):
+            cached = self._cache_get(request)
+            if cached is not None:
+                return cached
+            
+            start = time.perf_counter()
+            try:
+                response = await self.client.messages.create(**self._messages_args(request))
+            except Exception as e:
+                observe_stage(f"claude.{request.name}", time.perf_counter() - start, error=True)
+                return self._failed(request, e)
+            observe_stage(f"claude.{request.name}", time.perf_counter() - start)
+            
+            try:
+                return self._parse_response(request, response)
+            except Exception as e:
+                return self._failed(request, e)
+    
+    async def _map_chunks(self, diff: str, analyze_chunk: Callable[[str], Awaitable[dict]]) -> List[dict]:
+        """Analyze each token-budgeted chunk of a diff, bounded by `chunk_workers`."""
+        semaphore = asyncio.Semaphore(self.chunk_workers)
+        
+        async def run(chunk: str) -> dict:
+            async with semaphore:
+                return await analyze_chunk(chunk)
+        
+        return list(await asyncio.gather(*(run(chunk) for chunk in self._split_chunks(diff))))
+    
+    async def analyze_pr_diff(self, diff: str, pr_title: str, acceptance_criteria: list) -> dict:
+        """Analyze PR diff and generate insights."""
+        if not self._needs_chunking(diff):
+            return await self._complete(self._analyze_pr_diff_request(diff, pr_title, acceptance_criteria))
+        
+        results = await self._map_chunks(
+            diff,
+            lambda chunk: self._complete(self._analyze_pr_diff_request(chunk, pr_title, acceptance_criteria))
+        )
+        return _merge_pr_analyses(results)
+    
+    async def generate_test_scenarios(self,
+                                      code_diff: str,
+                                      acceptance_criteria: list,
+                                      file_types: list) -> dict:
+        """Generate integration and automation test scenarios."""
+        if not self._needs_chunking(code_diff):
+            return await self._complete(self._test_scenarios_request(code_diff, acceptance_criteria, file_types))
+        
+        results = await self._map_chunks(
+            code_diff,
+            lambda chunk: self._complete(self._test_scenarios_request(chunk, acceptance_criteria, file_types))
+        )
+        return _merge_test_results(results)
+    
+    async def score_release_risk(self,
+                                 changes_summary: str,
+                                 file_types: list,
+                                 change_magnitude: int) -> dict:
+        """Score the risk of a release."""
+        return await self._complete(self._release_risk_request(changes_summary, file_types, change_magnitude))
+    
+    async def aclose(self):
+        """Close the connection pool."""
+        await self.client.close()
+
 
+def _merge_pr_analyses(results: List[dict]) -> dict:
+    """Merge the findings of per-chunk PR analyses."""
+    return {
+        key: _merge_unique([item for result in results for item in result.get(key, [])])
+        for key in ("key_changes", "integration_points", "risks", "files_modified")
+    }
 
-def create_claude_analyzer(api_key: Optional[str] = None) -> ClaudeAnalyzer:
-    """Factory function to create Claude analyzer."""
-    return ClaudeAnalyzer(api_key)
+
+def _merge_test_results(results: List[dict]) -> dict:
+    """Merge per-chunk test scenarios."""
+    return {
+        key: _merge_scenarios([test for result in results for test in result.get(key, [])])
+        for key in ("integration_tests", "automation_tests", "e2e_flows")
+    }
+
+
+def _merge_unique(items: list) -> list:
+    """De-duplicate findings case-insensitively, keeping first-seen order."""
+    seen = set()
+    merged = []
+    for item in items:
+        key = str(item).strip().lower()
+        if key not in seen:
+            seen.add(key)
+            merged.append(item)
+    return merged
+
+
+def _merge_scenarios(tests: List[dict]) -> List[dict]:
+    """De-duplicate test scenarios by normalised name, keeping first-seen order."""
+    seen = set()
+    merged = []
+    for test in tests:
+        key = re.sub(r'[^a-z0-9]+', '_', str(test.get("name", "")).lower()).strip("_")
+        if not key:
+            key = str(test.get("description", "")).strip().lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        merged.append(test)
+    return merged
+
+
+def create_claude_analyzer(api_key: Optional[str] = None,
+                           cache: Optional[ResponseCache] = None) -> ClaudeAnalyzer:
+    """Factory function to create Claude analyzer.
+    
+    Without an explicit cache, the process-wide cache configured by the
+    CLAUDE_CACHE_* settings is used.
+    """
+    return ClaudeAnalyzer(api_key, cache=cache if cache is not None else get_shared_response_cache())
+
+
+def create_async_claude_analyzer(api_key: Optional[str] = None,
+                                 cache: Optional[ResponseCache] = None) -> AsyncClaudeAnalyzer:
+    """Factory function to create async Claude analyzer.
+    
+    Shares the process-wide response cache with the sync analyzer.
+    """
+    return AsyncClaudeAnalyzer(api_key, cache=cache if cache is not None else get_shared_response_cache())
@@ -1,9 +1,22 @@
 """GitHub API integration."""
 
+import asyncio
 import os
+import re
 from typing import Optional, List
+
+import httpx
 from github import Github, Repository, PullRequest
 from src.utils import logger
+from src.utils.metrics import timed
+from src.utils.patch_stream import PatchSpool
+from src.utils.tracing import set_attributes, span
+
+
+DEFAULT_GITHUB_API_URL = "https://api.github.com"
+
+# Page size for the PR files endpoint (GitHub's maximum).
+FILES_PER_PAGE = 100
 
 
 class GitHubClient:
@@ -18,23 +31,33 @@ class GitHubClient:
         self.client = Github(self.token)
         self._logger = logger
     
+    @timed("github.get_pr_diff")
     def get_pr_diff(self, repo_owner: str, repo_name: str, pr_number: int) -> dict:
         """Get PR diff and file changes."""
         try:
             repo = self.client.get_user(repo_owner).get_repo(repo_name)
             pr = repo.get_pull(pr_number)
             
-            files_changed = []
-            for file in pr.get_files():
-                files_changed.append({
+            # get_files() pages lazily; patches go to the spool as they arrive
+            spool = PatchSpool()
+            files_changed = spool.collect(
+                {
                     "filename": file.filename,
                     "status": file.status,
                     "additions": file.additions,
                     "deletions": file.deletions,
                     "patch": file.patch or "",
                     "changes": file.changes,
-                })
+                }
+                for file in pr.get_files()
+            )
             
+            set_attributes(
+                pr_number=pr_number,
+                files=len(files_changed),
+                diff_bytes=spool.total_bytes,
+                spilled=spool.spilled,
+            )
             return {
                 "pr_number": pr_number,
                 "title": pr.title,
@@ -42,6 +65,7 @@ class GitHubClient:
                 "author": pr.user.login,
                 "base_branch": pr.base.ref,
                 "head_branch": pr.head.ref,
+                "head_sha": pr.head.sha,
                 "files": files_changed,
                 "total_files": len(files_changed),
                 "total_additions": sum(f["additions"] for f in files_changed),
@@ -51,6 +75,43 @@ class GitHubClient:
             self._logger.error("Error fetching PR diff", error=str(e), pr_number=pr_number)
             raise
     
+    @timed("github.get_pr_stats")
+    def get_pr_stats(self, repo_owner: str, repo_name: str, pr_number: int) -> dict:
+        """Get PR size counters and head SHA without fetching the file list."""
+        try:
+            repo = self.client.get_user(repo_owner).get_repo(repo_name)
+            pr = repo.get_pull(pr_number)
+            return {
+                "changed_files": pr.changed_files,
+                "additions": pr.additions,
+                "deletions": pr.deletions,
+                "head_sha": pr.head.sha,
+            }
+        except Exception as e:
+            self._logger.error("Error fetching PR stats", error=str(e), pr_number=pr_number)
+            raise
+    
+    @timed("github.get_changed_files_between")
+    def get_changed_files_between(self, repo_owner: str, repo_name: str,
+                                  base_sha: str, head_sha: str) -> List[str]:
+        """Get filenames changed between two commits using the compare API."""
+        try:
+            repo = self.client.get_user(repo_owner).get_repo(repo_name)
+            comparison = repo.compare(base_sha, head_sha)
+            
+            changed = []
+            for file in comparison.files:
+                changed.append(file.filename)
+                # Renames invalidate results stored under the old path too
+                if getattr(file, "previous_filename", None):
+                    changed.append(file.previous_filename)
+            
+            return changed
+        except Exception as e:
+            self._logger.error("Error comparing commits", error=str(e), base=base_sha, head=head_sha)
+            raise
+    
+    @timed("github.post_pr_comment")
     def post_pr_comment(self, repo_owner: str, repo_name: str, pr_number: int, comment: str) -> dict:
         """Post a comment on a PR."""
         try:
@@ -71,25 +132,149 @@ class GitHubClient:
     
     def extract_jira_tickets_from_pr(self, pr_title: str, pr_body: str) -> List[str]:
         """Extract Jira ticket IDs from PR title and body."""
-        import re
-        
-        # Pattern: PROJECT-NUMBER (e.g., PROJ-123, INFRA-45)
-        pattern = r'\b([A-Z][A-Z0-9]*-\d+)\b'
-        
-        combined_text = f"{pr_title}\n{pr_body}"
-        matches = re.findall(pattern, combined_text)
-        
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_tickets = []
-        for ticket in matches:
-            if ticket not in seen:
-                seen.add(ticket)
-                unique_tickets.append(ticket)
+        return extract_jira_tickets(pr_title, pr_body)
+
+
+class AsyncGitHubClient:
+    """asyncio GitHub REST client for the ASGI server.
+    
+    Covers the calls the release analysis makes and returns the same shapes
+    as GitHubClient. One httpx connection pool is shared by all requests.
+    """
+    
+    def __init__(self,
+                 token: Optional[str] = None,
+                 base_url: Optional[str] = None,
+                 http_client: Optional[httpx.AsyncClient] = None):
+        """Initialize async GitHub client."""
+        self.token = token or os.getenv("GITHUB_TOKEN")
+        if not self.token:
+            raise ValueError("GITHUB_TOKEN not set in environment")
         
-        return unique_tickets
+        self.http = http_client or httpx.AsyncClient(
+            base_url=base_url or os.getenv("GITHUB_API_URL", DEFAULT_GITHUB_API_URL),
+            headers={
+                "Authorization": f"Bearer {self.token}",
+                "Accept": "application/vnd.github+json",
+                "X-GitHub-Api-Version": "2022-11-28",
+            },
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        )
+        self._logger = logger
+    
+    @timed("github.get_pr_diff")
+    async def get_pr_diff(self, repo_owner: str, repo_name: str, pr_number: int) -> dict:
+        """Get PR diff and file changes."""
+        try:
+            spool = PatchSpool()
+            pr, files_changed = await asyncio.gather(
+                self._get_json(f"/repos/{repo_owner}/{repo_name}/pulls/{pr_number}"),
+                self._get_pr_files(repo_owner, repo_name, pr_number, spool),
+            )
+            
+            set_attributes(
+                pr_number=pr_number,
+                files=len(files_changed),
+                diff_bytes=spool.total_bytes,
+                spilled=spool.spilled,
+            )
+            return {
+                "pr_number": pr_number,
+                "title": pr["title"],
+                "body": pr.get("body") or "",
+                "author": pr["user"]["login"],
+                "base_branch": pr["base"]["ref"],
+                "head_branch": pr["head"]["ref"],
+                "head_sha": pr["head"]["sha"],
+                "files": files_changed,
+                "total_files": len(files_changed),
+                "total_additions": sum(f["additions"] for f in files_changed),
+                "total_deletions": sum(f["deletions"] for f in files_changed),
+            }
+        except Exception as e:
+            self._logger.error("Error fetching PR diff", error=str(e), pr_number=pr_number)
+            raise
+    
+    @timed("github.get_pr_stats")
+    async def get_pr_stats(self, repo_owner: str, repo_name: str, pr_number: int) -> dict:
+        """Get PR size counters and head SHA without fetching the file list."""
+        try:
+            pr = await self._get_json(f"/repos/{repo_owner}/{repo_name}/pulls/{pr_number}")
+            return {
+                "changed_files": pr["changed_files"],
+                "additions": pr["additions"],
+                "deletions": pr["deletions"],
+                "head_sha": pr["head"]["sha"],
+            }
+        except Exception as e:
+            self._logger.error("Error fetching PR stats", error=str(e), pr_number=pr_number)
+            raise
+    
+    def extract_jira_tickets_from_pr(self, pr_title: str, pr_body: str) -> List[str]:
+        """Extract Jira ticket IDs from PR title and body."""
+        return extract_jira_tickets(pr_title, pr_body)
+    
+    async def aclose(self):
+        """Close the connection pool."""
+        await self.http.aclose()
+    
+    async def _get_pr_files(self, repo_owner: str, repo_name: str, pr_number: int, spool: PatchSpool) -> List[dict]:
+        """Fetch every page of the PR file list, moving each page's patches into the spool."""
+        files = []
+        page = 1
+        while True:
+            batch = await self._get_json(
+                f"/repos/{repo_owner}/{repo_name}/pulls/{pr_number}/files",
+                params={"per_page": FILES_PER_PAGE, "page": page}
+            )
+            files.extend(
+                spool.add_file({
+                    "filename": file["filename"],
+                    "status": file["status"],
+                    "additions": file["additions"],
+                    "deletions": file["deletions"],
+                    "patch": file.get("patch") or "",
+                    "changes": file["changes"],
+                })
+                for file in batch
+            )
+            if len(batch) < FILES_PER_PAGE:
+                return spool.finish(files)
+            page += 1
+    
+    async def _get_json(self, path: str, params: Optional[dict] = None):
+        with span("github.http", path=path, page=(params or {}).get("page")) as current:
+            response = await self.http.get(path, params=params)
+            current.set_attributes(status=response.status_code, response_bytes=len(response.content))
+            response.raise_for_status()
+            return response.json()
+
+
+def extract_jira_tickets(pr_title: str, pr_body: str) -> List[str]:
+    """Extract Jira ticket IDs from PR title and body."""
+    # Pattern: PROJECT-NUMBER (e.g., PROJ-123, INFRA-45)
+    pattern = r'\b([A-Z][A-Z0-9]*-\d+)\b'
+    
+    combined_text = f"{pr_title}\n{pr_body}"
+    matches = re.findall(pattern, combined_text)
+    
+    # Remove duplicates while preserving order
+    seen = set()
+    unique_tickets = []
+    for ticket in matches:
+        if ticket not in seen:
+            seen.add(ticket)
+            unique_tickets.append(ticket)
+    
+    return unique_tickets
 
 
 def create_github_client(token: Optional[str] = None) -> GitHubClient:
     """Factory function to create GitHub client."""
     return GitHubClient(token)
+
+
+def create_async_github_client(token: Optional[str] = None) -> AsyncGitHubClient:
+    """Factory function to create async GitHub client."""
+    return AsyncGitHubClient(token)
@@ -1,9 +1,26 @@
 """Jira API integration."""
 
+import asyncio
 import os
+from types import SimpleNamespace
 from typing import Optional, List, Dict
+
+import httpx
 from jira import JIRA
 from src.utils import logger
+from src.utils.ac_parser import adf_to_text, parse_acceptance_criteria
+from src.utils.metrics import timed
+from src.utils.tracing import set_attributes, span
+
+
+# Fields read by get_ticket_details; bulk searches request only these.
+TICKET_FIELDS = ["summary", "description", "status", "issuetype", "assignee", "labels", "priority"]
+
+# Keys per `key in (...)` search. Keeps each page within Jira's maxResults cap.
+BULK_CHUNK_SIZE = 50
+
+# Upper bound on JQL length so GET searches stay well under URL limits.
+MAX_JQL_LENGTH = 2000
 
 
 class JiraClient:
@@ -24,33 +41,29 @@ class JiraClient:
         )
         self._logger = logger
     
+    @timed("jira.get_ticket_details")
     def get_ticket_details(self, ticket_id: str) -> dict:
         """Get Jira ticket details including acceptance criteria."""
         try:
-            issue = self.client.issue(ticket_id)
-            
-            # Extract acceptance criteria from description
-            description = issue.fields.description or ""
-            acceptance_criteria = self._extract_ac_from_description(description)
-            
-            return {
-                "ticket_id": ticket_id,
-                "key": issue.key,
-                "summary": issue.fields.summary,
-                "description": description,
-                "status": issue.fields.status.name,
-                "type": issue.fields.issuetype.name,
-                "assignee": issue.fields.assignee.displayName if issue.fields.assignee else "Unassigned",
-                "acceptance_criteria": acceptance_criteria,
-                "labels": [label for label in issue.fields.labels],
-                "priority": issue.fields.priority.name if issue.fields.priority else "Medium",
-            }
+            issue = self.client.issue(ticket_id, fields=",".join(TICKET_FIELDS))
+            return self._issue_to_dict(issue, ticket_id)
         except Exception as e:
             self._logger.error("Error fetching Jira ticket", error=str(e), ticket_id=ticket_id)
             raise
     
-    def get_multiple_tickets(self, ticket_ids: List[str]) -> List[dict]:
-        """Get details for multiple Jira tickets."""
+    def get_multiple_tickets(self, ticket_ids: List[str], bulk: bool = True) -> List[dict]:
+        """Get details for multiple Jira tickets.
+        
+        In bulk mode all tickets are fetched with chunked JQL searches. Either
+        way, tickets that are missing or could not be fetched are logged and
+        skipped rather than raising.
+        """
+        if bulk:
+            result = self.get_tickets_bulk(ticket_ids)
+            if result["missing"]:
+                self._logger.warning("Jira tickets not found", missing=result["missing"], failed=result["failed"])
+            return result["tickets"]
+        
         results = []
         for ticket_id in ticket_ids:
             try:
@@ -62,32 +75,264 @@ class JiraClient:
         
         return results
     
-    def _extract_ac_from_description(self, description: str) -> List[str]:
+    @timed("jira.get_tickets_bulk")
+    def get_tickets_bulk(self, ticket_ids: List[str]) -> dict:
+        """Fetch tickets with `key in (...)` JQL searches.
+        
+        A chunk whose search fails is logged and its keys reported as
+        missing, so a Jira outage leaves the tickets out instead of failing
+        the caller. Issues that moved project come back under their new key;
+        when a search returns such an issue, the chunk's unanswered keys are
+        looked up one by one, which follows the move.
+        
+        Returns:
+            Dictionary with the found tickets (in request order, "ticket_id"
+            being the requested key), the requested keys Jira did not return,
+            and the subset of those whose search failed.
+        """
+        requested = list(dict.fromkeys(ticket_ids))
+        found: Dict[str, dict] = {}
+        failed: List[str] = []
+        
+        for chunk in self._chunk_ticket_ids(requested):
+            jql = f"key in ({', '.join(chunk)})"
+            try:
+                # validate_query=False makes Jira skip unknown keys instead of
+                # failing the whole search.
+                with span("jira.search", tickets=len(chunk)) as current:
+                    issues = self.client.search_issues(
+                        jql,
+                        maxResults=len(chunk),
+                        validate_query=False,
+                        fields=TICKET_FIELDS,
+                    )
+                    current.set_attribute("found", len(issues))
+            except Exception as e:
+                self._logger.error("Error in bulk Jira search", error=str(e), tickets=chunk)
+                failed.extend(chunk)
+                continue
+            
+            unanswered = match_issues(chunk, issues, found)
+            for ticket_id in unanswered:
+                try:
+                    issue = self.client.issue(ticket_id, fields=",".join(TICKET_FIELDS))
+                except Exception as e:
+                    self._logger.warning("Jira ticket not found", error=str(e), ticket_id=ticket_id)
+                    continue
+                found[ticket_id] = self._issue_to_dict(issue, ticket_id)
+        
+        return bulk_result(requested, found, failed, self._logger)
+    
+    def _chunk_ticket_ids(self, ticket_ids: List[str]) -> List[List[str]]:
+        """Split ticket IDs into chunks bounded by count and JQL length."""
+        return chunk_ticket_ids(ticket_ids)
+    
+    def _issue_to_dict(self, issue, ticket_id: str) -> dict:
+        """Convert a Jira issue into the ticket details dictionary."""
+        return issue_to_dict(issue, ticket_id)
+    
+    def _extract_ac_from_description(self, description) -> List[str]:
         """Extract acceptance criteria from Jira description."""
-        import re
+        return extract_acceptance_criteria(description)
+
+
+class AsyncJiraClient:
+    """asyncio Jira REST client for the ASGI server.
+    
+    Covers bulk ticket retrieval with the same JQL chunking and the same
+    ticket dictionaries as JiraClient. Chunks are searched concurrently.
+    """
+    
+    def __init__(self,
+                 url: Optional[str] = None,
+                 user: Optional[str] = None,
+                 token: Optional[str] = None,
+                 http_client: Optional[httpx.AsyncClient] = None):
+        """Initialize async Jira client."""
+        self.url = url or os.getenv("JIRA_URL")
+        self.user = user or os.getenv("JIRA_USER")
+        self.token = token or os.getenv("JIRA_API_TOKEN")
+        
+        if not all([self.url, self.user, self.token]):
+            raise ValueError("Jira credentials not fully set in environment")
+        
+        self.http = http_client or httpx.AsyncClient(
+            base_url=self.url,
+            auth=(self.user, self.token),
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=10),
+        )
+        self._logger = logger
+    
+    @timed("jira.get_tickets_bulk")
+    async def get_tickets_bulk(self, ticket_ids: List[str]) -> dict:
+        """Fetch tickets with `key in (...)` JQL searches.
         
-        ac_list = []
+        Failed searches and moved issues are handled as in
+        JiraClient.get_tickets_bulk.
         
-        # Look for "Acceptance Criteria" section
-        patterns = [
-            r'(?:Acceptance Criteria|AC)[\s\n:]*([^*-]*(?:[*-][^\n]*)*)',
-            r'(?:Given|When|Then)([^\n]*)',
-        ]
+        Returns:
+            Dictionary with the found tickets, missing keys and failed keys,
+            as JiraClient.get_tickets_bulk
+        """
+        requested = list(dict.fromkeys(ticket_ids))
+        chunks = chunk_ticket_ids(requested)
+        pages = await asyncio.gather(*(self._search(chunk) for chunk in chunks))
         
-        for pattern in patterns:
-            matches = re.findall(pattern, description, re.IGNORECASE | re.MULTILINE)
-            ac_list.extend(matches)
+        found: Dict[str, dict] = {}
+        failed: List[str] = []
+        unanswered: List[str] = []
+        for chunk, issues in zip(chunks, pages):
+            if issues is None:
+                failed.extend(chunk)
+            else:
+                unanswered.extend(match_issues(chunk, issues, found))
         
-        # Clean up and filter
-        cleaned_ac = []
-        for ac in ac_list:
-            ac = ac.strip().strip('*').strip('-').strip()
-            if ac and len(ac) > 10:  # Only meaningful AC
-                cleaned_ac.append(ac)
+        issues = await asyncio.gather(*(self._get_issue(ticket_id) for ticket_id in unanswered))
+        for ticket_id, issue in zip(unanswered, issues):
+            if issue is not None:
+                found[ticket_id] = issue_to_dict(issue, ticket_id)
         
-        return list(set(cleaned_ac))  # Remove duplicates
+        return bulk_result(requested, found, failed, self._logger)
+    
+    async def aclose(self):
+        """Close the connection pool."""
+        await self.http.aclose()
+    
+    async def _search(self, chunk: List[str]) -> Optional[list]:
+        """Run one `key in (...)` search, returning issues as attribute objects (None if it failed)."""
+        try:
+            with span("jira.search", tickets=len(chunk)) as current:
+                response = await self.http.post("/rest/api/2/search", json={
+                    "jql": f"key in ({', '.join(chunk)})",
+                    "maxResults": len(chunk),
+                    "fields": TICKET_FIELDS,
+                    "validateQuery": False,
+                })
+                response.raise_for_status()
+                issues = [_as_namespace(issue) for issue in response.json().get("issues", [])]
+                current.set_attribute("found", len(issues))
+                return issues
+        except Exception as e:
+            self._logger.error("Error in bulk Jira search", error=str(e), tickets=chunk)
+            return None
+    
+    async def _get_issue(self, ticket_id: str):
+        """Fetch one issue by key, following moves (None if it is not found)."""
+        try:
+            response = await self.http.get(
+                f"/rest/api/2/issue/{ticket_id}",
+                params={"fields": ",".join(TICKET_FIELDS)},
+                follow_redirects=True,
+            )
+            response.raise_for_status()
+            return _as_namespace(response.json())
+        except Exception as e:
+            self._logger.warning("Jira ticket not found", error=str(e), ticket_id=ticket_id)
+            return None
+
+
+def match_issues(chunk: List[str], issues: list, found: Dict[str, dict]) -> List[str]:
+    """Add a search's issues to `found` under the requested keys they answer.
+    
+    Returns:
+        Keys of the chunk to look up one by one: those without an issue when
+        the search also returned issues under keys that were not requested
+        (moved issues); empty otherwise, as the rest do not exist
+    """
+    requested = set(chunk)
+    moved = False
+    for issue in issues:
+        if issue.key in requested:
+            found[issue.key] = issue_to_dict(issue, issue.key)
+        else:
+            moved = True
+    return [ticket_id for ticket_id in chunk if ticket_id not in found] if moved else []
+
+
+def bulk_result(requested: List[str], found: Dict[str, dict], failed: List[str], log) -> dict:
+    """Result of a bulk fetch: found tickets in request order, missing and failed keys."""
+    tickets = [found[ticket_id] for ticket_id in requested if ticket_id in found]
+    missing = [ticket_id for ticket_id in requested if ticket_id not in found]
+    
+    set_attributes(requested=len(requested), found=len(tickets))
+    log.info("Jira tickets fetched", requested=len(requested), found=len(tickets), failed=len(failed))
+    
+    return {"tickets": tickets, "missing": missing, "failed": failed}
+
+
+def chunk_ticket_ids(ticket_ids: List[str]) -> List[List[str]]:
+    """Split ticket IDs into chunks bounded by count and JQL length."""
+    chunks = []
+    current: List[str] = []
+    length = len("key in ()")
+    
+    for ticket_id in ticket_ids:
+        extra = len(ticket_id) + 2
+        if current and (len(current) >= BULK_CHUNK_SIZE or length + extra > MAX_JQL_LENGTH):
+            chunks.append(current)
+            current = []
+            length = len("key in ()")
+        current.append(ticket_id)
+        length += extra
+    
+    if current:
+        chunks.append(current)
+    
+    return chunks
+
+
+def issue_to_dict(issue, ticket_id: str) -> dict:
+    """Convert a Jira issue into the ticket details dictionary."""
+    # Extract acceptance criteria from description; v3 APIs return it as an ADF document
+    description = issue.fields.description or ""
+    acceptance_criteria = extract_acceptance_criteria(description)
+    if not isinstance(description, str):
+        description = adf_to_text(description)
+    
+    return {
+        "ticket_id": ticket_id,
+        "key": issue.key,
+        "summary": issue.fields.summary,
+        "description": description,
+        "status": issue.fields.status.name,
+        "type": issue.fields.issuetype.name,
+        "assignee": issue.fields.assignee.displayName if issue.fields.assignee else "Unassigned",
+        "acceptance_criteria": acceptance_criteria,
+        "labels": [label for label in issue.fields.labels],
+        "priority": issue.fields.priority.name if issue.fields.priority else "Medium",
+    }
+
+
+def extract_acceptance_criteria(description) -> List[str]:
+    """Extract acceptance criteria from a Jira description, in order.
+
+    Args:
+        description: Jira wiki or Markdown text, or an ADF document
+
+    Returns:
+        Criteria from the description's acceptance criteria section and its
+        Given/When/Then lines
+    """
+    return parse_acceptance_criteria(description)
+
+
+def _as_namespace(value):
+    """Give a Jira REST JSON document the attribute access of a `jira.Issue`."""
+    if isinstance(value, dict):
+        return SimpleNamespace(**{key: _as_namespace(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return [_as_namespace(item) for item in value]
+    return value
 
 
 def create_jira_client(url: Optional[str] = None, user: Optional[str] = None, token: Optional[str] = None) -> JiraClient:
     """Factory function to create Jira client."""
     return JiraClient(url, user, token)
+
+
+def create_async_jira_client(url: Optional[str] = None,
+                             user: Optional[str] = None,
+                             token: Optional[str] = None) -> AsyncJiraClient:
+    """Factory function to create async Jira client."""
+    return AsyncJiraClient(url, user, token)
@@ -0,0 +1,96 @@
+"""Process-wide client pool reused across warm invocations."""
+
+import os
+import threading
+from typing import TYPE_CHECKING, Callable, Optional
+
+from src.utils import logger
+
+if TYPE_CHECKING:
+    from src.integrations.github import GitHubClient
+    from src.integrations.jira import JiraClient
+    from src.integrations.claude import ClaudeAnalyzer
+    from src.integrations.state_store import StateStore
+
+
+class ClientPool:
+    """Lazily constructed, thread-safe client singletons.
+
+    Each client is built on first use and then shared, so a warm Lambda
+    container keeps its HTTP connection pools (and TLS sessions) and the
+    Jira server handshake instead of redoing them per invocation. Clients
+    are built under a per-name lock, so concurrent first requests build a
+    client once without blocking construction of the others. A factory that
+    raises leaves nothing cached, so the next request retries.
+    """
+
+    def __init__(self):
+        """Initialize client pool."""
+        self._clients = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        self._logger = logger
+
+    def get(self, name: str, factory: Callable[[], object]):
+        """Return the client registered under `name`, building it with `factory` on first use."""
+        if name in self._clients:
+            return self._clients[name]
+
+        with self._lock:
+            lock = self._locks.setdefault(name, threading.Lock())
+
+        with lock:
+            if name not in self._clients:
+                self._clients[name] = factory()
+                self._logger.info("Client created", client=name)
+            return self._clients[name]
+
+    def peek(self, name: str):
+        """Return the client registered under `name` if it has been built, else None."""
+        return self._clients.get(name)
+
+    def reset(self, name: Optional[str] = None):
+        """Drop one client (or all), e.g. after rotating credentials."""
+        with self._lock:
+            if name is None:
+                self._clients.clear()
+            else:
+                self._clients.pop(name, None)
+
+    def github(self) -> "GitHubClient":
+        """Shared GitHub client."""
+        def build():
+            from src.integrations.github import create_github_client
+            return create_github_client()
+        return self.get("github", build)
+
+    def jira(self) -> Optional["JiraClient"]:
+        """Shared Jira client, or None when Jira is not configured."""
+        def build():
+            if not os.getenv("JIRA_API_TOKEN"):
+                return None
+            from src.integrations.jira import create_jira_client
+            return create_jira_client()
+        return self.get("jira", build)
+
+    def claude(self) -> "ClaudeAnalyzer":
+        """Shared Claude analyzer."""
+        def build():
+            from src.integrations.claude import create_claude_analyzer
+            return create_claude_analyzer()
+        return self.get("claude", build)
+
+    def state_store(self) -> "StateStore":
+        """Shared state store."""
+        def build():
+            from src.integrations.state_store import create_state_store
+            return create_state_store()
+        return self.get("state_store", build)
+
+
+_pool = ClientPool()
+
+
+def get_client_pool() -> ClientPool:
+    """Return the process-wide client pool."""
+    return _pool
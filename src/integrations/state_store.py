@@ -0,0 +1,263 @@
+"""Key-value state persistence for webhook processing."""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional
+
+from src.utils import logger
+from src.utils.tracing import traced
+
+
+class StateStore(ABC):
+    """Base class for JSON document stores keyed by string."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[dict]:
+        """Return the stored document or None."""
+
+    @abstractmethod
+    def put(self, key: str, value: dict) -> None:
+        """Store a document, replacing any previous value."""
+
+    @abstractmethod
+    def put_if_absent(self, key: str, value: dict, ttl_seconds: Optional[float] = None) -> bool:
+        """Atomically store a document unless a live one exists.
+
+        Returns:
+            True if the document was stored, False if the key was taken
+        """
+
+    @abstractmethod
+    def put_if_newer(self, key: str, value: dict, field: str) -> bool:
+        """Atomically store a document unless the stored one has a later `value[field]`.
+
+        Returns:
+            True if the document was stored, False if a newer one was kept
+        """
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove a document if present."""
+
+
+class MemoryStateStore(StateStore):
+    """In-process store for tests and local runs."""
+
+    def __init__(self):
+        """Initialize memory store."""
+        self._items = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return the stored document or None."""
+        with self._lock:
+            item = self._items.get(key)
+            if item is None or _expired(item[1]):
+                return None
+            return json.loads(item[0])
+
+    def put(self, key: str, value: dict) -> None:
+        """Store a document, replacing any previous value."""
+        with self._lock:
+            self._items[key] = (json.dumps(value), None)
+
+    def put_if_absent(self, key: str, value: dict, ttl_seconds: Optional[float] = None) -> bool:
+        """Atomically store a document unless a live one exists."""
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None and not _expired(item[1]):
+                return False
+            self._items[key] = (json.dumps(value), _expires_at(ttl_seconds))
+            return True
+
+    def put_if_newer(self, key: str, value: dict, field: str) -> bool:
+        """Atomically store a document unless the stored one has a later `value[field]`."""
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None and not _expired(item[1]) and _is_later(json.loads(item[0]), value, field):
+                return False
+            self._items[key] = (json.dumps(value), None)
+            return True
+
+    def delete(self, key: str) -> None:
+        """Remove a document if present."""
+        with self._lock:
+            self._items.pop(key, None)
+
+
+class LocalStateStore(StateStore):
+    """Store that keeps one JSON file per key in a directory.
+
+    Works offline and survives warm Lambda invocations when pointed at /tmp.
+    """
+
+    def __init__(self, directory: str):
+        """Initialize local store."""
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.json"
+
+    def _read(self, path: Path) -> Optional[dict]:
+        try:
+            with open(path) as f:
+                document = json.load(f)
+        except FileNotFoundError:
+            return None
+        return None if _expired(document.get("expires_at")) else document
+
+    def _write(self, path: Path, key: str, value: dict, expires_at: Optional[float] = None):
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"key": key, "value": value, "expires_at": expires_at}, f)
+        os.replace(tmp_path, path)
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return the stored document or None."""
+        with self._lock:
+            document = self._read(self._path(key))
+            return document["value"] if document else None
+
+    def put(self, key: str, value: dict) -> None:
+        """Store a document, replacing any previous value."""
+        with self._lock:
+            self._write(self._path(key), key, value)
+
+    def put_if_absent(self, key: str, value: dict, ttl_seconds: Optional[float] = None) -> bool:
+        """Atomically store a document unless a live one exists.
+
+        Atomic within a process; concurrent processes sharing a directory
+        should use a DynamoDB store instead.
+        """
+        path = self._path(key)
+        with self._lock:
+            if self._read(path) is not None:
+                return False
+            self._write(path, key, value, _expires_at(ttl_seconds))
+            return True
+
+    def put_if_newer(self, key: str, value: dict, field: str) -> bool:
+        """Atomically store a document unless the stored one has a later `value[field]`.
+
+        Atomic within a process, like put_if_absent.
+        """
+        path = self._path(key)
+        with self._lock:
+            document = self._read(path)
+            if document is not None and _is_later(document["value"], value, field):
+                return False
+            self._write(path, key, value)
+            return True
+
+    def delete(self, key: str) -> None:
+        """Remove a document if present."""
+        with self._lock:
+            self._path(key).unlink(missing_ok=True)
+
+
+class DynamoDBStateStore(StateStore):
+    """Store backed by a DynamoDB table with a string partition key `pk`."""
+
+    def __init__(self, table_name: str):
+        """Initialize DynamoDB store."""
+        import boto3
+
+        self.table = boto3.resource("dynamodb").Table(table_name)
+
+    @traced("dynamodb.get")
+    def get(self, key: str) -> Optional[dict]:
+        """Return the stored document or None."""
+        item = self.table.get_item(Key={"pk": key}, ConsistentRead=True).get("Item")
+        if not item or _expired(item.get("expires_at")):
+            return None
+        return json.loads(item["value"])
+
+    @traced("dynamodb.put")
+    def put(self, key: str, value: dict) -> None:
+        """Store a document, replacing any previous value."""
+        self.table.put_item(Item={"pk": key, "value": json.dumps(value)})
+
+    @traced("dynamodb.put_if_absent")
+    def put_if_absent(self, key: str, value: dict, ttl_seconds: Optional[float] = None) -> bool:
+        """Atomically store a document unless a live one exists.
+
+        `expires_at` doubles as the table's TTL attribute.
+        """
+        from botocore.exceptions import ClientError
+
+        item = {"pk": key, "value": json.dumps(value)}
+        expires_at = _expires_at(ttl_seconds)
+        if expires_at is not None:
+            item["expires_at"] = int(expires_at)
+
+        try:
+            self.table.put_item(
+                Item=item,
+                ConditionExpression="attribute_not_exists(pk) OR expires_at < :now",
+                ExpressionAttributeValues={":now": int(time.time())}
+            )
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") == "ConditionalCheckFailedException":
+                return False
+            raise
+
+    @traced("dynamodb.put_if_newer")
+    def put_if_newer(self, key: str, value: dict, field: str) -> bool:
+        """Atomically store a document unless the stored one has a later `value[field]`.
+
+        The field is copied to a top-level attribute so the put can be
+        conditioned on it; items without it (written by put) are replaced.
+        """
+        from botocore.exceptions import ClientError
+
+        try:
+            self.table.put_item(
+                Item={"pk": key, "value": json.dumps(value), field: value[field]},
+                ConditionExpression="attribute_not_exists(pk) OR attribute_not_exists(#field) OR #field <= :field",
+                ExpressionAttributeNames={"#field": field},
+                ExpressionAttributeValues={":field": value[field]}
+            )
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") == "ConditionalCheckFailedException":
+                return False
+            raise
+
+    @traced("dynamodb.delete")
+    def delete(self, key: str) -> None:
+        """Remove a document if present."""
+        self.table.delete_item(Key={"pk": key})
+
+
+def _expires_at(ttl_seconds: Optional[float]) -> Optional[float]:
+    return time.time() + ttl_seconds if ttl_seconds else None
+
+
+def _is_later(stored: dict, value: dict, field: str) -> bool:
+    return stored.get(field) is not None and stored[field] > value[field]
+
+
+def _expired(expires_at: Optional[float]) -> bool:
+    return expires_at is not None and float(expires_at) < time.time()
+
+
+def create_state_store() -> StateStore:
+    """Factory function to create a state store from environment settings.
+
+    STATE_TABLE_NAME - DynamoDB table to use (Lambda deployments)
+    STATE_DIR        - directory for the local JSON store (default /tmp/release-guardian-state)
+    """
+    table_name = os.getenv("STATE_TABLE_NAME")
+    if table_name:
+        logger.info("Using DynamoDB state store", table=table_name)
+        return DynamoDBStateStore(table_name)
+
+    return LocalStateStore(os.getenv("STATE_DIR", "/tmp/release-guardian-state"))
@@ -0,0 +1,115 @@
+"""Webhook deduplication and superseded-push detection."""
+
+import os
+import time
+from typing import Callable, Optional
+
+from src.integrations.state_store import StateStore
+from src.utils import logger
+
+
+# How long delivery and head SHA claims are remembered.
+DEFAULT_CLAIM_TTL_SECONDS = 24 * 3600
+
+# How long to wait for a newer push before starting an analysis.
+DEFAULT_DEBOUNCE_SECONDS = 5.0
+
+
+class WebhookGuard:
+    """Drops duplicate webhook deliveries and work for superseded pushes.
+
+    Every delivery claims its delivery ID and the PR's head SHA; a second
+    delivery for either is a duplicate. Each PR also records the newest head
+    SHA seen. After a short debounce window, and again before results are
+    posted, work for an older SHA is abandoned.
+    """
+
+    def __init__(self,
+                 store: StateStore,
+                 debounce_seconds: Optional[float] = None,
+                 claim_ttl_seconds: float = DEFAULT_CLAIM_TTL_SECONDS,
+                 sleep: Callable[[float], None] = time.sleep):
+        """Initialize webhook guard."""
+        self.store = store
+        self.debounce_seconds = debounce_seconds if debounce_seconds is not None else float(
+            os.getenv("WEBHOOK_DEBOUNCE_SECONDS", DEFAULT_DEBOUNCE_SECONDS)
+        )
+        self.claim_ttl_seconds = claim_ttl_seconds
+        self._sleep = sleep
+        self._logger = logger
+
+    def claim(self, pr_key: str, head_sha: str, delivery_id: Optional[str] = None) -> bool:
+        """
+        Claim a delivery for processing.
+
+        Returns:
+            False if the delivery ID or head SHA was already claimed
+        """
+        claim = {"pr": pr_key, "head_sha": head_sha, "claimed_at": time.time()}
+
+        if delivery_id and not self.store.put_if_absent(
+            f"delivery:{delivery_id}", claim, self.claim_ttl_seconds
+        ):
+            self._logger.info("Duplicate webhook delivery", delivery_id=delivery_id, pr=pr_key)
+            return False
+
+        if not self.store.put_if_absent(self._head_key(pr_key, head_sha), claim, self.claim_ttl_seconds):
+            self._logger.info("Head SHA already processed", head_sha=head_sha, pr=pr_key)
+            return False
+
+        return True
+
+    def release(self, pr_key: str, head_sha: str, delivery_id: Optional[str] = None):
+        """Release the delivery and head SHA claims so a redelivery can retry after a failure.
+
+        GitHub redelivers with the same delivery ID, so that claim must go too.
+        """
+        if delivery_id:
+            self.store.delete(f"delivery:{delivery_id}")
+        self.store.delete(self._head_key(pr_key, head_sha))
+
+    def mark_latest(self, pr_key: str, head_sha: str, event_time: Optional[str] = None):
+        """Record a head SHA as the newest push for a PR.
+
+        `event_time` (the PR's `updated_at`) keeps a late, older delivery
+        from overwriting a newer push. The comparison is part of the store's
+        write, so concurrent deliveries cannot interleave a read and a put.
+        """
+        self.store.put_if_newer(
+            self._latest_key(pr_key), {"head_sha": head_sha, "event_time": event_time or ""}, "event_time"
+        )
+
+    def is_superseded(self, pr_key: str, head_sha: str) -> bool:
+        """Check whether a newer push has been recorded for the PR."""
+        latest = self.store.get(self._latest_key(pr_key))
+        superseded = bool(latest) and latest["head_sha"] != head_sha
+        if superseded:
+            self._logger.info(
+                "Push superseded",
+                pr=pr_key,
+                head_sha=head_sha,
+                latest_head_sha=latest["head_sha"]
+            )
+        return superseded
+
+    def wait_for_quiet(self, pr_key: str, head_sha: str) -> bool:
+        """
+        Wait out the debounce window.
+
+        Returns:
+            True if this push is still the newest afterwards
+        """
+        if self.debounce_seconds > 0:
+            self._sleep(self.debounce_seconds)
+        return not self.is_superseded(pr_key, head_sha)
+
+    def _head_key(self, pr_key: str, head_sha: str) -> str:
+        return f"head:{pr_key}@{head_sha}"
+
+    def _latest_key(self, pr_key: str) -> str:
+        return f"latest:{pr_key}"
+
+
+def create_webhook_guard(store: StateStore) -> WebhookGuard:
+    """Factory function to create webhook guard."""
+    return WebhookGuard(store)
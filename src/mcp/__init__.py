@@ -1,5 +1,14 @@
 """MCP module."""
 
 from .server import ReleasGuardianMCPServer, main
+from .asgi import AsyncReleaseGuardianServer, create_app
+from .jobs import JobQueue, create_job_queue
 
-__all__ = ["ReleasGuardianMCPServer", "main"]
+__all__ = [
+    "ReleasGuardianMCPServer",
+    "AsyncReleaseGuardianServer",
+    "JobQueue",
+    "create_app",
+    "create_job_queue",
+    "main",
+]
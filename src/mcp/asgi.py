@@ -0,0 +1,322 @@
+"""ASGI MCP Server - asyncio variant of the Release Guardian MCP server."""
+
+import json
+import os
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple, Union
+
+from src.agents import (
+    create_planner_agent,
+    create_test_generator_agent,
+    create_risk_scorer_agent,
+    create_rollback_planner_agent,
+    create_release_analysis_pipeline,
+    fast_path_stats
+)
+from src.integrations.pool import ClientPool
+from src.mcp.responses import analysis_payload, risk_payload, rollback_payload, tests_payload
+from src.utils import AsyncSingleFlight, logger, make_cache_key, setup_logging
+from src.utils.diff_model import parse_diff
+from src.utils.metrics import CONTENT_TYPE, get_metrics_registry, record_http_request
+from src.utils.memory import memory_enabled, track_memory
+from src.utils.profiler import profiled
+
+
+# Status and a JSON payload, or a plain-text body
+Response = Tuple[int, Union[dict, str]]
+
+
+class AsyncReleaseGuardianServer:
+    """ASGI application serving the MCP server's synchronous routes.
+
+    GitHub, Jira and Claude are called through the async clients, so one
+    event loop keeps every in-flight request's upstream calls going at once
+    instead of parking a worker thread on each. Responses match the Flask
+    server. Async analysis jobs (/jobs/...) are only served by the Flask
+    server.
+
+    Clients and agents are built on first use and closed on lifespan
+    shutdown. Identical concurrent requests are coalesced as in the Flask
+    server; set MCP_COALESCE_ENABLED=false to turn that off.
+    """
+
+    def __init__(self):
+        """Initialize ASGI server."""
+        setup_logging()
+        self.clients = ClientPool()
+        self.coalesce_enabled = os.getenv("MCP_COALESCE_ENABLED", "true").lower() not in ("0", "false", "no")
+        self.inflight = AsyncSingleFlight()
+        self._routes: Dict[Tuple[str, str], Callable[[dict], Awaitable[Response]]] = {
+            ("GET", "/health"): self._health,
+            ("GET", "/metrics"): self._metrics,
+            ("POST", "/analyze-release"): self._analyze_release_impl,
+            ("POST", "/generate-tests"): self._generate_tests_impl,
+            ("POST", "/release-risk-score"): self._release_risk_score_impl,
+            ("POST", "/rollback-plan"): self._rollback_plan_impl,
+        }
+        self._logger = logger
+
+    async def __call__(self, scope: dict, receive, send):
+        """ASGI entry point."""
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        started = time.perf_counter()
+        if scope["method"] == "POST" and memory_enabled():
+            with track_memory(f"http {scope['path']}"):
+                status, payload = await self._dispatch(scope, receive)
+        else:
+            status, payload = await self._dispatch(scope, receive)
+        if isinstance(payload, str):
+            body, content_type = payload.encode(), CONTENT_TYPE.encode()
+        else:
+            body, content_type = json.dumps(payload).encode(), b"application/json"
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", content_type),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+        if (scope["method"], scope["path"]) in self._routes:
+            record_http_request(scope["path"], scope["method"], status, time.perf_counter() - started)
+
+    async def _dispatch(self, scope: dict, receive) -> Response:
+        """Route a request to its handler."""
+        method, path = scope["method"], scope["path"]
+        handler = self._routes.get((method, path))
+        if handler is None:
+            if any(route_path == path for _, route_path in self._routes):
+                return 405, {"error": "Method not allowed"}
+            return 404, {"error": "Not found"}
+
+        endpoint = path.lstrip("/")
+        try:
+            data = await _read_json(receive) if method == "POST" else {}
+            return await handler(data)
+        except Exception as e:
+            self._logger.error(f"Error in {endpoint}", error=str(e))
+            return 400, {"error": str(e)}
+
+    async def _lifespan(self, receive, send):
+        """Handle ASGI lifespan startup and shutdown."""
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.aclose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def aclose(self):
+        """Close the upstream clients' connection pools."""
+        for name in ("github", "jira", "claude"):
+            client = self.clients.peek(name)
+            if client is not None:
+                try:
+                    await client.aclose()
+                except Exception as e:
+                    self._logger.warning("Error closing client", client=name, error=str(e))
+        self.clients.reset()
+
+    def _github(self):
+        """Shared async GitHub client."""
+        from src.integrations.github import create_async_github_client
+        return self.clients.get("github", create_async_github_client)
+
+    def _jira(self):
+        """Shared async Jira client, or None when Jira is not configured."""
+        def build():
+            if not os.getenv("JIRA_API_TOKEN"):
+                return None
+            from src.integrations.jira import create_async_jira_client
+            return create_async_jira_client()
+        return self.clients.get("jira", build)
+
+    def _claude(self):
+        """Shared async Claude analyzer."""
+        from src.integrations.claude import create_async_claude_analyzer
+        return self.clients.get("claude", create_async_claude_analyzer)
+
+    def _planner(self):
+        """Shared planner agent."""
+        return self.clients.get(
+            "agent:planner",
+            lambda: create_planner_agent(self._github(), self._jira())
+        )
+
+    def _test_generator(self):
+        """Shared test generator agent."""
+        return self.clients.get(
+            "agent:test_generator",
+            lambda: create_test_generator_agent(self._claude())
+        )
+
+    def _risk_scorer(self):
+        """Shared risk scorer agent."""
+        return self.clients.get(
+            "agent:risk_scorer",
+            lambda: create_risk_scorer_agent(self._claude())
+        )
+
+    def _pipeline(self):
+        """Shared release analysis pipeline."""
+        return self.clients.get(
+            "agent:analysis_pipeline",
+            lambda: create_release_analysis_pipeline(self._planner(), self._test_generator(), self._risk_scorer())
+        )
+
+    async def _coalesced(self, endpoint: str, fn, **inputs):
+        """Await `fn()` once for identical concurrent requests to an endpoint."""
+        if not self.coalesce_enabled:
+            return await fn()
+        return await self.inflight.do(make_cache_key(endpoint=endpoint, **inputs), fn)
+
+    async def _health(self, data: dict) -> Response:
+        """Health check."""
+        return 200, {
+            "status": "ok",
+            "service": "ai-release-guardian",
+            "server": "asgi",
+            "fast_path": fast_path_stats(),
+            "coalescing": self.inflight.stats(),
+        }
+
+    async def _metrics(self, data: dict) -> Response:
+        """Metrics in the Prometheus text exposition format."""
+        return 200, get_metrics_registry().render()
+
+    async def _analyze_release_impl(self, data: dict) -> Response:
+        """Implementation of analyze-release endpoint."""
+        repo_owner = data.get("repo_owner")
+        repo_name = data.get("repo_name")
+        pr_number = data.get("pr_number")
+
+        if not all([repo_owner, repo_name, pr_number]):
+            return 400, {"error": "Missing required fields"}
+
+        # Only requests for the same push share an analysis
+        head_sha = data.get("head_sha")
+        if self.coalesce_enabled and not head_sha:
+            head_sha = (await self._github().get_pr_stats(repo_owner, repo_name, pr_number))["head_sha"]
+        result = await self._coalesced(
+            "analyze-release",
+            lambda: self._analyze_pr(repo_owner, repo_name, pr_number),
+            repo_owner=repo_owner,
+            repo_name=repo_name,
+            pr_number=pr_number,
+            head_sha=head_sha
+        )
+        return 200, result
+
+    async def _analyze_pr(self, repo_owner: str, repo_name: str, pr_number: int) -> dict:
+        """Run the full release analysis for a PR."""
+        planner = self._planner()
+        pipeline = self._pipeline()
+
+        with profiled("server.analyze_release", pr_number=pr_number, repo=f"{repo_owner}/{repo_name}"):
+            context = await planner.analyze_pr_context_async(repo_owner, repo_name, pr_number)
+            analysis = await pipeline.analyze_async(context)
+
+        return analysis_payload(pr_number, context, analysis)
+
+    async def _generate_tests_impl(self, data: dict) -> Response:
+        """Implementation of generate-tests endpoint."""
+        code_diff = data.get("code_diff")
+        acceptance_criteria = data.get("acceptance_criteria", [])
+        file_types = data.get("file_types", {})
+
+        if not code_diff:
+            return 400, {"error": "Missing code_diff"}
+
+        result = await self._coalesced(
+            "generate-tests",
+            lambda: self._test_generator().generate_tests_async(
+                code_diff,
+                acceptance_criteria,
+                file_types,
+                data.get("pr_title", "")
+            ),
+            code_diff=code_diff,
+            acceptance_criteria=acceptance_criteria,
+            file_types=file_types,
+            pr_title=data.get("pr_title", "")
+        )
+        return 200, tests_payload(result)
+
+    async def _release_risk_score_impl(self, data: dict) -> Response:
+        """Implementation of release-risk-score endpoint."""
+        changes_summary = data.get("changes_summary")
+        file_types = data.get("file_types", {})
+        total_changes = data.get("total_changes", 0)
+
+        if not changes_summary:
+            return 400, {"error": "Missing changes_summary"}
+
+        risk = await self._coalesced(
+            "release-risk-score",
+            lambda: self._risk_scorer().score_release_async(
+                changes_summary,
+                file_types,
+                total_changes,
+                data.get("risky_patterns", [])
+            ),
+            changes_summary=changes_summary,
+            file_types=file_types,
+            total_changes=total_changes,
+            risky_patterns=data.get("risky_patterns", [])
+        )
+        return 200, risk_payload(risk)
+
+    async def _rollback_plan_impl(self, data: dict) -> Response:
+        """Implementation of rollback-plan endpoint."""
+        release_id = data.get("release_id")
+
+        if not release_id:
+            return 400, {"error": "Missing release_id"}
+
+        # Local and CPU-only; no upstream calls to await
+        plan = create_rollback_planner_agent().generate_rollback_plan(
+            release_id,
+            data.get("changed_files", []),
+            data.get("file_types", {}),
+            data.get("risk_flags", []),
+            parse_diff(data["code_diff"]) if data.get("code_diff") else None
+        )
+        return 200, rollback_payload(plan)
+
+
+async def _read_json(receive) -> dict:
+    """Read a request body and decode it as JSON."""
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            break
+    body = b"".join(chunks)
+    return json.loads(body) if body else {}
+
+
+def create_app() -> AsyncReleaseGuardianServer:
+    """Factory function to create the ASGI app (e.g. `uvicorn --factory src.mcp.asgi:create_app`)."""
+    return AsyncReleaseGuardianServer()
+
+
+def main(host: str = "0.0.0.0", port: Optional[int] = None):
+    """Main entry point."""
+    import uvicorn
+
+    port = port or int(os.getenv("MCP_SERVER_PORT", 8000))
+    logger.info("Starting Release Guardian ASGI MCP Server", host=host, port=port)
+    uvicorn.run(create_app(), host=host, port=port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
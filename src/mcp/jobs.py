@@ -0,0 +1,342 @@
+"""Background job queue with priority lanes for long-running analyses."""
+
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+import requests
+
+from src.utils import logger
+
+
+# Lanes in priority order. Workers always take the highest non-empty lane,
+# except that the bulk lane may only occupy `bulk_workers` workers at once
+# and any job waiting longer than `max_wait_seconds` goes first.
+LANES = ("express", "standard", "bulk")
+
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_WAIT_SECONDS = 300.0
+DEFAULT_RESULT_TTL_SECONDS = 3600.0
+DEFAULT_SMALL_PR_CHANGES = 200
+DEFAULT_LARGE_PR_CHANGES = 2000
+DEFAULT_LARGE_PR_FILES = 100
+
+# Recent wait times kept per lane for the wait time metrics.
+WAIT_SAMPLES = 500
+
+
+class Job:
+    """A queued analysis request and its outcome."""
+
+    def __init__(self, payload: dict, lane: str, callback_url: Optional[str] = None):
+        """Initialize job."""
+        self.job_id = uuid.uuid4().hex
+        self.payload = payload
+        self.lane = lane
+        self.callback_url = callback_url
+        self.status = "queued"
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.callback_status: Optional[str] = None
+        self.created_at = time.time()
+        self.queued_at = time.monotonic()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.wait_seconds: Optional[float] = None
+        self.run_seconds: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        """Whether the job has succeeded or failed."""
+        return self.status in ("succeeded", "failed")
+
+    def to_dict(self) -> dict:
+        """Serialize job status, including the result once finished."""
+        job = {
+            "job_id": self.job_id,
+            "status": self.status,
+            "lane": self.lane,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "wait_seconds": self.wait_seconds,
+            "run_seconds": self.run_seconds,
+        }
+        if self.callback_url:
+            job["callback_status"] = self.callback_status
+        if self.status == "succeeded":
+            job["result"] = self.result
+        if self.status == "failed":
+            job["error"] = self.error
+        return job
+
+
+class JobQueue:
+    """Runs submitted jobs on a worker pool, highest priority lane first.
+
+    Worker threads start on the first submission. Finished jobs are kept for
+    `result_ttl_seconds` so callers can poll for them; callers that passed a
+    callback URL also get the final job status POSTed to it.
+    """
+
+    def __init__(self,
+                 handler: Callable[[dict], dict],
+                 workers: int = DEFAULT_WORKERS,
+                 bulk_workers: Optional[int] = None,
+                 max_wait_seconds: float = DEFAULT_MAX_WAIT_SECONDS,
+                 result_ttl_seconds: float = DEFAULT_RESULT_TTL_SECONDS,
+                 small_pr_changes: int = DEFAULT_SMALL_PR_CHANGES,
+                 large_pr_changes: int = DEFAULT_LARGE_PR_CHANGES,
+                 large_pr_files: int = DEFAULT_LARGE_PR_FILES,
+                 callback_sender: Optional[Callable[[str, dict], None]] = None):
+        """Initialize job queue."""
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.bulk_workers = bulk_workers if bulk_workers is not None else max(1, self.workers - 1)
+        self.max_wait_seconds = max_wait_seconds
+        self.result_ttl_seconds = result_ttl_seconds
+        self.small_pr_changes = small_pr_changes
+        self.large_pr_changes = large_pr_changes
+        self.large_pr_files = large_pr_files
+        self._send_callback = callback_sender or _post_callback
+        self._logger = logger
+
+        self._cond = threading.Condition()
+        self._queues: Dict[str, deque] = {lane: deque() for lane in LANES}
+        self._running: Dict[str, int] = {lane: 0 for lane in LANES}
+        self._waits: Dict[str, deque] = {lane: deque(maxlen=WAIT_SAMPLES) for lane in LANES}
+        self._jobs: Dict[str, Job] = {}
+        self._threads: List[threading.Thread] = []
+        self._shutdown = False
+        self._counters = {"submitted": 0, "succeeded": 0, "failed": 0, "callbacks_failed": 0}
+
+    def choose_lane(self,
+                    total_changes: Optional[int] = None,
+                    changed_files: Optional[int] = None,
+                    risk_hint: Optional[str] = None) -> str:
+        """
+        Pick a lane from PR size and an optional caller risk hint.
+
+        Args:
+            total_changes: Additions plus deletions, if known
+            changed_files: Number of changed files, if known
+            risk_hint: "high" (e.g. hotfixes) jumps to express, "low" goes to bulk
+
+        Returns:
+            Lane name
+        """
+        if risk_hint == "high":
+            return "express"
+        if risk_hint == "low":
+            return "bulk"
+        if (total_changes is not None and total_changes >= self.large_pr_changes) or \
+                (changed_files is not None and changed_files >= self.large_pr_files):
+            return "bulk"
+        if total_changes is not None and total_changes <= self.small_pr_changes:
+            return "express"
+        return "standard"
+
+    def submit(self, payload: dict, lane: str = "standard", callback_url: Optional[str] = None) -> Job:
+        """Queue a job and return it."""
+        if lane not in LANES:
+            raise ValueError(f"Unknown lane: {lane}")
+
+        job = Job(payload, lane, callback_url)
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("Job queue is shut down")
+            self._evict_finished()
+            self._jobs[job.job_id] = job
+            self._queues[lane].append(job)
+            self._counters["submitted"] += 1
+            self._ensure_workers()
+            self._cond.notify()
+
+        self._logger.info("Job queued", job_id=job.job_id, lane=lane, depth=len(self._queues[lane]))
+        return job
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Return a job's status, or None if unknown or expired."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job else None
+
+    def stats(self) -> dict:
+        """Queue depth, running jobs and wait times per lane."""
+        now = time.monotonic()
+        with self._cond:
+            lanes = {}
+            for lane in LANES:
+                queue = self._queues[lane]
+                waits = sorted(self._waits[lane])
+                lanes[lane] = {
+                    "depth": len(queue),
+                    "running": self._running[lane],
+                    "oldest_wait_seconds": round(now - queue[0].queued_at, 3) if queue else 0.0,
+                    "wait_seconds_avg": round(sum(waits) / len(waits), 3) if waits else 0.0,
+                    "wait_seconds_p95": round(waits[int(0.95 * (len(waits) - 1))], 3) if waits else 0.0,
+                }
+            return {
+                "workers": self.workers,
+                "depth": sum(lane["depth"] for lane in lanes.values()),
+                "running": sum(lane["running"] for lane in lanes.values()),
+                "lanes": lanes,
+                **self._counters,
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting jobs; workers exit once the queue is drained."""
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _ensure_workers(self):
+        """Start worker threads on first use. Caller holds the lock."""
+        if self._threads:
+            return
+        for idx in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{idx}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _next_job(self) -> Optional[Job]:
+        """Pop the next runnable job. Caller holds the lock."""
+        now = time.monotonic()
+        runnable = [
+            lane for lane in LANES
+            if self._queues[lane] and not (lane == "bulk" and self._running[lane] >= self.bulk_workers)
+        ]
+        if not runnable:
+            return None
+
+        oldest = max(runnable, key=lambda lane: now - self._queues[lane][0].queued_at)
+        if now - self._queues[oldest][0].queued_at >= self.max_wait_seconds:
+            return self._queues[oldest].popleft()
+        return self._queues[runnable[0]].popleft()
+
+    def _work(self):
+        """Worker loop."""
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None and not self._shutdown:
+                    self._cond.wait()
+                    job = self._next_job()
+                if job is None:
+                    return
+                self._running[job.lane] += 1
+                job.status = "running"
+                job.started_at = time.time()
+                job.wait_seconds = round(time.monotonic() - job.queued_at, 3)
+                self._waits[job.lane].append(job.wait_seconds)
+
+            try:
+                self._run(job)
+            finally:
+                with self._cond:
+                    self._running[job.lane] -= 1
+                    # A finished bulk job may unblock another bulk job
+                    self._cond.notify_all()
+
+    def _run(self, job: Job):
+        """Run one job and deliver its callback."""
+        start = time.monotonic()
+        try:
+            result = self.handler(job.payload)
+            status, error = "succeeded", None
+        except Exception as e:
+            self._logger.error("Job failed", job_id=job.job_id, error=str(e))
+            result, status, error = None, "failed", str(e)
+
+        with self._cond:
+            job.result, job.error, job.status = result, error, status
+            job.finished_at = time.time()
+            job.run_seconds = round(time.monotonic() - start, 3)
+            self._counters[status] += 1
+
+        self._logger.info(
+            "Job finished",
+            job_id=job.job_id,
+            lane=job.lane,
+            status=status,
+            wait_seconds=job.wait_seconds,
+            run_seconds=job.run_seconds
+        )
+
+        if job.callback_url:
+            try:
+                self._send_callback(job.callback_url, job.to_dict())
+                job.callback_status = "delivered"
+            except Exception as e:
+                self._logger.warning("Job callback failed", job_id=job.job_id, error=str(e))
+                job.callback_status = "failed"
+                with self._cond:
+                    self._counters["callbacks_failed"] += 1
+
+    def _evict_finished(self):
+        """Forget finished jobs past their retention. Caller holds the lock."""
+        cutoff = time.time() - self.result_ttl_seconds
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+def validate_callback_url(url: str) -> Optional[str]:
+    """
+    Check a caller-supplied callback URL.
+
+    JOB_CALLBACK_ALLOWED_HOSTS (comma-separated) restricts callbacks to those
+    hosts when set.
+
+    Returns:
+        An error message, or None if the URL is acceptable
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        return "callback_url must be an http(s) URL"
+
+    allowed = [h.strip().lower() for h in os.getenv("JOB_CALLBACK_ALLOWED_HOSTS", "").split(",") if h.strip()]
+    if allowed and parsed.hostname.lower() not in allowed:
+        return f"callback_url host not allowed: {parsed.hostname}"
+    return None
+
+
+def _post_callback(url: str, job: dict):
+    """POST the finished job to the caller's callback URL."""
+    response = requests.post(url, json=job, timeout=10)
+    response.raise_for_status()
+
+
+def create_job_queue(handler: Callable[[dict], dict]) -> JobQueue:
+    """Factory function to create a job queue from environment settings.
+
+    JOB_WORKERS             - worker threads (default 4)
+    JOB_BULK_WORKERS        - workers the bulk lane may occupy (default JOB_WORKERS - 1)
+    JOB_MAX_WAIT_SECONDS    - wait after which a job runs regardless of lane (default 300)
+    JOB_RESULT_TTL_SECONDS  - how long finished jobs can be polled (default 3600)
+    JOB_SMALL_PR_CHANGES    - PRs with at most this many changed lines use the express lane
+    JOB_LARGE_PR_CHANGES    - PRs with at least this many changed lines use the bulk lane
+    JOB_LARGE_PR_FILES      - PRs with at least this many changed files use the bulk lane
+    """
+    workers = int(os.getenv("JOB_WORKERS", DEFAULT_WORKERS))
+    bulk_workers = os.getenv("JOB_BULK_WORKERS")
+    return JobQueue(
+        handler,
+        workers=workers,
+        bulk_workers=int(bulk_workers) if bulk_workers else None,
+        max_wait_seconds=float(os.getenv("JOB_MAX_WAIT_SECONDS", DEFAULT_MAX_WAIT_SECONDS)),
+        result_ttl_seconds=float(os.getenv("JOB_RESULT_TTL_SECONDS", DEFAULT_RESULT_TTL_SECONDS)),
+        small_pr_changes=int(os.getenv("JOB_SMALL_PR_CHANGES", DEFAULT_SMALL_PR_CHANGES)),
+        large_pr_changes=int(os.getenv("JOB_LARGE_PR_CHANGES", DEFAULT_LARGE_PR_CHANGES)),
+        large_pr_files=int(os.getenv("JOB_LARGE_PR_FILES", DEFAULT_LARGE_PR_FILES)),
+    )
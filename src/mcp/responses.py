@@ -0,0 +1,63 @@
+"""Response payloads shared by the Flask and ASGI MCP servers."""
+
+from src.models.schemas import RiskAssessment, RollbackPlan
+from src.utils.patch_stream import public_file
+
+
+def analysis_payload(pr_number: int, context: dict, analysis: dict) -> dict:
+    """Body of a successful analyze-release response."""
+    pr_info = context["pr_info"]
+    test_result = analysis["test_result"]
+    risk = analysis["risk"]
+    
+    return {
+        "success": True,
+        "pr_number": pr_number,
+        "analysis": {
+            "files": [public_file(f) for f in pr_info["files"]],
+            "jira_tickets": context["jira_tickets"],
+            "acceptance_criteria": context["acceptance_criteria"],
+            "tests_generated": test_result["total_tests"],
+            "risk_score": risk.risk_score,
+            "confidence": risk.confidence_percentage,
+            "risk_flags": risk.risk_flags,
+            "risk_findings": analysis.get("risk_findings", []),
+            "requires_manual_review": risk.requires_manual_review,
+            "assessment_source": risk.assessment_source,
+        }
+    }
+
+
+def tests_payload(result: dict) -> dict:
+    """Body of a successful generate-tests response."""
+    return {
+        "success": True,
+        "integration_tests": [t.dict() for t in result["integration_tests"]],
+        "automation_tests": [t.dict() for t in result["automation_tests"]],
+        "e2e_flows": [t.dict() for t in result["e2e_flows"]],
+        "total": result["total_tests"]
+    }
+
+
+def risk_payload(risk: RiskAssessment) -> dict:
+    """Body of a successful release-risk-score response."""
+    return {
+        "success": True,
+        "risk_score": risk.risk_score,
+        "confidence_percentage": risk.confidence_percentage,
+        "risk_flags": risk.risk_flags,
+        "suggestions": risk.suggestions,
+        "requires_manual_review": risk.requires_manual_review,
+    }
+
+
+def rollback_payload(plan: RollbackPlan) -> dict:
+    """Body of a successful rollback-plan response."""
+    return {
+        "success": True,
+        "release_id": plan.release_id,
+        "steps": plan.steps,
+        "estimated_duration_minutes": plan.estimated_duration_minutes,
+        "critical_alerts": plan.critical_alerts,
+        "data_backup_required": plan.data_backup_required,
+    }
@@ -1,49 +1,121 @@
 """MCP Server - Exposes Release Guardian capabilities."""
 
+import contextlib
 import os
 import json
+import time
 from typing import Optional
-from flask import Flask, request, jsonify
-from src.integrations import (
-    create_github_client,
-    create_jira_client,
-    create_claude_analyzer
-)
+from flask import Flask, Response, g, request, jsonify
+from src.integrations import get_client_pool
 from src.agents import (
     create_planner_agent,
     create_test_generator_agent,
     create_risk_scorer_agent,
-    create_rollback_planner_agent
+    create_rollback_planner_agent,
+    create_release_analysis_pipeline,
+    fast_path_stats
 )
-from src.utils import logger, setup_logging
+from src.mcp.jobs import create_job_queue, validate_callback_url
+from src.mcp.responses import analysis_payload, risk_payload, rollback_payload, tests_payload
+from src.utils import SingleFlight, logger, make_cache_key, setup_logging
+from src.utils.diff_model import parse_diff
+from src.utils.metrics import CONTENT_TYPE, get_metrics_registry, record_http_request
+from src.utils.memory import memory_enabled, track_memory
+from src.utils.profiler import profiled
 
 
 class ReleasGuardianMCPServer:
-    """MCP server for Release Guardian."""
+    """MCP server for Release Guardian.
+    
+    Clients and agents come from the process-wide client pool, so requests
+    reuse their HTTP sessions. Identical concurrent requests (same endpoint
+    and inputs; for analyze-release the same repo, PR and head SHA) share a
+    single in-flight computation. Set MCP_COALESCE_ENABLED=false to turn
+    coalescing off.
+    """
     
     def __init__(self):
         """Initialize MCP server."""
         setup_logging()
         self.app = Flask(__name__)
+        self.clients = get_client_pool()
+        self.coalesce_enabled = os.getenv("MCP_COALESCE_ENABLED", "true").lower() not in ("0", "false", "no")
+        self.inflight = SingleFlight()
+        self.jobs = create_job_queue(self._run_analysis)
         self._setup_routes()
     
     def _setup_routes(self):
         """Setup API routes."""
         
+        @self.app.before_request
+        def start_timer():
+            g.request_started = time.perf_counter()
+            if request.method == "POST" and request.url_rule is not None and memory_enabled():
+                g.memory = contextlib.ExitStack()
+                g.memory.enter_context(track_memory(f"http {request.url_rule.rule}"))
+        
+        @self.app.teardown_request
+        def finish_memory(error):
+            memory = g.pop("memory", None)
+            if memory is not None:
+                memory.close()
+        
+        @self.app.after_request
+        def record_request(response):
+            if request.url_rule is not None and hasattr(g, "request_started"):
+                record_http_request(
+                    request.url_rule.rule,
+                    request.method,
+                    response.status_code,
+                    time.perf_counter() - g.request_started
+                )
+            return response
+        
+        @self.app.route("/metrics", methods=["GET"])
+        def metrics():
+            """Metrics in the Prometheus text exposition format."""
+            self._update_job_gauges()
+            return Response(get_metrics_registry().render(), mimetype=None, content_type=CONTENT_TYPE)
+        
         @self.app.route("/health", methods=["GET"])
         def health():
-            return jsonify({"status": "ok", "service": "ai-release-guardian"}), 200
+            return jsonify({
+                "status": "ok",
+                "service": "ai-release-guardian",
+                "fast_path": fast_path_stats(),
+                "jobs": self.jobs.stats(),
+                "coalescing": self.inflight.stats(),
+            }), 200
         
         @self.app.route("/analyze-release", methods=["POST"])
         def analyze_release():
-            """Analyze a release and generate recommendations."""
+            """Analyze a release and generate recommendations.
+            
+            Runs as a background job when the body sets "async": true or the
+            request sends "Prefer: respond-async".
+            """
             try:
                 data = request.json
+                if data.get("async") or "respond-async" in request.headers.get("Prefer", ""):
+                    return self._submit_analysis_job(data)
                 return self._analyze_release_impl(data)
             except Exception as e:
                 logger.error("Error in analyze-release", error=str(e))
                 return jsonify({"error": str(e)}), 400
         
+        @self.app.route("/jobs/metrics", methods=["GET"])
+        def job_metrics():
+            """Queue depth and wait times per lane."""
+            return jsonify(self.jobs.stats()), 200
+        
+        @self.app.route("/jobs/<job_id>", methods=["GET"])
+        def job_status(job_id):
+            """Status (and result, once finished) of an analysis job."""
+            job = self.jobs.get(job_id)
+            if job is None:
+                return jsonify({"error": "Job not found"}), 404
+            return jsonify(job), 200
+        
         @self.app.route("/generate-tests", methods=["POST"])
         def generate_tests():
             """Generate integration and automation tests."""
@@ -74,6 +146,15 @@ class ReleasGuardianMCPServer:
                 logger.error("Error in rollback-plan", error=str(e))
                 return jsonify({"error": str(e)}), 400
     
+    def _update_job_gauges(self):
+        """Copy the job queue's depth and running count per lane into gauges."""
+        registry = get_metrics_registry()
+        depth = registry.gauge("release_guardian_job_queue_depth", "Queued analysis jobs by lane")
+        running = registry.gauge("release_guardian_jobs_running", "Running analysis jobs by lane")
+        for lane, lane_stats in self.jobs.stats()["lanes"].items():
+            depth.set(lane_stats["depth"], lane=lane)
+            running.set(lane_stats["running"], lane=lane)
+    
     def _analyze_release_impl(self, data: dict) -> tuple:
         """Implementation of analyze-release endpoint."""
         repo_owner = data.get("repo_owner")
@@ -83,55 +164,119 @@ class ReleasGuardianMCPServer:
         if not all([repo_owner, repo_name, pr_number]):
             return jsonify({"error": "Missing required fields"}), 400
         
-        # Initialize clients
-        github_client = create_github_client()
-        jira_client = create_jira_client() if os.getenv("JIRA_API_TOKEN") else None
-        claude_analyzer = create_claude_analyzer()
-        
-        # Create agents
-        planner = create_planner_agent(github_client, jira_client)
-        test_gen = create_test_generator_agent(claude_analyzer)
-        risk_scorer = create_risk_scorer_agent(claude_analyzer)
-        
-        # Analyze
-        context = planner.analyze_pr_context(repo_owner, repo_name, pr_number)
-        pr_info = context["pr_info"]
-        
-        # Generate tests
-        test_result = test_gen.generate_tests(
-            "\n".join([f["patch"] for f in pr_info["files"]]),
-            context["acceptance_criteria"],
-            context["file_types"],
-            pr_info["title"]
-        )
+        return jsonify(self._run_analysis(data)), 200
+    
+    def _submit_analysis_job(self, data: dict) -> tuple:
+        """Queue an analyze-release request and return 202 with its job ID."""
+        repo_owner = data.get("repo_owner")
+        repo_name = data.get("repo_name")
+        pr_number = data.get("pr_number")
         
-        # Score risk
-        risky_patterns = planner.extract_risky_patterns(
-            "\n".join([f["patch"] for f in pr_info["files"]]),
-            context["file_types"]
-        )
+        if not all([repo_owner, repo_name, pr_number]):
+            return jsonify({"error": "Missing required fields"}), 400
         
-        risk = risk_scorer.score_release(
-            pr_info["title"],
-            context["file_types"],
-            context["total_changes"],
-            risky_patterns
-        )
+        callback_url = data.get("callback_url")
+        if callback_url:
+            error = validate_callback_url(callback_url)
+            if error:
+                return jsonify({"error": error}), 400
+        
+        lane = self._choose_lane(data)
+        job = self.jobs.submit(data, lane=lane, callback_url=callback_url)
+        status_url = f"/jobs/{job.job_id}"
         
         return jsonify({
             "success": True,
-            "pr_number": pr_number,
-            "analysis": {
-                "files": pr_info["files"],
-                "jira_tickets": context["jira_tickets"],
-                "acceptance_criteria": context["acceptance_criteria"],
-                "tests_generated": test_result["total_tests"],
-                "risk_score": risk.risk_score,
-                "confidence": risk.confidence_percentage,
-                "risk_flags": risk.risk_flags,
-                "requires_manual_review": risk.requires_manual_review,
-            }
-        }), 200
+            "job_id": job.job_id,
+            "status": job.status,
+            "lane": lane,
+            "status_url": status_url,
+        }), 202, {"Location": status_url}
+    
+    def _choose_lane(self, data: dict) -> str:
+        """Pick a job lane from caller hints, fetching PR size if none were given."""
+        total_changes = data.get("total_changes")
+        changed_files = data.get("changed_files")
+        
+        if total_changes is None and changed_files is None:
+            try:
+                stats = self.clients.github().get_pr_stats(
+                    data["repo_owner"], data["repo_name"], data["pr_number"]
+                )
+                total_changes = stats["additions"] + stats["deletions"]
+                changed_files = stats["changed_files"]
+            except Exception as e:
+                logger.warning("Could not size PR for job lane", error=str(e))
+        
+        return self.jobs.choose_lane(total_changes, changed_files, data.get("risk_hint"))
+    
+    def _coalesced(self, endpoint: str, fn, **inputs):
+        """Run `fn` once for identical concurrent requests to an endpoint."""
+        if not self.coalesce_enabled:
+            return fn()
+        return self.inflight.do(make_cache_key(endpoint=endpoint, **inputs), fn)
+    
+    def _planner(self):
+        """Shared planner agent."""
+        return self.clients.get(
+            "agent:planner",
+            lambda: create_planner_agent(self.clients.github(), self.clients.jira())
+        )
+    
+    def _test_generator(self):
+        """Shared test generator agent."""
+        return self.clients.get(
+            "agent:test_generator",
+            lambda: create_test_generator_agent(self.clients.claude())
+        )
+    
+    def _risk_scorer(self):
+        """Shared risk scorer agent."""
+        return self.clients.get(
+            "agent:risk_scorer",
+            lambda: create_risk_scorer_agent(self.clients.claude())
+        )
+    
+    def _pipeline(self):
+        """Shared release analysis pipeline."""
+        return self.clients.get(
+            "agent:analysis_pipeline",
+            lambda: create_release_analysis_pipeline(self._planner(), self._test_generator(), self._risk_scorer())
+        )
+    
+    def _run_analysis(self, data: dict) -> dict:
+        """Run the full release analysis for a PR, coalescing identical in-flight requests.
+        
+        Requests join an in-flight analysis only for the same head SHA, which
+        is looked up when the caller does not send it, so a request made
+        after a new push starts a new analysis.
+        """
+        repo_owner, repo_name, pr_number = data["repo_owner"], data["repo_name"], data["pr_number"]
+        head_sha = data.get("head_sha")
+        if self.coalesce_enabled and not head_sha:
+            head_sha = self.clients.github().get_pr_stats(repo_owner, repo_name, pr_number)["head_sha"]
+        return self._coalesced(
+            "analyze-release",
+            lambda: self._analyze_pr(repo_owner, repo_name, pr_number),
+            repo_owner=repo_owner,
+            repo_name=repo_name,
+            pr_number=pr_number,
+            head_sha=head_sha
+        )
+    
+    def _analyze_pr(self, repo_owner: str, repo_name: str, pr_number: int) -> dict:
+        """Run the full release analysis for a PR."""
+        planner = self._planner()
+        pipeline = self._pipeline()
+        
+        with profiled("server.analyze_release", pr_number=pr_number, repo=f"{repo_owner}/{repo_name}"):
+            # Analyze
+            context = planner.analyze_pr_context(repo_owner, repo_name, pr_number)
+            
+            # Generate tests and score risk concurrently
+            analysis = pipeline.analyze(context)
+        
+        return analysis_payload(pr_number, context, analysis)
     
     def _generate_tests_impl(self, data: dict) -> tuple:
         """Implementation of generate-tests endpoint."""
@@ -142,23 +287,21 @@ class ReleasGuardianMCPServer:
         if not code_diff:
             return jsonify({"error": "Missing code_diff"}), 400
         
-        claude_analyzer = create_claude_analyzer()
-        test_gen = create_test_generator_agent(claude_analyzer)
-        
-        result = test_gen.generate_tests(
-            code_diff,
-            acceptance_criteria,
-            file_types,
-            data.get("pr_title", "")
+        result = self._coalesced(
+            "generate-tests",
+            lambda: self._test_generator().generate_tests(
+                code_diff,
+                acceptance_criteria,
+                file_types,
+                data.get("pr_title", "")
+            ),
+            code_diff=code_diff,
+            acceptance_criteria=acceptance_criteria,
+            file_types=file_types,
+            pr_title=data.get("pr_title", "")
         )
         
-        return jsonify({
-            "success": True,
-            "integration_tests": [t.dict() for t in result["integration_tests"]],
-            "automation_tests": [t.dict() for t in result["automation_tests"]],
-            "e2e_flows": [t.dict() for t in result["e2e_flows"]],
-            "total": result["total_tests"]
-        }), 200
+        return jsonify(tests_payload(result)), 200
     
     def _release_risk_score_impl(self, data: dict) -> tuple:
         """Implementation of release-risk-score endpoint."""
@@ -169,24 +312,21 @@ class ReleasGuardianMCPServer:
         if not changes_summary:
             return jsonify({"error": "Missing changes_summary"}), 400
         
-        claude_analyzer = create_claude_analyzer()
-        risk_scorer = create_risk_scorer_agent(claude_analyzer)
-        
-        risk = risk_scorer.score_release(
-            changes_summary,
-            file_types,
-            total_changes,
-            data.get("risky_patterns", [])
+        risk = self._coalesced(
+            "release-risk-score",
+            lambda: self._risk_scorer().score_release(
+                changes_summary,
+                file_types,
+                total_changes,
+                data.get("risky_patterns", [])
+            ),
+            changes_summary=changes_summary,
+            file_types=file_types,
+            total_changes=total_changes,
+            risky_patterns=data.get("risky_patterns", [])
         )
         
-        return jsonify({
-            "success": True,
-            "risk_score": risk.risk_score,
-            "confidence_percentage": risk.confidence_percentage,
-            "risk_flags": risk.risk_flags,
-            "suggestions": risk.suggestions,
-            "requires_manual_review": risk.requires_manual_review,
-        }), 200
+        return jsonify(risk_payload(risk)), 200
     
     def _rollback_plan_impl(self, data: dict) -> tuple:
         """Implementation of rollback-plan endpoint."""
@@ -203,17 +343,11 @@ class ReleasGuardianMCPServer:
             release_id,
             changed_files,
             file_types,
-            data.get("risk_flags", [])
+            data.get("risk_flags", []),
+            parse_diff(data["code_diff"]) if data.get("code_diff") else None
         )
         
-        return jsonify({
-            "success": True,
-            "release_id": plan.release_id,
-            "steps": plan.steps,
-            "estimated_duration_minutes": plan.estimated_duration_minutes,
-            "critical_alerts": plan.critical_alerts,
-            "data_backup_required": plan.data_backup_required,
-        }), 200
+        return jsonify(rollback_payload(plan)), 200
     
     def run(self, host: str = "0.0.0.0", port: int = 8000, debug: bool = False):
         """Run the MCP server."""
@@ -25,6 +25,7 @@ class RiskAssessment(BaseModel):
     risk_flags: List[str] = Field(default=[], description="Detected risks")
     suggestions: List[str] = Field(default=[], description="Mitigation suggestions")
     requires_manual_review: bool = Field(default=False, description="Requires QA review")
+    assessment_source: str = Field(default="llm", description="llm or heuristic")
 
 
 class PRAnalysis(BaseModel):
@@ -0,0 +1,66 @@
+"""pytest plugin registering the `ac` marker and exporting the collected markers.
+
+Tests declare the acceptance criteria they cover:
+
+    @pytest.mark.ac("PROJ-123", "AC-2")
+    def test_export_as_csv(): ...
+
+Markers on classes and modules (`pytestmark`) apply to their tests, and a
+test may carry several. Run with
+`-p release_guardian_ac --ac-markers-file=PATH` (this directory on the
+path), the plugin writes the markers of every collected test to PATH as
+{node id: [{"issue", "criterion"}]}.
+
+The plugin runs inside the tested repository's pytest session, so it is a
+top-level module with no imports from this project: a `src` package of
+the tested repository must not be shadowed by this one.
+"""
+
+import json
+from typing import Dict, List
+
+import pytest
+
+MARKER = "ac"
+
+
+def pytest_addoption(parser):
+    """Add --ac-markers-file."""
+    parser.getgroup("ac markers").addoption(
+        "--ac-markers-file", default=None, help="write the ac markers of the collected tests to this JSON file"
+    )
+
+
+def pytest_configure(config):
+    """Register the ac marker."""
+    config.addinivalue_line(
+        "markers", "ac(issue_key, criterion_id): acceptance criterion of a Jira issue this test covers"
+    )
+
+
+def pytest_collection_finish(session):
+    """Write the markers of the collected tests when --ac-markers-file is given."""
+    path = session.config.getoption("ac_markers_file")
+    if not path:
+        return
+    markers = {}
+    for item in session.items:
+        found = item_markers(item)
+        if found:
+            markers[item.nodeid] = found
+    with open(path, "w") as f:
+        json.dump(markers, f)
+
+
+def item_markers(item) -> List[Dict[str, str]]:
+    """The ac markers of a collected test, closest first; malformed ones are skipped with a warning."""
+    found = []
+    for mark in item.iter_markers(name=MARKER):
+        if len(mark.args) != 2:
+            item.warn(pytest.PytestWarning(
+                f"ignoring ac marker {mark.args!r}: expected @pytest.mark.ac(issue_key, criterion_id)"
+            ))
+            continue
+        issue, criterion = mark.args
+        found.append({"issue": str(issue), "criterion": str(criterion)})
+    return found
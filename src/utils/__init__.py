@@ -1,5 +1,28 @@
 """Utility modules."""
 
 from .logger import logger, setup_logging
+from .cache import ResponseCache, create_response_cache, get_shared_response_cache, make_cache_key
+from .singleflight import AsyncSingleFlight, SingleFlight
+from .metrics import MetricsRegistry, get_metrics_registry, timed
+from .tracing import configure_tracing, current_span, span, traced
+from .profiler import SamplingProfiler, profiled
 
-__all__ = ["logger", "setup_logging"]
+__all__ = [
+    "logger",
+    "setup_logging",
+    "ResponseCache",
+    "create_response_cache",
+    "get_shared_response_cache",
+    "make_cache_key",
+    "SingleFlight",
+    "AsyncSingleFlight",
+    "MetricsRegistry",
+    "get_metrics_registry",
+    "timed",
+    "span",
+    "traced",
+    "current_span",
+    "configure_tracing",
+    "SamplingProfiler",
+    "profiled",
+]
@@ -0,0 +1,98 @@
+"""Joining the `ac` markers of tests to Jira acceptance criteria.
+
+Tests declare the criteria they cover with `@pytest.mark.ac("PROJ-123",
+"AC-2")`. The criterion id is the criterion's 1-based position in the
+ticket's acceptance criteria ("2", "AC-2", "ac 2") or its text (case and
+spacing ignored). The marker is registered by the standalone pytest plugin
+in src/pytest_plugins/release_guardian_ac.py, which writes the markers of
+the collected tests to a file; TestExecutionAgent attaches them to the
+test results as their "ac" list.
+
+TestValidationAgent joins those lists to the Jira criteria here, with one
+dict lookup per marker; only tests without markers are matched by name.
+"""
+
+import re
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from src.utils.ac_matcher import to_mask
+
+# "3", "AC-3", "ac 3", "#3": the third criterion of the ticket
+_NUMBERED = re.compile(r"(?:ac|#)?[\s#_-]*(\d+)")
+
+
+class MarkerCoverage(NamedTuple):
+    """Coverage of acceptance criteria by the tests' ac markers."""
+    masks: List[int]
+    unmarked: List[int]
+    unknown: List[str]
+
+
+def criterion_key(criterion) -> str:
+    """Join key of a criterion id: its number, or its lowercased text with single spaces."""
+    text = " ".join(str(criterion).lower().split())
+    numbered = _NUMBERED.fullmatch(text)
+    return str(int(numbered.group(1))) if numbered else text
+
+
+def criterion_index(acceptance_criteria: Sequence[str],
+                    issue_criteria: Optional[Dict[str, Sequence[str]]] = None) -> Dict[Tuple[Optional[str], str], List[int]]:
+    """Positions in `acceptance_criteria` by (issue key, criterion key).
+
+    Args:
+        acceptance_criteria: Criteria being validated
+        issue_criteria: Each Jira issue's criteria in ticket order, which
+            numbers them; without it the issue of a marker is ignored and
+            numbers are positions in `acceptance_criteria`
+    """
+    positions: Dict[str, List[int]] = {}
+    for position, ac in enumerate(acceptance_criteria):
+        positions.setdefault(ac, []).append(position)
+
+    sources = {None: acceptance_criteria} if issue_criteria is None else issue_criteria
+    index: Dict[Tuple[Optional[str], str], List[int]] = {}
+    for issue, criteria in sources.items():
+        issue = issue.strip().upper() if issue is not None else None
+        for number, ac in enumerate(criteria, 1):
+            found = positions.get(ac)
+            if found:
+                index.setdefault((issue, str(number)), found)
+                index.setdefault((issue, criterion_key(ac)), found)
+    return index
+
+
+def trace_markers(tests: Sequence[dict],
+                  acceptance_criteria: Sequence[str],
+                  issue_criteria: Optional[Dict[str, Sequence[str]]] = None) -> MarkerCoverage:
+    """Join the tests' ac markers to the criteria.
+
+    Args:
+        tests: Test result dictionaries, with an "ac" list when marked
+        acceptance_criteria: Criteria being validated
+        issue_criteria: Each Jira issue's criteria in ticket order (see criterion_index)
+
+    Returns:
+        Bitmask of the tests marked with each criterion, positions of the
+        tests without markers, and markers of the validated issues naming
+        no criterion
+    """
+    index = criterion_index(acceptance_criteria, issue_criteria)
+    issues = {issue for issue, _ in index}
+    covering: List[List[int]] = [[] for _ in acceptance_criteria]
+    unmarked = []
+    unknown = []
+    for position, test in enumerate(tests):
+        markers = test.get("ac")
+        if not markers:
+            unmarked.append(position)
+            continue
+        for marker in markers:
+            issue = marker["issue"].strip().upper() if issue_criteria is not None else None
+            found = index.get((issue, criterion_key(marker["criterion"])))
+            if found is not None:
+                for ac in found:
+                    covering[ac].append(position)
+            elif issue in issues:
+                unknown.append(f"{marker['issue']} {marker['criterion']} ({test['name']})")
+    masks = [to_mask(positions, len(tests)) if positions else 0 for positions in covering]
+    return MarkerCoverage(masks, unmarked, unknown)
@@ -0,0 +1,165 @@
+"""Inverted index matching acceptance criteria to test names.
+
+A test matches a criterion when at least two of the criterion's words
+longer than three characters occur in the test's lowercased name, or the
+whole lowercased criterion does. Words match anywhere in the name, so
+"login" matches "test_user_login_works" and "relogin".
+
+Test names are lowercased and split into alphanumeric tokens once. A
+criterion word of letters and digits can only occur inside one token, so
+the tests containing it are the postings of the tokens containing it,
+found with one search of the joined token vocabulary. Words with
+punctuation are looked up by their longest alphanumeric run and checked
+against the candidate names.
+
+Matches are bitmasks over the tests (bit i set when test i matches), so
+combining a criterion's words is a few big-integer operations, and
+counting matches is `mask.bit_count()`. Masks per word and per criterion
+are memoized, so repeated criteria and words shared between criteria are
+looked up once.
+"""
+
+import itertools
+import re
+from bisect import bisect_right
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+# Criterion words of this length or less are ignored
+MAX_IGNORED_WORD_LENGTH = 3
+
+_TOKEN = re.compile(r"[^\W_]+")
+
+
+def _joined(parts: Sequence[str]) -> Tuple[str, List[int]]:
+    """Parts joined by newlines, and the offset each part starts at."""
+    starts = []
+    offset = 0
+    for part in parts:
+        starts.append(offset)
+        offset += len(part) + 1
+    return "\n".join(parts), starts
+
+
+def _find_parts(haystack: str, starts: List[int], needle: str) -> List[int]:
+    """Indices of the joined parts containing `needle`, which has no newline."""
+    found = []
+    position = haystack.find(needle)
+    while position != -1:
+        part = bisect_right(starts, position) - 1
+        found.append(part)
+        following = part + 1
+        if following == len(starts):
+            break
+        position = haystack.find(needle, starts[following])
+    return found
+
+
+def to_mask(indices: Iterable[int], size: int) -> int:
+    """Bitmask with the given bits, all below `size`, set."""
+    bits = bytearray((size + 7) // 8)
+    for index in indices:
+        bits[index >> 3] |= 1 << (index & 7)
+    return int.from_bytes(bits, "little")
+
+
+def mask_indices(mask: int) -> List[int]:
+    """Positions of the set bits of a mask, in increasing order."""
+    bits = bin(mask)[:1:-1]
+    found = []
+    position = bits.find("1")
+    while position != -1:
+        found.append(position)
+        position = bits.find("1", position + 1)
+    return found
+
+
+class ACMatcher:
+    """Matches acceptance criteria against a fixed list of test names."""
+
+    def __init__(self, test_names: Sequence[str]):
+        """Tokenize every test name once.
+
+        Args:
+            test_names: Test names; bit i of a match is the i-th name
+        """
+        self.names = [name.lower() for name in test_names]
+
+        postings: Dict[str, List[int]] = defaultdict(list)
+        tokenize = _TOKEN.findall
+        for index, name in enumerate(self.names):
+            for token in set(tokenize(name)):
+                postings[token].append(index)
+        self._postings = dict(postings)
+        self._tokens = list(postings)
+        self._vocabulary, self._token_starts = _joined(self._tokens)
+
+        # All names joined and the characters in them, built for the first
+        # criterion that can match as a whole or word without letters
+        self._text: Optional[Tuple[str, List[int]]] = None
+        self._characters: Set[str] = set()
+
+        self._word_masks: Dict[str, int] = {}
+        self._criterion_masks: Dict[str, int] = {}
+
+    def match(self, criterion: str) -> int:
+        """Bitmask of the tests matching a criterion."""
+        key = criterion.lower()
+        cached = self._criterion_masks.get(key)
+        if cached is not None:
+            return cached
+
+        words = Counter(word for word in key.split() if len(word) > MAX_IGNORED_WORD_LENGTH)
+        seen = 0
+        matched = 0
+        for word, count in words.items():
+            tests = self._word_mask(word)
+            # Tests reaching a second word (or a repeated one) match
+            matched |= tests if count > 1 else tests & seen
+            seen |= tests
+        # A name containing the whole criterion contains each of its words,
+        # so only criteria with fewer than two words need the full check
+        if sum(words.values()) < 2:
+            matched |= to_mask(self._containing(key), len(self.names))
+
+        self._criterion_masks[key] = matched
+        return matched
+
+    def match_all(self, criteria: Sequence[str]) -> List[int]:
+        """Bitmask of the tests matching each criterion."""
+        return [self.match(criterion) for criterion in criteria]
+
+    def _word_mask(self, word: str) -> int:
+        """Bitmask of the tests whose name contains a criterion word."""
+        cached = self._word_masks.get(word)
+        if cached is not None:
+            return cached
+
+        runs = _TOKEN.findall(word)
+        if not runs:
+            tests: Iterable[int] = self._containing(word)
+        else:
+            longest = max(runs, key=len)
+            postings, tokens = self._postings, self._tokens
+            tests = itertools.chain.from_iterable(
+                postings[tokens[part]] for part in _find_parts(self._vocabulary, self._token_starts, longest)
+            )
+            if longest != word:
+                names = self.names
+                tests = [index for index in set(tests) if word in names[index]]
+
+        mask = self._word_masks[word] = to_mask(tests, len(self.names))
+        return mask
+
+    def _containing(self, text: str) -> List[int]:
+        """Tests whose name contains `text`, by searching all names at once."""
+        if not text:
+            return list(range(len(self.names)))
+        if self._text is None:
+            self._text = _joined(self.names)
+            self._characters = set(self._text[0])
+        if not set(text) <= self._characters:
+            return []
+        if "\n" in text:
+            return [index for index, name in enumerate(self.names) if text in name]
+        return _find_parts(*self._text, text)
@@ -0,0 +1,341 @@
+"""Line-oriented extraction of acceptance criteria from ticket descriptions.
+
+Descriptions arrive as Jira wiki markup, Markdown, or Atlassian Document
+Format (ADF) documents from the v3 REST API and webhooks; ADF is first
+flattened to Markdown-style lines. The parser then reads the text once, a
+line at a time, with a small state machine:
+
+- a heading, bold line or "Label:" line titled "Acceptance Criteria" (or
+  "AC") opens the criteria section; text after the title on the same line
+  is a criterion, and then only the list items following it are, up to
+  the first paragraph line
+- inside the section every bullet, numbered item, checkbox, table row and
+  paragraph line is a criterion, until the next heading, known section
+  label ("Notes:", "Out of scope:"), in plain text or bold, or horizontal
+  rule; other bold labels ("**Important:**") are criteria text
+- inline emphasis markup ("*", "**") is removed from criteria
+- anywhere in the description, Given/When/Then lines (and And/But lines
+  continuing them) are criteria
+- code blocks ({code}, {noformat}, ``` fences) are skipped
+
+Each line is looked at a constant number of times, so extraction is
+linear in the description's length. Criteria keep their order and
+duplicates are dropped.
+"""
+
+import re
+from typing import Iterable, List, Optional
+
+# Section titles that open the criteria section, lowercased
+AC_TITLES = frozenset({
+    "acceptance criteria", "acceptance criterion", "acceptance criterias", "ac", "acs", "a/c",
+})
+
+# Label lines ("Notes:") that close the criteria section; other lines ending
+# in a colon inside the section are criteria introducing sub-items
+SECTION_TITLES = frozenset({
+    "description", "summary", "background", "context", "user story", "story", "notes", "technical notes",
+    "implementation notes", "testing notes", "qa notes", "out of scope", "non-goals", "definition of done",
+    "dod", "dependencies", "assumptions", "risks", "open questions", "questions", "design", "links",
+    "resources", "attachments", "steps to reproduce", "expected result", "actual result", "environment",
+})
+
+GHERKIN_KEYWORDS = ("given", "when", "then")
+GHERKIN_CONTINUATIONS = ("and", "but")
+
+# Criteria shorter than this are dropped as noise
+MIN_CRITERION_LENGTH = 10
+
+BULLET_CHARS = "*-+#•"
+
+# Deepest indentation adf_to_text writes, so deeply nested lists stay linear
+MAX_ADF_INDENT = 16
+CHECKBOXES = ("[ ]", "[x]", "[X]", "(/)", "(x)", "(-)", "(?)", "(on)", "(off)")
+
+# Emphasis asterisks: "**" anywhere, "*" at the start or end of a word
+_EMPHASIS = re.compile(r"\*\*|(?<!\S)\*(?=\S)|(?<=\S)\*(?!\S)")
+
+
+def parse_acceptance_criteria(description) -> List[str]:
+    """Acceptance criteria of a description, in order and without duplicates.
+
+    Args:
+        description: Jira wiki or Markdown text, or an ADF document (as a
+            dictionary or an attribute object)
+    """
+    if description is None:
+        return []
+    if not isinstance(description, str):
+        description = adf_to_text(description)
+
+    criteria: List[str] = []
+    in_section = False
+    # After "AC: first criterion", only list items continue the section
+    items_only = False
+    gherkin = False
+    fence: Optional[str] = None
+
+    for raw in description.splitlines():
+        line = raw.strip()
+
+        # Code blocks: skip until the closing marker
+        if fence is not None:
+            if line.startswith(fence):
+                fence = None
+            continue
+        opening = _code_fence(line)
+        if opening is not None:
+            fence = opening
+            continue
+
+        if not line:
+            gherkin = False
+            continue
+
+        title, rest = _section_title(line)
+        if title is not None:
+            in_section = title in AC_TITLES
+            items_only = bool(rest)
+            gherkin = False
+            if in_section and rest:
+                criteria.append(rest)
+            continue
+        if _is_rule(line):
+            in_section = gherkin = False
+            continue
+
+        text = _item_text(line)
+        if not text:
+            continue
+        keyword = _first_word(text)
+        if keyword in GHERKIN_KEYWORDS:
+            gherkin = True
+            criteria.append(text)
+        elif gherkin and keyword in GHERKIN_CONTINUATIONS:
+            criteria.append(text)
+        elif in_section:
+            gherkin = False
+            if items_only and not _is_item(line):
+                in_section = False
+            else:
+                criteria.append(text)
+
+    return list(dict.fromkeys(
+        criterion for criterion in map(_plain, criteria) if len(criterion) > MIN_CRITERION_LENGTH
+    ))
+
+
+def _code_fence(line: str) -> Optional[str]:
+    """Closing marker of a code block opened by this line, else None."""
+    first = line[:1]
+    if first == "`" or first == "~":
+        return line[:3] if line.startswith("```") or line.startswith("~~~") else None
+    if first != "{":
+        return None
+    lowered = line[:10].lower()
+    if lowered.startswith("{code") or lowered.startswith("{noformat"):
+        marker = "{code" if lowered.startswith("{code") else "{noformat"
+        # A block opened and closed on the same line needs no skipping
+        if line.lower().count(marker) > 1:
+            return None
+        return marker + "}" if marker == "{noformat" else "{code}"
+    return None
+
+
+def _section_title(line: str):
+    """(lowercased title, text after it) if the line is a heading or label, else (None, None).
+
+    Headings are Jira "h1." to "h6.", Markdown "#" headings (two or more
+    "#", or one followed by a criteria title, since a single "#" is a Jira
+    numbered item) and lines that are entirely bold. Labels are "Title:"
+    lines with a criteria or known section title; bold lines and labels
+    count only with those titles too.
+    """
+    text = None
+    if len(line) > 3 and line[0] in "hH" and line[1] in "123456" and line[2] == ".":
+        text = line[3:]
+    elif line.startswith("#"):
+        hashes = len(line) - len(line.lstrip("#"))
+        candidate = line[hashes:]
+        if candidate[:1] == " " and (hashes > 1 or _title_of(candidate) in AC_TITLES):
+            text = candidate
+    elif line[0] in "*_" and len(line) > 2:
+        # *Acceptance Criteria*, **Acceptance Criteria:**, *AC:* rest
+        marker = "**" if line.startswith("**") else line[0]
+        end = line.find(marker, len(marker))
+        if end > len(marker) and line[len(marker)] != " ":
+            inner = line[len(marker):end]
+            after = line[end + len(marker):].strip()
+            if not after or inner.rstrip().endswith(":") or after.startswith(":"):
+                title = _title_of(inner)
+                if title in AC_TITLES or title in SECTION_TITLES:
+                    return title, _rest(after)
+                return None, None
+
+    if text is not None:
+        title = _title_of(text)
+        colon = text.find(":")
+        if colon != -1 and _title_of(text[:colon]) in AC_TITLES:
+            return _title_of(text[:colon]), _rest(text[colon + 1:])
+        return title, ""
+
+    # Label lines: "Acceptance Criteria:", "AC: user can log in", "Notes:"
+    colon = line.find(":")
+    if colon > 0 and line[0] not in BULLET_CHARS:
+        label = _title_of(line[:colon])
+        if label in AC_TITLES:
+            return label, _rest(line[colon + 1:])
+        if label in SECTION_TITLES:
+            return label, ""
+    return None, None
+
+
+def _title_of(text: str) -> str:
+    """Lowercased title text without markup and a trailing colon."""
+    return text.strip().strip("*_").strip().rstrip(":").strip().strip("*_").strip().lower()
+
+
+def _rest(text: str) -> str:
+    return _item_text(text.strip().lstrip(":").strip()) if text else ""
+
+
+def _is_rule(line: str) -> bool:
+    """Horizontal rule: "----" in Jira, "---", "***" or "___" in Markdown."""
+    return len(line) >= 3 and line[0] in "-*_" and line == line[0] * len(line)
+
+
+def _item_text(line: str) -> str:
+    """Text of a bullet, numbered item, checkbox, table row or paragraph line."""
+    first = line[:1]
+    if not first:
+        return ""
+    if first == "|":
+        cells = [cell.strip() for cell in line.strip("|").split("|")]
+        if line.startswith("||"):
+            return ""  # Jira table header row
+        if all(not cell or set(cell) <= set("-: ") for cell in cells):
+            return ""  # Markdown table separator
+        return " - ".join(cell for cell in cells if cell)
+
+    # Bullets, possibly nested (Jira "**", "#*") and numbered items ("1.", "2)")
+    if first in BULLET_CHARS:
+        rest = line.lstrip(BULLET_CHARS)
+        if rest[:1] in ("", " "):
+            line = rest.lstrip()
+    elif first.isdigit():
+        rest = line.lstrip("0123456789")
+        if rest[:1] in (".", ")") and rest[1:2] == " ":
+            line = rest[2:].lstrip()
+
+    if line[:1] in ("[", "(") and line.startswith(CHECKBOXES):
+        line = line[line.index("]" if line[0] == "[" else ")") + 1:].lstrip()
+
+    return line.strip().strip("*").strip("-").strip()
+
+
+def _plain(text: str) -> str:
+    """Criterion text without emphasis markup."""
+    return _EMPHASIS.sub("", text).strip() if "*" in text else text
+
+
+def _is_item(line: str) -> bool:
+    """Whether a line is a bullet, numbered item, checkbox or table row."""
+    first = line[:1]
+    if first == "|":
+        return True
+    if first in BULLET_CHARS:
+        return line.lstrip(BULLET_CHARS)[:1] in ("", " ")
+    if first.isdigit():
+        rest = line.lstrip("0123456789")
+        return rest[:1] in (".", ")") and rest[1:2] == " "
+    return line.startswith(CHECKBOXES)
+
+
+def _first_word(text: str) -> str:
+    """Lowercased leading word, read no further than needed to tell the Gherkin keywords apart."""
+    head = text[:6].lower()
+    end = 0
+    while end < len(head) and head[end].isalpha():
+        end += 1
+    return head[:end]
+
+
+def adf_to_text(document) -> str:
+    """Flatten an ADF document into Markdown-style lines.
+
+    Headings become "#" lines, list items "-" or "1." lines indented by
+    depth (up to MAX_ADF_INDENT), task items "- [ ]" lines, table rows "|" lines and code blocks
+    ``` fences, so the line parser reads ADF like the other formats. Nodes
+    are walked with an explicit stack, so deeply nested documents cannot
+    exhaust the recursion limit.
+    """
+    lines: List[str] = []
+    # (node, prefix of the line the node's text goes on)
+    stack = [(document, "")]
+    while stack:
+        node, prefix = stack.pop()
+        node_type = _field(node, "type")
+        children = _field(node, "content") or []
+
+        if node_type in ("paragraph", "heading", "codeBlock", "tableRow"):
+            if node_type == "heading":
+                # At least "##": a single "#" reads as a Jira numbered item
+                level = _field(_field(node, "attrs"), "level") or 1
+                lines.append(prefix + "#" * max(level, 2) + " " + _inline_text(children))
+            elif node_type == "codeBlock":
+                lines.extend(["```", _inline_text(children), "```"])
+            elif node_type == "tableRow":
+                cells = [" ".join(_inline_text(_field(p, "content") or []) for p in _field(cell, "content") or [])
+                         for cell in children]
+                lines.append("| " + " | ".join(cells) + " |")
+            else:
+                lines.append(prefix + _inline_text(children))
+            continue
+
+        if node_type in ("bulletList", "orderedList", "taskList"):
+            marker = {"bulletList": "- ", "orderedList": "1. ", "taskList": "- [ ] "}[node_type]
+            indent = " " * min(len(prefix), MAX_ADF_INDENT)
+            stack.extend((child, indent + marker) for child in reversed(children))
+            continue
+
+        if node_type in ("listItem", "taskItem"):
+            if node_type == "taskItem":
+                # Task items hold inline content directly
+                lines.append(prefix + _inline_text(children))
+                continue
+            # The first block takes the bullet; nested blocks are indented
+            indent = " " * min(len(prefix) + 2, MAX_ADF_INDENT)
+            stack.extend((child, indent) for child in reversed(children[1:]))
+            if children:
+                stack.append((children[0], prefix))
+            continue
+
+        # doc, panel, blockquote, table, expand and unknown containers
+        stack.extend((child, prefix) for child in reversed(children))
+    return "\n".join(lines)
+
+
+def _inline_text(nodes: Iterable) -> str:
+    """Text of inline nodes; hard breaks become spaces."""
+    parts = []
+    for node in nodes:
+        node_type = _field(node, "type")
+        if node_type == "text":
+            parts.append(_field(node, "text") or "")
+        elif node_type == "hardBreak":
+            parts.append(" ")
+        elif node_type in ("mention", "emoji", "status", "inlineCard", "date"):
+            attrs = _field(node, "attrs")
+            parts.append(_field(attrs, "text") or _field(attrs, "url") or "")
+        else:
+            parts.append(_inline_text(_field(node, "content") or []))
+    return "".join(parts).strip()
+
+
+def _field(node, name: str):
+    """Field of an ADF node given as a dictionary or an attribute object."""
+    if node is None:
+        return None
+    if isinstance(node, dict):
+        return node.get(name)
+    return getattr(node, name, None)
@@ -0,0 +1,216 @@
+"""BM25 similarity between acceptance criteria and tests.
+
+An optional alternative to the word-overlap rule in ac_matcher: each test
+is a document made of its name (split on punctuation and camelCase), its
+docstring or description when the results carry one, and the description
+and expected outcomes of the generated TestScenario it implements. Words
+are lowercased, common words dropped and plural/tense suffixes stripped.
+
+The documents are turned into a sparse term x test matrix of BM25 weights
+(arrays of postings, as in a CSC matrix) with NumPy, and every criterion
+is scored against every test by batched sums over the postings of its
+terms. A criterion's score for a test is the BM25 score divided by the
+score of a test containing each of its terms once at average length, so
+1.0 means every term found and unknown terms pull the score down. Tests
+scoring at least the threshold cover the criterion.
+
+NumPy is imported when an index is built, so it is only needed when this
+mode is enabled (AC_MATCH_MODE=bm25).
+"""
+
+import re
+import string
+from typing import Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_SIMILARITY_THRESHOLD = 0.5
+
+# BM25 term frequency saturation and length normalization
+DEFAULT_K1 = 1.2
+DEFAULT_B = 0.75
+
+# Largest criteria x tests block of scores held at once
+MAX_SCORE_BLOCK = 1_000_000
+
+STOP_WORDS = frozenset("""
+a an and are as at be been but by can could does for from has have if in into is it its may must not of on or
+should so than that the their them then there these they this to was were when where which while who will with
+would given able user's py test tests testing spec case cases
+""".split())
+
+# Parts of a word split at case changes and digits
+_WORD = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+|[^\W\da-zA-Z_]+")
+# Punctuation and underscores become spaces before splitting at whitespace
+_PUNCTUATION = str.maketrans(dict.fromkeys(string.punctuation, " "))
+# Separates documents in the joined text
+_SEPARATOR = "\x00"
+_SUFFIXES = ("ing", "ies", "ed", "es", "s")
+
+
+def _stem(word: str) -> str:
+    """Word without a plural or tense suffix, if enough of it remains."""
+    if word[-1] not in "sgd":
+        return word
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)] + ("y" if suffix == "ies" else "")
+    return word
+
+
+def _normalized_key(text: str) -> str:
+    """Lowercased words of a test or scenario name joined by "_", without a test_ prefix."""
+    words = [word.lower() for word in _WORD.findall(text)]
+    if words and words[0] == "test":
+        words = words[1:]
+    return "_".join(words)
+
+
+def describe_tests(tests: Sequence[dict], scenarios: Optional[Sequence] = None) -> List[str]:
+    """Text describing each test: name, docstring/description and its generated scenario.
+
+    A scenario belongs to a test when the test function's name (without
+    "test_", class and parameters) equals the scenario's name or test_id
+    in snake case.
+
+    Args:
+        tests: Test result dictionaries with a "name"
+        scenarios: Generated TestScenario objects or their dictionaries
+    """
+    scenario_text: Dict[str, str] = {}
+    for scenario in scenarios or []:
+        fields = scenario if isinstance(scenario, dict) else vars(scenario)
+        text = " ".join([fields.get("name", ""), fields.get("description", "")] + list(fields.get("expected_outcomes", [])))
+        for key in (fields.get("name"), fields.get("test_id")):
+            if key:
+                scenario_text.setdefault(_normalized_key(key), text)
+
+    documents = []
+    for test in tests:
+        name = test["name"]
+        parts = [name, test.get("docstring"), test.get("description")]
+        if scenario_text:
+            function = name.rsplit("::", 1)[-1].split("[", 1)[0]
+            parts.append(scenario_text.get(_normalized_key(function)))
+        documents.append(" ".join(filter(None, parts)))
+    return documents
+
+
+class BM25Index:
+    """BM25 weights of a fixed list of test documents."""
+
+    def __init__(self, documents: Sequence[str], k1: float = DEFAULT_K1, b: float = DEFAULT_B):
+        """Tokenize all documents and build the weight matrix.
+
+        Args:
+            documents: One text per test; bit i of a match is documents[i]
+            k1: Term frequency saturation
+            b: Document length normalization (0 to 1)
+        """
+        import numpy as np
+
+        self._np = np
+        self.size = len(documents)
+
+        # Split all documents at whitespace and punctuation in one pass, then
+        # split, lowercase, stem and filter each distinct raw word once
+        raw_words = f" {_SEPARATOR} ".join(
+            document.replace(_SEPARATOR, " ") for document in documents
+        ).translate(_PUNCTUATION).split()
+        raw_ids = dict.fromkeys(raw_words)
+        self.vocabulary: Dict[str, int] = {}
+        raw_terms: List[int] = []
+        raw_counts: List[int] = []
+        for index, word in enumerate(raw_ids):
+            raw_ids[word] = index
+            terms = [self.vocabulary.setdefault(term, len(self.vocabulary)) for term in _terms(word)]
+            raw_terms.extend(terms)
+            raw_counts.append(len(terms))
+        ids = np.fromiter(map(raw_ids.__getitem__, raw_words), dtype=np.int64, count=len(raw_words))
+        raw_counts = np.array(raw_counts, dtype=np.int64)
+        raw_starts = np.cumsum(raw_counts) - raw_counts
+
+        # Expand each raw word occurrence into its terms: (term, test) per occurrence
+        documents_of = np.cumsum(ids == raw_ids.get(_SEPARATOR, -1))
+        counts = raw_counts[ids]
+        terms = np.array(raw_terms, dtype=np.int64)[_ranges(np, raw_starts[ids], counts)]
+        documents_of = np.repeat(documents_of, counts)
+        vocabulary_size = max(len(self.vocabulary), 1)
+
+        # Term frequencies per (term, test), sorted by term: the postings
+        size = max(self.size, 1)
+        pairs, frequencies = np.unique(terms * size + documents_of, return_counts=True)
+        self._tests = pairs % size
+        pair_terms = pairs // size
+        self._starts = np.concatenate(([0], np.cumsum(np.bincount(pair_terms, minlength=vocabulary_size))))
+
+        lengths = np.bincount(documents_of, minlength=self.size).astype(np.float64)
+        average = lengths.mean() if lengths.any() else 1.0
+        document_frequency = np.diff(self._starts)
+        self._idf = np.log1p((self.size - document_frequency + 0.5) / (document_frequency + 0.5))
+        # Weight of a term no test contains
+        self._unknown_idf = float(np.log1p((self.size + 0.5) / 0.5))
+        norms = k1 * (1 - b + b * lengths[self._tests] / average)
+        self._weights = self._idf[pair_terms] * frequencies * (k1 + 1) / (frequencies + norms)
+
+    def query_terms(self, query: str) -> Tuple[List[int], float]:
+        """Known term ids of a query (repeated per occurrence) and its ideal score."""
+        ids = []
+        ideal = 0.0
+        for word in query.translate(_PUNCTUATION).split():
+            for term in _terms(word):
+                index = self.vocabulary.get(term)
+                if index is None:
+                    ideal += self._unknown_idf
+                else:
+                    ids.append(index)
+                    ideal += self._idf[index]
+        return ids, ideal
+
+    def match(self, queries: Sequence[str], threshold: float = DEFAULT_SIMILARITY_THRESHOLD) -> List[Tuple[int, float]]:
+        """(bitmask of documents scoring at least `threshold`, best score) per query.
+
+        Scores are summed for a block of queries at a time: the postings of
+        every (query, term) pair are gathered and added up per (query,
+        test) cell with one bincount.
+        """
+        np = self._np
+        matches = []
+        block = max(1, MAX_SCORE_BLOCK // max(self.size, 1))
+        for first in range(0, len(queries), block):
+            chunk = queries[first:first + block]
+            rows, postings, ideals = [], [], []
+            for row, query in enumerate(chunk):
+                terms, ideal = self.query_terms(query)
+                ideals.append(ideal or 1.0)
+                rows.extend([row] * len(terms))
+                postings.extend(terms)
+
+            postings = np.array(postings, dtype=np.int64)
+            starts = self._starts[postings]
+            counts = self._starts[postings + 1] - starts
+            positions = _ranges(np, starts, counts)
+            cells = np.repeat(np.array(rows, dtype=np.int64), counts) * self.size + self._tests[positions]
+            totals = np.bincount(cells, weights=self._weights[positions], minlength=len(chunk) * self.size)
+            totals = totals.reshape(len(chunk), self.size)
+
+            ideals = np.array(ideals)
+            packed = np.packbits(totals >= (threshold * ideals)[:, None], axis=1, bitorder="little")
+            best = np.minimum(totals.max(axis=1) / ideals, 1.0) if self.size else np.zeros(len(chunk))
+            matches.extend(
+                (int.from_bytes(row.tobytes(), "little"), round(float(score), 3)) for row, score in zip(packed, best)
+            )
+        return matches
+
+
+def _terms(word: str) -> List[str]:
+    """Index terms of a raw word: camelCase parts, lowercased and stemmed, without stop words."""
+    if word.isdigit() or (word.islower() and word.isalpha()):
+        parts = [word]
+    else:
+        parts = [part.lower() for part in _WORD.findall(word)]
+    return [_stem(part) for part in parts if len(part) > 1 and part not in STOP_WORDS]
+
+
+def _ranges(np, starts, counts):
+    """Concatenation of range(start, start + count) for each start and count."""
+    offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(counts)[:-1])), counts)
+    return np.arange(counts.sum()) + offsets
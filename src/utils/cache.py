@@ -0,0 +1,268 @@
+"""Content-addressed response cache with in-memory and on-disk tiers."""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import closing
+from pathlib import Path
+from typing import List, Optional
+
+from src.utils.logger import logger
+
+
+def make_cache_key(**parts) -> str:
+    """Build a stable SHA-256 key from JSON-serialisable inputs."""
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CacheTier(ABC):
+    """Base class for a cache storage tier.
+
+    Values are JSON strings so every read hands back a fresh copy.
+    """
+
+    name = "tier"
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """Return the stored value or None."""
+
+    @abstractmethod
+    def set(self, key: str, value: str) -> None:
+        """Store a value."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove every entry."""
+
+
+class MemoryLRUTier(CacheTier):
+    """Thread-safe in-process LRU tier with TTL."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 86400):
+        """Initialize memory tier."""
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the stored value or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            value, expires_at = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        """Store a value, evicting the least recently used entries."""
+        with self._lock:
+            self._entries[key] = (value, time.time() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteTier(CacheTier):
+    """Persistent SQLite tier with TTL and size-based eviction."""
+
+    name = "disk"
+
+    def __init__(self, path: str, ttl_seconds: float = 86400, max_bytes: int = 100 * 1024 * 1024):
+        """Initialize disk tier."""
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5)
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the stored value or None."""
+        now = time.time()
+        with self._lock, closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            if row[1] < now:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        """Store a value and evict expired or least recently used rows."""
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now + self.ttl_seconds, now)
+            )
+            conn.execute("DELETE FROM responses WHERE expires_at < ?", (now,))
+
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.max_bytes:
+                rows = conn.execute(
+                    "SELECT key, size FROM responses ORDER BY accessed_at ASC"
+                ).fetchall()
+                for old_key, old_size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    conn.execute("DELETE FROM responses WHERE key = ?", (old_key,))
+                    total -= old_size
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM responses")
+
+
+class ResponseCache:
+    """Tiered cache for JSON-serialisable responses.
+
+    Tiers are checked in order; a hit in a slower tier is promoted to the
+    faster ones.
+    """
+
+    def __init__(self, tiers: Optional[List[CacheTier]] = None):
+        """Initialize response cache."""
+        self.tiers = tiers if tiers is not None else [MemoryLRUTier()]
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "sets": 0, "errors": 0}
+        self._tier_hits = {tier.name: 0 for tier in self.tiers}
+        self._logger = logger
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return a cached response or None."""
+        for idx, tier in enumerate(self.tiers):
+            try:
+                value = tier.get(key)
+            except Exception as e:
+                self._logger.warning("Cache tier read failed", tier=tier.name, error=str(e))
+                self._count("errors")
+                continue
+
+            if value is None:
+                continue
+
+            for faster in self.tiers[:idx]:
+                try:
+                    faster.set(key, value)
+                except Exception as e:
+                    self._logger.warning("Cache tier write failed", tier=faster.name, error=str(e))
+
+            with self._lock:
+                self._counters["hits"] += 1
+                self._tier_hits[tier.name] = self._tier_hits.get(tier.name, 0) + 1
+            return json.loads(value)
+
+        self._count("misses")
+        return None
+
+    def set(self, key: str, response: dict) -> None:
+        """Store a response in every tier."""
+        value = json.dumps(response)
+        for tier in self.tiers:
+            try:
+                tier.set(key, value)
+            except Exception as e:
+                self._logger.warning("Cache tier write failed", tier=tier.name, error=str(e))
+                self._count("errors")
+        self._count("sets")
+
+    def clear(self) -> None:
+        """Remove every entry from every tier."""
+        for tier in self.tiers:
+            tier.clear()
+
+    def stats(self) -> dict:
+        """Return hit/miss counters."""
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "tier_hits": dict(self._tier_hits),
+                "hit_rate": round(self._counters["hits"] / lookups, 4) if lookups else 0.0,
+            }
+
+    def _count(self, counter: str):
+        with self._lock:
+            self._counters[counter] += 1
+
+
+def create_response_cache() -> Optional[ResponseCache]:
+    """Factory function to create a response cache from environment settings.
+
+    CLAUDE_CACHE_ENABLED      - set to "false" to disable caching
+    CLAUDE_CACHE_DIR          - enables the on-disk SQLite tier in this directory
+    CLAUDE_CACHE_TTL_SECONDS  - entry lifetime (default 7 days)
+    CLAUDE_CACHE_MAX_ENTRIES  - memory tier size (default 256)
+    CLAUDE_CACHE_MAX_MB       - disk tier size (default 100)
+    """
+    if os.getenv("CLAUDE_CACHE_ENABLED", "true").lower() in ("0", "false", "no"):
+        return None
+
+    ttl = float(os.getenv("CLAUDE_CACHE_TTL_SECONDS", 7 * 86400))
+    tiers: List[CacheTier] = [
+        MemoryLRUTier(max_entries=int(os.getenv("CLAUDE_CACHE_MAX_ENTRIES", 256)), ttl_seconds=ttl)
+    ]
+
+    cache_dir = os.getenv("CLAUDE_CACHE_DIR")
+    if cache_dir:
+        tiers.append(SQLiteTier(
+            os.path.join(cache_dir, "claude_responses.sqlite"),
+            ttl_seconds=ttl,
+            max_bytes=int(float(os.getenv("CLAUDE_CACHE_MAX_MB", 100)) * 1024 * 1024)
+        ))
+
+    return ResponseCache(tiers)
+
+
+_shared_cache: Optional[ResponseCache] = None
+_shared_cache_built = False
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_response_cache() -> Optional[ResponseCache]:
+    """Return the process-wide response cache, creating it on first use."""
+    global _shared_cache, _shared_cache_built
+    with _shared_cache_lock:
+        if not _shared_cache_built:
+            _shared_cache = create_response_cache()
+            _shared_cache_built = True
+        return _shared_cache
@@ -0,0 +1,87 @@
+"""Split unified diffs into token-budgeted chunks."""
+
+from typing import List
+
+
+# Rough characters-per-token ratio for code and English prose.
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in a piece of text."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def split_into_hunks(diff: str) -> List[str]:
+    """Split a diff into file and hunk sections.
+
+    A new section starts at every `diff --git` file header or, outside a
+    file header, at every `@@` hunk header. GitHub patches have no file
+    header, so each one starts with its first hunk.
+    """
+    sections: List[str] = []
+    current: List[str] = []
+    in_file_header = False
+
+    for line in diff.splitlines(keepends=True):
+        starts_file = line.startswith("diff --git ")
+        starts_hunk = line.startswith("@@") and not in_file_header
+
+        if (starts_file or starts_hunk) and current:
+            sections.append("".join(current))
+            current = []
+
+        if starts_file:
+            in_file_header = True
+        elif line.startswith("@@"):
+            in_file_header = False
+
+        current.append(line)
+
+    if current:
+        sections.append("".join(current))
+
+    return sections
+
+
+def split_diff(diff: str, max_tokens: int) -> List[str]:
+    """
+    Pack a diff into chunks of at most `max_tokens` estimated tokens.
+
+    Chunks break on file and hunk boundaries. A single hunk that is larger
+    than the budget is split on line boundaries, and a single line larger
+    than the budget is split into fixed-size pieces.
+    """
+    max_chars = max(1, max_tokens * CHARS_PER_TOKEN)
+    chunks: List[str] = []
+    current: List[str] = []
+    current_size = 0
+
+    def flush():
+        nonlocal current, current_size
+        if current:
+            chunks.append("".join(current))
+            current = []
+            current_size = 0
+
+    for section in split_into_hunks(diff):
+        if len(section) > max_chars:
+            flush()
+            for line in section.splitlines(keepends=True):
+                # Minified or generated lines can exceed the budget on their own
+                for start in range(0, len(line), max_chars):
+                    piece = line[start:start + max_chars]
+                    if current_size + len(piece) > max_chars:
+                        flush()
+                    current.append(piece)
+                    current_size += len(piece)
+            flush()
+            continue
+
+        if current_size + len(section) > max_chars:
+            flush()
+        current.append(section)
+        current_size += len(section)
+
+    flush()
+    return chunks
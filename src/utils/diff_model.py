@@ -0,0 +1,404 @@
+"""Parsed unified diffs: files, hunks and added/removed line ranges.
+
+A PR is parsed once (see `ParsedDiff.from_files`) and the result is shared
+by the agents, so scans that only care about added lines neither re-parse
+the patches nor look at context and removed lines.
+
+The model does not copy patch text. Consecutive added (or removed) lines
+are stored as runs: four integers in flat arrays giving where the run
+starts and ends in the patch, its first line number and its line count.
+Line text is sliced out of the patch when asked for, reading spilled
+patches back from their PatchSpool one file at a time.
+"""
+
+from array import array
+from bisect import bisect_right
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, Union
+
+from src.utils.patch_stream import PatchRef, consume_patches
+
+
+class Hunk:
+    """One `@@` section of a file's patch."""
+
+    __slots__ = ("old_start", "old_count", "new_start", "new_count", "section", "added", "removed")
+
+    def __init__(self, old_start: int, old_count: int, new_start: int, new_count: int, section: str):
+        self.old_start = old_start
+        self.old_count = old_count
+        self.new_start = new_start
+        self.new_count = new_count
+        # Text after the closing @@, usually the enclosing function or class
+        self.section = section
+        # Index ranges of the hunk's runs in the file's LineRuns
+        self.added = range(0)
+        self.removed = range(0)
+
+
+class LineRuns:
+    """Runs of consecutive added or removed lines of one patch.
+
+    Run i covers patch[starts[i]:ends[i]] (lines still carry their "+" or
+    "-" marker), starts at file line firsts[i] and has counts[i] lines.
+    `text_starts[i]` is where the run begins in the joined text.
+    """
+
+    __slots__ = ("starts", "ends", "firsts", "counts", "text_starts", "lines")
+
+    def __init__(self):
+        self.starts = array("L")
+        self.ends = array("L")
+        self.firsts = array("L")
+        self.counts = array("L")
+        self.text_starts = array("L")
+        self.lines = 0
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def add(self, start: int, end: int, first: int, count: int):
+        text_start = 0
+        if self.starts:
+            last = len(self.starts) - 1
+            # Previous run's text length plus the newline joining the runs
+            text_start = self.text_starts[last] + self.ends[last] - self.starts[last] - self.counts[last] + 1
+        self.starts.append(start)
+        self.ends.append(end)
+        self.firsts.append(first)
+        self.counts.append(count)
+        self.text_starts.append(text_start)
+        self.lines += count
+
+    def locator(self, patch: str) -> Callable[[int], Optional[Tuple[int, int]]]:
+        """Function mapping a patch offset inside the runs to (file line number, column), else None.
+
+        Columns count from the first character after the line's marker; the
+        marker itself is column -1. Lines are counted on from the previous
+        call's offset, so ascending offsets cost only the text between them.
+        """
+        last = [-1, 0, 0]  # run index, offset and line number of the previous call
+
+        def locate(offset: int) -> Optional[Tuple[int, int]]:
+            index = bisect_right(self.starts, offset) - 1
+            if index < 0 or offset >= self.ends[index]:
+                return None
+            start = self.starts[index]
+            last_index, counted_to, line_number = last
+            if index != last_index or offset < counted_to:
+                counted_to, line_number = start, self.firsts[index]
+            line_number += patch.count("\n", counted_to, offset)
+            last[:] = index, offset, line_number
+            line_start = patch.rfind("\n", start, offset) + 1 or start
+            return line_number, offset - line_start - 1
+
+        return locate
+
+    def run_text(self, patch: str, index: int) -> str:
+        """Text of one run's lines without their markers."""
+        marker = patch[self.starts[index]]
+        return patch[self.starts[index] + 1:self.ends[index]].replace("\n" + marker, "\n")
+
+
+class LineText:
+    """Added or removed lines of a file joined with newlines, markers stripped."""
+
+    __slots__ = ("text", "_runs")
+
+    def __init__(self, text: str, runs: LineRuns):
+        self.text = text
+        self._runs = runs
+
+    def position(self, offset: int) -> Tuple[int, int]:
+        """Map an offset in `text` to (file line number, column)."""
+        index = bisect_right(self._runs.text_starts, offset) - 1
+        run_start = self._runs.text_starts[index]
+        line_start = self.text.rfind("\n", run_start, offset) + 1 or run_start
+        return self._runs.firsts[index] + self.text.count("\n", run_start, offset), offset - line_start
+
+
+class ParsedFile:
+    """A file's hunks and the runs of its added and removed lines."""
+
+    __slots__ = ("filename", "status", "hunks", "added_runs", "removed_runs", "_patch")
+
+    def __init__(self, filename: str, status: Optional[str], hunks: List[Hunk],
+                 added_runs: LineRuns, removed_runs: LineRuns, patch: Union[str, PatchRef]):
+        self.filename = filename
+        self.status = status
+        self.hunks = hunks
+        self.added_runs = added_runs
+        self.removed_runs = removed_runs
+        self._patch = patch
+
+    @property
+    def added_count(self) -> int:
+        """Number of added lines."""
+        return self.added_runs.lines
+
+    @property
+    def removed_count(self) -> int:
+        """Number of removed lines."""
+        return self.removed_runs.lines
+
+    def patch(self) -> str:
+        """The file's patch text."""
+        return self._patch.read() if isinstance(self._patch, PatchRef) else self._patch
+
+    def added_text(self) -> LineText:
+        """Added lines joined with newlines, without their "+" marker."""
+        return self._text(self.added_runs)
+
+    def removed_text(self) -> LineText:
+        """Removed lines joined with newlines, without their "-" marker."""
+        return self._text(self.removed_runs)
+
+    def added_lines(self, hunk: Optional[Hunk] = None) -> Iterator[Tuple[int, str]]:
+        """Yield (new-file line number, text) for added lines, optionally of one hunk."""
+        return self._lines(self.added_runs, hunk.added if hunk is not None else None)
+
+    def removed_lines(self, hunk: Optional[Hunk] = None) -> Iterator[Tuple[int, str]]:
+        """Yield (old-file line number, text) for removed lines, optionally of one hunk."""
+        return self._lines(self.removed_runs, hunk.removed if hunk is not None else None)
+
+    def hunk_for_line(self, line_number: int, old: bool = False) -> Optional[Hunk]:
+        """Hunk whose new-file (or, with `old`, old-file) range contains `line_number`."""
+        for hunk in self.hunks:
+            start, count = (hunk.old_start, hunk.old_count) if old else (hunk.new_start, hunk.new_count)
+            if start <= line_number < start + max(count, 1):
+                return hunk
+        return None
+
+    def _text(self, runs: LineRuns) -> LineText:
+        if not runs:
+            return LineText("", runs)
+        patch = self.patch()
+        return LineText("\n".join([runs.run_text(patch, i) for i in range(len(runs))]), runs)
+
+    def _lines(self, runs: LineRuns, indexes: Optional[range]) -> Iterator[Tuple[int, str]]:
+        if not runs:
+            return
+        patch = self.patch()
+        for index in indexes if indexes is not None else range(len(runs)):
+            first = runs.firsts[index]
+            for offset, line in enumerate(runs.run_text(patch, index).split("\n")):
+                yield first + offset, line
+
+
+class ParsedDiff:
+    """Parsed files of a PR or of a unified diff.
+
+    Instances are `consume_patches` consumers, so a PR's files can be
+    parsed in the same pass that feeds other consumers.
+    """
+
+    __slots__ = ("files",)
+
+    def __init__(self, files: Optional[List[ParsedFile]] = None):
+        """Initialize parsed diff."""
+        self.files = files if files is not None else []
+
+    @classmethod
+    def from_files(cls, files: Iterable[dict]) -> "ParsedDiff":
+        """Parse the patches of PR file dictionaries."""
+        diff = cls()
+        consume_patches(files, diff)
+        return diff
+
+    def __call__(self, file_info: dict, patch: str):
+        """Parse one file's patch, keeping its spool reference rather than the text if it has one."""
+        self.files.append(parse_patch(
+            file_info["filename"], patch, file_info.get("status"), source=file_info.get("patch_ref")
+        ))
+
+    @property
+    def added_count(self) -> int:
+        """Added lines across all files."""
+        return sum(f.added_count for f in self.files)
+
+    @property
+    def removed_count(self) -> int:
+        """Removed lines across all files."""
+        return sum(f.removed_count for f in self.files)
+
+    @property
+    def hunk_count(self) -> int:
+        """Hunks across all files."""
+        return sum(len(f.hunks) for f in self.files)
+
+    def get(self, filename: str) -> Optional[ParsedFile]:
+        """Parsed file by name."""
+        for parsed in self.files:
+            if parsed.filename == filename:
+                return parsed
+        return None
+
+
+def parse_patch(filename: str, patch: str, status: Optional[str] = None,
+                source: Optional[PatchRef] = None) -> ParsedFile:
+    """Parse one file's patch (hunks only, as returned by GitHub).
+
+    Lines before the first hunk header, such as `---`/`+++` file headers,
+    are skipped, as are "\\ No newline at end of file" markers. Text with
+    no hunk header at all is read as a single hunk starting at line 1. Hunk
+    lengths from the headers decide where a hunk ends, so added lines that
+    begin with "++" are not mistaken for file headers.
+
+    Args:
+        source: Where the parsed file reads the patch back from; defaults
+            to the `patch` string itself
+    """
+    hunks: List[Hunk] = []
+    added = LineRuns()
+    removed = LineRuns()
+
+    hunk = None
+    run = None  # [runs, marker, start, end, first line, count] of the open run
+    old_line = new_line = old_left = new_left = 0
+    headerless = bool(patch) and not patch.startswith("@@") and "\n@@" not in patch
+    if headerless:
+        # Hand-written snippets: one hunk from line 1 to the end of the text
+        hunk = Hunk(1, 0, 1, 0, "")
+        hunks.append(hunk)
+        old_line = new_line = 1
+        old_left = new_left = len(patch) + 1
+    position = 0
+    for line in patch.split("\n"):
+        start = position
+        position += len(line) + 1
+        if old_left > 0 or new_left > 0:
+            marker = line[:1]
+            if marker == "+" or marker == "-":
+                if run is not None and run[1] == marker:
+                    run[3] = start + len(line)
+                    run[5] += 1
+                else:
+                    if run is not None:
+                        run[0].add(run[2], run[3], run[4], run[5])
+                    if marker == "+":
+                        run = [added, marker, start, start + len(line), new_line, 1]
+                    else:
+                        run = [removed, marker, start, start + len(line), old_line, 1]
+                if marker == "+":
+                    new_line += 1
+                    new_left -= 1
+                else:
+                    old_line += 1
+                    old_left -= 1
+                continue
+            if run is not None:
+                run[0].add(run[2], run[3], run[4], run[5])
+                run = None
+            if marker == "\\":
+                continue
+            if marker == " " or line == "":
+                old_line += 1
+                new_line += 1
+                old_left -= 1
+                new_left -= 1
+                continue
+            # Truncated hunk; look for the next header
+            old_left = new_left = 0
+
+        if line.startswith("@@"):
+            header = _parse_hunk_header(line)
+            if header is None:
+                continue
+            if hunk is not None:
+                hunk.added = range(hunk.added.start, len(added))
+                hunk.removed = range(hunk.removed.start, len(removed))
+            old_start, old_left, new_start, new_left, section = header
+            hunk = Hunk(old_start, old_left, new_start, new_left, section)
+            hunk.added = range(len(added), len(added))
+            hunk.removed = range(len(removed), len(removed))
+            hunks.append(hunk)
+            old_line, new_line = old_start, new_start
+
+    if run is not None:
+        run[0].add(run[2], run[3], run[4], run[5])
+    if headerless:
+        # The empty string after a trailing newline is not a line
+        trailing = 1 if patch.endswith("\n") else 0
+        hunk.old_count, hunk.new_count = old_line - 1 - trailing, new_line - 1 - trailing
+    if hunk is not None:
+        hunk.added = range(hunk.added.start, len(added))
+        hunk.removed = range(hunk.removed.start, len(removed))
+
+    return ParsedFile(filename, status, hunks, added, removed, source if source is not None else patch)
+
+
+def parse_diff(diff: str) -> ParsedDiff:
+    """Parse a unified diff of one or more files.
+
+    Files start at `diff --git` headers and are named from their `+++ b/`
+    line (or `--- a/` for deleted files); their status follows GitHub's
+    ("added", "removed", "renamed" or "modified"). Text without file
+    headers, such as a single GitHub patch or patches joined with newlines,
+    is parsed as one unnamed file.
+    """
+    parsed = ParsedDiff()
+    for filename, status, patch in _split_files(diff):
+        parsed.files.append(parse_patch(filename, patch, status))
+    return parsed
+
+
+def _split_files(diff: str) -> Iterator[Tuple[str, Optional[str], str]]:
+    """Split a unified diff into (filename, status, text) per file."""
+    if not diff.startswith("diff --git ") and "\ndiff --git " not in diff:
+        yield "", None, diff
+        return
+
+    sections = diff.split("\ndiff --git ")
+    if not sections[0].startswith("diff --git "):
+        # Text before the first file header has no file to belong to
+        sections = sections[1:]
+    for section in sections:
+        head = section[:section.find("\n@@")] if "\n@@" in section else section
+        yield _header_filename(head), _header_status(head), section
+
+
+def _header_filename(head: str) -> str:
+    """Filename from the header lines of one file's diff."""
+    old_name = ""
+    for line in head.split("\n"):
+        if line.startswith("+++ ") and line[4:] != "/dev/null":
+            return line[6:] if line.startswith("+++ b/") else line[4:]
+        if line.startswith("--- ") and line[4:] != "/dev/null":
+            old_name = line[6:] if line.startswith("--- a/") else line[4:]
+    if old_name:
+        return old_name
+    # Binary or mode-only changes: "diff --git a/x b/x"
+    first = head.split("\n", 1)[0]
+    _, _, b_path = first.rpartition(" b/")
+    return b_path
+
+
+def _header_status(head: str) -> Optional[str]:
+    """GitHub-style file status from the header lines of one file's diff."""
+    if "\nnew file mode " in head:
+        return "added"
+    if "\ndeleted file mode " in head:
+        return "removed"
+    if "\nrename from " in head:
+        return "renamed"
+    return "modified"
+
+
+def _parse_hunk_header(line: str) -> Optional[Tuple[int, int, int, int, str]]:
+    """Parse "@@ -a,b +c,d @@ section" into (a, b, c, d, section)."""
+    end = line.find(" @@", 2)
+    if end < 0:
+        return None
+    ranges = line[3:end].split(" ")
+    if len(ranges) != 2 or not ranges[0].startswith("-") or not ranges[1].startswith("+"):
+        return None
+    try:
+        old_start, old_count = _parse_range(ranges[0][1:])
+        new_start, new_count = _parse_range(ranges[1][1:])
+    except ValueError:
+        return None
+    return old_start, old_count, new_start, new_count, line[end + 3:].strip()
+
+
+def _parse_range(text: str) -> Tuple[int, int]:
+    start, _, count = text.partition(",")
+    return int(start), int(count) if count else 1
@@ -0,0 +1,301 @@
+"""Strip low-signal content from PR patches before they are sent to Claude."""
+
+import json
+import os
+import posixpath
+import re
+from fnmatch import fnmatchcase
+from typing import Iterable, List, Optional, Tuple
+
+from src.utils.diff_chunker import estimate_tokens
+from src.utils.logger import logger
+from src.utils.patch_stream import iter_file_patches, public_file
+
+
+# Path rules are matched in order; the first match wins. Patterns without a
+# "/" are matched against the file's basename, others against the full path.
+# Actions: "drop" removes the patch, "summarize" replaces it with one line.
+DEFAULT_PATH_RULES = [
+    {
+        "name": "lockfile",
+        "action": "summarize",
+        "patterns": [
+            "package-lock.json", "npm-shrinkwrap.json", "yarn.lock", "pnpm-lock.yaml",
+            "poetry.lock", "Pipfile.lock", "uv.lock", "Cargo.lock", "go.sum",
+            "composer.lock", "Gemfile.lock", "mix.lock", "packages.lock.json",
+        ],
+    },
+    {
+        "name": "vendored",
+        "action": "drop",
+        "patterns": [
+            "vendor/*", "*/vendor/*", "third_party/*", "*/third_party/*",
+            "node_modules/*", "*/node_modules/*",
+        ],
+    },
+    {
+        "name": "minified",
+        "action": "drop",
+        "patterns": ["*.min.js", "*.min.css", "*.map", "*.bundle.js"],
+    },
+    {
+        "name": "generated",
+        "action": "summarize",
+        "patterns": [
+            "*_pb2.py", "*_pb2_grpc.py", "*.pb.go", "*.generated.*", "*.g.dart",
+            "generated/*", "*/generated/*", "dist/*", "*/dist/*",
+        ],
+    },
+    {
+        "name": "snapshot",
+        "action": "summarize",
+        "patterns": ["*.snap", "__snapshots__/*", "*/__snapshots__/*"],
+    },
+]
+
+# Markers that identify generated files regardless of their path, looked for
+# in the first lines of the file. A bare "do not edit" is not enough: hand-written
+# files use it for sections too.
+GENERATED_MARKERS = ("@generated", "code generated", "generated by", "autogenerated", "auto-generated")
+
+# Lines at the top of a file searched for GENERATED_MARKERS.
+GENERATED_HEADER_LINES = 5
+
+# A hunk starting at line 1 of the new file
+_FIRST_HUNK = re.compile(r"@@ -\d+(?:,\d+)? \+1(?:,\d+)? @@")
+
+# Average added-line length above which a file is treated as minified.
+MINIFIED_LINE_LENGTH = 500
+
+
+class DiffReducer:
+    """Drops or summarises low-signal files and collapses long context runs."""
+
+    def __init__(self,
+                 path_rules: Optional[List[dict]] = None,
+                 detect_content: bool = True,
+                 max_context_lines: int = 3):
+        """Initialize diff reducer."""
+        self.path_rules = path_rules if path_rules is not None else DEFAULT_PATH_RULES
+        self.detect_content = detect_content
+        self.max_context_lines = max_context_lines
+        self._logger = logger
+
+    def reduce_files(self, files: List[dict]) -> dict:
+        """
+        Reduce the patches of a PR's files.
+
+        Args:
+            files: File dictionaries from GitHubClient.get_pr_diff
+
+        Returns:
+            Dictionary with the reduced file list (dropped files removed,
+            other files copied with a reduced patch) and a savings report
+        """
+        reduced_files = []
+        report_files = []
+
+        for file_info, patch in iter_file_patches(files):
+            reduced_patch, entry = self.reduce_file(file_info, patch)
+            report_files.append(entry)
+            if reduced_patch is not None:
+                reduced_files.append(public_file(file_info, reduced_patch))
+
+        return {"files": reduced_files, "report": self.summarize(report_files)}
+
+    def reduce_file(self, file_info: dict, patch: str) -> Tuple[Optional[str], dict]:
+        """Reduce one file's patch and describe the savings.
+
+        Returns:
+            Tuple of (reduced patch or None if dropped, report entry)
+        """
+        reduced_patch, action, rule = self.reduce_patch(file_info["filename"], patch, file_info)
+
+        original_bytes = len(patch.encode("utf-8"))
+        reduced_bytes = len(reduced_patch.encode("utf-8")) if reduced_patch is not None else 0
+        return reduced_patch, {
+            "filename": file_info["filename"],
+            "action": action,
+            "rule": rule,
+            "original_bytes": original_bytes,
+            "reduced_bytes": reduced_bytes,
+            "bytes_saved": original_bytes - reduced_bytes,
+            "tokens_saved": max(0, estimate_tokens(patch) - estimate_tokens(reduced_patch or "")),
+        }
+
+    def summarize(self, report_files: List[dict]) -> dict:
+        """Total per-file report entries into a savings report and log it."""
+        report = {
+            "files": report_files,
+            "original_bytes": sum(f["original_bytes"] for f in report_files),
+            "reduced_bytes": sum(f["reduced_bytes"] for f in report_files),
+            "bytes_saved": sum(f["bytes_saved"] for f in report_files),
+            "tokens_saved": sum(f["tokens_saved"] for f in report_files),
+        }
+
+        self._logger.info(
+            "Diff reduced",
+            files=len(report_files),
+            dropped=sum(1 for f in report_files if f["action"] == "drop"),
+            summarized=sum(1 for f in report_files if f["action"] == "summarize"),
+            bytes_saved=report["bytes_saved"],
+            tokens_saved=report["tokens_saved"]
+        )
+
+        return report
+
+    def reduce_patch(self, filename: str, patch: str,
+                     file_info: Optional[dict] = None) -> Tuple[Optional[str], str, Optional[str]]:
+        """
+        Reduce a single patch.
+
+        Returns:
+            Tuple of (reduced patch or None if dropped, action, matched rule name)
+        """
+        rule = self._match_path_rule(filename) or self._match_content_rule(patch)
+        if rule is None:
+            return self._collapse_context(patch), "collapse", None
+
+        if rule["action"] == "drop":
+            return None, "drop", rule["name"]
+
+        info = file_info or {}
+        summary = (
+            f"[{rule['name']} file {filename}: +{info.get('additions', 0)}/"
+            f"-{info.get('deletions', 0)} lines, content omitted]\n"
+        )
+        return summary, "summarize", rule["name"]
+
+    def _match_path_rule(self, filename: str) -> Optional[dict]:
+        """Return the first path rule matching a filename."""
+        basename = posixpath.basename(filename)
+        for rule in self.path_rules:
+            for pattern in rule["patterns"]:
+                target = filename if "/" in pattern else basename
+                if fnmatchcase(target, pattern):
+                    return rule
+        return None
+
+    def _match_content_rule(self, patch: str) -> Optional[dict]:
+        """Detect generated or minified content from the patch itself."""
+        if not self.detect_content or not patch:
+            return None
+
+        head = _file_header(patch).lower()
+        if any(marker in head for marker in GENERATED_MARKERS):
+            return {"name": "generated", "action": "summarize"}
+
+        added = [line for line in patch.splitlines() if line.startswith("+")]
+        if added and sum(len(line) for line in added) / len(added) > MINIFIED_LINE_LENGTH:
+            return {"name": "minified", "action": "drop"}
+
+        return None
+
+    def _collapse_context(self, patch: str) -> str:
+        """Replace long runs of unchanged context lines with a marker."""
+        keep = self.max_context_lines
+        lines = patch.splitlines(keepends=True)
+        output: List[str] = []
+        run: List[str] = []
+
+        def flush_run():
+            if len(run) > keep * 2 + 1:
+                output.extend(run[:keep])
+                output.append(f" ... {len(run) - keep * 2} unchanged lines ...\n")
+                output.extend(run[-keep:] if keep else [])
+            else:
+                output.extend(run)
+            run.clear()
+
+        for line in lines:
+            if line.startswith(" "):
+                run.append(line)
+            else:
+                flush_run()
+                output.append(line)
+        flush_run()
+
+        return "".join(output)
+
+
+def _file_header(patch: str, count: int = GENERATED_HEADER_LINES) -> str:
+    """The first lines of the new file, if the patch's first hunk starts at line 1.
+
+    Removed lines are skipped, so only what the file starts with after the
+    change is searched, not comments elsewhere in the patch.
+    """
+    if not _FIRST_HUNK.match(patch):
+        return ""
+    lines = []
+    position = patch.find("\n") + 1
+    while position and len(lines) < count and position < len(patch):
+        end = patch.find("\n", position)
+        line = patch[position:end if end != -1 else len(patch)]
+        if line.startswith("@@"):
+            break
+        if not line.startswith("-"):
+            lines.append(line[1:])
+        position = end + 1
+    return "\n".join(lines)
+
+
+class PromptDiffBuilder:
+    """Builds the diff sent to Claude from a stream of (file, patch) pairs.
+
+    Used as a `consume_patches` consumer: each patch is reduced (when a
+    reducer is set) and kept, so the prompt is assembled in the same pass
+    that feeds the other consumers.
+    """
+
+    def __init__(self, reducer: Optional[DiffReducer] = None, filenames: Optional[Iterable[str]] = None):
+        """Initialize prompt diff builder; `filenames` limits the files included."""
+        self.reducer = reducer
+        self.filenames = set(filenames) if filenames is not None else None
+        self.files = 0
+        self._parts: List[str] = []
+        self._report_files: List[dict] = []
+
+    def __call__(self, file_info: dict, patch: str):
+        """Add one file's patch."""
+        if self.filenames is not None and file_info["filename"] not in self.filenames:
+            return
+        self.files += 1
+        if self.reducer is None:
+            self._parts.append(patch)
+            return
+        reduced_patch, entry = self.reducer.reduce_file(file_info, patch)
+        self._report_files.append(entry)
+        if reduced_patch is not None:
+            self._parts.append(reduced_patch)
+
+    def diff(self) -> str:
+        """The prompt diff."""
+        return "\n".join(self._parts)
+
+    def report(self) -> Optional[dict]:
+        """Savings report, or None without a reducer."""
+        if self.reducer is None:
+            return None
+        return self.reducer.summarize(self._report_files)
+
+
+def create_diff_reducer() -> Optional[DiffReducer]:
+    """Factory function to create a diff reducer from environment settings.
+
+    DIFF_REDUCER_ENABLED      - set to "false" to send patches unchanged
+    DIFF_REDUCER_RULES_FILE   - JSON file with a list of path rules replacing the defaults
+    DIFF_REDUCER_CONTEXT_LINES - context lines kept around each collapsed run (default 3)
+    """
+    if os.getenv("DIFF_REDUCER_ENABLED", "true").lower() in ("0", "false", "no"):
+        return None
+
+    path_rules = None
+    rules_file = os.getenv("DIFF_REDUCER_RULES_FILE")
+    if rules_file:
+        with open(rules_file) as f:
+            path_rules = json.load(f)
+
+    return DiffReducer(
+        path_rules=path_rules,
+        max_context_lines=int(os.getenv("DIFF_REDUCER_CONTEXT_LINES", 3))
+    )
@@ -0,0 +1,342 @@
+"""Classify changed files into categories with a declarative rule table.
+
+Rules are dictionaries (see DEFAULT_CATEGORY_RULES), one per category and
+matched in order like the diff reducer's path rules: the first category
+with a matching entry wins, and files matching none fall back to "other".
+Each rule can list:
+
+    extensions - file suffixes, compound ones included (".d.ts")
+    filenames  - exact basenames ("Dockerfile", "conftest.py")
+    dirs       - directory paths, CODEOWNERS-style: "tests" or "db/migrate"
+                 match those directories anywhere in the path, "/infra"
+                 only at the repository root
+    globs      - fnmatch patterns, against the basename if they have no "/"
+    case_globs - globs matched case-sensitively, for naming conventions
+                 such as JUnit's "*Test.java" that lowercasing would turn
+                 into "contest.java" matches
+
+Matching is case-insensitive except for case_globs. Extensions and filenames are dictionary
+lookups and dirs a walk of a trie of path components, so most files never
+reach a glob. Results are memoised per path, and classifiers are shared
+per repository, so paths seen in earlier PRs cost one cache lookup.
+"""
+
+import json
+import os
+import re
+import threading
+from fnmatch import translate
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.utils.logger import logger
+
+DEFAULT_CATEGORY = "other"
+DEFAULT_CACHE_SIZE = 262144
+
+DEFAULT_CATEGORY_RULES = [
+    {
+        "category": "tests",
+        "dirs": ["test", "tests", "__tests__", "spec", "specs", "e2e", "cypress", "testdata", "fixtures"],
+        "filenames": ["conftest.py", "pytest.ini", "tox.ini", "jest.config.js", "jest.config.ts", "karma.conf.js"],
+        "globs": ["test_*", "*_test.*", "*_tests.*", "*.test.*", "*.spec.*", "*_spec.*"],
+        "case_globs": ["*Test.java", "*Tests.java", "*Test.kt", "*Tests.kt", "*Test.cs", "*Tests.cs"],
+    },
+    {
+        "category": "database",
+        "extensions": [".sql", ".ddl", ".migration", ".prisma", ".cql"],
+        "dirs": ["migrations", "alembic", "flyway", "liquibase", "db/migrate", "db/schema"],
+        "filenames": ["schema.rb", "structure.sql"],
+    },
+    {
+        "category": "infrastructure",
+        "extensions": [".tf", ".tfvars", ".hcl", ".yaml", ".yml", ".dockerfile"],
+        "dirs": [
+            "k8s", "kubernetes", "helm", "charts", "terraform", "infra", "infrastructure",
+            "cloudformation", "ansible", "deploy", ".github/workflows", ".circleci",
+        ],
+        "filenames": ["dockerfile", ".dockerignore", "jenkinsfile", "vagrantfile", "procfile"],
+        "globs": ["dockerfile.*", "docker-compose*", "*.dockerfile.*"],
+    },
+    {
+        "category": "config",
+        "extensions": [".json", ".toml", ".ini", ".cfg", ".conf", ".env", ".properties", ".xml", ".plist"],
+        "dirs": ["config", "configs", "conf", "settings"],
+        "filenames": [".env", ".editorconfig", ".npmrc", ".babelrc", ".eslintrc", ".prettierrc", "setup.cfg"],
+        "globs": [".env.*", "*config.*", "*.config.*", "settings.*"],
+    },
+    {
+        "category": "frontend",
+        "extensions": [
+            ".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx", ".d.ts", ".vue", ".svelte",
+            ".css", ".scss", ".sass", ".less", ".html", ".htm",
+        ],
+    },
+    {
+        "category": "backend",
+        "extensions": [
+            ".py", ".pyi", ".go", ".java", ".kt", ".kts", ".scala", ".rs", ".c", ".h", ".cc",
+            ".cpp", ".hpp", ".cs", ".rb", ".php", ".ex", ".exs", ".erl", ".swift",
+        ],
+    },
+]
+
+
+class FileClassifier:
+    """Category lookup for file paths, compiled from a rule table."""
+
+    def __init__(self,
+                 rules: Optional[List[dict]] = None,
+                 default_category: str = DEFAULT_CATEGORY,
+                 cache_size: int = DEFAULT_CACHE_SIZE):
+        """Initialize file classifier.
+
+        Args:
+            rules: Category rule dictionaries in priority order; defaults to
+                DEFAULT_CATEGORY_RULES. Rules with `"enabled": false` are skipped.
+            default_category: Category of files no rule matches
+            cache_size: Paths whose category is memoised
+        """
+        rules = rules if rules is not None else DEFAULT_CATEGORY_RULES
+        self.rules = [rule for rule in rules if rule.get("enabled", True)]
+        for rule in self.rules:
+            if not rule.get("category"):
+                raise ValueError(f"File category rule needs a category: {rule!r}")
+        self.default_category = default_category
+        self.categories = [rule["category"] for rule in self.rules] + [default_category]
+
+        # Each table maps a key to the priority (rule index) of its first rule
+        self._extensions: Dict[str, int] = {}
+        self._filenames: Dict[str, int] = {}
+        self._anywhere: dict = {}
+        self._rooted: dict = {}
+        globs: Dict[Tuple[int, bool], List[str]] = {}
+        case_globs: Dict[Tuple[int, bool], List[str]] = {}
+        for priority, rule in enumerate(self.rules):
+            for extension in rule.get("extensions") or []:
+                extension = extension.lower()
+                self._extensions.setdefault(extension if extension.startswith(".") else "." + extension, priority)
+            for filename in rule.get("filenames") or []:
+                self._filenames.setdefault(filename.lower(), priority)
+            for directory in rule.get("dirs") or []:
+                trie = self._rooted if directory.startswith("/") else self._anywhere
+                _add_dir(trie, directory.strip("/").lower(), priority)
+            for pattern in rule.get("globs") or []:
+                pattern = pattern.lower()
+                globs.setdefault((priority, "/" in pattern), []).append(pattern)
+            for pattern in rule.get("case_globs") or []:
+                case_globs.setdefault((priority, "/" in pattern), []).append(pattern)
+        self._globs = [(priority, full_path, _GlobSet(patterns))
+                       for (priority, full_path), patterns in sorted(globs.items())]
+        self._case_globs = [(priority, full_path, _GlobSet(patterns))
+                            for (priority, full_path), patterns in sorted(case_globs.items())]
+        # Most files match no glob at all; one combined test per target rules them out
+        self._any_glob = {
+            full_path: _GlobSet([pattern for (_, key), patterns in globs.items() if key == full_path
+                                 for pattern in patterns])
+            for full_path in (False, True)
+        }
+
+        # Directories repeat far more than paths do in large PRs
+        self._directories: Dict[str, int] = {}
+        self._directory_cache_size = cache_size
+        self.classify = lru_cache(maxsize=cache_size)(self._classify)
+
+    def classify_files(self, files: Iterable[dict]) -> dict:
+        """Group file dictionaries' names by category.
+
+        Returns:
+            Dictionary of category -> filenames, in rule order, with only
+            non-empty categories
+        """
+        classification: Dict[str, List[str]] = {category: [] for category in self.categories}
+        classify = self.classify
+        for file_info in files:
+            filename = file_info["filename"]
+            classification[classify(filename)].append(filename)
+        return {category: names for category, names in classification.items() if names}
+
+    def cache_info(self):
+        """Hit and miss counts of the per-path memo."""
+        return self.classify.cache_info()
+
+    def _classify(self, filename: str) -> str:
+        path = filename.lower()
+        directory, _, basename = path.rpartition("/")
+        best = len(self.rules)
+
+        priority = self._filenames.get(basename)
+        if priority is not None:
+            best = priority
+
+        # Every suffix from each dot: "app.d.ts" tries ".d.ts" then ".ts"
+        dot = basename.find(".", 1)
+        while dot != -1:
+            priority = self._extensions.get(basename[dot:])
+            if priority is not None and priority < best:
+                best = priority
+            dot = basename.find(".", dot + 1)
+
+        if directory and best > 0:
+            priority = self._directories.get(directory)
+            if priority is None:
+                priority = self._directories[directory] = self._directory_priority(directory)
+            best = min(best, priority)
+
+        basename_glob = self._any_glob[False].match(basename)
+        path_glob = self._any_glob[True].match(path)
+        if basename_glob or path_glob:
+            for priority, full_path, globs in self._globs:
+                if priority >= best:
+                    break
+                if (path_glob if full_path else basename_glob) and globs.match(path if full_path else basename):
+                    best = priority
+
+        for priority, full_path, globs in self._case_globs:
+            if priority >= best:
+                break
+            if globs.match(filename if full_path else filename.rpartition("/")[2]):
+                best = priority
+
+        return self.rules[best]["category"] if best < len(self.rules) else self.default_category
+
+    def _directory_priority(self, directory: str) -> int:
+        """Best priority of the dirs entries matching a directory path."""
+        if len(self._directories) >= self._directory_cache_size:
+            self._directories.clear()
+        best = len(self.rules)
+        parts = directory.split("/")
+        if parts[0] in self._rooted:
+            best = min(best, _walk(self._rooted, parts, 0))
+        anywhere = self._anywhere
+        for start, part in enumerate(parts):
+            if part in anywhere:
+                best = min(best, _walk(anywhere, parts, start))
+        return best
+
+
+class _GlobSet:
+    """Globs of one rule, with the common shapes turned into string tests.
+
+    "name*", "*name" and "*name*" become startswith, endswith and substring
+    tests; anything else is matched as one regex alternation.
+    """
+
+    __slots__ = ("prefixes", "suffixes", "infixes", "pattern")
+
+    def __init__(self, patterns: List[str]):
+        prefixes, suffixes, infixes, others = [], [], [], []
+        for pattern in patterns:
+            literal = pattern.strip("*")
+            if any(char in literal for char in "*?["):
+                others.append(translate(pattern))
+            elif pattern.startswith("*") and pattern.endswith("*") and len(pattern) > 1:
+                infixes.append(literal)
+            elif pattern.startswith("*"):
+                suffixes.append(literal)
+            elif pattern.endswith("*"):
+                prefixes.append(literal)
+            else:
+                others.append(translate(pattern))
+        self.prefixes = tuple(prefixes)
+        self.suffixes = tuple(suffixes)
+        self.infixes = re.compile("|".join(map(re.escape, infixes))) if infixes else None
+        self.pattern = re.compile("|".join(others)) if others else None
+
+    def match(self, target: str) -> bool:
+        """Whether any of the globs matches `target`."""
+        if target.startswith(self.prefixes) or target.endswith(self.suffixes):
+            return True
+        if self.infixes is not None and self.infixes.search(target):
+            return True
+        return self.pattern is not None and self.pattern.match(target) is not None
+
+
+def _add_dir(trie: dict, directory: str, priority: int):
+    node = trie
+    for part in directory.split("/"):
+        node = node.setdefault(part, {})
+    if None not in node:
+        # Under None: the priority of the first rule ending here
+        node[None] = priority
+
+
+def _walk(trie: dict, parts: List[str], start: int) -> int:
+    """Best priority of the trie's directory paths starting at parts[start]."""
+    best = 1 << 30
+    node = trie
+    for part in parts[start:]:
+        node = node.get(part)
+        if node is None:
+            break
+        best = min(best, node.get(None, best))
+    return best
+
+
+def merge_category_rules(rules: List[dict], overrides: List[dict]) -> List[dict]:
+    """Apply rule overrides by category.
+
+    Overrides of an existing category replace its fields in place; new
+    categories go first, so repository-specific categories take precedence.
+    """
+    merged = {rule["category"]: dict(rule) for rule in rules}
+    added = []
+    for override in overrides:
+        category = override.get("category")
+        if category in merged:
+            merged[category].update(override)
+        else:
+            added.append(dict(override))
+    return added + list(merged.values())
+
+
+def load_repo_rules(repo: Optional[str] = None) -> List[dict]:
+    """Category rules for a repository ("owner/name").
+
+    FILE_CLASSIFIER_RULES_FILE - JSON object mapping "*" and/or repository
+                                 names to lists of rule overrides; "*"
+                                 applies to every repository, then the
+                                 repository's own entry
+    """
+    rules = DEFAULT_CATEGORY_RULES
+    rules_file = os.getenv("FILE_CLASSIFIER_RULES_FILE")
+    if rules_file:
+        with open(rules_file) as f:
+            config = json.load(f)
+        for key in ("*", repo):
+            if key and key in config:
+                rules = merge_category_rules(rules, config[key])
+    return rules
+
+
+def create_file_classifier(repo: Optional[str] = None, rules: Optional[List[dict]] = None) -> FileClassifier:
+    """Factory function to create a file classifier from environment settings.
+
+    FILE_CLASSIFIER_RULES_FILE  - per-repository rule overrides (see load_repo_rules)
+    FILE_CLASSIFIER_CACHE_SIZE  - paths memoised per classifier (default 262144)
+    """
+    return FileClassifier(
+        rules if rules is not None else load_repo_rules(repo),
+        cache_size=int(os.getenv("FILE_CLASSIFIER_CACHE_SIZE", DEFAULT_CACHE_SIZE))
+    )
+
+
+_shared_classifiers: Dict[Optional[str], Tuple[List[dict], FileClassifier]] = {}
+_shared_classifiers_lock = threading.Lock()
+
+
+def get_file_classifier(repo: Optional[str] = None) -> FileClassifier:
+    """Return the process-wide classifier of a repository, compiling it on first use.
+
+    Repositories with the same rules share one classifier and its memo.
+    """
+    with _shared_classifiers_lock:
+        entry = _shared_classifiers.get(repo)
+        if entry is None:
+            rules = load_repo_rules(repo)
+            entry = next((shared for shared in _shared_classifiers.values() if shared[0] == rules), None)
+            if entry is None:
+                entry = (rules, create_file_classifier(repo, rules))
+                logger.info("File classifier compiled", repo=repo, categories=entry[1].categories)
+            _shared_classifiers[repo] = entry
+        return entry[1]
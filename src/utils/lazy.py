@@ -0,0 +1,34 @@
+"""Lazy package exports (PEP 562)."""
+
+import importlib
+import sys
+from typing import Callable, Dict, List, Tuple
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Tuple[Callable[[str], object], Callable[[], List[str]]]:
+    """
+    Build module-level `__getattr__` and `__dir__` for a package.
+
+    Each exported name is imported from its submodule on first access and
+    then cached on the package, so importing the package itself stays cheap
+    and a code path only loads the submodules (and SDKs) it uses.
+
+    Args:
+        package: The package's `__name__`
+        exports: Mapping of exported name to relative submodule (".github")
+
+    Returns:
+        Tuple of (__getattr__, __dir__)
+    """
+    def __getattr__(name: str):
+        submodule = exports.get(name)
+        if submodule is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(submodule, package), name)
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(sys.modules[package])) | set(exports))
+
+    return __getattr__, __dir__
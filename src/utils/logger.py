@@ -3,6 +3,8 @@
 import os
 import structlog
 
+from src.utils.tracing import add_trace_ids
+
 def setup_logging():
     """Configure structured logging."""
     log_level = os.getenv("LOG_LEVEL", "INFO")
@@ -12,6 +14,7 @@ def setup_logging():
             structlog.stdlib.filter_by_level,
             structlog.stdlib.add_logger_name,
             structlog.stdlib.add_log_level,
+            add_trace_ids,
             structlog.stdlib.PositionalArgumentsFormatter(),
             structlog.processors.TimeStamper(fmt="iso"),
             structlog.processors.StackInfoRenderer(),
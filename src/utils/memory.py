@@ -0,0 +1,145 @@
+"""Opt-in memory instrumentation for pipeline stages and requests.
+
+With MEMORY_PROFILE=true every `track_memory` block reports:
+- process RSS and peak RSS when it finishes, and how far the peak RSS rose
+  while it ran (a non-zero value means this stage set a new high-water
+  mark);
+- the peak of Python allocations traced during the block (tracemalloc);
+- the source lines whose live allocations grew the most between the start
+  and the end of the block.
+
+Allocations that are freed before the block ends (a joined diff string
+passed on and dropped, say) only show up in the traced peak, not in the
+top sites. tracemalloc is process-wide, so reports from concurrent
+requests overlap. Tracing allocations slows Python code down noticeably,
+which is why this is off by default.
+"""
+
+import contextlib
+import contextvars
+import os
+import resource
+import sys
+import tracemalloc
+from typing import Iterator, List, Optional
+
+from src.utils.logger import logger
+from src.utils.tracing import set_attributes
+
+DEFAULT_TOP_ALLOCATIONS = 10
+
+_MB = 1024 * 1024
+
+_IGNORED_FILES = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class _OpenStage:
+    """Bookkeeping for a `track_memory` block that has not finished yet."""
+
+    __slots__ = ("snapshot", "peak", "peak_rss")
+
+    def __init__(self, snapshot: tracemalloc.Snapshot, peak_rss: Optional[float]):
+        self.snapshot = snapshot
+        self.peak = 0
+        self.peak_rss = peak_rss
+
+
+_open_stage: contextvars.ContextVar[Optional[_OpenStage]] = contextvars.ContextVar("memory_stage", default=None)
+
+
+def memory_enabled() -> bool:
+    """Whether MEMORY_PROFILE turns the instrumentation on."""
+    return os.getenv("MEMORY_PROFILE", "false").lower() in ("1", "true", "yes")
+
+
+def rss_mb() -> Optional[float]:
+    """Current resident set size in MB (Linux only)."""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / _MB
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KB on Linux and in bytes on macOS
+    return peak / _MB if sys.platform == "darwin" else peak / 1024
+
+
+@contextlib.contextmanager
+def track_memory(stage: str, top: Optional[int] = None) -> Iterator[dict]:
+    """Measure memory around a block when MEMORY_PROFILE is set.
+
+    Yields a dictionary that is empty while the block runs and holds the
+    report once it has finished; it stays empty when instrumentation is off.
+    The report is also logged and added to the current tracing span.
+    """
+    report: dict = {}
+    if not memory_enabled():
+        yield report
+        return
+
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(int(os.getenv("MEMORY_TRACE_FRAMES", "1")))
+
+    parent = _open_stage.get()
+    if parent is not None:
+        parent.peak = max(parent.peak, tracemalloc.get_traced_memory()[1])
+    state = _OpenStage(_snapshot(), peak_rss_mb())
+    tracemalloc.reset_peak()
+    token = _open_stage.set(state)
+    try:
+        yield report
+    finally:
+        _open_stage.reset(token)
+        state.peak = max(state.peak, tracemalloc.get_traced_memory()[1])
+        if parent is not None:
+            parent.peak = max(parent.peak, state.peak)
+
+        peak_rss = peak_rss_mb()
+        report.update({
+            "stage": stage,
+            "rss_mb": _round(rss_mb()),
+            "peak_rss_mb": _round(peak_rss),
+            "peak_rss_growth_mb": _round(peak_rss - state.peak_rss),
+            "traced_peak_mb": _round(state.peak / _MB),
+            "top_allocations": _top_allocations(state.snapshot, top),
+        })
+        set_attributes(
+            peak_rss_mb=report["peak_rss_mb"],
+            peak_rss_growth_mb=report["peak_rss_growth_mb"],
+            traced_peak_mb=report["traced_peak_mb"],
+        )
+        logger.info("Memory usage", **report)
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces(_IGNORED_FILES)
+
+
+def _top_allocations(before: tracemalloc.Snapshot, top: Optional[int]) -> List[dict]:
+    """Source lines whose live allocations grew the most since `before`."""
+    limit = top or int(os.getenv("MEMORY_TOP_ALLOCATIONS", DEFAULT_TOP_ALLOCATIONS))
+    sites = []
+    for stat in _snapshot().compare_to(before, "lineno")[:limit]:
+        if stat.size_diff <= 0:
+            break
+        frame = stat.traceback[0]
+        sites.append({
+            "site": f"{frame.filename}:{frame.lineno}",
+            "size_kb": round(stat.size_diff / 1024, 1),
+            "count": stat.count_diff,
+        })
+    return sites
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 1) if value is not None else None
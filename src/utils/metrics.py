@@ -0,0 +1,330 @@
+"""In-process metrics: counters, gauges and histograms.
+
+The MCP servers expose the registry on /metrics in the Prometheus text
+exposition format; the Lambda handler writes it to the log as one
+structured line per series after each invocation.
+"""
+
+import asyncio
+import functools
+import math
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.utils.tracing import span
+
+# Seconds; fine enough below a second for the quantile estimates to be useful
+# for both local stages and Claude calls.
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0,
+)
+
+STAGE_SECONDS = "release_guardian_stage_duration_seconds"
+STAGE_ERRORS = "release_guardian_stage_errors_total"
+CLAUDE_TOKENS = "release_guardian_claude_tokens_total"
+CLAUDE_CACHE = "release_guardian_claude_cache_requests_total"
+HTTP_REQUESTS = "release_guardian_http_requests_total"
+HTTP_SECONDS = "release_guardian_http_request_duration_seconds"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: dict) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Iterable[Tuple[str, str]] = ()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (
+        key + '="' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for key, value in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """Base class holding one value per label set."""
+
+    kind = ""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._series: Dict[Labels, object] = {}
+        self._lock = threading.Lock()
+
+    def clear(self):
+        """Drop every series."""
+        with self._lock:
+            self._series.clear()
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        """Add `amount` to the series for `labels`."""
+        key = _labels(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        """Current value of a series."""
+        with self._lock:
+            return self._series.get(_labels(labels), 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = list(self._series.items())
+        return self._header() + [f"{self.name}{_format_labels(key)} {_format_value(value)}" for key, value in series]
+
+    def snapshot(self) -> List[dict]:
+        with self._lock:
+            return [{"metric": self.name, "type": self.kind, "labels": dict(key), "value": value}
+                    for key, value in self._series.items()]
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        """Set the series for `labels` to `value`."""
+        with self._lock:
+            self._series[_labels(labels)] = value
+
+    def dec(self, amount: float = 1, **labels):
+        """Subtract `amount` from the series for `labels`."""
+        self.inc(-amount, **labels)
+
+
+class _HistogramSeries:
+    __slots__ = ("buckets", "count", "sum")
+
+    def __init__(self, size: int):
+        self.buckets = [0] * size
+        self.count = 0
+        self.sum = 0.0
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text)
+        self.bounds = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        """Record one observation."""
+        key = _labels(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _HistogramSeries(len(self.bounds))
+            series.buckets[bisect_left(self.bounds, value)] += 1
+            series.count += 1
+            series.sum += value
+
+    def quantile(self, q: float, **labels) -> Optional[float]:
+        """Estimate a quantile by interpolating within its bucket, like PromQL's histogram_quantile."""
+        with self._lock:
+            series = self._series.get(_labels(labels))
+            if series is None or series.count == 0:
+                return None
+            return self._quantile(series, q)
+
+    def _quantile(self, series: _HistogramSeries, q: float) -> float:
+        rank = q * series.count
+        cumulative = 0
+        for i, count in enumerate(series.buckets):
+            if count and cumulative + count >= rank:
+                upper = self.bounds[i]
+                lower = self.bounds[i - 1] if i else 0.0
+                if math.isinf(upper):
+                    return lower
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.bounds[-2]
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        with self._lock:
+            for key, series in self._series.items():
+                cumulative = 0
+                for bound, count in zip(self.bounds, series.buckets):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{_format_labels(key, [('le', _format_value(bound))])} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(series.sum)}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {series.count}")
+        return lines
+
+    def snapshot(self) -> List[dict]:
+        with self._lock:
+            return [
+                {
+                    "metric": self.name,
+                    "type": self.kind,
+                    "labels": dict(key),
+                    "count": series.count,
+                    "sum": round(series.sum, 6),
+                    "p50": round(self._quantile(series, 0.50), 6),
+                    "p95": round(self._quantile(series, 0.95), 6),
+                    "p99": round(self._quantile(series, 0.99), 6),
+                }
+                for key, series in self._series.items()
+                if series.count
+            ]
+
+
+class MetricsRegistry:
+    """Named metrics, created on first use."""
+
+    def __init__(self):
+        """Initialize metrics registry."""
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help_text: str = "") -> Counter:
+        """Get or create a counter."""
+        return self._get(Counter, name, help_text)
+
+    def gauge(self, name: str, help_text: str = "") -> Gauge:
+        """Get or create a gauge."""
+        return self._get(Gauge, name, help_text)
+
+    def histogram(self, name: str, help_text: str = "", buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Get or create a histogram."""
+        return self._get(Histogram, name, help_text, buckets)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> List[dict]:
+        """One record per series: counters and gauges with their value, histograms with count, sum and p50/p95/p99."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return [record for metric in metrics for record in metric.snapshot()]
+
+    def reset(self):
+        """Clear every series, keeping the metric definitions."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.clear()
+
+    def _get(self, cls, name: str, help_text: str, *args) -> _Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text or name, *args)
+            elif type(metric) is not cls:
+                raise ValueError(f"Metric {name} is already registered as a {metric.kind}")
+            return metric
+
+
+_registry = MetricsRegistry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Process-wide metrics registry."""
+    return _registry
+
+
+def observe_stage(stage: str, seconds: float, error: bool = False):
+    """Record the duration (and failure) of one pipeline stage."""
+    _registry.histogram(STAGE_SECONDS, "Duration of agent and integration calls by stage").observe(seconds, stage=stage)
+    if error:
+        _registry.counter(STAGE_ERRORS, "Agent and integration calls that raised, by stage").inc(stage=stage)
+
+
+def timed(stage: str) -> Callable:
+    """Decorator recording a function's duration under `stage` and tracing it as a span; works on sync and async functions."""
+    def decorator(fn: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    with span(stage):
+                        result = await fn(*args, **kwargs)
+                except BaseException:
+                    observe_stage(stage, time.perf_counter() - start, error=True)
+                    raise
+                observe_stage(stage, time.perf_counter() - start)
+                return result
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                with span(stage):
+                    result = fn(*args, **kwargs)
+            except BaseException:
+                observe_stage(stage, time.perf_counter() - start, error=True)
+                raise
+            observe_stage(stage, time.perf_counter() - start)
+            return result
+        return wrapper
+    return decorator
+
+
+def record_claude_usage(prompt: str, usage) -> None:
+    """Count the input and output tokens of a Claude response."""
+    if usage is None:
+        return
+    tokens = _registry.counter(CLAUDE_TOKENS, "Claude tokens by prompt and direction")
+    for direction in ("input", "output"):
+        count = getattr(usage, f"{direction}_tokens", None)
+        if isinstance(count, (int, float)):
+            tokens.inc(count, prompt=prompt, direction=direction)
+
+
+def record_cache_lookup(prompt: str, hit: bool):
+    """Count a Claude response cache lookup."""
+    _registry.counter(CLAUDE_CACHE, "Claude response cache lookups by prompt and result").inc(
+        prompt=prompt, result="hit" if hit else "miss"
+    )
+
+
+def record_http_request(route: str, method: str, status: int, seconds: float):
+    """Count an HTTP request and record its duration."""
+    _registry.counter(HTTP_REQUESTS, "HTTP requests by route, method and status").inc(
+        route=route, method=method, status=status
+    )
+    _registry.histogram(HTTP_SECONDS, "HTTP request duration by route").observe(seconds, route=route)
+
+
+def log_metrics(log, reset: bool = True):
+    """Write every series as a structured log line, then (by default) clear the registry."""
+    for record in _registry.snapshot():
+        log.info("metric", **record)
+    if reset:
+        _registry.reset()
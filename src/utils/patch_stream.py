@@ -0,0 +1,152 @@
+"""Bounded-memory storage and single-pass consumption of PR file patches.
+
+GitHub clients feed each file of a PR through a PatchSpool as the file list
+is paged in. Patches stay in the file dictionaries as `"patch"` while the
+PR is small; once the spool outgrows PATCH_SPOOL_MAX_MEMORY_MB (counted in
+UTF-8 bytes) it moves every patch to a temporary file and the dictionaries
+carry a `"patch_ref"` instead, read back one file at a time.
+
+Consumers never join the whole diff: `consume_patches` reads each patch once
+and hands it to every consumer (risk keyword scan, diff reduction and prompt
+building) before moving on to the next file.
+"""
+
+import os
+import tempfile
+import threading
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_MAX_MEMORY_MB = 64
+
+
+class PatchRef:
+    """Location of a spilled patch."""
+
+    __slots__ = ("spool", "index")
+
+    def __init__(self, spool: "PatchSpool", index: int):
+        self.spool = spool
+        self.index = index
+
+    def read(self) -> str:
+        """Load the patch text."""
+        return self.spool.get(self.index)
+
+
+class PatchSpool:
+    """Append-only patch store that moves to a temporary file once it outgrows memory."""
+
+    def __init__(self, max_memory_bytes: Optional[int] = None):
+        """Initialize patch spool."""
+        self.max_memory_bytes = max_memory_bytes if max_memory_bytes is not None else int(
+            float(os.getenv("PATCH_SPOOL_MAX_MEMORY_MB", DEFAULT_MAX_MEMORY_MB)) * 1024 * 1024
+        )
+        self.total_bytes = 0
+        self._patches: List[str] = []
+        self._offsets: List[Tuple[int, int]] = []
+        self._file = None
+        self._end = 0
+        self._lock = threading.Lock()
+
+    @property
+    def spilled(self) -> bool:
+        """Whether patches have moved to the temporary file."""
+        return self._file is not None
+
+    def add(self, patch: str) -> int:
+        """Store a patch and return its index."""
+        size = len(patch.encode("utf-8"))
+        with self._lock:
+            self.total_bytes += size
+            if self._file is None:
+                self._patches.append(patch)
+                if self.total_bytes <= self.max_memory_bytes:
+                    return len(self._patches) - 1
+                self._spill()
+            else:
+                self._write(patch)
+            return len(self._offsets) - 1
+
+    def get(self, index: int) -> str:
+        """Read a patch back."""
+        with self._lock:
+            if self._file is None:
+                return self._patches[index]
+            offset, length = self._offsets[index]
+            self._file.seek(offset)
+            return self._file.read(length).decode("utf-8")
+
+    def collect(self, files: Iterable[dict]) -> List[dict]:
+        """Store the patches of a stream of file dictionaries.
+
+        Returns the dictionaries with `"patch"` kept while everything fits in
+        memory, or replaced by `"patch_ref"` once the spool has spilled.
+        """
+        return self.finish([self.add_file(file_info) for file_info in files])
+
+    def add_file(self, file_info: dict) -> dict:
+        """Move a file dictionary's patch into the spool; call `finish` once all files are added."""
+        file_info["patch_ref"] = PatchRef(self, self.add(file_info.pop("patch", None) or ""))
+        return file_info
+
+    def finish(self, files: List[dict]) -> List[dict]:
+        """Put patches back into the dictionaries if the spool never spilled."""
+        if not self.spilled:
+            for file_info in files:
+                file_info["patch"] = self._patches[file_info.pop("patch_ref").index]
+        return files
+
+    def close(self):
+        """Release the temporary file."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+
+    def _spill(self):
+        self._file = tempfile.TemporaryFile(prefix="release-guardian-patches-")
+        for patch in self._patches:
+            self._write(patch)
+        self._patches = []
+
+    def _write(self, patch: str):
+        data = patch.encode("utf-8")
+        self._file.seek(self._end)
+        self._file.write(data)
+        self._offsets.append((self._end, len(data)))
+        self._end += len(data)
+
+
+def file_patch(file_info: dict) -> str:
+    """Patch text of a file dictionary, loading it from the spool if needed."""
+    ref = file_info.get("patch_ref")
+    if ref is not None:
+        return ref.read()
+    return file_info.get("patch") or ""
+
+
+def iter_file_patches(files: Iterable[dict]) -> Iterator[Tuple[dict, str]]:
+    """Yield (file dictionary, patch text) pairs, loading one patch at a time."""
+    for file_info in files:
+        yield file_info, file_patch(file_info)
+
+
+def consume_patches(files: Iterable[dict], *consumers: Callable[[dict, str], None]):
+    """Read every patch once and pass it to each consumer in turn."""
+    for file_info, patch in iter_file_patches(files):
+        for consumer in consumers:
+            consumer(file_info, patch)
+
+
+def public_file(file_info: dict, patch: Optional[str] = None) -> dict:
+    """File dictionary without its spool reference, for JSON responses.
+
+    Spilled patches are left out of responses to keep them bounded; such
+    files carry `"patch_truncated": True` in place of their `"patch"` unless
+    a replacement `patch` is given.
+    """
+    public = {key: value for key, value in file_info.items() if key != "patch_ref"}
+    if patch is not None:
+        public["patch"] = patch
+    elif "patch_ref" in file_info:
+        public["patch_truncated"] = True
+    return public
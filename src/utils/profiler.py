@@ -0,0 +1,162 @@
+"""Sampling profiler that attributes stack samples to pipeline stages.
+
+A background thread samples every thread's Python stack at a fixed interval
+(PROFILE_INTERVAL_MS, default 10 ms) and files each sample under the
+innermost tracing span open on that thread, so every @timed stage gets its
+own profile. Only traces started with `profiled` are sampled.
+
+Samples are wall-clock: a thread blocked on a socket or a subprocess is
+counted with the blocking call as its leaf frame, which keeps waits on
+GitHub, Jira or Claude apart from CPU time spent in our own code.
+
+Profiles are written in the collapsed-stack format ("frame;frame;frame
+count" per line) read by flamegraph.pl, speedscope and inferno: one file per
+stage plus one combined file rooted at the stage names.
+"""
+
+import contextlib
+import os
+import sys
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Iterator, List, Optional, Set
+
+from src.utils.logger import logger
+from src.utils.tracing import Span, span, thread_spans
+
+DEFAULT_INTERVAL_MS = 10
+
+# Deeper stacks are truncated at the root end.
+MAX_STACK_DEPTH = 256
+
+
+class SamplingProfiler:
+    """Samples the stacks of threads running profiled traces."""
+
+    def __init__(self, interval: Optional[float] = None):
+        """Initialize profiler; `interval` is in seconds."""
+        self.interval = interval or float(os.getenv("PROFILE_INTERVAL_MS", DEFAULT_INTERVAL_MS)) / 1000
+        self._samples: Counter = Counter()
+        self._traces: Set[str] = set()
+        self._labels: Dict[object, str] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop: Optional[threading.Event] = None
+
+    def start_trace(self, trace_id: str):
+        """Sample threads working on `trace_id`, starting the sampler thread if needed."""
+        with self._lock:
+            self._traces.add(trace_id)
+            if self._thread is None:
+                self._stop = threading.Event()
+                self._thread = threading.Thread(
+                    target=self._run, args=(self._stop,), name="sampling-profiler", daemon=True
+                )
+                self._thread.start()
+
+    def stop_trace(self, trace_id: str) -> Dict[str, Counter]:
+        """Stop sampling `trace_id` and return its samples as {stage: {stack: count}}."""
+        with self._lock:
+            self._traces.discard(trace_id)
+            thread = self._thread if not self._traces else None
+            if thread is not None:
+                self._stop.set()
+                self._thread = None
+            stages: Dict[str, Counter] = defaultdict(Counter)
+            for key in [key for key in self._samples if key[0] == trace_id]:
+                _, stage, stack = key
+                stages[stage][stack] += self._samples.pop(key)
+        if thread is not None:
+            thread.join()
+        return dict(stages)
+
+    def sample(self, skip: Optional[int] = None):
+        """Take one sample of every thread inside a profiled trace."""
+        frames = sys._current_frames()
+        spans = thread_spans()
+        with self._lock:
+            for thread_id, frame in frames.items():
+                current: Optional[Span] = spans.get(thread_id)
+                if thread_id == skip or current is None or current.trace_id not in self._traces:
+                    continue
+                self._samples[(current.trace_id, current.name, self._stack(frame))] += 1
+
+    def _run(self, stop: threading.Event):
+        own = threading.get_ident()
+        while not stop.wait(self.interval):
+            self.sample(skip=own)
+
+    def _stack(self, frame) -> str:
+        """Collapsed stack for a frame, root first."""
+        labels = []
+        while frame is not None and len(labels) < MAX_STACK_DEPTH:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                module = frame.f_globals.get("__name__", "?")
+                label = self._labels[code] = f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+            labels.append(label)
+            frame = frame.f_back
+        return ";".join(reversed(labels))
+
+
+def write_collapsed(stages: Dict[str, Counter], directory: str, prefix: str = "profile") -> List[str]:
+    """Write per-stage and combined collapsed-stack files; returns their paths."""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    combined = []
+    for stage, stacks in sorted(stages.items()):
+        lines = [f"{stack} {count}" for stack, count in stacks.most_common()]
+        path = os.path.join(directory, f"{prefix}.{stage}.collapsed")
+        with open(path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        paths.append(path)
+        combined.extend(f"{stage};{line}" for line in lines)
+
+    if combined:
+        path = os.path.join(directory, f"{prefix}.collapsed")
+        with open(path, "w") as f:
+            f.write("\n".join(combined) + "\n")
+        paths.append(path)
+    return paths
+
+
+_profiler: Optional[SamplingProfiler] = None
+_profiler_lock = threading.Lock()
+
+
+def get_profiler() -> SamplingProfiler:
+    """Process-wide sampling profiler."""
+    global _profiler
+    with _profiler_lock:
+        if _profiler is None:
+            _profiler = SamplingProfiler()
+        return _profiler
+
+
+@contextlib.contextmanager
+def profiled(name: str, directory: Optional[str] = None, prefix: Optional[str] = None, **attributes) -> Iterator[Span]:
+    """Run a block in a span, sampling its trace when `directory` (or PROFILE_DIR) is set.
+
+    Files are named `<prefix>.<stage>.collapsed`; the prefix defaults to
+    the span name and the start of the trace ID so concurrent requests do
+    not overwrite each other.
+    """
+    directory = directory or os.getenv("PROFILE_DIR")
+    if not directory:
+        with span(name, **attributes) as current:
+            yield current
+        return
+
+    profiler = get_profiler()
+    with span(name, **attributes) as current:
+        profiler.start_trace(current.trace_id)
+        try:
+            yield current
+        finally:
+            stages = profiler.stop_trace(current.trace_id)
+            try:
+                paths = write_collapsed(stages, directory, prefix or f"profile-{name}-{current.trace_id[:8]}")
+                logger.info("Profile written", stage_count=len(stages), files=paths)
+            except OSError as e:
+                logger.error("Error writing profile", error=str(e), directory=directory)
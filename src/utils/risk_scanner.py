@@ -0,0 +1,1182 @@
+"""Rule-driven scan of PR patches for risky changes.
+
+Rules are dictionaries (see DEFAULT_RISK_RULES) with literal signatures,
+an optional regex, the side of the diff they apply to ("added" lines by
+default, or "removed" for things like deleted auth decorators) and path
+globs. Every literal of every rule is compiled into one matcher, so each
+patch is searched once for all of them rather than once per signature: an
+`NgramMatcher` when NumPy is installed, a regex-based `LiteralMatcher`
+otherwise. Hits on context lines, or on the side a rule does not look at,
+are dropped by looking them up in the file's parsed line runs. A rule with
+both literals and a regex only runs its regex on lines where one of its
+literals was found.
+
+Findings carry the file, line, column and hunk of each match so PR
+comments can point at the exact change.
+"""
+
+import json
+import os
+import posixpath
+import re
+import threading
+from collections import Counter
+from fnmatch import translate
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.utils.diff_model import LineRuns, ParsedDiff, ParsedFile
+from src.utils.logger import logger
+
+DEFAULT_MAX_FINDINGS = 200
+DEFAULT_MAX_FINDINGS_PER_RULE = 5
+
+SEVERITIES = ("critical", "high", "medium", "low")
+
+SNIPPET_LENGTH = 160
+
+# Per-mille frequency of characters in lowercased source code and diffs.
+# The literal matcher anchors each signature on its rarest characters, so
+# it makes as few stops as possible on ordinary code.
+CHAR_FREQUENCY = {
+    " ": 218.0, "e": 80.4, "t": 57.8, "s": 51.0, "r": 45.3, "a": 44.8, "i": 39.0,
+    "n": 38.2, "o": 36.6, "l": 27.7, "c": 25.6, "d": 22.1, "p": 21.8, '"': 20.4,
+    "u": 18.7, "m": 16.1, "f": 15.7, "_": 15.4, "h": 12.7, "g": 12.5, ".": 12.0,
+    "-": 9.8, ":": 8.9, "y": 8.4, "(": 8.2, ")": 8.2, ",": 7.9, "k": 7.1, "b": 6.6,
+    "=": 5.3, "*": 4.6, "w": 4.4, "#": 4.3, "v": 4.1, "`": 4.1, "[": 3.5, "]": 3.5,
+    "x": 3.4, "/": 2.3, "0": 2.3, "j": 2.1, "2": 2.0, "1": 1.9, "|": 1.6, "q": 1.4,
+    "{": 1.4, "}": 1.4, "'": 1.4, ">": 0.9, "z": 0.8, "3": 0.7, "5": 0.7, "\\": 0.7,
+    "+": 0.7, "4": 0.5,
+}
+RARE_CHAR_FREQUENCY = 0.3
+
+# Relative costs of the literal matcher, in stops at an anchor byte that
+# appears once per thousand bytes: a pass over the text for one more anchor,
+# and a stop whose neighbouring byte matches too, so the regex goes on to
+# try the literals' tries.
+ANCHOR_PASS_COST = 24.0
+MATCH_STOP_COST = 6.0
+
+# The n-gram matcher hashes the first NGRAM_PREFIX bytes at every position
+# into a table of 2**NGRAM_TABLE_BITS entries (Fibonacci hashing), NGRAM_CHUNK
+# positions at a time, and compares up to NGRAM_WINDOW bytes where the table
+# has an entry. A byte continuing a word after another word byte counts
+# WORD_CONTINUATION_WEIGHT times its frequency when placing windows: n-grams
+# inside words ("impo", "from") are far more common than their characters
+# suggest, and windows across a word boundary are rare.
+NGRAM_PREFIX = 4
+NGRAM_WINDOW = 8
+NGRAM_TABLE_BITS = 20
+NGRAM_CHUNK = 1 << 16
+NGRAM_HASH_MULTIPLIER = 0x9E3779B1
+WORD_CONTINUATION_WEIGHT = 4.0
+
+# Patterns without a "/" are matched against the file's basename, others
+# against the full path, as for the diff reducer's path rules. Documentation
+# is excluded by file type only, since docs/ directories can hold code.
+DOC_PATTERNS = ["*.md", "*.markdown", "*.rst", "*.txt", "*.adoc"]
+TEST_PATTERNS = [
+    "test_*", "*_test.*", "*.test.*", "*.spec.*", "conftest.py",
+    "tests/*", "*/tests/*", "test/*", "*/test/*", "*/fixtures/*", "*/testdata/*",
+]
+EXAMPLE_PATTERNS = ["*.example", "*.sample", "*.template", "*.dist"]
+
+# Messages name the area ("Database", "Auth", "API", "Infrastructure") that
+# RiskScorerAgent.extract_deployment_gates keys its gates on.
+DEFAULT_RISK_RULES = [
+    {
+        "name": "breaking_change",
+        "category": "compatibility",
+        "severity": "medium",
+        "message": "Breaking changes in code - versioning strategy check needed",
+        "literals": ["breaking", "deprecated", "backwards incompatible", "backward incompatible",
+                     "backwards-incompatible", "backward-incompatible", "no longer supported"],
+    },
+    {
+        "name": "sql_drop",
+        "category": "database",
+        "severity": "critical",
+        "message": "Database objects dropped or truncated - confirm backups and a restore path",
+        "literals": [
+            "drop table", "drop column", "drop database", "drop schema", "drop index", "drop view",
+            "drop materialized view", "drop constraint", "drop trigger", "drop function",
+            "drop procedure", "drop sequence", "drop type", "drop partition", "drop user", "drop role",
+            "truncate table", "drop keyspace", ".dropdatabase(", ".dropcollection(",
+            ".dropindex(", "flushall", "flushdb",
+        ],
+        "exclude_paths": DOC_PATTERNS,
+    },
+    {
+        "name": "sql_alter",
+        "category": "database",
+        "severity": "high",
+        "message": "Database schema altered - requires migration testing",
+        "literals": [
+            "alter table", "alter column", "alter type", "alter index", "rename column", "rename table",
+            "rename to", "modify column", "change column", "add column", "add constraint",
+            "set not null", "drop not null", "drop default", "set data type", "create unique index",
+        ],
+        "exclude_paths": DOC_PATTERNS,
+    },
+    {
+        "name": "sql_unbounded_write",
+        "category": "database",
+        "severity": "high",
+        "message": "Database rows deleted or updated without a WHERE clause - check the statement's scope",
+        "literals": ["delete from", "update "],
+        "pattern": r"\bdelete\s+from\s+[\w.\"`\[\]]+\s*(?:;|[\"'`)]|$)"
+                   r"|\bupdate\s+[\w.\"`\[\]]+\s+set\s+(?:(?!\bwhere\b)[^;\"'`])*(?:;|[\"'`)]|$)",
+        "exclude_paths": DOC_PATTERNS,
+    },
+    {
+        "name": "destructive_migration",
+        "category": "database",
+        "severity": "high",
+        "message": "Destructive Database migration - dropped or rewritten data cannot be rolled back",
+        "literals": [
+            "op.drop_table(", "op.drop_column(", "op.alter_column(", "op.drop_constraint(",
+            "op.drop_index(", "op.rename_table(", "op.execute(",
+            "migrations.removefield(", "migrations.deletemodel(", "migrations.alterfield(",
+            "migrations.renamefield(", "migrations.renamemodel(", "migrations.runsql(",
+            "remove_column ", "remove_column(", "drop_table ", "drop_table(", "rename_column ",
+            "rename_column(", "change_column ", "change_column(", "remove_index ", "remove_reference ",
+            "remove_timestamps ", "drop_join_table ",
+            "$table->dropcolumn(", "$table->renamecolumn(", "$table->dropforeign(", "schema::drop(",
+            "schema::dropifexists(", "queryinterface.removecolumn(", "queryinterface.droptable(",
+            "queryinterface.changecolumn(", "queryinterface.renamecolumn(", "knex.schema.droptable(",
+            ".dropcolumn(", ".droptable(", ".droptableifexists(", "<dropcolumn", "<droptable",
+            "<renamecolumn", "<modifydatatype",
+        ],
+        "exclude_paths": DOC_PATTERNS,
+    },
+    {
+        "name": "dynamic_code_execution",
+        "category": "security",
+        "severity": "critical",
+        "message": "Dynamic code execution added - review for code injection",
+        "literals": ["eval(", "exec(", "new function(", "settimeout(\"", "setinterval(\"",
+                     "__import__(", "vm.runinnewcontext(", "vm.runincontext(", "vm.runinthiscontext(",
+                     "scriptengine.eval(", "instance_eval", "class_eval", "module_eval"],
+        "pattern": r"(?<![\w.$])(?:eval|exec)\s*\(|\bnew\s+function\s*\(|\bset(?:timeout|interval)\(\s*[\"']"
+                   r"|__import__\(|\bvm\.run\w*context\(|scriptengine\.eval\(|\b(?:instance|class|module)_eval\b",
+        "exclude_paths": DOC_PATTERNS,
+    },
+    {
+        "name": "shell_execution",
+        "category": "security",
+        "severity": "high",
+        "message": "Shell command execution added - review for command injection",
+        "literals": [
+            "os.system(", "os.popen(", "os.spawn", "os.exec", "subprocess.getoutput(",
+            "subprocess.getstatusoutput(", "commands.getoutput(", "shell=true", "shell = true",
+            "pty.spawn(", "child_process.exec(", "child_process.execsync(", "execsync(", "shelljs",
+            "runtime.getruntime().exec(", "new processbuilder(", "proc_open(", "shell_exec(",
+            "passthru(", "popen(", "%x(", "open3.capture", "kernel.system(", "exec.command(\"sh\"",
+            "exec.command(\"bash\"", "process.start(\"cmd", "/bin/sh -c", "bash -c", "sh -c ",
+        ],
+        "exclude_paths": DOC_PATTERNS,
+    },
+    {
+        "name": "unsafe_deserialization",
+        "category": "security",
+        "severity": "high",
+        "message": "Unsafe deserialization added - untrusted input can execute code",
+        "literals": [
+            "pickle.loads(", "pickle.load(", "cpickle.load", "_pickle.load", "dill.load", "cloudpickle.load",
+            "marshal.loads(", "marshal.load(", "shelve.open(", "jsonpickle.decode(", "torch.load(",
+            "joblib.load(", "yaml.load(", "yaml.unsafe_load(", "yaml.load_all(", "loader=yaml.loader",
+            "loader=yaml.unsafeloader", "loader=yaml.fullloader", "yaml.unsafeloader", "objectinputstream(",
+            ".readobject(", "xmldecoder(", "xstream.fromxml(", "binaryformatter", "netdatacontractserializer",
+            "losformatter", "typenamehandling.all", "typenamehandling.auto", "unserialize(",
+            "node-serialize", "serialize-javascript", "oj.load(", "psych.unsafe_load(",
+        ],
+        "exclude_paths": DOC_PATTERNS,
+    },
+    {
+        "name": "tls_verification_disabled",
+        "category": "security",
+        "severity": "high",
+        "message": "TLS certificate verification disabled",
+        "literals": [
+            "verify=false", "verify = false", "verify: false", "ssl_verify=false", "ssl_verify = false",
+            "sslverify=false", "sslverify: false", "verify_ssl=false", "verify_ssl = false",
+            "cert_none", "check_hostname=false", "check_hostname = false", "_create_unverified_context",
+            "_create_default_https_context", "insecureskipverify", "insecure_skip_verify", "insecure: true",
+            "rejectunauthorized: false", "rejectunauthorized:false", "rejectunauthorized = false",
+            "node_tls_reject_unauthorized", "strict-ssl false", "strict_ssl=false", "strictssl: false",
+            "curl -k ", "curl --insecure", "wget --no-check-certificate", "--no-check-certificate",
+            "trustallcerts", "trustallmanager", "x509trustmanager", "allowallhostnameverifier",
+            "noophostnameverifier", "hostnameverifier", "servercertificatevalidationcallback",
+            "verify_mode = openssl::ssl::verify_none", "verify_none", "urllib3.disable_warnings(",
+            "insecurerequestwarning", "tls_reqcert never", "sslmode=disable",
+        ],
+        "exclude_paths": DOC_PATTERNS,
+    },
+    {
+        "name": "web_protection_relaxed",
+        "category": "security",
+        "severity": "high",
+        "message": "Web request protection relaxed - check CSRF, CORS and security header changes",
+        "literals": [
+            "csrf_exempt", "csrf.exempt", "wtf_csrf_enabled = false", "wtf_csrf_enabled=false",
+            "csrf_enabled = false", "csrf_enabled=false", "csrf_protection = false",
+            "skip_before_action :verify_authenticity_token", "protect_from_forgery except",
+            "protect_from_forgery with: :null_session", "csrf().disable()", "csrf.disable()",
+            "csrf: false", "access-control-allow-origin: *", "access-control-allow-origin\", \"*\"",
+            "access-control-allow-origin', '*'", "allow_origins=[\"*\"]", "allow_origins=['*']",
+            "allow_origins = [\"*\"]", "allowedorigins(\"*\")", "allowanyorigin()", "origins: \"*\"",
+            "origins: '*'", "origin: \"*\"", "origin: '*'", "origin: true", "cors_origin_allow_all = true",
+            "cors_allow_all_origins = true", "cors_allow_all_origins=true", "supports_credentials=true",
+            "allow_credentials=true", "contentsecuritypolicy: false", "frameguard: false",
+            "x-frame-options\", \"allowall\"", "secure_ssl_redirect = false", "session_cookie_secure = false",
+            "csrf_cookie_secure = false", "session_cookie_httponly = false", "httponly: false",
+            "httponly=false", "samesite=none", "samesite: 'none'", "samesite: \"none\"",
+        ],
+        "exclude_paths": DOC_PATTERNS,
+    },
+    {
+        "name": "auth_bypass",
+        "category": "auth",
+        "severity": "critical",
+        "message": "Auth checks bypassed or weakened - test all auth flows",
+        "literals": [
+            "permitall()", "@permitall", "allowanonymous", "authorizationlevel.anonymous",
+            "permission_classes = []", "permission_classes=[]", "permission_classes = (allowany",
+            "permission_classes = [allowany", "permission_classes=[allowany", "authentication_classes = []",
+            "authentication_classes=[]", "skip_before_action :authenticate", "skip_before_action :require_login",
+            "skip_authorization", "skip_auth", "bypass_auth", "bypassauth", "disable_auth", "auth_disabled",
+            "auth_enabled = false", "auth_enabled=false", "auth_required=false", "auth_required = false",
+            "login_required=false", "require_auth=false", "authenticate=false", "no_auth=true",
+            "\"verify_signature\": false", "'verify_signature': false", "verify_signature=false",
+            "verify_exp\": false", "'verify_exp': false", "algorithms=[\"none\"]", "algorithms=['none']",
+            "algorithm=\"none\"", "algorithm='none'", "ignoreexpiration: true", "jwt.decode(token, verify=false",
+            "options={\"verify_signature\": false}", "is_superuser = true", "is_superuser=true",
+            "isadmin = true", "is_admin = true", "is_admin=true", "grant all privileges",
+        ],
+        "exclude_paths": DOC_PATTERNS + TEST_PATTERNS,
+    },
+    {
+        "name": "auth_check_removed",
+        "category": "auth",
+        "severity": "high",
+        "message": "Auth decorator or middleware removed - test all auth flows",
+        "lines": "removed",
+        "literals": [
+            "@login_required", "@permission_required", "@requires_auth", "@auth_required", "@auth.login_required",
+            "@jwt_required", "@fresh_jwt_required", "@token_required", "@authenticated", "@roles_required",
+            "@roles_accepted", "@requires_roles", "@requires_scope", "@requires_permission", "@admin_required",
+            "@staff_member_required", "@user_passes_test", "@permission_classes", "@authentication_classes",
+            "@preauthorize", "@postauthorize", "@secured(", "@rolesallowed", "@denyall", "[authorize",
+            "@useguards(", "authguard", "@authorize", "before_action :authenticate", "before_action :require_login",
+            "before_action :authorize", "before_filter :authenticate", "authorize!", "requireauth",
+            "ensureauthenticated", "isauthenticated", "passport.authenticate(", "verifytoken", "verify_token",
+            "depends(get_current_user", "depends(get_current_active_user", "security(oauth2_scheme",
+            "check_permission(", "has_permission(", "requirepermission", "middleware('auth", "middleware(\"auth",
+            "->middleware('auth", "authenticatejwt", "requirelogin", "loginrequiredmixin", "permissionrequiredmixin",
+            "userpassestestmixin", "isauthenticatedorreadonly",
+        ],
+        "exclude_paths": DOC_PATTERNS + TEST_PATTERNS,
+    },
+    {
+        "name": "api_route_removed",
+        "category": "api",
+        "severity": "high",
+        "message": "API route removed - verify contract compatibility for existing clients",
+        "lines": "removed",
+        "literals": [
+            "@app.route(", "@bp.route(", "@blueprint.route(", "@api.route(", "@router.get(", "@router.post(",
+            "@router.put(", "@router.patch(", "@router.delete(", "@app.get(", "@app.post(", "@app.put(",
+            "@app.patch(", "@app.delete(", "@app.api_route(", "@api_view(", "@action(detail",
+            "@getmapping", "@postmapping", "@putmapping", "@deletemapping", "@patchmapping", "@requestmapping",
+            "@get(\"/", "@post(\"/", "@put(\"/", "@delete(\"/", "@path(\"/", "[httpget", "[httppost",
+            "[httpput", "[httpdelete", "[httppatch", "[route(\"", "router.get(", "router.post(", "router.put(",
+            "router.patch(", "router.delete(", "router.route(", "app.get('/", "app.post('/", "app.put('/",
+            "app.delete('/", "app.patch('/", "app.get(\"/", "app.post(\"/", "app.put(\"/", "app.delete(\"/",
+            "route::get(", "route::post(", "route::put(", "route::delete(", "route::resource(",
+            "path(\"", "path('", "re_path(", "url(r'", "url(r\"", "handlefunc(\"/", ".handle(\"/",
+            "resources :", "resource :", "get '/", "post '/", "put '/", "delete '/",
+        ],
+        "exclude_paths": DOC_PATTERNS + TEST_PATTERNS,
+    },
+    {
+        "name": "feature_flag_removed",
+        "category": "config",
+        "severity": "medium",
+        "message": "Feature flag check removed - confirm the rollout finished before deleting the fallback",
+        "lines": "removed",
+        "literals": [
+            "feature_flag", "featureflag", "feature_enabled(", "is_feature_enabled", "isfeatureenabled",
+            "is_enabled(\"", "is_enabled('", "isenabled(\"", "isenabled('", "feature_toggle", "featuretoggle",
+            "feature_switch", "ldclient.variation(", "ld_client.variation(", ".variation(\"", ".variation('",
+            "boolvariation(", "launchdarkly", "flipper.enabled?", "flipper[:", "flag_is_active(",
+            "switch_is_active(", "waffle.", "unleash.isenabled(", "unleash.is_enabled(", "growthbook",
+            "optimizely", "gettreatment(", "flagsmith", "posthog.feature_enabled(", "configcat",
+            "split_client", "getfeaturevalue(", "getbooleanvalue(", "openfeature",
+        ],
+        "exclude_paths": DOC_PATTERNS + TEST_PATTERNS,
+    },
+    {
+        "name": "aws_access_key",
+        "category": "secrets",
+        "severity": "critical",
+        "message": "Possible secret committed - rotate it and load it from a secret store",
+        "literals": ["AKIA", "ASIA", "ABIA", "ACCA"],
+        "pattern": r"\b(?:AKIA|ASIA|ABIA|ACCA)[0-9A-Z]{16}\b",
+        "case_sensitive": True,
+        "redact": True,
+    },
+    {
+        "name": "private_key",
+        "category": "secrets",
+        "severity": "critical",
+        "message": "Possible secret committed - rotate it and load it from a secret store",
+        "literals": ["-----BEGIN"],
+        "pattern": r"-----BEGIN (?:[A-Z0-9]+ )*PRIVATE KEY(?: BLOCK)?-----",
+        "case_sensitive": True,
+        "redact": True,
+    },
+    {
+        "name": "github_token",
+        "category": "secrets",
+        "severity": "critical",
+        "message": "Possible secret committed - rotate it and load it from a secret store",
+        "literals": ["ghp_", "gho_", "ghu_", "ghs_", "ghr_", "github_pat_"],
+        "pattern": r"\b(?:gh[pousr]_[A-Za-z0-9]{36,}|github_pat_[A-Za-z0-9_]{60,})",
+        "case_sensitive": True,
+        "redact": True,
+    },
+    {
+        "name": "slack_token",
+        "category": "secrets",
+        "severity": "critical",
+        "message": "Possible secret committed - rotate it and load it from a secret store",
+        "literals": ["xoxb-", "xoxp-", "xoxa-", "xoxr-", "xoxs-", "xapp-", "hooks.slack.com/services/"],
+        "pattern": r"\bxox[abprs]-[A-Za-z0-9-]{10,}|\bxapp-[A-Za-z0-9-]{10,}|hooks\.slack\.com/services/T[A-Za-z0-9/]{10,}",
+        "case_sensitive": True,
+        "redact": True,
+    },
+    {
+        "name": "stripe_key",
+        "category": "secrets",
+        "severity": "critical",
+        "message": "Possible secret committed - rotate it and load it from a secret store",
+        "literals": ["sk_live_", "rk_live_"],
+        "pattern": r"\b[sr]k_live_[A-Za-z0-9]{20,}",
+        "case_sensitive": True,
+        "redact": True,
+    },
+    {
+        "name": "llm_api_key",
+        "category": "secrets",
+        "severity": "critical",
+        "message": "Possible secret committed - rotate it and load it from a secret store",
+        "literals": ["sk-ant-", "sk-proj-"],
+        "pattern": r"\bsk-(?:ant|proj)-[A-Za-z0-9_-]{20,}",
+        "case_sensitive": True,
+        "redact": True,
+    },
+    {
+        "name": "google_api_key",
+        "category": "secrets",
+        "severity": "critical",
+        "message": "Possible secret committed - rotate it and load it from a secret store",
+        "literals": ["AIza"],
+        "pattern": r"\bAIza[0-9A-Za-z_-]{35}",
+        "case_sensitive": True,
+        "redact": True,
+    },
+    {
+        "name": "hardcoded_credential",
+        "category": "secrets",
+        "severity": "high",
+        "message": "Possible secret committed - rotate it and load it from a secret store",
+        "literals": ["password", "passwd", "pwd", "secret", "api_key", "apikey", "api-key", "access_token",
+                     "auth_token", "private_key", "credentials"],
+        "pattern": r"(?:password|passwd|pwd|secret|api[_-]?key|access_token|auth_token|private_key|credentials)"
+                   r"[\w-]*[\"']?\s*(?::|=|=>)\s*[\"'][^\"'\s$%{}<>]{8,}[\"']",
+        "exclude_paths": DOC_PATTERNS + TEST_PATTERNS + EXAMPLE_PATTERNS,
+        "redact": True,
+    },
+    {
+        "name": "infrastructure_exposure",
+        "category": "infrastructure",
+        "severity": "high",
+        "message": "Infrastructure opened to the internet - check security groups, ingress and bucket policies",
+        "literals": [
+            "0.0.0.0/0", "::/0", "publicly_accessible = true", "publicly_accessible=true",
+            "publiclyaccessible: true", "map_public_ip_on_launch = true", "associate_public_ip_address = true",
+            "acl = \"public-read", "acl: public-read", "public-read-write", "block_public_acls = false",
+            "block_public_policy = false", "ignore_public_acls = false", "restrict_public_buckets = false",
+            "blockpublicacls: false", "blockpublicpolicy: false", "\"principal\": \"*\"", "\"principal\":\"*\"",
+            "principal: '*'", "principal: \"*\"", "\"aws\": \"*\"", "type: loadbalancer", "type: nodeport",
+            "hostport:", "authorizationtype: none", "authorization_type = \"none\"", "allusers",
+            "allauthenticatedusers", "public_network_access_enabled = true", "ingress.kubernetes.io/whitelist",
+        ],
+        "exclude_paths": DOC_PATTERNS,
+    },
+    {
+        "name": "infrastructure_data_protection",
+        "category": "infrastructure",
+        "severity": "high",
+        "message": "Infrastructure data protection turned off - check deletion protection, backups and encryption",
+        "literals": [
+            "deletion_protection = false", "deletion_protection=false", "deletionprotection: false",
+            "deletion_protection_enabled = false", "skip_final_snapshot = true", "skip_final_snapshot=true",
+            "force_destroy = true", "force_destroy=true", "prevent_destroy = false", "backup_retention_period = 0",
+            "backupretentionperiod: 0", "storage_encrypted = false", "storageencrypted: false", "encrypted = false",
+            "encrypted: false", "encrypted=false", "enable_key_rotation = false", "multi_az = false",
+            "removalpolicy.destroy", "removal_policy=removalpolicy.destroy", "deletionpolicy: delete",
+            "point_in_time_recovery_enabled = false", "pointintimerecoveryenabled: false",
+            "versioning_configuration { status = \"suspended\"", "status = \"suspended\"", "mfa_delete = false",
+            "apply_immediately = true", "allow_major_version_upgrade = true", "retain_on_delete = false",
+            "persistentvolumereclaimpolicy: delete", "reclaimpolicy: delete",
+        ],
+        "exclude_paths": DOC_PATTERNS,
+    },
+    {
+        "name": "infrastructure_wildcard_permissions",
+        "category": "infrastructure",
+        "severity": "high",
+        "message": "Infrastructure IAM or RBAC policy grants wildcard access",
+        "literals": [
+            "\"action\": \"*\"", "\"action\":\"*\"", "\"action\": [\"*\"]", "action: \"*\"", "action: '*'",
+            "actions = [\"*\"]", "\"*:*\"", "\"s3:*\"", "\"iam:*\"", "\"ec2:*\"", "\"kms:*\"", "\"sts:*\"",
+            "\"dynamodb:*\"", "\"lambda:*\"", "'s3:*'", "'iam:*'", "iam:passrole", "administratoraccess",
+            "poweruseraccess", "cluster-admin", "verbs: [\"*\"]", "verbs: ['*']", "- verbs: [\"*\"]",
+            "resources: [\"*\"]", "apigroups: [\"*\"]", "roles/owner", "roles/editor",
+        ],
+        "exclude_paths": DOC_PATTERNS,
+    },
+    {
+        "name": "container_privileges",
+        "category": "infrastructure",
+        "severity": "high",
+        "message": "Container given elevated privileges - Infrastructure review needed",
+        "literals": [
+            "privileged: true", "--privileged", "privileged = true", "allowprivilegeescalation: true",
+            "runasuser: 0", "runasnonroot: false", "runasgroup: 0", "hostnetwork: true", "hostpid: true",
+            "hostipc: true", "host_network = true", "network_mode: host", "--net=host", "--network=host",
+            "cap_add", "capabilities: add", "sys_admin", "net_admin", "/var/run/docker.sock",
+            "readonlyrootfilesystem: false", "seccompprofile: unconfined", "seccomp:unconfined",
+            "apparmor:unconfined", "hostpath:", "user root", "user: root", "user: \"0\"", "--cap-add",
+        ],
+        "exclude_paths": DOC_PATTERNS,
+    },
+    {
+        "name": "weak_crypto",
+        "category": "security",
+        "severity": "medium",
+        "message": "Weak cryptography added - use a modern hash, cipher or TLS version",
+        "literals": [
+            "md5(", "md5.new(", "sha1(", "sha1.new(", "\"md5\"", "'md5'", "\"sha1\"", "'sha1'", "\"sha-1\"",
+            "des.new(", "des3.new(", "arc4.new(", "rc4", "blowfish", "mode_ecb", "/ecb/", "\"des\"", "'des'",
+            "des-cbc", "des-ede", "createcipher(", "messagedigest.getinstance(\"md5", "crypt_md5",
+            "protocol_tlsv1", "protocol_sslv2", "protocol_sslv3", "tlsv1_method", "sslv3_method",
+            "tlsv1.0", "tls1.0", "ssl_protocols sslv3", "ssl_protocols tlsv1 ", "minversion: 'tlsv1'",
+            "tls.versiontls10", "securityprotocoltype.ssl3", "securityprotocoltype.tls ", "rsa.generate(1024",
+            "key_size=1024", "keysize: 1024", "pbkdf2_sha1",
+        ],
+        "exclude_paths": DOC_PATTERNS,
+    },
+    {
+        "name": "sql_string_building",
+        "category": "security",
+        "severity": "high",
+        "message": "SQL built from strings - use parameterized queries",
+        "literals": ["\"select ", "'select ", "\"insert ", "'insert ", "\"update ", "'update ", "\"delete ",
+                     "'delete ", "`select ", "`insert ", "`update ", "`delete ", "execute(f", ".raw(f"],
+        "pattern": r"\bf[\"'](?:select|insert|update|delete)\b"
+                   r"|[\"'](?:select|insert|update|delete)\b[^\"']*[\"']\s*(?:%\s*[\w(]|\+|\.format\()"
+                   r"|`(?:select|insert|update|delete)\b[^`]*\$\{"
+                   r"|\b(?:execute|executemany|raw)\(\s*f[\"']",
+        "exclude_paths": DOC_PATTERNS,
+    },
+    {
+        "name": "raw_html_output",
+        "category": "security",
+        "severity": "medium",
+        "message": "Raw HTML rendering added - check output escaping (XSS)",
+        "literals": [
+            "dangerouslysetinnerhtml", ".innerhtml =", ".innerhtml=", ".innerhtml +=", ".outerhtml =",
+            "document.write(", "document.writeln(", "insertadjacenthtml(", "v-html", "[innerhtml]",
+            "|safe", "| safe", "mark_safe(", "markup(", "{% autoescape off", "autoescape=false",
+            "autoescape: false", ".html_safe", "html_safe(", "raw(@", "@html.raw(", "<%- ", "{!! ",
+            "bypasssecuritytrusthtml", "bypasssecuritytrustscript", "bypasssecuritytrusturl",
+            "bypasssecuritytrustresourceurl", "$sce.trustashtml", "trustashtml(", "ng-bind-html",
+            "template.html(",
+        ],
+        "exclude_paths": DOC_PATTERNS,
+    },
+    {
+        "name": "debug_leftover",
+        "category": "quality",
+        "severity": "low",
+        "message": "Debugging code left in - remove before release",
+        "literals": [
+            "pdb.set_trace(", "ipdb.set_trace(", "pudb.set_trace(", "breakpoint()", "import pdb",
+            "import ipdb", "from pdb import", "debugger;", "binding.pry", "binding.irb", "byebug",
+            "var_dump(", "print_r(", "console.trace(", "debug = true", "debug=true", "debug: true",
+            "app.run(debug=true", "flask_debug=1", "debug_toolbar", "show_exceptions = true",
+            "runtime.breakpoint(", "__debugbreak(",
+        ],
+        "exclude_paths": DOC_PATTERNS,
+    },
+    {
+        "name": "error_handling_relaxed",
+        "category": "quality",
+        "severity": "medium",
+        "message": "Errors silently swallowed or ignored - failures may go unnoticed",
+        "literals": [
+            "except:", "except exception: pass", "except baseexception: pass",
+            "contextlib.suppress(exception", "suppress(exception)", "catch (e) {}", "catch(e){}",
+            "catch (err) {}", "catch (_) {}", "catch {}", "catch (exception e) {}", "catch (throwable",
+            ".catch(() => {})", ".catch(()=>{})", ".catch(noop)", "rescue nil", "rescue exception",
+            "on error resume next", "_ = err", "|| true", "set +e", "ignore_errors: true",
+            "ignore_errors: yes", "ignore_errors=true", "failed_when: false", "continue-on-error: true",
+            "allow_failure: true", "ignoreerrors: true", "@suppress(\"", "error_reporting(0)",
+        ],
+        "exclude_paths": DOC_PATTERNS,
+    },
+    {
+        "name": "checks_disabled",
+        "category": "quality",
+        "severity": "low",
+        "message": "Tests or checks skipped or disabled",
+        "literals": [
+            "@pytest.mark.skip", "@pytest.mark.xfail", "@unittest.skip", "pytest.skip(", "self.skiptest(",
+            "it.skip(", "describe.skip(", "test.skip(", "xdescribe(", "it.todo(", "@disabled", "@ignore",
+            "t.skip(", "[ignore]", "[fact(skip", "@ts-nocheck", "eslint-disable */", "# nosec", "nosemgrep",
+            "--no-verify", "[skip ci]", "[ci skip]", "skip_ci", "--no-tests", "-dskiptests", "--skip-tests",
+            "-dmaven.test.skip", "fail_under = 0", "--cov-fail-under=0",
+        ],
+        "exclude_paths": DOC_PATTERNS,
+    },
+    {
+        "name": "destructive_operation",
+        "category": "operations",
+        "severity": "high",
+        "message": "Recursive or forced deletion added - check the target cannot be empty or user-controlled",
+        "literals": [
+            "rm -rf", "rm -fr", "rm -r ", "rm --recursive", "shutil.rmtree(", "fs.rmsync(", "fs.rmdirsync(",
+            "fs.rm(", "rimraf", "fileutils.rm_rf", "fileutils.rm_r", "fileutils.deletedirectory(",
+            "os.removedirs(", "remove-item -recurse", "remove-item -force", "rd /s", "rmdir /s", "del /f",
+            "del /s", "git push --force", "git push -f", "git reset --hard", "git clean -f", "kubectl delete",
+            "terraform destroy", "pulumi destroy", "helm uninstall", "helm delete", "aws s3 rm", "aws s3 rb",
+            "gsutil rm", "gsutil -m rm", "az group delete", "dropdb ", "mkfs", "dd if=", "> /dev/sd",
+        ],
+        "exclude_paths": DOC_PATTERNS,
+    },
+    {
+        "name": "permissive_file_permissions",
+        "category": "security",
+        "severity": "medium",
+        "message": "World-writable or world-readable file permissions set",
+        "literals": ["chmod 777", "chmod -r 777", "chmod 666", "chmod 0777", "chmod a+rwx", "chmod a+w",
+                     "chmod o+w", "chmod -r a+w", "0o777", "0o666", "mode: '0777'", "mode: \"0777\"",
+                     "mode: 0777", "umask(0)", "umask 000", "umask 0000", "os.chmod(", "fs.chmodsync("],
+        "pattern": r"chmod\b.*\b(?:0?777|0?666|a\+w|a\+rwx|o\+w)\b|\b0o?(?:777|666)\b|mode:\s*[\"']?0?777|umask\s*\(?\s*0+\b",
+        "exclude_paths": DOC_PATTERNS,
+    },
+    {
+        "name": "pipe_to_shell",
+        "category": "supply_chain",
+        "severity": "high",
+        "message": "Remote script piped into a shell - pin and verify downloads",
+        "literals": ["| bash", "|bash", "| sh", "|sh", "| sudo", "| zsh", "| python", "| iex", "iex(", "iex ("],
+        "pattern": r"\b(?:curl|wget|invoke-webrequest|iwr|irm)\b.*\|\s*(?:sudo\s+)?(?:ba|z)?sh\b"
+                   r"|\b(?:curl|wget)\b.*\|\s*(?:sudo\s+)?python\d?\b|\biex\s*\(\s*(?:new-object|iwr|irm|invoke-)",
+        "exclude_paths": DOC_PATTERNS,
+    },
+    {
+        "name": "untrusted_package_source",
+        "category": "supply_chain",
+        "severity": "medium",
+        "message": "Dependencies installed from an untrusted or unpinned source",
+        "literals": ["--trusted-host", "--extra-index-url", "--index-url http://", "index-url = http://",
+                     "git+http://", "git+git://", "registry=http://", "\"registry\": \"http://",
+                     "source 'http://", "source \"http://", "--allow-unauthenticated", "--force-yes",
+                     "gpgcheck=0", "sslverify=0", "strict-ssl=false", "npm config set strict-ssl false",
+                     "gem install --trust-policy nosecurity", "--no-verify-checksum", "insecure-skip-verify"],
+        "exclude_paths": DOC_PATTERNS,
+    },
+]
+
+
+def char_frequency(char: str) -> float:
+    """Per-mille frequency of a character in code, for picking rare anchors."""
+    frequency = CHAR_FREQUENCY.get(char)
+    if frequency is not None:
+        return frequency
+    lower = char.lower()
+    if lower != char and lower in CHAR_FREQUENCY:
+        # Upper-case letters, for case-sensitive literals
+        return CHAR_FREQUENCY[lower] / 4
+    return RARE_CHAR_FREQUENCY
+
+
+def _byte_frequency(byte: int) -> float:
+    return char_frequency(chr(byte)) if byte < 0x80 else RARE_CHAR_FREQUENCY
+
+
+class LiteralMatcher:
+    """Finds every occurrence of a set of literals, overlapping ones included.
+
+    Python's standard library has no Aho-Corasick automaton, and a regex
+    alternation of hundreds of literals is much slower than a pass per
+    literal. Instead each literal is anchored on one of its bytes, chosen
+    so that a few rare bytes cover every literal, and every anchor gets one
+    compiled regex: the anchor byte, then a trie of what follows it in each
+    literal, then a trie of lookbehinds for what precedes it. The regex
+    engine jumps from anchor to anchor with a fast byte search, and a class
+    of the possible neighbouring bytes rejects most stops straight away, so
+    a scan costs one quick pass per anchor.
+
+    Texts are scanned as bytes; offsets are byte offsets.
+    """
+
+    def __init__(self, literals: Iterable[bytes]):
+        """Initialize literal matcher."""
+        self.literals: List[bytes] = list(dict.fromkeys(literal for literal in literals if literal))
+        placements = _place_anchors(self.literals)
+        self.anchors = list(dict.fromkeys(self.literals[index][position] for index, position in placements))
+
+        groups: Dict[int, List[Tuple[int, int]]] = {anchor: [] for anchor in self.anchors}
+        for index, position in placements:
+            groups[self.literals[index][position]].append((index, position))
+        self._scans: List[Tuple["re.Pattern", List[Tuple[int, int]]]] = [
+            (self._compile(anchor, entries), entries) for anchor, entries in groups.items()
+        ]
+
+    def finditer(self, data: bytes) -> Iterator[Tuple[int, int]]:
+        """Yield (start offset, literal index) for every occurrence, grouped by anchor."""
+        literals = self.literals
+        for regex, entries in self._scans:
+            for match in regex.finditer(data):
+                position = match.start()
+                for index, prefix in entries:
+                    start = position - prefix
+                    if start >= 0 and data.startswith(literals[index], start):
+                        yield start, index
+
+    def _compile(self, anchor: int, entries: List[Tuple[int, int]]) -> "re.Pattern":
+        """Regex matching the anchor wherever one of its literals surrounds it."""
+        forward: dict = {}
+        for index, position in entries:
+            literal = self.literals[index]
+            node = forward
+            for byte in literal[position + 1:]:
+                node = node.setdefault(byte, {})
+            # Under None: a trie of the bytes before the anchor, last byte first
+            backward = node.setdefault(None, {})
+            for byte in reversed(literal[:position]):
+                backward = backward.setdefault(byte, {})
+            backward[None] = {}
+        head = re.escape(bytes([anchor]))
+        # Only the anchor is consumed, so literals that overlap themselves
+        # ("abab" in "ababab") are found at every start
+        return re.compile(head + b"(?=" + _forward_pattern(forward, head) + b")")
+
+
+def _place_anchors(literals: List[bytes]) -> List[Tuple[int, int]]:
+    """Pick an anchor position in every literal so the anchors are few and rare.
+
+    Greedy weighted set cover: each new anchor byte costs a pass over the
+    text plus a stop at each of its occurrences, and every stop whose
+    neighbouring byte also matches costs more.
+
+    Returns:
+        (literal index, anchor position) pairs
+    """
+    # Best position and its neighbour's frequency, per literal and byte
+    options: List[Dict[int, Tuple[float, int]]] = []
+    for literal in literals:
+        best: Dict[int, Tuple[float, int]] = {}
+        for position, byte in enumerate(literal):
+            neighbour = _neighbour_frequency(literal, position)
+            if byte not in best or neighbour < best[byte][0]:
+                best[byte] = (neighbour, position)
+        options.append(best)
+
+    placements = []
+    chosen = set()
+    uncovered = set(range(len(literals)))
+    while uncovered:
+        candidates: Dict[int, List[int]] = {}
+        for index in uncovered:
+            for byte in options[index]:
+                candidates.setdefault(byte, []).append(index)
+
+        def cost_per_literal(byte: int) -> Tuple[float, int]:
+            covered = candidates[byte]
+            frequency = _byte_frequency(byte)
+            cost = 0.0 if byte in chosen else ANCHOR_PASS_COST + frequency
+            cost += frequency * MATCH_STOP_COST * sum(options[index][byte][0] for index in covered) / 1000
+            return cost / len(covered), byte
+
+        anchor = min(candidates, key=cost_per_literal)
+        chosen.add(anchor)
+        for index in candidates[anchor]:
+            placements.append((index, options[index][anchor][1]))
+        uncovered.difference_update(candidates[anchor])
+    return sorted(placements)
+
+
+def _neighbour_frequency(literal: bytes, position: int) -> float:
+    """Frequency of the byte the anchor's first check looks at (1000 if there is none)."""
+    if position + 1 < len(literal):
+        return _byte_frequency(literal[position + 1])
+    if position > 0:
+        return _byte_frequency(literal[position - 1])
+    return 1000.0
+
+
+def _forward_pattern(node: dict, tail: bytes) -> bytes:
+    """Regex for the bytes after the anchor; `tail` is the escaped text matched so far."""
+    alternatives = []
+    backward = node.get(None)
+    if backward is not None:
+        alternatives.append(_backward_pattern(backward, tail))
+    children = sorted(key for key in node if key is not None)
+    for byte in children:
+        escaped = re.escape(bytes([byte]))
+        alternatives.append(escaped + _forward_pattern(node[byte], tail + escaped))
+    return _alternation(alternatives, children if backward is None else [], b"(?=[", b"])")
+
+
+def _backward_pattern(node: dict, tail: bytes) -> bytes:
+    """Lookbehinds for the bytes before the anchor, nearest first."""
+    if None in node:
+        # A literal ends here: the match is complete
+        return b""
+    children = sorted(node)
+    alternatives = []
+    for byte in children:
+        escaped = re.escape(bytes([byte])) + tail
+        alternatives.append(b"(?<=" + escaped + b")" + _backward_pattern(node[byte], escaped))
+    return _alternation(alternatives, children, b"(?<=[", b"]" + tail + b")")
+
+
+def _alternation(alternatives: List[bytes], guard: List[int], open_guard: bytes, close_guard: bytes) -> bytes:
+    if len(alternatives) == 1:
+        return alternatives[0]
+    pattern = b"(?:" + b"|".join(alternatives) + b")"
+    if len(guard) > 2:
+        # One class test rejects most positions before any branch is tried
+        pattern = open_guard + b"".join(re.escape(bytes([byte])) for byte in guard) + close_guard + pattern
+    return pattern
+
+
+class NgramMatcher:
+    """Finds every occurrence of a set of literals with vectorized n-gram filters.
+
+    Needs NumPy; RiskScanner uses LiteralMatcher without it. Each literal is
+    represented by a window of up to NGRAM_WINDOW of its bytes, placed where
+    it is rarest in code. A scan reads the text as overlapping little-endian
+    words, one starting at every byte: the first NGRAM_PREFIX bytes of each
+    word are hashed into a table of window prefixes, the few positions that
+    pass have their words compared with the windows exactly, and only those
+    are checked against whole literals. The text is read once whatever the
+    number of literals.
+
+    Texts are scanned as bytes; offsets are byte offsets.
+    """
+
+    def __init__(self, literals: Iterable[bytes]):
+        """Initialize n-gram matcher."""
+        import numpy as np
+
+        self._np = np
+        self.literals: List[bytes] = list(dict.fromkeys(literal for literal in literals if literal))
+
+        # (window width, window as a little-endian integer) -> [(literal index, window offset)]
+        self._windows: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+        for index, literal in enumerate(self.literals):
+            position = _place_window(literal)
+            window = literal[position:position + NGRAM_WINDOW]
+            self._windows.setdefault((len(window), int.from_bytes(window, "little")), []).append((index, position))
+
+        # Literals of one or two bytes only fit a shorter prefix; windows of
+        # three bytes are entered once per possible fourth byte.
+        self._prefix_width = min([NGRAM_PREFIX] + [width for width, _ in self._windows if width < 3])
+        prefixes = []
+        for width, key in self._windows:
+            prefix = key & _byte_mask(self._prefix_width)
+            if width >= self._prefix_width:
+                prefixes.append(prefix)
+            else:
+                prefixes.extend(prefix | last << 8 * width for last in range(256))
+        self._table = np.zeros(1 << NGRAM_TABLE_BITS, dtype=bool)
+        self._table[_hash_prefixes(np, np.array(prefixes, dtype=np.uint32))] = True
+
+        keys: Dict[int, List[int]] = {}
+        for width, key in self._windows:
+            keys.setdefault(width, []).append(key)
+        # Sorted windows of each width, for a binary search per candidate
+        self._keys = {width: np.array(sorted(found), dtype=np.uint64) for width, found in keys.items()}
+
+    def finditer(self, data: bytes) -> Iterator[Tuple[int, int]]:
+        """Yield (start offset, literal index) for every occurrence, grouped by window width."""
+        np = self._np
+        size = len(data)
+        if not size or not self._windows:
+            return
+
+        # Overlapping words starting at every byte, over zero padding
+        padded = data + bytes(7)
+        prefixes = np.ndarray((size,), dtype="<u4", buffer=padded, strides=(1,))
+        words = np.ndarray((size,), dtype="<u8", buffer=padded, strides=(1,))
+
+        chunk = min(size, NGRAM_CHUNK)
+        hashes = np.empty(chunk, dtype=np.uint32)
+        passed = np.empty(chunk, dtype=bool)
+        candidates = []
+        for start in range(0, size, chunk):
+            count = min(chunk, size - start)
+            block = prefixes[start:start + count]
+            if self._prefix_width < NGRAM_PREFIX:
+                block = np.bitwise_and(block, np.uint32(_byte_mask(self._prefix_width)), out=hashes[:count])
+            _hash_prefixes(np, block, out=hashes[:count])
+            np.take(self._table, hashes[:count], out=passed[:count])
+            found = np.flatnonzero(passed[:count])
+            if len(found):
+                candidates.append(found + start)
+        if not candidates:
+            return
+
+        positions = np.concatenate(candidates)
+        grams = words[positions]
+        literals = self.literals
+        for width, keys in self._keys.items():
+            windows = grams & np.uint64(_byte_mask(width)) if width < 8 else grams
+            slots = np.minimum(np.searchsorted(keys, windows), len(keys) - 1)
+            matched = keys[slots] == windows
+            for position, key in zip(positions[matched].tolist(), windows[matched].tolist()):
+                for index, offset in self._windows[width, key]:
+                    start = position - offset
+                    if start >= 0 and data.startswith(literals[index], start):
+                        yield start, index
+
+
+def literal_matcher(literals: Iterable[bytes]):
+    """An NgramMatcher over the literals, or a LiteralMatcher if NumPy is not installed."""
+    try:
+        return NgramMatcher(literals)
+    except ImportError:
+        return LiteralMatcher(literals)
+
+
+def _place_window(literal: bytes) -> int:
+    """Offset of a literal's n-gram window: the full window whose first NGRAM_PREFIX bytes are rarest."""
+    last = max(len(literal) - NGRAM_WINDOW, 0)
+    return min(
+        range(last + 1),
+        key=lambda position: (_ngram_frequency(literal[position:position + NGRAM_PREFIX]), position)
+    )
+
+
+def _ngram_frequency(gram: bytes) -> float:
+    """Relative frequency of a byte sequence in code, from its bytes' frequencies."""
+    frequency = 1.0
+    for position, byte in enumerate(gram):
+        frequency *= _byte_frequency(byte)
+        if position and _is_word_byte(gram[position - 1]) and _is_word_byte(byte):
+            frequency *= WORD_CONTINUATION_WEIGHT
+    return frequency
+
+
+def _is_word_byte(byte: int) -> bool:
+    return byte == 0x5F or 0x30 <= byte <= 0x39 or 0x61 <= byte <= 0x7A or 0x41 <= byte <= 0x5A
+
+
+def _byte_mask(width: int) -> int:
+    return (1 << 8 * width) - 1
+
+
+def _hash_prefixes(np, prefixes, out=None):
+    """Multiplicative hash of 32-bit prefixes into NGRAM_TABLE_BITS bits."""
+    out = np.multiply(prefixes, np.uint32(NGRAM_HASH_MULTIPLIER), out=out)
+    return np.right_shift(out, np.uint32(32 - NGRAM_TABLE_BITS), out=out)
+
+
+class _CompiledRule:
+    """A rule dictionary with its paths and regex prepared for scanning."""
+
+    __slots__ = ("rule", "index", "side", "pattern", "paths", "exclude_paths", "redact", "has_literals")
+
+    def __init__(self, rule: dict, index: int):
+        if not rule.get("name") or not rule.get("message"):
+            raise ValueError(f"Risk rule needs a name and a message: {rule!r}")
+        if not rule.get("literals") and not rule.get("pattern"):
+            raise ValueError(f"Risk rule {rule['name']!r} needs literals or a pattern")
+        side = rule.get("lines", "added")
+        if side not in ("added", "removed"):
+            raise ValueError(f"Risk rule {rule['name']!r} has unknown lines {side!r}")
+        if rule.get("severity", "medium") not in SEVERITIES:
+            raise ValueError(f"Risk rule {rule['name']!r} has unknown severity {rule.get('severity')!r}")
+
+        self.rule = rule
+        self.index = index
+        self.side = side
+        flags = 0 if rule.get("case_sensitive") else re.IGNORECASE
+        self.pattern = re.compile(rule["pattern"], flags | re.MULTILINE) if rule.get("pattern") else None
+        self.paths = _PathGlobs(rule.get("paths") or [])
+        self.exclude_paths = _PathGlobs(rule.get("exclude_paths") or [])
+        self.redact = bool(rule.get("redact"))
+        self.has_literals = bool(rule.get("literals"))
+
+    def applies_to(self, filename: str, basename: Optional[str] = None) -> bool:
+        """Whether the rule's path globs select a file."""
+        basename = basename if basename is not None else posixpath.basename(filename)
+        if self.paths and not self.paths.match(filename, basename):
+            return False
+        return not self.exclude_paths.match(filename, basename)
+
+
+class _PathGlobs:
+    """Path globs compiled into one regex for basenames and one for full paths."""
+
+    __slots__ = ("basename", "path")
+
+    def __init__(self, patterns: List[str]):
+        self.basename = _glob_regex([pattern for pattern in patterns if "/" not in pattern])
+        self.path = _glob_regex([pattern for pattern in patterns if "/" in pattern])
+
+    def __bool__(self) -> bool:
+        return self.basename is not None or self.path is not None
+
+    def match(self, filename: str, basename: str) -> bool:
+        """Whether any glob matches the file."""
+        if self.basename is not None and self.basename.match(basename):
+            return True
+        return self.path is not None and self.path.match(filename) is not None
+
+
+def _glob_regex(patterns: List[str]) -> Optional["re.Pattern"]:
+    return re.compile("|".join(translate(pattern) for pattern in patterns)) if patterns else None
+
+
+class RiskScanner:
+    """Scans parsed diffs against a table of risky-change rules."""
+
+    def __init__(self,
+                 rules: Optional[List[dict]] = None,
+                 max_findings: int = DEFAULT_MAX_FINDINGS,
+                 max_findings_per_rule: int = DEFAULT_MAX_FINDINGS_PER_RULE):
+        """Initialize risk scanner.
+
+        Args:
+            rules: Rule dictionaries; defaults to DEFAULT_RISK_RULES. Rules
+                with `"enabled": false` are skipped.
+            max_findings: Stop after this many findings across the diff
+            max_findings_per_rule: Findings kept per rule and file
+        """
+        rules = rules if rules is not None else DEFAULT_RISK_RULES
+        self.rules = [
+            _CompiledRule(rule, index)
+            for index, rule in enumerate(rule for rule in rules if rule.get("enabled", True))
+        ]
+        self.max_findings = max_findings
+        self.max_findings_per_rule = max_findings_per_rule
+        self._logger = logger
+
+        # Lowercased literal -> (rule, exact literal for case-sensitive rules).
+        # Every literal goes into one matcher over the lowercased patch;
+        # case-sensitive hits are checked against the original bytes.
+        owners: Dict[bytes, List[Tuple[_CompiledRule, Optional[bytes]]]] = {}
+        for compiled in self.rules:
+            case_sensitive = bool(compiled.rule.get("case_sensitive"))
+            for literal in compiled.rule.get("literals") or []:
+                key = literal.encode("utf-8")
+                # bytes.lower() only folds ASCII letters, like the scanned text
+                owners.setdefault(key.lower(), []).append((compiled, key if case_sensitive else None))
+        self._matcher = literal_matcher(owners)
+        self._owners = [owners[literal] for literal in self._matcher.literals]
+        self._pattern_rules = [compiled for compiled in self.rules if not compiled.has_literals]
+
+    def scan(self, diff: ParsedDiff) -> List[dict]:
+        """Find risky changes in every file of a diff.
+
+        Returns:
+            Finding dictionaries (see `scan_file`), file by file, capped at
+            max_findings
+        """
+        findings: List[dict] = []
+        for parsed in diff.files:
+            findings.extend(self.scan_file(parsed))
+            if len(findings) >= self.max_findings:
+                self._logger.info("Risk findings truncated", max_findings=self.max_findings)
+                return findings[:self.max_findings]
+        return findings
+
+    def scan_file(self, parsed: ParsedFile) -> List[dict]:
+        """Find risky changes in one file.
+
+        Returns:
+            Finding dictionaries with the rule's name, category, severity
+            and message, plus filename, line (new-file line for added lines,
+            old-file line for removed ones), column, side, hunk header and
+            the matched line (secrets redacted), ordered by position
+        """
+        basename = posixpath.basename(parsed.filename)
+        rules = [compiled for compiled in self.rules if compiled.applies_to(parsed.filename, basename)]
+        sides = {compiled.side for compiled in rules}
+        if not any(self._runs(parsed, side) for side in sides):
+            return []
+        applicable = {compiled.index for compiled in rules}
+
+        patch = parsed.patch()
+        data = patch.encode("utf-8", "surrogatepass")
+        hits = []
+        literals = self._matcher.literals
+        for start, literal_index in self._matcher.finditer(data.lower()):
+            for compiled, exact in self._owners[literal_index]:
+                if compiled.index in applicable and (exact is None or data.startswith(exact, start)):
+                    hits.append((start, compiled.index, len(literals[literal_index])))
+        hits.sort()
+        if len(data) != len(patch):
+            hits = _text_offsets(data, hits)
+        locators = {side: self._runs(parsed, side).locator(patch) for side in sides}
+
+        findings = []
+        seen = set()
+        per_rule = Counter()
+        for start, rule_index, length in hits:
+            compiled = self.rules[rule_index]
+            if per_rule[rule_index] >= self.max_findings_per_rule:
+                continue
+            position = locators[compiled.side](start)
+            if position is None or position[1] < 0:
+                continue
+            line_number, column = position
+            if (rule_index, compiled.side, line_number) in seen:
+                continue
+
+            line_start = start - column
+            line_end = patch.find("\n", start)
+            line = patch[line_start:line_end if line_end >= 0 else len(patch)]
+            span = (column, column + length)
+            if compiled.pattern is not None:
+                match = compiled.pattern.search(line)
+                if match is None:
+                    continue
+                span = match.span()
+
+            seen.add((rule_index, compiled.side, line_number))
+            per_rule[rule_index] += 1
+            findings.append(self._finding(compiled, parsed, line_number, line, span))
+
+        for compiled in self._pattern_rules:
+            if compiled.index in applicable:
+                findings.extend(self._scan_pattern(compiled, parsed))
+
+        findings.sort(key=lambda finding: (finding["side"] != "added", finding["line"], finding["column"]))
+        return findings
+
+    def summarize(self, findings: List[dict]) -> List[str]:
+        """Distinct finding messages, most severe first."""
+        ranked = sorted(
+            enumerate(findings),
+            key=lambda item: (SEVERITIES.index(item[1]["severity"]), item[0])
+        )
+        return list(dict.fromkeys(finding["message"] for _, finding in ranked))
+
+    def _scan_pattern(self, compiled: _CompiledRule, parsed: ParsedFile) -> List[dict]:
+        """Run a regex-only rule over the joined lines of its side."""
+        text = parsed.added_text() if compiled.side == "added" else parsed.removed_text()
+        findings = []
+        for match in compiled.pattern.finditer(text.text):
+            line_number, column = text.position(match.start())
+            line_start = match.start() - column
+            line_end = text.text.find("\n", match.start())
+            line = text.text[line_start:line_end if line_end >= 0 else len(text.text)]
+            findings.append(self._finding(
+                compiled, parsed, line_number, line, (column, column + len(match.group()))
+            ))
+            if len(findings) >= self.max_findings_per_rule:
+                break
+        return findings
+
+    def _finding(self, compiled: _CompiledRule, parsed: ParsedFile, line_number: int,
+                 line: str, span: Tuple[int, int]) -> dict:
+        rule = compiled.rule
+        hunk = parsed.hunk_for_line(line_number, old=compiled.side == "removed")
+        if compiled.redact:
+            start, end = span
+            line = line[:start] + line[start:min(end, start + 4)] + "****" + line[end:]
+        return {
+            "rule": rule["name"],
+            "category": rule.get("category", "other"),
+            "severity": rule.get("severity", "medium"),
+            "message": rule["message"],
+            "filename": parsed.filename,
+            "line": line_number,
+            "column": span[0],
+            "side": compiled.side,
+            "hunk": _hunk_header(hunk) if hunk is not None else None,
+            "match": line.strip()[:SNIPPET_LENGTH],
+        }
+
+    def _runs(self, parsed: ParsedFile, side: str) -> LineRuns:
+        return parsed.added_runs if side == "added" else parsed.removed_runs
+
+
+def _text_offsets(data: bytes, hits: List[Tuple[int, int, int]]) -> List[Tuple[int, int, int]]:
+    """Convert sorted (byte offset, rule, byte length) hits of non-ASCII text to character offsets."""
+    converted = []
+    byte_offset = char_offset = 0
+    for start, rule_index, length in hits:
+        char_offset += len(data[byte_offset:start].decode("utf-8", "surrogatepass"))
+        byte_offset = start
+        converted.append((char_offset, rule_index, len(data[start:start + length].decode("utf-8", "surrogatepass"))))
+    return converted
+
+
+def _hunk_header(hunk) -> str:
+    header = f"@@ -{hunk.old_start},{hunk.old_count} +{hunk.new_start},{hunk.new_count} @@"
+    return f"{header} {hunk.section}" if hunk.section else header
+
+
+def merge_rules(rules: List[dict], overrides: List[dict]) -> List[dict]:
+    """Apply rule overrides by name; unknown names are appended as new rules."""
+    merged = {rule["name"]: dict(rule) for rule in rules}
+    for override in overrides:
+        name = override.get("name")
+        if name in merged:
+            merged[name].update(override)
+        else:
+            merged[name] = dict(override)
+    return list(merged.values())
+
+
+def create_risk_scanner() -> RiskScanner:
+    """Factory function to create a risk scanner from environment settings.
+
+    RISK_RULES_FILE             - JSON list of rules; entries named like a default
+                                  rule override its fields ("enabled": false turns
+                                  it off), others are added
+    RISK_SCAN_MAX_FINDINGS      - findings kept per diff (default 200)
+    RISK_SCAN_MAX_PER_RULE      - findings kept per rule and file (default 5)
+    """
+    rules = DEFAULT_RISK_RULES
+    rules_file = os.getenv("RISK_RULES_FILE")
+    if rules_file:
+        with open(rules_file) as f:
+            rules = merge_rules(DEFAULT_RISK_RULES, json.load(f))
+
+    return RiskScanner(
+        rules,
+        max_findings=int(os.getenv("RISK_SCAN_MAX_FINDINGS", DEFAULT_MAX_FINDINGS)),
+        max_findings_per_rule=int(os.getenv("RISK_SCAN_MAX_PER_RULE", DEFAULT_MAX_FINDINGS_PER_RULE))
+    )
+
+
+_shared_scanner: Optional[RiskScanner] = None
+_shared_scanner_lock = threading.Lock()
+
+
+def get_risk_scanner() -> RiskScanner:
+    """Return the process-wide risk scanner, compiling its rules on first use."""
+    global _shared_scanner
+    with _shared_scanner_lock:
+        if _shared_scanner is None:
+            _shared_scanner = create_risk_scanner()
+        return _shared_scanner
@@ -0,0 +1,104 @@
+"""Request coalescing for identical concurrent calls."""
+
+import asyncio
+import threading
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call:
+    """An in-flight call shared by every caller with the same key."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time.
+
+    Callers that arrive while a call for their key is in flight wait for it
+    and receive its result, or re-raise its exception. Nothing is cached:
+    once the call finishes, the next caller starts a new one.
+    """
+
+    def __init__(self):
+        """Initialize single-flight group."""
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "executions": 0, "coalesced": 0}
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """Run `fn`, or wait for the in-flight call with the same key."""
+        with self._lock:
+            self._stats["calls"] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._stats["executions"] += 1
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self) -> dict:
+        """Return call counters."""
+        with self._lock:
+            return {**self._stats, "in_flight": len(self._calls)}
+
+
+class AsyncSingleFlight:
+    """SingleFlight for coroutines on a single event loop.
+
+    The shared call runs as its own task, and every caller, the one that
+    started it included, awaits it through asyncio.shield. A caller that is
+    cancelled (e.g. its client disconnected) leaves the call running for
+    the others.
+    """
+
+    def __init__(self):
+        """Initialize single-flight group."""
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self._stats = {"calls": 0, "executions": 0, "coalesced": 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Await `fn()`, or the in-flight call with the same key."""
+        self._stats["calls"] += 1
+        call = self._calls.get(key)
+        if call is not None:
+            self._stats["coalesced"] += 1
+        else:
+            self._stats["executions"] += 1
+            call = self._calls[key] = asyncio.ensure_future(fn())
+            call.add_done_callback(lambda done: self._finished(key, done))
+        return await asyncio.shield(call)
+
+    def _finished(self, key: Hashable, call: asyncio.Task):
+        """Forget a finished call so the next caller starts a new one."""
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.cancelled():
+            # Mark the exception retrieved when every caller went away
+            call.exception()
+
+    def stats(self) -> dict:
+        """Return call counters."""
+        return {**self._stats, "in_flight": len(self._calls)}
@@ -0,0 +1,257 @@
+"""Lightweight tracing: nested spans with trace IDs and attributes.
+
+Spans nest through a context variable, so a span opened inside another (in
+the same thread or asyncio task) becomes its child. Work handed to a
+thread pool keeps its parent when submitted through `with_current_context`.
+The logger adds the current trace and span IDs to every log line.
+
+Finished spans go to the exporter chosen by TRACE_EXPORTER:
+    jsonl   - one JSON object per span (TRACE_FILE, default traces/spans.jsonl)
+    chrome  - Trace Event Format, opens in Perfetto or chrome://tracing
+              (TRACE_FILE, default traces/trace.json)
+Unset, spans are still created (for log correlation) but not exported.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+# Innermost open span per thread, for samplers that cannot read another
+# thread's context (approximate when asyncio tasks interleave on one thread).
+_thread_spans: Dict[int, "Span"] = {}
+
+
+class Span:
+    """One timed operation in a trace."""
+
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_id", "start_time", "duration",
+        "attributes", "error", "thread_id", "lane_id", "_start",
+    )
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else f"{random.getrandbits(128):032x}"
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        self.thread_id = threading.get_ident()
+        self.lane_id = _lane_id()
+        self.start_time = time.time()
+        self.duration: Optional[float] = None
+        self._start = time.perf_counter()
+
+    def set_attribute(self, key: str, value: Any):
+        """Attach an attribute, e.g. a PR number or a token count."""
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes):
+        """Attach several attributes."""
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> dict:
+        """JSON-serializable form of a finished span."""
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "duration_ms": round(self.duration * 1000, 3) if self.duration is not None else None,
+            "thread_id": self.thread_id,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class JsonLinesExporter:
+    """Appends each finished span to a file as one JSON line."""
+
+    def __init__(self, path: str):
+        """Open the span file."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._file = open(path, "a", buffering=1)
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        """Write one span."""
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+
+
+class ChromeTraceExporter(JsonLinesExporter):
+    """Writes spans as Trace Event Format "complete" events.
+
+    The file is a JSON array that is never closed, which the format allows,
+    so spans are streamed as they finish. Each thread (and each asyncio task)
+    gets its own track.
+    """
+
+    def __init__(self, path: str):
+        """Start a new trace file."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._file = open(path, "w", buffering=1)
+        self._file.write("[\n")
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def export(self, span: Span):
+        """Write one span as a complete ("X") event."""
+        event = {
+            "name": span.name,
+            "cat": span.name.split(".", 1)[0],
+            "ph": "X",
+            "ts": int(span.start_time * 1_000_000),
+            "dur": int((span.duration or 0) * 1_000_000),
+            "pid": self._pid,
+            "tid": span.lane_id,
+            "args": {
+                **span.attributes,
+                "trace_id": span.trace_id,
+                "span_id": span.span_id,
+                "parent_id": span.parent_id,
+                **({"error": span.error} if span.error else {}),
+            },
+        }
+        line = json.dumps(event, default=str)
+        with self._lock:
+            self._file.write(line + ",\n")
+
+
+_exporter = None
+_exporter_loaded = False
+_exporter_lock = threading.Lock()
+
+
+def create_exporter_from_env():
+    """Build the exporter selected by TRACE_EXPORTER and TRACE_FILE, or None."""
+    kind = os.getenv("TRACE_EXPORTER", "").lower()
+    if kind == "jsonl":
+        return JsonLinesExporter(os.getenv("TRACE_FILE", "traces/spans.jsonl"))
+    if kind == "chrome":
+        return ChromeTraceExporter(os.getenv("TRACE_FILE", "traces/trace.json"))
+    if kind:
+        raise ValueError(f"Unknown TRACE_EXPORTER: {kind}")
+    return None
+
+
+def configure_tracing(exporter=None):
+    """Send finished spans to `exporter` (None disables exporting)."""
+    global _exporter, _exporter_loaded
+    with _exporter_lock:
+        _exporter = exporter
+        _exporter_loaded = True
+
+
+def _get_exporter():
+    global _exporter, _exporter_loaded
+    if not _exporter_loaded:
+        with _exporter_lock:
+            if not _exporter_loaded:
+                _exporter = create_exporter_from_env()
+                _exporter_loaded = True
+    return _exporter
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes) -> Iterator[Span]:
+    """Open a span as a child of the current one (or as a new trace's root)."""
+    current = Span(name, _current_span.get(), attributes)
+    token = _current_span.set(current)
+    thread_id = current.thread_id
+    previous = _thread_spans.get(thread_id)
+    _thread_spans[thread_id] = current
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.duration = time.perf_counter() - current._start
+        _current_span.reset(token)
+        if previous is None:
+            _thread_spans.pop(thread_id, None)
+        else:
+            _thread_spans[thread_id] = previous
+        exporter = _get_exporter()
+        if exporter is not None:
+            exporter.export(current)
+
+
+def traced(name: str) -> Callable:
+    """Decorator running a function (sync or async) inside a span."""
+    def decorator(fn: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_span() -> Optional[Span]:
+    """The innermost open span, if any."""
+    return _current_span.get()
+
+
+def thread_spans() -> Dict[int, Span]:
+    """Snapshot of the innermost open span on each thread."""
+    return dict(_thread_spans)
+
+
+def set_attributes(**attributes):
+    """Attach attributes to the current span; a no-op outside a span."""
+    current = _current_span.get()
+    if current is not None:
+        current.attributes.update(attributes)
+
+
+def with_current_context(fn: Callable) -> Callable:
+    """Bind `fn` to a copy of the current context, so spans it opens on another thread keep their parent.
+
+    A context can only be entered by one thread at a time, so wrap once per
+    submission rather than once per pool.
+    """
+    return functools.partial(contextvars.copy_context().run, fn)
+
+
+def add_trace_ids(logger, method_name: str, event_dict: dict) -> dict:
+    """structlog processor adding the current trace and span IDs."""
+    current = _current_span.get()
+    if current is not None:
+        event_dict.setdefault("trace_id", current.trace_id)
+        event_dict.setdefault("span_id", current.span_id)
+    return event_dict
+
+
+def _lane_id() -> int:
+    """Track for trace viewers: the asyncio task if there is one, else the thread."""
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    return id(task) if task is not None else threading.get_ident()
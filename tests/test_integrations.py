@@ -2,7 +2,20 @@
 
 import pytest
 import json
+from types import SimpleNamespace
+from unittest.mock import patch
 from src.mcp.server import ReleasGuardianMCPServer
+from src.mcp.asgi import AsyncReleaseGuardianServer
+from src.integrations.claude import ClaudeAnalyzer
+from src.integrations.github import AsyncGitHubClient
+from src.integrations.jira import AsyncJiraClient, JiraClient
+from src.integrations.state_store import LocalStateStore, MemoryStateStore
+from src.integrations.webhook_guard import WebhookGuard
+from src.integrations.pool import ClientPool
+from src.mcp.jobs import JobQueue
+from src.utils.cache import ResponseCache
+from src.utils.metrics import get_metrics_registry
+from src.models.schemas import RiskAssessment
 
 
 @pytest.fixture
@@ -42,6 +55,18 @@ class TestMCPEndpoints:
             # In production, we'd mock the API
             assert response.status_code in [200, 400]
     
+    def test_metrics_endpoint(self, app):
+        """Test /metrics serves per-route request metrics as Prometheus text."""
+        with app.test_client() as client:
+            client.get('/health')
+            response = client.get('/metrics')
+        
+        assert response.status_code == 200
+        assert response.content_type.startswith('text/plain; version=0.0.4')
+        text = response.get_data(as_text=True)
+        assert 'release_guardian_http_requests_total{method="GET",route="/health",status="200"}' in text
+        assert 'release_guardian_job_queue_depth{lane="express"} 0' in text
+    
     def test_analyze_release_missing_fields(self, app):
         """Test analyze-release with missing fields."""
         with app.test_client() as client:
@@ -52,6 +77,520 @@ class TestMCPEndpoints:
             )
             
             assert response.status_code == 400
+    
+    def test_analyze_release_async_job(self):
+        """Test async analyze-release returns 202 and the job can be polled."""
+        server = ReleasGuardianMCPServer()
+        server.jobs.handler = lambda data: {"success": True, "pr_number": data["pr_number"]}
+        
+        with server.app.test_client() as client:
+            response = client.post('/analyze-release', json={
+                "repo_owner": "org", "repo_name": "repo", "pr_number": 7,
+                "total_changes": 40, "async": True,
+            })
+            assert response.status_code == 202
+            data = json.loads(response.data)
+            assert data['lane'] == 'express'
+            assert response.headers['Location'] == data['status_url']
+            
+            server.jobs.shutdown()
+            job = json.loads(client.get(data['status_url']).data)
+            assert job['status'] == 'succeeded'
+            assert job['result'] == {"success": True, "pr_number": 7}
+            assert client.get('/jobs/unknown').status_code == 404
+
+    
+    def test_concurrent_analyses_share_clients_and_computation(self):
+        """Test identical concurrent analyze-release requests run once on pooled clients."""
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+        server = ReleasGuardianMCPServer()
+        server.clients = ClientPool()
+        builds = []
+        release = threading.Event()
+        
+        def build_github():
+            builds.append("github")
+            return SimpleNamespace()
+        
+        server.clients.get("github", build_github)
+        server.clients.get("jira", lambda: None)
+        server.clients.get("claude", lambda: SimpleNamespace())
+        
+        def analyze(repo_owner, repo_name, pr_number):
+            release.wait(5)
+            return {"success": True, "pr_number": pr_number}
+        
+        with patch.object(server, "_analyze_pr", side_effect=analyze) as analyze_pr:
+            payload = {"repo_owner": "org", "repo_name": "repo", "pr_number": 7, "head_sha": "abc"}
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                futures = [executor.submit(server._run_analysis, payload) for _ in range(4)]
+                while server.inflight.stats()["calls"] < 4:
+                    pass
+                release.set()
+                results = [f.result() for f in futures]
+        
+        assert analyze_pr.call_count == 1
+        assert all(r == {"success": True, "pr_number": 7} for r in results)
+        assert server._planner() is server._planner()
+        assert builds == ["github"]
+
+    def test_request_after_new_push_does_not_join_stale_analysis(self):
+        """Test requests without a head SHA are keyed on the PR's current head."""
+        import threading
+        server = ReleasGuardianMCPServer()
+        server.clients = ClientPool()
+        heads = iter(["sha1", "sha2"])
+        server.clients.get("github", lambda: SimpleNamespace(
+            get_pr_stats=lambda owner, name, number: {"head_sha": next(heads)}
+        ))
+        release = threading.Event()
+
+        def analyze(repo_owner, repo_name, pr_number):
+            release.wait(5)
+            return {"success": True}
+
+        with patch.object(server, "_analyze_pr", side_effect=analyze) as analyze_pr:
+            payload = {"repo_owner": "org", "repo_name": "repo", "pr_number": 7}
+            first = threading.Thread(target=server._run_analysis, args=(payload,))
+            first.start()
+            while server.inflight.stats()["calls"] < 1:
+                pass
+            second = threading.Thread(target=server._run_analysis, args=(payload,))
+            second.start()
+            while server.inflight.stats()["calls"] < 2:
+                pass
+            release.set()
+            first.join()
+            second.join()
+
+        assert analyze_pr.call_count == 2
+
+
+class TestJobQueue:
+    """Test the background analysis job queue."""
+    
+    def test_lanes_from_size_and_risk_hint(self):
+        """Test lane selection."""
+        queue = JobQueue(lambda data: data, small_pr_changes=100, large_pr_changes=1000, large_pr_files=50)
+        
+        assert queue.choose_lane(total_changes=20) == "express"
+        assert queue.choose_lane(total_changes=500) == "standard"
+        assert queue.choose_lane(total_changes=500, changed_files=80) == "bulk"
+        assert queue.choose_lane(total_changes=5000, risk_hint="high") == "express"
+        assert queue.choose_lane() == "standard"
+    
+    def test_small_prs_run_before_queued_bulk_jobs(self):
+        """Test higher lanes are served first and failures are recorded."""
+        import threading
+        started = threading.Event()
+        release = threading.Event()
+        order = []
+        
+        def handler(data):
+            if data["name"] == "blocker":
+                started.set()
+                release.wait(5)
+            order.append(data["name"])
+            if data["name"] == "broken":
+                raise RuntimeError("boom")
+            return {"name": data["name"]}
+        
+        queue = JobQueue(handler, workers=1)
+        queue.submit({"name": "blocker"}, lane="standard")
+        assert started.wait(5)
+        bulk = queue.submit({"name": "monorepo"}, lane="bulk")
+        queue.submit({"name": "broken"}, lane="standard")
+        queue.submit({"name": "typo"}, lane="express")
+        
+        stats = queue.stats()
+        assert stats["depth"] == 3
+        assert stats["lanes"]["bulk"]["depth"] == 1
+        
+        release.set()
+        queue.shutdown()
+        
+        assert order == ["blocker", "typo", "broken", "monorepo"]
+        assert queue.get(bulk.job_id)["result"] == {"name": "monorepo"}
+        assert queue.stats()["failed"] == 1
+    
+    def test_callback_receives_finished_job(self):
+        """Test the completion callback."""
+        calls = []
+        queue = JobQueue(lambda data: {"ok": True}, workers=1,
+                         callback_sender=lambda url, job: calls.append((url, job)))
+        job = queue.submit({}, callback_url="https://ci.example.com/hook")
+        queue.shutdown()
+        
+        assert calls[0][0] == "https://ci.example.com/hook"
+        assert calls[0][1]["status"] == "succeeded"
+        assert queue.get(job.job_id)["callback_status"] == "delivered"
+
+
+def _fake_issue(key):
+    """Build an object shaped like a jira Issue."""
+    return SimpleNamespace(
+        key=key,
+        fields=SimpleNamespace(
+            summary=f"Summary {key}",
+            description="",
+            status=SimpleNamespace(name="Open"),
+            issuetype=SimpleNamespace(name="Story"),
+            assignee=None,
+            labels=[],
+            priority=None,
+        ),
+    )
+
+
+class TestJiraClient:
+    """Test Jira ticket retrieval."""
+    
+    @patch('src.integrations.jira.JIRA')
+    def test_bulk_fetch_reports_missing_tickets(self, mock_jira):
+        """Test bulk fetch uses one search and reports missing keys."""
+        mock_jira.return_value.search_issues.return_value = [_fake_issue("PROJ-2"), _fake_issue("PROJ-1")]
+        client = JiraClient(url="http://jira", user="u", token="t")
+        
+        result = client.get_tickets_bulk(["PROJ-1", "PROJ-2", "PROJ-3", "PROJ-1"])
+        
+        assert [t["ticket_id"] for t in result["tickets"]] == ["PROJ-1", "PROJ-2"]
+        assert result["missing"] == ["PROJ-3"]
+        assert mock_jira.return_value.search_issues.call_count == 1
+        mock_jira.return_value.issue.assert_not_called()
+    
+    @patch('src.integrations.jira.JIRA')
+    def test_bulk_fetch_is_chunked(self, mock_jira):
+        """Test large ticket lists are split into several searches."""
+        mock_jira.return_value.search_issues.return_value = []
+        client = JiraClient(url="http://jira", user="u", token="t")
+        
+        client.get_tickets_bulk([f"PROJ-{i}" for i in range(120)])
+        
+        assert mock_jira.return_value.search_issues.call_count == 3
+    
+    @patch('src.integrations.jira.JIRA')
+    def test_failed_search_reports_chunk_as_missing(self, mock_jira):
+        """Test a search error leaves that chunk's tickets out instead of raising."""
+        mock_jira.return_value.search_issues.side_effect = [
+            [_fake_issue("PROJ-1")], RuntimeError("503 Service Unavailable")
+        ]
+        client = JiraClient(url="http://jira", user="u", token="t")
+        ticket_ids = [f"PROJ-{i}" for i in range(1, 61)]
+        
+        result = client.get_tickets_bulk(ticket_ids)
+        
+        assert [t["ticket_id"] for t in result["tickets"]] == ["PROJ-1"]
+        assert result["failed"] == ticket_ids[50:]
+        assert result["missing"] == ticket_ids[1:]
+        assert client.get_multiple_tickets(["PROJ-1"]) == []
+    
+    @patch('src.integrations.jira.JIRA')
+    def test_moved_issue_keeps_requested_key(self, mock_jira):
+        """Test an issue returned under its new key is looked up and kept under the requested one."""
+        mock_jira.return_value.search_issues.return_value = [_fake_issue("NEW-5"), _fake_issue("PROJ-2")]
+        mock_jira.return_value.issue.side_effect = lambda key, fields: {"PROJ-1": _fake_issue("NEW-5")}[key]
+        client = JiraClient(url="http://jira", user="u", token="t")
+        
+        result = client.get_tickets_bulk(["PROJ-1", "PROJ-2", "PROJ-3"])
+        
+        assert [(t["ticket_id"], t["key"]) for t in result["tickets"]] == [("PROJ-1", "NEW-5"), ("PROJ-2", "PROJ-2")]
+        assert result["missing"] == ["PROJ-3"]
+        assert result["failed"] == []
+
+
+class TestClaudeAnalyzerCache:
+    """Test Claude response caching."""
+    
+    @patch('src.integrations.claude.anthropic.Anthropic')
+    def test_repeat_call_served_from_cache(self, mock_anthropic):
+        """Test identical requests only call the API once."""
+        mock_anthropic.return_value.messages.create.return_value = SimpleNamespace(
+            content=[SimpleNamespace(text='{"risk_score": 30, "risk_factors": []}')]
+        )
+        cache = ResponseCache()
+        analyzer = ClaudeAnalyzer(api_key="key", cache=cache)
+        
+        first = analyzer.score_release_risk("Add endpoint", ["backend"], 40)
+        first["risk_factors"].append("mutated by caller")
+        second = analyzer.score_release_risk("Add endpoint", ["backend"], 40)
+        
+        assert second == {"risk_score": 30, "risk_factors": []}
+        assert mock_anthropic.return_value.messages.create.call_count == 1
+        assert cache.stats()["hits"] == 1
+        lookups = get_metrics_registry().counter("release_guardian_claude_cache_requests_total")
+        assert lookups.value(prompt="score_release_risk", result="hit") >= 1
+    
+    @patch('src.integrations.claude.anthropic.Anthropic')
+    def test_error_defaults_are_not_cached(self, mock_anthropic):
+        """Test failed calls are retried rather than served from cache."""
+        mock_anthropic.return_value.messages.create.side_effect = RuntimeError("overloaded")
+        cache = ResponseCache()
+        analyzer = ClaudeAnalyzer(api_key="key", cache=cache)
+        
+        analyzer.score_release_risk("Add endpoint", ["backend"], 40)
+        analyzer.score_release_risk("Add endpoint", ["backend"], 40)
+        
+        assert mock_anthropic.return_value.messages.create.call_count == 2
+
+    
+    @patch('src.integrations.claude.anthropic.Anthropic')
+    def test_large_diff_is_chunked_and_merged(self, mock_anthropic):
+        """Test oversized diffs are analyzed per chunk and de-duplicated."""
+        mock_anthropic.return_value.messages.create.side_effect = lambda **kw: SimpleNamespace(
+            content=[SimpleNamespace(text=json.dumps({
+                "integration_tests": [{"name": "Test Login"}, {"name": f"test_{len(kw['messages'][0]['content'])}"}],
+                "automation_tests": [],
+                "e2e_flows": [],
+            }))]
+        )
+        analyzer = ClaudeAnalyzer(api_key="key", cache=None, chunk_token_budget=50)
+        diff = "@@ -1 +1 @@\n+" + "a" * 150 + "\n@@ -9 +9 @@\n+" + "b" * 100 + "\n"
+        
+        result = analyzer.generate_test_scenarios(diff, ["AC"], ["backend"])
+        
+        names = [t["name"] for t in result["integration_tests"]]
+        assert mock_anthropic.return_value.messages.create.call_count == 2
+        assert names.count("Test Login") == 1
+        assert len(names) == 3
+
+
+class TestStateStore:
+    """Test local state persistence."""
+    
+    def test_local_store_round_trip(self, tmp_path):
+        """Test documents survive a new store instance on the same directory."""
+        LocalStateStore(str(tmp_path)).put("analysis:org/repo#1", {"head_sha": "abc"})
+        store = LocalStateStore(str(tmp_path))
+        
+        assert store.get("analysis:org/repo#1") == {"head_sha": "abc"}
+        store.delete("analysis:org/repo#1")
+        assert store.get("analysis:org/repo#1") is None
+
+    @pytest.mark.parametrize("make_store", [lambda path: MemoryStateStore(), lambda path: LocalStateStore(str(path))])
+    def test_put_if_newer_keeps_the_latest_under_concurrency(self, tmp_path, make_store):
+        """Test racing writers leave the document with the greatest field, whatever the order."""
+        from concurrent.futures import ThreadPoolExecutor
+        store = make_store(tmp_path)
+        times = [f"2024-01-01T10:00:{second:02d}Z" for second in range(40)]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda t: store.put_if_newer("latest", {"event_time": t}, "event_time"), times[::-1]))
+
+        assert store.get("latest") == {"event_time": times[-1]}
+        assert store.put_if_newer("latest", {"event_time": times[0]}, "event_time") is False
+
+
+class TestWebhookGuard:
+    """Test webhook deduplication and superseded-push detection."""
+    
+    def _guard(self):
+        return WebhookGuard(MemoryStateStore(), debounce_seconds=1, sleep=lambda s: None)
+    
+    def test_duplicate_delivery_and_head_sha(self):
+        """Test redeliveries and repeated head SHAs are rejected."""
+        guard = self._guard()
+        
+        assert guard.claim("org/repo#1", "sha1", "delivery-1") is True
+        assert guard.claim("org/repo#1", "sha1", "delivery-1") is False
+        assert guard.claim("org/repo#1", "sha1", "delivery-2") is False
+        
+        # A redelivery after a failure reuses the delivery ID
+        guard.release("org/repo#1", "sha1", "delivery-1")
+        assert guard.claim("org/repo#1", "sha1", "delivery-1") is True
+    
+    def test_newer_push_supersedes_older(self):
+        """Test a newer push wins even if the older delivery arrives late."""
+        guard = self._guard()
+        guard.mark_latest("org/repo#1", "sha2", "2024-01-01T10:00:05Z")
+        guard.mark_latest("org/repo#1", "sha1", "2024-01-01T10:00:00Z")
+        
+        assert guard.wait_for_quiet("org/repo#1", "sha1") is False
+        assert guard.wait_for_quiet("org/repo#1", "sha2") is True
+        assert guard.is_superseded("org/repo#2", "sha1") is False
+
+
+class TestClientPool:
+    """Test process-wide client reuse."""
+    
+    def test_builds_each_client_once_across_threads(self):
+        """Test concurrent first requests share one client."""
+        from concurrent.futures import ThreadPoolExecutor
+        pool = ClientPool()
+        builds = []
+        
+        def factory():
+            builds.append(1)
+            return object()
+        
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            clients = list(executor.map(lambda _: pool.get("github", factory), range(16)))
+        
+        assert len(builds) == 1
+        assert all(client is clients[0] for client in clients)
+    
+    def test_failed_build_is_retried(self):
+        """Test a factory error is not cached."""
+        pool = ClientPool()
+        
+        def failing():
+            raise ValueError("GITHUB_TOKEN not set in environment")
+        
+        with pytest.raises(ValueError):
+            pool.get("github", failing)
+        assert pool.get("github", lambda: "client") == "client"
+    
+    def test_jira_is_none_when_not_configured(self, monkeypatch):
+        """Test Jira stays unconfigured and is not rebuilt."""
+        monkeypatch.delenv("JIRA_API_TOKEN", raising=False)
+        pool = ClientPool()
+        
+        assert pool.jira() is None
+        assert "jira" in pool._clients
+    
+    def test_package_exports_resolve_lazily(self):
+        """Test lazily exported names resolve to the submodule objects."""
+        import src.integrations as integrations
+        from src.integrations.state_store import create_state_store
+        
+        assert integrations.create_state_store is create_state_store
+        assert "get_client_pool" in dir(integrations)
+        with pytest.raises(AttributeError):
+            integrations.missing_name
+
+
+class TestAsyncClients:
+    """Test the asyncio GitHub and Jira clients."""
+    
+    def test_github_pr_diff_pages_files(self):
+        """Test the PR and every page of its files are fetched."""
+        import asyncio
+        import httpx
+        
+        def handler(request):
+            if request.url.path.endswith("/files"):
+                page = int(request.url.params["page"])
+                count = 100 if page == 1 else 3
+                return httpx.Response(200, json=[
+                    {"filename": f"f{page}_{i}.py", "status": "modified", "additions": 1,
+                     "deletions": 0, "changes": 1, "patch": "+x"}
+                    for i in range(count)
+                ])
+            return httpx.Response(200, json={
+                "title": "PROJ-1 Add login", "body": None, "user": {"login": "dev"},
+                "base": {"ref": "main"}, "head": {"ref": "feature", "sha": "abc"},
+            })
+        
+        async def fetch():
+            http = httpx.AsyncClient(base_url="https://github.test", transport=httpx.MockTransport(handler))
+            client = AsyncGitHubClient(token="t", http_client=http)
+            try:
+                return await client.get_pr_diff("org", "repo", 7)
+            finally:
+                await client.aclose()
+        
+        pr = asyncio.run(fetch())
+        
+        assert pr["total_files"] == 103
+        assert pr["head_sha"] == "abc"
+        assert pr["body"] == ""
+    
+    def test_jira_bulk_fetch_reports_missing_tickets(self):
+        """Test async bulk fetch returns the same shape as JiraClient."""
+        import asyncio
+        import httpx
+        
+        def handler(request):
+            return httpx.Response(200, json={"issues": [{
+                "key": "PROJ-1",
+                "fields": {"summary": "Login", "description": "Acceptance Criteria:\n* User can log in",
+                           "status": {"name": "Open"}, "issuetype": {"name": "Story"}, "priority": {"name": "High"},
+                           "assignee": None, "labels": []},
+            }]})
+        
+        async def fetch():
+            http = httpx.AsyncClient(base_url="https://jira.test", transport=httpx.MockTransport(handler))
+            client = AsyncJiraClient(url="https://jira.test", user="u", token="t", http_client=http)
+            try:
+                return await client.get_tickets_bulk(["PROJ-1", "PROJ-2"])
+            finally:
+                await client.aclose()
+        
+        result = asyncio.run(fetch())
+        
+        assert [t["ticket_id"] for t in result["tickets"]] == ["PROJ-1"]
+        assert result["tickets"][0]["acceptance_criteria"] == ["User can log in"]
+        assert result["missing"] == ["PROJ-2"]
+    
+    def test_jira_bulk_fetch_survives_failed_search_and_follows_moves(self):
+        """Test async bulk fetch reports failed chunks and keeps moved issues under the requested key."""
+        import asyncio
+        import httpx
+        
+        def issue(key):
+            return {"key": key, "fields": {"summary": key, "description": "", "status": {"name": "Open"},
+                                           "issuetype": {"name": "Story"}, "priority": None,
+                                           "assignee": None, "labels": []}}
+        
+        def handler(request):
+            if request.url.path == "/rest/api/2/issue/PROJ-1":
+                return httpx.Response(200, json=issue("NEW-5"))
+            if request.url.path.startswith("/rest/api/2/issue/"):
+                return httpx.Response(404)
+            if "PROJ-1," in json.loads(request.content)["jql"]:
+                return httpx.Response(200, json={"issues": [issue("NEW-5")]})
+            return httpx.Response(503)
+        
+        async def fetch():
+            http = httpx.AsyncClient(base_url="https://jira.test", transport=httpx.MockTransport(handler))
+            client = AsyncJiraClient(url="https://jira.test", user="u", token="t", http_client=http)
+            try:
+                return await client.get_tickets_bulk([f"PROJ-{i}" for i in range(1, 61)])
+            finally:
+                await client.aclose()
+        
+        result = asyncio.run(fetch())
+        
+        assert [(t["ticket_id"], t["key"]) for t in result["tickets"]] == [("PROJ-1", "NEW-5")]
+        assert result["failed"] == [f"PROJ-{i}" for i in range(51, 61)]
+        assert len(result["missing"]) == 59
+
+
+class TestASGIServer:
+    """Test the ASGI variant of the MCP server."""
+    
+    def _post(self, server, path, payload):
+        import asyncio
+        import httpx
+        
+        async def send():
+            transport = httpx.ASGITransport(app=server)
+            async with httpx.AsyncClient(transport=transport, base_url="http://asgi") as client:
+                return await client.post(path, json=payload)
+        
+        return asyncio.run(send())
+    
+    def test_missing_fields_and_unknown_routes(self):
+        """Test validation errors and routing match the Flask server."""
+        server = AsyncReleaseGuardianServer()
+        
+        assert self._post(server, "/analyze-release", {}).status_code == 400
+        assert self._post(server, "/health", {}).status_code == 405
+        assert self._post(server, "/nope", {}).status_code == 404
+    
+    def test_risk_score_endpoint(self):
+        """Test release-risk-score awaits the async risk scorer."""
+        server = AsyncReleaseGuardianServer()
+        
+        async def score(*args):
+            return RiskAssessment(risk_score=30, confidence_percentage=80, risk_flags=[],
+                                  suggestions=[], requires_manual_review=False)
+        
+        server.clients.get("agent:risk_scorer", lambda: SimpleNamespace(score_release_async=score))
+        response = self._post(server, "/release-risk-score", {"changes_summary": "Add endpoint"})
+        
+        assert response.status_code == 200
+        assert response.json()["risk_score"] == 30
 
 
 if __name__ == "__main__":